@@ -15,7 +15,14 @@ from api.engine.format_legality_filter_v1 import (
     legality_filter_available_v1,
     select_filter_columns_v1,
 )
+from api.engine.primitive_bitset_index_v1 import get_cards_primitives_bitset_index_v1
 from api.engine.utils import normalize_primitives_source
+from engine.color_identity_mask import (
+    COLOR_IDENTITY_MASK_COLUMN,
+    color_identity_mask,
+    is_mask_subset,
+    snapshot_has_color_identity_mask,
+)
 from engine.db import connect as cards_db_connect
 
 VERSION = "candidate_pool_v1"
@@ -193,6 +200,11 @@ def _snapshot_exists(db_snapshot_id: str) -> bool:
     return row is not None
 
 
+def _snapshot_color_mask_available(db_snapshot_id: str) -> bool:
+    with cards_db_connect() as con:
+        return snapshot_has_color_identity_mask(con, db_snapshot_id)
+
+
 def _build_gc_filter_context(*, db_snapshot_id: str, bracket_id: str, current_cards: List[str]) -> Dict[str, Any]:
     current_gc_count = sum(1 for name in current_cards if name in GAME_CHANGERS_SET)
     snapshot_available = _snapshot_exists(db_snapshot_id)
@@ -243,6 +255,7 @@ def _query_snapshot_cards(
     exclude_names_lower: Set[str],
     include_primitives_set: Set[str],
     select_columns: List[str],
+    commander_color_mask: Optional[int] = None,
 ) -> Tuple[List[Dict[str, Any]], float]:
     snapshot_id = db_snapshot_id.strip() if isinstance(db_snapshot_id, str) else ""
     if snapshot_id == "":
@@ -278,46 +291,43 @@ def _query_snapshot_cards(
         where_clauses.append(f"LOWER(name) NOT IN ({placeholders})")
         params.extend(exclude_names_sorted)
 
-    base_where_clauses = list(where_clauses)
-    base_params = list(params)
-
-    include_primitives_sorted = sorted(include_primitives_set)
-    include_filter_enabled = len(include_primitives_sorted) > 0
-    if include_filter_enabled:
-        primitive_placeholders = ",".join("?" for _ in include_primitives_sorted)
-        where_clauses.append("json_valid(primitives_json) = 1")
+    if commander_color_mask is not None:
         where_clauses.append(
-            (
-                "EXISTS ("
-                "SELECT 1 FROM json_each(primitives_json) AS primitive "
-                f"WHERE primitive.value IN ({primitive_placeholders})"
-                ")"
-            )
+            f"{COLOR_IDENTITY_MASK_COLUMN} IS NOT NULL AND ({COLOR_IDENTITY_MASK_COLUMN} & ~?) = 0"
         )
-        params.extend(include_primitives_sorted)
-
-    sql = (
-        f"SELECT {select_sql} "
-        f"FROM cards WHERE {' AND '.join(where_clauses)} "
-        "ORDER BY oracle_id ASC, name ASC"
-    )
+        params.append(int(commander_color_mask))
 
+    include_primitives_sorted = sorted(include_primitives_set)
     sql_started_at = perf_counter()
 
-    fallback_sql = (
-        f"SELECT {select_sql} "
-        f"FROM cards WHERE {' AND '.join(base_where_clauses)} "
-        "ORDER BY oracle_id ASC, name ASC"
-    )
-    fallback_params = tuple(base_params)
-
-    with cards_db_connect() as con:
-        try:
+    if len(include_primitives_sorted) == 0:
+        sql = (
+            f"SELECT {select_sql} "
+            f"FROM cards WHERE {' AND '.join(where_clauses)} "
+            "ORDER BY oracle_id ASC, name ASC"
+        )
+        with cards_db_connect() as con:
             rows = con.execute(sql, tuple(params)).fetchall()
-        except sqlite3.OperationalError:
-            if not include_filter_enabled:
-                raise
-            rows = con.execute(fallback_sql, fallback_params).fetchall()
+    else:
+        # Primitive membership comes from the in-memory posting lists; SQL only fetches
+        # the matching rows by primary key, in the same oracle_id order as before.
+        primitive_index = get_cards_primitives_bitset_index_v1(snapshot_id)
+        candidate_oracle_ids = sorted(primitive_index.oracle_ids_for(primitive_index.union(include_primitives_sorted)))
+        rows = []
+        with cards_db_connect() as con:
+            for oracle_id_chunk in _chunk(candidate_oracle_ids, 500):
+                placeholders = ",".join("?" for _ in oracle_id_chunk)
+                rows.extend(
+                    con.execute(
+                        (
+                            f"SELECT {select_sql} "
+                            f"FROM cards WHERE {' AND '.join(where_clauses)} "
+                            f"AND oracle_id IN ({placeholders}) "
+                            "ORDER BY oracle_id ASC, name ASC"
+                        ),
+                        (*params, *oracle_id_chunk),
+                    ).fetchall()
+                )
 
     sql_query_ms = _round6(max((perf_counter() - sql_started_at) * 1000.0, 0.0))
     return [dict(row) for row in rows], sql_query_ms
@@ -348,8 +358,14 @@ def get_candidate_pool_v1(
     format_clean = format.strip() if isinstance(format, str) and format.strip() != "" else "commander"
     cards_table_columns = _normalize_cards_table_columns(list_cards_table_columns())
     legality_filter_available = legality_filter_available_v1(cards_table_columns)
+    color_mask_available = (
+        COLOR_IDENTITY_MASK_COLUMN in cards_table_columns and _snapshot_color_mask_available(db_snapshot_id)
+    )
+    commander_color_mask = color_identity_mask(commander_colors) if color_mask_available else None
 
     query_columns = ["oracle_id", "name", "color_identity", "primitives_json"]
+    if color_mask_available:
+        query_columns.append(COLOR_IDENTITY_MASK_COLUMN)
     for column in select_filter_columns_v1(cards_table_columns):
         if column in query_columns:
             continue
@@ -367,6 +383,7 @@ def get_candidate_pool_v1(
         exclude_names_lower=exclude_names_lower,
         include_primitives_set=include_primitives_set,
         select_columns=query_columns,
+        commander_color_mask=commander_color_mask,
     )
 
     total_candidates_seen = len(rows)
@@ -386,8 +403,12 @@ def get_candidate_pool_v1(
     filtered_illegal_count = len(filtered_illegal_names)
     filtered_illegal_examples_top5 = _top5_sorted_unique_names(filtered_illegal_names)
 
-    color_cache, color_cache_sql_ms = _build_name_color_cache(db_snapshot_id, rows)
-    sql_query_ms = _round6(sql_query_ms + color_cache_sql_ms)
+    # With a materialized mask the SQL query already applied the color filter per row;
+    # the name-keyed JSON cache is only needed for snapshots built before the mask existed.
+    color_cache: Dict[str, Tuple[bool, Set[str]]] = {}
+    if commander_color_mask is None:
+        color_cache, color_cache_sql_ms = _build_name_color_cache(db_snapshot_id, rows)
+        sql_query_ms = _round6(sql_query_ms + color_cache_sql_ms)
 
     python_filter_ms = 0.0
     color_check_ms = 0.0
@@ -416,8 +437,13 @@ def get_candidate_pool_v1(
             python_filter_ms += max((perf_counter() - filter_started_at) * 1000.0, 0.0)
 
         color_started_at = perf_counter() if dev_metrics_enabled else 0.0
-        color_available, card_colors = color_cache.get(name.lower(), (False, set()))
-        color_legal = color_available and card_colors.issubset(commander_colors)
+        if commander_color_mask is not None:
+            card_mask = row.get(COLOR_IDENTITY_MASK_COLUMN)
+            color_available = isinstance(card_mask, int) and not isinstance(card_mask, bool)
+            color_legal = color_available and is_mask_subset(card_mask, commander_color_mask)
+        else:
+            color_available, card_colors = color_cache.get(name.lower(), (False, set()))
+            color_legal = color_available and card_colors.issubset(commander_colors)
         if dev_metrics_enabled:
             color_check_ms += max((perf_counter() - color_started_at) * 1000.0, 0.0)
         if not color_available:
@@ -1,7 +1,18 @@
-from typing import Any, Dict, List
+import heapq
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 
 _BUCKET_ORDER_V1 = ("ramp", "draw", "interaction", "protection", "wincon")
 
+# Per-primitive membership flags are packed into 16-bit lanes so one integer
+# addition per primitive accumulates all four overlap counts of a candidate.
+_LANE_BITS = 16
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_LANE_MISSING = 0
+_LANE_HYPOTHESIS = 1
+_LANE_COMMANDER = 2
+_LANE_ANCHOR = 3
+
 
 def _normalize_primitives(value: Any) -> List[str]:
     if not isinstance(value, list):
@@ -37,6 +48,15 @@ def _primitive_matches_bucket(primitive: str, bucket: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=8192)
+def _bucket_mask_for_primitive(primitive: str) -> int:
+    mask = 0
+    for bit, bucket in enumerate(_BUCKET_ORDER_V1):
+        if _primitive_matches_bucket(primitive, bucket):
+            mask |= 1 << bit
+    return mask
+
+
 def _to_str_set(value: Any) -> set[str]:
     if not isinstance(value, list):
         return set()
@@ -62,6 +82,14 @@ def _extract_missing_targets(missing_targets: Dict[str, Any]) -> tuple[set[str],
     return missing_primitives, missing_buckets
 
 
+def _missing_bucket_mask(missing_buckets: List[str]) -> int:
+    mask = 0
+    for bit, bucket in enumerate(_BUCKET_ORDER_V1):
+        if bucket in missing_buckets:
+            mask |= 1 << bit
+    return mask
+
+
 def _gc_penalty(is_game_changer: bool, gc_remaining: int | None) -> int:
     if not is_game_changer:
         return 0
@@ -74,14 +102,37 @@ def _gc_penalty(is_game_changer: bool, gc_remaining: int | None) -> int:
     return 0
 
 
+def _encode_primitive(
+    primitive: str,
+    missing_primitives_set: set[str],
+    hypothesis_primitives_set: set[str],
+    commander_primitives_set: set[str],
+    anchor_primitives_set: set[str],
+) -> Tuple[int, int]:
+    packed = 0
+    if primitive in missing_primitives_set:
+        packed |= 1 << (_LANE_MISSING * _LANE_BITS)
+    if primitive in hypothesis_primitives_set:
+        packed |= 1 << (_LANE_HYPOTHESIS * _LANE_BITS)
+    if primitive in commander_primitives_set:
+        packed |= 1 << (_LANE_COMMANDER * _LANE_BITS)
+    if primitive in anchor_primitives_set:
+        packed |= 1 << (_LANE_ANCHOR * _LANE_BITS)
+    return packed, _bucket_mask_for_primitive(primitive)
+
+
 def rank_candidates_v1(
     candidates: list[dict],
     deck_state: dict,
     hypothesis: dict | None,
     missing_targets: dict,
     gc_remaining: int | None,
+    top_k: int | None = None,
 ) -> list[dict]:
-    """Return candidates sorted deterministically by strategic value."""
+    """Return candidates sorted deterministically by strategic value.
+
+    When top_k is given only the first top_k rows of the full ranking are returned.
+    """
 
     candidate_rows = candidates if isinstance(candidates, list) else []
     deck_state_obj = deck_state if isinstance(deck_state, dict) else {}
@@ -92,8 +143,13 @@ def rank_candidates_v1(
     hypothesis_primitives_set = _to_str_set(hypothesis_obj.get("core_primitives"))
 
     missing_primitives_set, missing_buckets = _extract_missing_targets(missing_targets)
+    missing_bucket_mask = _missing_bucket_mask(missing_buckets)
+    gc_penalty_if_game_changer = _gc_penalty(is_game_changer=True, gc_remaining=gc_remaining)
 
-    ranked_rows: List[Dict[str, Any]] = []
+    # Each distinct primitive is encoded once per call: (packed overlap flags, bucket mask).
+    encoded_by_primitive: Dict[str, Tuple[int, int]] = {}
+
+    scored: List[Tuple[Tuple[Any, ...], Tuple[int, ...], dict]] = []
     for candidate in candidate_rows:
         if not isinstance(candidate, dict):
             continue
@@ -101,60 +157,73 @@ def rank_candidates_v1(
         if not isinstance(name, str) or name == "":
             continue
 
-        primitives_set = set(_normalize_primitives(candidate.get("primitives")))
-
-        covers_missing_primitives_count = len([
-            primitive
-            for primitive in missing_primitives_set
-            if primitive in primitives_set
-        ])
-
-        covered_missing_buckets = [
-            bucket
-            for bucket in missing_buckets
-            if any(_primitive_matches_bucket(primitive, bucket) for primitive in primitives_set)
-        ]
-        covers_missing_targets_count = len(covered_missing_buckets)
-
-        anchor_overlap_score = len([p for p in primitives_set if p in anchor_primitives_set])
-        commander_alignment_score = len([p for p in primitives_set if p in commander_primitives_set])
-        hypothesis_alignment_score = len([p for p in primitives_set if p in hypothesis_primitives_set])
+        packed_counts = 0
+        bucket_mask = 0
+        for primitive in set(_normalize_primitives(candidate.get("primitives"))):
+            encoded = encoded_by_primitive.get(primitive)
+            if encoded is None:
+                encoded = _encode_primitive(
+                    primitive,
+                    missing_primitives_set,
+                    hypothesis_primitives_set,
+                    commander_primitives_set,
+                    anchor_primitives_set,
+                )
+                encoded_by_primitive[primitive] = encoded
+            packed_counts += encoded[0]
+            bucket_mask |= encoded[1]
+
+        covers_missing_primitives_count = (packed_counts >> (_LANE_MISSING * _LANE_BITS)) & _LANE_MASK
+        hypothesis_alignment_score = (packed_counts >> (_LANE_HYPOTHESIS * _LANE_BITS)) & _LANE_MASK
+        commander_alignment_score = (packed_counts >> (_LANE_COMMANDER * _LANE_BITS)) & _LANE_MASK
+        anchor_overlap_score = (packed_counts >> (_LANE_ANCHOR * _LANE_BITS)) & _LANE_MASK
+        covers_missing_targets_count = (bucket_mask & missing_bucket_mask).bit_count()
 
         role_compression_score = covers_missing_targets_count
         if covers_missing_primitives_count > 0 and covers_missing_targets_count > 0:
             role_compression_score += 1
 
-        gc_penalty = _gc_penalty(
-            is_game_changer=bool(candidate.get("is_game_changer")),
-            gc_remaining=gc_remaining,
-        )
+        gc_penalty = gc_penalty_if_game_changer if bool(candidate.get("is_game_changer")) else 0
 
+        signals = (
+            role_compression_score,
+            covers_missing_targets_count,
+            covers_missing_primitives_count,
+            hypothesis_alignment_score,
+            commander_alignment_score,
+            anchor_overlap_score,
+            gc_penalty,
+        )
         rank_key = (
-            -int(role_compression_score),
-            -int(covers_missing_targets_count),
-            -int(covers_missing_primitives_count),
-            -int(hypothesis_alignment_score),
-            -int(commander_alignment_score),
-            -int(anchor_overlap_score),
-            int(gc_penalty),
+            -role_compression_score,
+            -covers_missing_targets_count,
+            -covers_missing_primitives_count,
+            -hypothesis_alignment_score,
+            -commander_alignment_score,
+            -anchor_overlap_score,
+            gc_penalty,
             name,
         )
+        scored.append((rank_key, signals, candidate))
+
+    # Both paths are stable, so equal keys keep input order exactly like a full sort.
+    if isinstance(top_k, int) and 0 <= top_k < len(scored):
+        selected = heapq.nsmallest(top_k, scored, key=lambda item: item[0])
+    else:
+        selected = sorted(scored, key=lambda item: item[0])
 
+    ranked_rows: List[Dict[str, Any]] = []
+    for _rank_key, signals, candidate in selected:
         row_out = dict(candidate)
         row_out["ranking_signals_v1"] = {
-            "role_compression_score": int(role_compression_score),
-            "covers_missing_targets_count": int(covers_missing_targets_count),
-            "covers_missing_primitives_count": int(covers_missing_primitives_count),
-            "hypothesis_alignment_score": int(hypothesis_alignment_score),
-            "commander_alignment_score": int(commander_alignment_score),
-            "anchor_overlap_score": int(anchor_overlap_score),
-            "gc_penalty": int(gc_penalty),
+            "role_compression_score": int(signals[0]),
+            "covers_missing_targets_count": int(signals[1]),
+            "covers_missing_primitives_count": int(signals[2]),
+            "hypothesis_alignment_score": int(signals[3]),
+            "commander_alignment_score": int(signals[4]),
+            "anchor_overlap_score": int(signals[5]),
+            "gc_penalty": int(signals[6]),
         }
-        row_out["_rank_key_v1"] = rank_key
         ranked_rows.append(row_out)
 
-    ranked_rows.sort(key=lambda row: row.get("_rank_key_v1"))
-    for row in ranked_rows:
-        row.pop("_rank_key_v1", None)
-
     return ranked_rows
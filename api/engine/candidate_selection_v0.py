@@ -2,6 +2,7 @@ import json
 from typing import Any, Dict, List
 
 from api.engine.constants import GAME_CHANGERS_SET, SINGLETON_EXEMPT_NAMES, TagsNotCompiledError
+from api.engine.primitive_bitset_index_v1 import get_primitive_bitset_index_v1
 from api.engine.utils import normalize_primitives_source, sorted_unique
 from api.engine.version_resolve_v1 import resolve_runtime_taxonomy_version
 from engine.db import connect as cards_db_connect, is_legal_in_format
@@ -129,71 +130,57 @@ def query_candidate_rows(snapshot_id: str, primitives_needed: List[str], limit:
             requested=None,
             db=con,
         )
-        taxonomy_version = _ensure_runtime_primitive_index(
-            con=con,
-            snapshot_id=snapshot_id,
-            taxonomy_version=taxonomy_version,
+        primitive_index = (
+            get_primitive_bitset_index_v1(snapshot_id=snapshot_id, taxonomy_version=taxonomy_version)
+            if isinstance(taxonomy_version, str) and taxonomy_version != ""
+            else None
         )
+        if primitive_index is None or primitive_index.card_count == 0:
+            _ensure_runtime_primitive_index(
+                con=con,
+                snapshot_id=snapshot_id,
+                taxonomy_version=taxonomy_version,
+            )
+            return []
 
         if primitives_needed_sorted:
-            placeholders = ",".join(["?"] * len(primitives_needed_sorted))
-            rows = con.execute(
-                f"""
-                SELECT DISTINCT
-                  c.name,
-                  c.oracle_id,
-                  c.mana_cost,
-                  c.type_line,
-                  c.color_identity,
-                  c.legalities_json,
-                  t.primitive_ids_json AS primitives_json
-                FROM primitive_to_cards p
-                JOIN cards c
-                  ON c.snapshot_id = p.snapshot_id
-                 AND c.oracle_id = p.oracle_id
-                LEFT JOIN card_tags t
-                  ON t.snapshot_id = p.snapshot_id
-                 AND t.taxonomy_version = p.taxonomy_version
-                 AND t.oracle_id = p.oracle_id
-                WHERE p.snapshot_id = ?
-                  AND p.taxonomy_version = ?
-                  AND p.primitive_id IN ({placeholders})
-                ORDER BY c.name ASC
-                LIMIT ?
-                """,
-                (snapshot_id, taxonomy_version, *primitives_needed_sorted, int(limit)),
-            ).fetchall()
+            bitset = primitive_index.union(primitives_needed_sorted)
         else:
-            rows = con.execute(
-                """
-                SELECT DISTINCT
-                  c.name,
-                  c.oracle_id,
-                  c.mana_cost,
-                  c.type_line,
-                  c.color_identity,
-                  c.legalities_json,
-                  t.primitive_ids_json AS primitives_json
-                FROM primitive_to_cards p
-                JOIN cards c
-                  ON c.snapshot_id = p.snapshot_id
-                 AND c.oracle_id = p.oracle_id
-                LEFT JOIN card_tags t
-                  ON t.snapshot_id = p.snapshot_id
-                 AND t.taxonomy_version = p.taxonomy_version
-                 AND t.oracle_id = p.oracle_id
-                WHERE p.snapshot_id = ?
-                  AND p.taxonomy_version = ?
-                ORDER BY c.name ASC
-                LIMIT ?
+            bitset = primitive_index.all_cards
+        # Ordinals are assigned in (name, oracle_id) order, so the expansion is already sorted.
+        ordinals = primitive_index.ordinals(bitset)[: max(0, int(limit))]
+
+        oracle_ids = [primitive_index.oracle_ids[ordinal] for ordinal in ordinals]
+        rows_by_oracle_id: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(oracle_ids), 500):
+            oracle_id_chunk = oracle_ids[start : start + 500]
+            placeholders = ",".join(["?"] * len(oracle_id_chunk))
+            for row in con.execute(
+                f"""
+                SELECT
+                  name,
+                  oracle_id,
+                  mana_cost,
+                  type_line,
+                  color_identity,
+                  legalities_json
+                FROM cards
+                WHERE snapshot_id = ?
+                  AND oracle_id IN ({placeholders})
                 """,
-                (snapshot_id, taxonomy_version, int(limit)),
-            ).fetchall()
+                (snapshot_id, *oracle_id_chunk),
+            ).fetchall():
+                row_dict = dict(row)
+                rows_by_oracle_id[str(row_dict.get("oracle_id"))] = row_dict
 
     out: List[Dict[str, Any]] = []
     seen_names: set[str] = set()
-    for row in rows:
-        card = build_card_row(dict(row))
+    for ordinal in ordinals:
+        row = rows_by_oracle_id.get(primitive_index.oracle_ids[ordinal])
+        if row is None:
+            continue
+        card = build_card_row(row)
+        card["primitives"] = primitive_index.primitives_for(ordinal)
         name = card.get("name")
         if not isinstance(name, str) or name == "":
             continue
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+from typing import Any, Dict, List, Sequence, Tuple
+
+VERSION = "card_image_bundle_v1"
+
+CARD_IMAGE_BUNDLE_MEDIA_TYPE = "application/vnd.mtg-engine.image-bundle"
+CARD_IMAGE_BUNDLE_MAGIC = b"MTGIMGB1"
+CARD_IMAGE_BUNDLE_MAX_IDS = 150
+
+_MANIFEST_LENGTH = struct.Struct(">I")
+
+
+def card_image_bundle_etag(size: str, oracle_ids: Sequence[str], image_etags: Sequence[str]) -> str:
+    """Hash of the requested id list plus each cached image's own ETag (or "" when missing)."""
+    digest = hashlib.sha256()
+    digest.update(f"{VERSION}\n{size}\n".encode("utf-8"))
+    for oracle_id, image_etag in zip(oracle_ids, image_etags):
+        digest.update(f"{oracle_id}\t{image_etag}\n".encode("utf-8"))
+    return f'"bundle-{digest.hexdigest()[:40]}"'
+
+
+def encode_card_image_bundle_v1(
+    *,
+    size: str,
+    images: Sequence[Tuple[str, str, bytes]],
+    missing: Sequence[str],
+) -> bytes:
+    """MAGIC | u32 BE manifest length | manifest JSON | image bytes, concatenated in manifest order.
+
+    images are (oracle_id, media_type, payload); manifest offsets are relative
+    to the first byte after the manifest.
+    """
+    entries: List[Dict[str, Any]] = []
+    offset = 0
+    for oracle_id, media_type, payload in images:
+        entries.append({"oracle_id": oracle_id, "media_type": media_type, "offset": offset, "length": len(payload)})
+        offset += len(payload)
+    manifest = json.dumps(
+        {"version": VERSION, "size": size, "images": entries, "missing": list(missing)},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return b"".join(
+        [CARD_IMAGE_BUNDLE_MAGIC, _MANIFEST_LENGTH.pack(len(manifest)), manifest, *(payload for _, _, payload in images)]
+    )
+
+
+def decode_card_image_bundle_v1(body: bytes) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    """(manifest, oracle_id -> image bytes); raises ValueError on a malformed bundle."""
+    header_length = len(CARD_IMAGE_BUNDLE_MAGIC) + _MANIFEST_LENGTH.size
+    if len(body) < header_length or not body.startswith(CARD_IMAGE_BUNDLE_MAGIC):
+        raise ValueError("Not a card image bundle.")
+    (manifest_length,) = _MANIFEST_LENGTH.unpack_from(body, len(CARD_IMAGE_BUNDLE_MAGIC))
+    payload_start = header_length + manifest_length
+    if payload_start > len(body):
+        raise ValueError("Truncated card image bundle manifest.")
+    manifest = json.loads(body[header_length:payload_start].decode("utf-8"))
+
+    images: Dict[str, bytes] = {}
+    for entry in manifest.get("images", []):
+        start = payload_start + int(entry["offset"])
+        end = start + int(entry["length"])
+        if end > len(body):
+            raise ValueError("Truncated card image bundle payload.")
+        images[entry["oracle_id"]] = body[start:end]
+    return manifest, images
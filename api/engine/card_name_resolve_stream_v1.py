@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import tempfile
+from typing import IO, Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from engine.db import connect as cards_db_connect, resolve_db_path
+from engine.snapshot_cache import SnapshotScopedCache, snapshot_cards_signature
+
+from api.engine.card_suggest_index_v1 import SUGGEST_OPTIONAL_COLUMNS, SUGGEST_REQUIRED_COLUMNS
+from api.engine.decklist_parse_v1 import normalize_decklist_name
+
+VERSION = "card_name_resolve_stream_v1"
+
+RESOLVE_STREAM_BATCH_SIZE = 256
+RESOLVE_STREAM_MAX_LINE_BYTES = 4096
+RESOLVE_STREAM_MAX_BODY_BYTES = 64 * 1024 * 1024
+# Request bodies up to this size stay in memory while spooled; larger ones roll over to a temp file.
+RESOLVE_STREAM_SPOOL_MEMORY_BYTES = 1024 * 1024
+RESOLVE_STREAM_READ_CHUNK_BYTES = 64 * 1024
+
+STATUS_RESOLVED = "RESOLVED"
+STATUS_MISSING = "MISSING"
+STATUS_INVALID = "INVALID"
+
+_INDEX_CACHE = SnapshotScopedCache()
+
+
+class ResolveStreamBodyTooLargeError(ValueError):
+    pass
+
+
+class CardNameResolveIndexV1:
+    """normalize_decklist_name(name) -> projected card row, first row in name order wins."""
+
+    __slots__ = ("snapshot_id", "_rows_by_name_norm")
+
+    def __init__(self, *, snapshot_id: str, rows_by_name_norm: Dict[str, Dict[str, Any]]) -> None:
+        self.snapshot_id = snapshot_id
+        self._rows_by_name_norm = rows_by_name_norm
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._rows_by_name_norm)
+
+    def lookup(self, name_norm: str) -> Optional[Dict[str, Any]]:
+        return self._rows_by_name_norm.get(name_norm)
+
+
+def build_card_name_resolve_index_v1(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    project_row: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+) -> CardNameResolveIndexV1:
+    available = {row[1] for row in con.execute("PRAGMA table_info(cards)").fetchall() if isinstance(row[1], str)}
+    columns = list(SUGGEST_REQUIRED_COLUMNS) + [column for column in SUGGEST_OPTIONAL_COLUMNS if column in available]
+    cursor = con.execute(
+        f"SELECT {', '.join(columns)} FROM cards "
+        "WHERE snapshot_id = ? AND name IS NOT NULL "
+        "ORDER BY LOWER(name) ASC, name ASC, oracle_id ASC",
+        (snapshot_id,),
+    )
+
+    rows_by_name_norm: Dict[str, Dict[str, Any]] = {}
+    for row in cursor:
+        row_dict = {column: row[idx] for idx, column in enumerate(columns)}
+        name_norm = normalize_decklist_name(row_dict.get("name"))
+        if name_norm is None or name_norm in rows_by_name_norm:
+            continue
+        projected = project_row(row_dict)
+        if projected is not None:
+            rows_by_name_norm[name_norm] = projected
+
+    return CardNameResolveIndexV1(snapshot_id=snapshot_id, rows_by_name_norm=rows_by_name_norm)
+
+
+def get_card_name_resolve_index_v1(
+    snapshot_id: str,
+    project_row: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+) -> CardNameResolveIndexV1:
+    """Cached index for the snapshot; project_row must be the same for every caller."""
+
+    def _build() -> CardNameResolveIndexV1:
+        with cards_db_connect() as con:
+            return build_card_name_resolve_index_v1(con, snapshot_id, project_row)
+
+    return _INDEX_CACHE.get_or_build(
+        resolve_db_path(),
+        (VERSION, snapshot_id),
+        _build,
+        lambda con: snapshot_cards_signature(con, snapshot_id),
+    )
+
+
+def clear_card_name_resolve_index_cache_v1() -> None:
+    _INDEX_CACHE.clear()
+
+
+async def spool_body_chunks(
+    chunks: AsyncIterable[bytes],
+    *,
+    max_body_bytes: Optional[int] = None,
+    max_memory_bytes: Optional[int] = None,
+) -> IO[bytes]:
+    """Copy a chunked body into a SpooledTemporaryFile rewound to the start; raises past max_body_bytes.
+
+    Memory stays bounded by max_memory_bytes plus one chunk however large the
+    body is: past that the spool rolls over to a temp file.
+    """
+    limit = RESOLVE_STREAM_MAX_BODY_BYTES if max_body_bytes is None else int(max_body_bytes)
+    spool = tempfile.SpooledTemporaryFile(
+        max_size=RESOLVE_STREAM_SPOOL_MEMORY_BYTES if max_memory_bytes is None else int(max_memory_bytes)
+    )
+    total = 0
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            total += len(chunk)
+            if total > limit:
+                raise ResolveStreamBodyTooLargeError(f"Request body exceeds {limit} bytes.")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def iter_spooled_chunks(
+    spool: IO[bytes],
+    chunk_size: int = RESOLVE_STREAM_READ_CHUNK_BYTES,
+) -> AsyncIterator[bytes]:
+    """Fixed-size chunks of a spooled body; the spool is closed once the iterator finishes or is dropped."""
+    try:
+        while True:
+            chunk = spool.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        spool.close()
+
+
+async def iter_body_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_bytes: int = RESOLVE_STREAM_MAX_LINE_BYTES,
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """(line_no, line) pairs from a chunked body; overlong lines yield None and are skipped to the next newline.
+
+    Each chunk is split once and only its unterminated tail (at most
+    max_line_bytes) is carried over, so the cost is linear in the body size
+    whatever the chunk size.
+    """
+    tail = b""
+    line_no = 0
+    overflow = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            line_no += 1
+            if overflow or len(line) > max_line_bytes:
+                overflow = False
+                yield line_no, None
+            else:
+                yield line_no, line
+        if len(tail) > max_line_bytes:
+            overflow = True
+            tail = b""
+    if overflow:
+        yield line_no + 1, None
+    elif tail.strip() != b"":
+        yield line_no + 1, tail
+
+
+def parse_name_line(line: Optional[bytes], *, plain_text: bool) -> Tuple[str, str | None]:
+    """(input, name_norm) for one body line; name_norm is None when the line is not a usable name."""
+    if line is None:
+        return "", None
+    try:
+        text = line.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        return "", None
+    if text == "":
+        return "", None
+
+    if plain_text:
+        raw_name: Any = text
+    else:
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            return text, None
+        raw_name = parsed.get("name") if isinstance(parsed, dict) else parsed
+
+    if not isinstance(raw_name, str):
+        return text, None
+    input_name = raw_name.strip()
+    return input_name, normalize_decklist_name(input_name)
+
+
+def resolve_name_batch(
+    index: Optional[CardNameResolveIndexV1],
+    batch: List[Tuple[int, str, str | None]],
+) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for line_no, input_name, name_norm in batch:
+        if name_norm is None:
+            out.append({"line_no": line_no, "input": input_name, "status": STATUS_INVALID})
+            continue
+        resolved = index.lookup(name_norm) if index is not None else None
+        if resolved is None:
+            out.append({"line_no": line_no, "input": input_name, "status": STATUS_MISSING})
+            continue
+        out.append(
+            {
+                "line_no": line_no,
+                "input": input_name,
+                "status": STATUS_RESOLVED,
+                "name": resolved.get("name"),
+                "oracle_id": resolved.get("oracle_id"),
+                "mana_cost": resolved.get("mana_cost"),
+                "type_line": resolved.get("type_line"),
+                "image_uri": resolved.get("image_uri"),
+            }
+        )
+    return out
+
+
+def encode_ndjson(rows: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n" for row in rows).encode("utf-8")
+
+
+async def stream_resolved_names_v1(
+    chunks: AsyncIterable[bytes],
+    *,
+    snapshot_id: str,
+    index: Optional[CardNameResolveIndexV1],
+    plain_text: bool,
+    batch_size: int = RESOLVE_STREAM_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """NDJSON result rows in input order, one chunk per batch, then a summary row."""
+    counts = {STATUS_RESOLVED: 0, STATUS_MISSING: 0, STATUS_INVALID: 0}
+    batch: List[Tuple[int, str, str | None]] = []
+    batch_size_clean = max(int(batch_size), 1)
+
+    def _flush() -> bytes:
+        rows = resolve_name_batch(index, batch)
+        for row in rows:
+            counts[row["status"]] += 1
+        batch.clear()
+        return encode_ndjson(rows)
+
+    async for line_no, line in iter_body_lines(chunks):
+        if line is not None and line.strip() == b"":
+            continue
+        input_name, name_norm = parse_name_line(line, plain_text=plain_text)
+        batch.append((line_no, input_name, name_norm))
+        if len(batch) >= batch_size_clean:
+            yield _flush()
+
+    if batch:
+        yield _flush()
+
+    yield encode_ndjson(
+        [
+            {
+                "summary": {
+                    "version": VERSION,
+                    "snapshot_id": snapshot_id,
+                    "resolved": counts[STATUS_RESOLVED],
+                    "missing": counts[STATUS_MISSING],
+                    "invalid": counts[STATUS_INVALID],
+                }
+            }
+        ]
+    )
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional
+
+from engine.db import connect as cards_db_connect, resolve_db_path
+from engine.folded_name_index import FoldedNameIndex, sqlite_ascii_lower
+from engine.snapshot_cache import SnapshotScopedCache, snapshot_cards_signature
+
+VERSION = "card_suggest_index_v1"
+
+SUGGEST_REQUIRED_COLUMNS = ("oracle_id", "name", "mana_cost", "type_line")
+SUGGEST_OPTIONAL_COLUMNS = (
+    "image_uri",
+    "image_url",
+    "art_uri",
+    "art_url",
+    "image_uris_json",
+    "card_faces_json",
+)
+
+_INDEX_CACHE = SnapshotScopedCache()
+
+
+class CardSuggestIndexV1:
+    """Per-snapshot autocomplete index over cards.name.
+
+    Entries are kept in ``ORDER BY name`` order with projected result rows;
+    prefix and substring lookups go through a shared FoldedNameIndex.
+    """
+
+    __slots__ = ("snapshot_id", "_folded_index", "_results")
+
+    def __init__(self, *, snapshot_id: str, folded_names: List[str], results: List[Optional[Dict[str, Any]]]) -> None:
+        self.snapshot_id = snapshot_id
+        self._folded_index = FoldedNameIndex(folded_names)
+        self._results = results
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._folded_index)
+
+    def prefix_matches(self, query: str, limit: int) -> List[Optional[Dict[str, Any]]]:
+        """Rows of ``LOWER(name) LIKE 'query%' ORDER BY name LIMIT limit``."""
+        return [self._results[position] for position in self._folded_index.prefix_positions(query, limit)]
+
+    def contains_matches(self, query: str, limit: int) -> List[Optional[Dict[str, Any]]]:
+        """Rows of ``LOWER(name) LIKE '%query%' AND NOT LIKE 'query%' ORDER BY name LIMIT limit``."""
+        return [self._results[position] for position in self._folded_index.contains_positions(query, limit)]
+
+
+def _available_columns(con: sqlite3.Connection) -> List[str]:
+    rows = con.execute("PRAGMA table_info(cards)").fetchall()
+    names = {row[1] for row in rows if isinstance(row[1], str)}
+    return list(SUGGEST_REQUIRED_COLUMNS) + [column for column in SUGGEST_OPTIONAL_COLUMNS if column in names]
+
+
+def build_card_suggest_index_v1(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    project_row: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+) -> CardSuggestIndexV1:
+    columns = _available_columns(con)
+    rows = con.execute(
+        f"SELECT {', '.join(columns)} FROM cards "
+        "WHERE snapshot_id = ? AND name IS NOT NULL "
+        "ORDER BY name ASC, rowid ASC",
+        (snapshot_id,),
+    ).fetchall()
+
+    folded_names: List[str] = []
+    results: List[Optional[Dict[str, Any]]] = []
+    for row in rows:
+        row_dict = {column: row[idx] for idx, column in enumerate(columns)}
+        name = row_dict.get("name")
+        if not isinstance(name, str):
+            continue
+        folded_names.append(sqlite_ascii_lower(name))
+        results.append(project_row(row_dict))
+
+    return CardSuggestIndexV1(snapshot_id=snapshot_id, folded_names=folded_names, results=results)
+
+
+def get_card_suggest_index_v1(
+    snapshot_id: str,
+    project_row: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+) -> CardSuggestIndexV1:
+    """Cached index for the snapshot; project_row must be the same for every caller."""
+
+    def _build() -> CardSuggestIndexV1:
+        with cards_db_connect() as con:
+            return build_card_suggest_index_v1(con, snapshot_id, project_row)
+
+    return _INDEX_CACHE.get_or_build(
+        resolve_db_path(),
+        (VERSION, snapshot_id),
+        _build,
+        lambda con: snapshot_cards_signature(con, snapshot_id),
+    )
+
+
+def clear_card_suggest_index_cache_v1() -> None:
+    _INDEX_CACHE.clear()
+
+
+def query_has_like_wildcards(query: str) -> bool:
+    return "%" in query or "_" in query
+
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 from typing import Any, Iterable, Set
 
+from engine.color_identity_mask import (
+    COLOR_IDENTITY_MASK_COLUMN,
+    color_identity_mask,
+    colors_from_mask,
+    is_mask_subset,
+)
 from engine.db import connect as cards_db_connect
 
 VERSION = "color_identity_constraints_v1"
@@ -75,30 +82,54 @@ def _normalize_commander_names(values: Any) -> list[str]:
     return out
 
 
-def _fetch_color_identity(db_snapshot_id: str, card_name: str) -> tuple[bool, Set[str]]:
+def _fetch_color_identity_mask(db_snapshot_id: str, card_name: str) -> int | None:
     snapshot_id = db_snapshot_id.strip() if isinstance(db_snapshot_id, str) else ""
     name = card_name.strip() if isinstance(card_name, str) else ""
     if snapshot_id == "" or name == "":
-        return False, set()
+        return None
 
     with cards_db_connect() as con:
-        row = con.execute(
-            """
-            SELECT color_identity
-            FROM cards
-            WHERE snapshot_id = ?
-              AND LOWER(name) = LOWER(?)
-            ORDER BY oracle_id ASC, name ASC
-            LIMIT 1
-            """,
-            (snapshot_id, name),
-        ).fetchone()
+        try:
+            row = con.execute(
+                f"""
+                SELECT {COLOR_IDENTITY_MASK_COLUMN}, color_identity
+                FROM cards
+                WHERE snapshot_id = ?
+                  AND LOWER(name) = LOWER(?)
+                ORDER BY oracle_id ASC, name ASC
+                LIMIT 1
+                """,
+                (snapshot_id, name),
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Snapshot predates the materialized mask column.
+            row = con.execute(
+                """
+                SELECT NULL, color_identity
+                FROM cards
+                WHERE snapshot_id = ?
+                  AND LOWER(name) = LOWER(?)
+                ORDER BY oracle_id ASC, name ASC
+                LIMIT 1
+                """,
+                (snapshot_id, name),
+            ).fetchone()
 
     if row is None:
-        return False, set()
+        return None
 
-    color_identity_raw = row[0] if isinstance(row, (tuple, list)) else row["color_identity"]
-    return _parse_color_identity_field(color_identity_raw)
+    mask = row[0]
+    if isinstance(mask, int) and not isinstance(mask, bool):
+        return mask
+    available, colors = _parse_color_identity_field(row[1])
+    return color_identity_mask(colors) if available else None
+
+
+def _fetch_color_identity(db_snapshot_id: str, card_name: str) -> tuple[bool, Set[str]]:
+    mask = _fetch_color_identity_mask(db_snapshot_id=db_snapshot_id, card_name=card_name)
+    if mask is None:
+        return False, set()
+    return True, set(colors_from_mask(mask))
 
 
 def get_commander_color_identity_union_v1(db_snapshot_id: str, commander_names: Any) -> Set[str] | str:
@@ -121,8 +152,8 @@ def get_commander_color_identity_v1(db_snapshot_id: str, commander_name: str) ->
 
 
 def is_card_color_legal_v1(card_name: str, commander_color_set: Set[str], db_snapshot_id: str) -> bool | str:
-    commander_colors = _normalize_color_set(commander_color_set)
-    available, card_colors = _fetch_color_identity(db_snapshot_id=db_snapshot_id, card_name=card_name)
-    if not available:
+    commander_mask = color_identity_mask(_normalize_color_set(commander_color_set))
+    card_mask = _fetch_color_identity_mask(db_snapshot_id=db_snapshot_id, card_name=card_name)
+    if card_mask is None:
         return UNKNOWN_COLOR_IDENTITY
-    return card_colors.issubset(commander_colors)
+    return is_mask_subset(card_mask, commander_mask)
@@ -297,8 +297,11 @@ def _rank_candidates_for_builder_v1(
     anchor_primitives_set: set[str],
     core_primitives_set: set[str],
     exclude_names: set[str] | None = None,
+    top_k: int | None = None,
 ) -> List[Dict[str, Any]]:
     excluded = exclude_names if isinstance(exclude_names, set) else set()
+    deck_card_set = set(deck_cards)
+    commander_ci_set = set(commander_ci)
     candidate_rows: List[Dict[str, Any]] = []
     for candidate in candidate_pool:
         if not isinstance(candidate, dict):
@@ -319,6 +322,8 @@ def _rank_candidates_for_builder_v1(
             bracket_id=bracket_id,
             commander_name=commander_name,
             gc_set=gc_set,
+            deck_card_set=deck_card_set,
+            commander_ci_set=commander_ci_set,
         ):
             continue
 
@@ -353,6 +358,7 @@ def _rank_candidates_for_builder_v1(
             bracket_id=bracket_id,
             gc_set=gc_set,
         ),
+        top_k=top_k,
     )
     return ranked
 
@@ -439,6 +445,8 @@ def _can_add_card(
     bracket_id: str,
     commander_name: str,
     gc_set: set[str],
+    deck_card_set: set[str] | None = None,
+    commander_ci_set: set[str] | None = None,
 ) -> bool:
     if not isinstance(card_name, str):
         return False
@@ -448,11 +456,13 @@ def _can_add_card(
     if not isinstance(card_meta, dict):
         return False
 
-    if not set(card_meta.get("color_identity") or []).issubset(set(commander_ci)):
+    ci_set = commander_ci_set if isinstance(commander_ci_set, set) else set(commander_ci)
+    if not set(card_meta.get("color_identity") or []).issubset(ci_set):
         return False
 
     exempt = is_singleton_exempt_card(card_name, card_meta.get("type_line"))
-    if (not exempt) and (card_name in set(deck_cards)):
+    in_deck = card_name in deck_card_set if isinstance(deck_card_set, set) else card_name in set(deck_cards)
+    if (not exempt) and in_deck:
         return False
 
     if bracket_id == "B3" and card_name in gc_set:
@@ -782,9 +792,12 @@ def _rank_replacements_for_cut_v0_1(
     primitive_frequency_without: Dict[str, int],
     targets: Dict[str, int],
     category_counts_without: Dict[str, int],
+    top_k: int | None = None,
 ) -> List[Dict[str, Any]]:
     _ = weakest_bucket
 
+    deck_card_set = set(deck_without_cut)
+    commander_ci_set = set(commander_ci)
     candidate_rows: List[Dict[str, Any]] = []
 
     for candidate in candidate_pool:
@@ -804,6 +817,8 @@ def _rank_replacements_for_cut_v0_1(
             bracket_id=bracket_id,
             commander_name=commander_name,
             gc_set=gc_set,
+            deck_card_set=deck_card_set,
+            commander_ci_set=commander_ci_set,
         ):
             continue
 
@@ -840,6 +855,7 @@ def _rank_replacements_for_cut_v0_1(
             bracket_id=bracket_id,
             gc_set=gc_set,
         ),
+        top_k=top_k,
     )
 
     return [
@@ -1359,6 +1375,7 @@ def generate_deck_completion_v0(
             commander_primitives_set=commander_primitives_set,
             anchor_primitives_set=anchor_primitives_set,
             core_primitives_set=core_primitives_set,
+            top_k=1,
         )
         chosen = ranked_candidates[0] if ranked_candidates else None
 
@@ -1495,6 +1512,7 @@ def generate_deck_completion_v0(
             commander_primitives_set=commander_primitives_set,
             anchor_primitives_set=anchor_primitives_set,
             core_primitives_set=core_primitives_set,
+            top_k=1,
         )
 
         picked = None
@@ -1628,6 +1646,7 @@ def generate_deck_completion_v0(
                         primitive_frequency_without=primitive_frequency_without,
                         targets=targets,
                         category_counts_without=category_counts_without,
+                        top_k=REFINEMENT_REPLACEMENT_TOP_K_V0_1,
                     )
                     replacement_candidates = replacement_candidates[:REFINEMENT_REPLACEMENT_TOP_K_V0_1]
 
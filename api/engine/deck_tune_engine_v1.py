@@ -11,6 +11,11 @@ from api.engine.color_identity_constraints_v1 import (
     get_commander_color_identity_v1,
     is_card_color_legal_v1,
 )
+from api.engine.deck_tune_local_search_v1 import (
+    SWAP_SEARCH_K_MAX_V1,
+    SWAP_SEARCH_K_MIN_V1,
+    run_swap_local_search_v1,
+)
 from api.engine.utils import normalize_primitives_source, slot_sort_key
 
 
@@ -20,6 +25,7 @@ _TOP_CUT_LIMIT = 10
 _TOP_ADD_LIMIT = 50
 _MAX_SWAP_EVALUATIONS = 500
 PROTECT_TOP_K_CARDS_V1 = 8
+SWAP_SEARCH_K_DEFAULT_V1 = 1
 MIN_TOTAL_SCORE_DELTA_V1 = 0.01
 REQUIRE_PRIMITIVE_COVERAGE_WHEN_MISSING_REQUIRED_V1 = True
 
@@ -392,6 +398,35 @@ def _resolve_protect_top_k_from_engine_patches(canonical_payload: Dict[str, Any]
     return int(protect_top_k_cards)
 
 
+def _resolve_swap_search_k_from_engine_patches(canonical_payload: Dict[str, Any]) -> int:
+    swap_search_k = int(SWAP_SEARCH_K_DEFAULT_V1)
+
+    raw_patches = canonical_payload.get("engine_patches_v0") if isinstance(canonical_payload, dict) else None
+    patches = raw_patches if isinstance(raw_patches, list) else []
+
+    for patch in patches:
+        if not isinstance(patch, dict):
+            continue
+        if _nonempty_str(patch.get("patch_type")) != "tune_config_v1":
+            continue
+
+        enabled_flag = patch.get("enabled")
+        if isinstance(enabled_flag, bool) and not enabled_flag:
+            continue
+
+        swap_search_k_raw = patch.get("swap_search_k")
+        if swap_search_k_raw is None:
+            payload = patch.get("payload") if isinstance(patch.get("payload"), dict) else {}
+            swap_search_k_raw = payload.get("swap_search_k")
+
+        if isinstance(swap_search_k_raw, bool) or not isinstance(swap_search_k_raw, int):
+            continue
+
+        swap_search_k = min(max(int(swap_search_k_raw), SWAP_SEARCH_K_MIN_V1), SWAP_SEARCH_K_MAX_V1)
+
+    return int(swap_search_k)
+
+
 def _partition_protected_cut_candidates(
     cut_candidates: List[Dict[str, Any]],
     *,
@@ -540,6 +575,7 @@ def _evaluate_swap_pairs(
     protection_primitives_enabled: bool,
     collect_dev_metrics: bool,
     swap_filter_metrics_out: Any = None,
+    legal_pairs_out: Any = None,
 ) -> Tuple[List[Dict[str, Any]], int, float]:
     swaps: List[Dict[str, Any]] = []
     swap_evaluations_total = 0
@@ -643,6 +679,29 @@ def _evaluate_swap_pairs(
                 coherence_delta = float(dead_slot_delta) + float(add_contribution - cut_contribution)
                 total_score_delta = float(coherence_delta) + float(primitive_coverage_delta)
 
+                pair_reasons: List[str] = []
+                if cut_is_dead_slot:
+                    pair_reasons.append("CUT_DEAD_SLOT")
+                if cut_redundancy_excess_count > 0:
+                    pair_reasons.append("CUT_REDUNDANCY_EXCESS")
+                if protection_primitives_enabled and len(protection_primitive_set.intersection(set(add_primitives))) > 0:
+                    pair_reasons.append("ADD_PROTECTION_SUPPORT")
+                pair_reasons.append("GC_COMPLIANCE_PRESERVED")
+
+                if isinstance(legal_pairs_out, list):
+                    legal_pairs_out.append(
+                        {
+                            "cut_name": cut_name,
+                            "add_name": add_name,
+                            "cut_oracle_id": cut_oracle_id,
+                            "add_oracle_id": add_oracle_id,
+                            "cut_primitives": list(cut_primitives),
+                            "add_primitives": list(add_primitives),
+                            "coherence_delta": _round6(coherence_delta),
+                            "reasons_v1": sorted(set(pair_reasons)),
+                        }
+                    )
+
                 if total_score_delta < float(MIN_TOTAL_SCORE_DELTA_V1):
                     swaps_filtered_minbar_count += 1
                     continue
@@ -651,16 +710,9 @@ def _evaluate_swap_pairs(
                     swaps_filtered_minbar_count += 1
                     continue
 
-                reasons: List[str] = []
-                if cut_is_dead_slot:
-                    reasons.append("CUT_DEAD_SLOT")
-                if cut_redundancy_excess_count > 0:
-                    reasons.append("CUT_REDUNDANCY_EXCESS")
+                reasons: List[str] = list(pair_reasons)
                 if primitive_coverage_delta > 0:
                     reasons.append("ADD_PRIMITIVE_COVERAGE")
-                if protection_primitives_enabled and len(protection_primitive_set.intersection(set(add_primitives))) > 0:
-                    reasons.append("ADD_PROTECTION_SUPPORT")
-                reasons.append("GC_COMPLIANCE_PRESERVED")
 
                 swaps.append(
                     {
@@ -687,6 +739,31 @@ def _evaluate_swap_pairs(
     return swaps, swap_evaluations_total, _round6(swap_eval_ms_total)
 
 
+def _swap_rows_preserve_gc_limits(
+    *,
+    swap_rows: List[Dict[str, Any]],
+    deck_cards: List[str],
+    bracket_id: str,
+    db_snapshot_id: str,
+) -> bool:
+    deck_after = list(deck_cards)
+    for row in swap_rows:
+        deck_after = _remove_one_card(deck_after, _nonempty_str(row.get("cut_name")))
+    add_names = [_nonempty_str(row.get("add_name")) for row in swap_rows]
+
+    for idx, add_name in enumerate(add_names):
+        other_adds = add_names[:idx] + add_names[idx + 1:]
+        gc_verdict = would_violate_gc_limit_v1(
+            candidate_card=add_name,
+            current_cards=deck_after + other_adds,
+            bracket_id=bracket_id,
+            db_snapshot_id=db_snapshot_id,
+        )
+        if gc_verdict is True or gc_verdict == UNKNOWN_BRACKET_RULES:
+            return False
+    return True
+
+
 def _attach_dev_metrics(
     *,
     payload: Dict[str, Any],
@@ -1018,6 +1095,7 @@ def run_deck_tune_engine_v1(
     )
 
     protect_top_k_cards = _resolve_protect_top_k_from_engine_patches(canonical_payload)
+    swap_search_k = _resolve_swap_search_k_from_engine_patches(canonical_payload)
 
     cut_candidates = _extract_cut_candidates(
         canonical_deck_input=canonical_payload,
@@ -1062,6 +1140,7 @@ def run_deck_tune_engine_v1(
         add_candidates_dedup.append(row)
 
     swap_filter_metrics: Dict[str, Any] = {}
+    legal_pairs: List[Dict[str, Any]] = []
     candidate_swaps, swap_evaluations_total, swap_eval_ms_total = _evaluate_swap_pairs(
         db_snapshot_id=db_snapshot_id,
         bracket_id=bracket_id_clean,
@@ -1075,6 +1154,7 @@ def run_deck_tune_engine_v1(
         protection_primitives_enabled=protection_enabled,
         collect_dev_metrics=collect_dev_metrics,
         swap_filter_metrics_out=swap_filter_metrics,
+        legal_pairs_out=legal_pairs if swap_search_k > 1 else None,
     )
 
     selected_swaps, swap_selection_summary = _select_unique_swaps(
@@ -1082,6 +1162,31 @@ def run_deck_tune_engine_v1(
         max_swaps=max_swaps_clean,
     )
 
+    swap_search_summary_v1: Dict[str, Any] | None = None
+    if swap_search_k > 1:
+        selected_swaps, swap_search_summary_v1 = run_swap_local_search_v1(
+            selected_swaps=selected_swaps,
+            legal_pairs=legal_pairs,
+            primitive_counts_by_id=primitive_counts_by_id,
+            target_primitives=set(include_primitives),
+            required_missing_primitives=set(missing_primitives),
+            require_coverage_gain=bool(
+                REQUIRE_PRIMITIVE_COVERAGE_WHEN_MISSING_REQUIRED_V1 and len(missing_primitives) > 0
+            ),
+            max_swaps=max_swaps_clean,
+            swap_search_k=swap_search_k,
+            min_gain=float(MIN_TOTAL_SCORE_DELTA_V1),
+            cut_key_fn=_swap_cut_identity_key,
+            add_key_fn=_swap_add_identity_key,
+            is_group_allowed=lambda swap_rows: _swap_rows_preserve_gc_limits(
+                swap_rows=swap_rows,
+                deck_cards=deck_cards,
+                bracket_id=bracket_id_clean,
+                db_snapshot_id=db_snapshot_id,
+            ),
+        )
+        swap_selection_summary["selected_count"] = int(len(selected_swaps))
+
     protected_cut_names_top10: List[str] = []
     protected_seen: Set[str] = set()
     for row in sorted(protected_cut_candidates, key=_cut_protection_rank_key):
@@ -1149,6 +1254,14 @@ def run_deck_tune_engine_v1(
 
     status = "OK" if len(recommended_swaps_v1) > 0 else "WARN"
 
+    evaluation_summary_v1: Dict[str, Any] = {
+        "cuts_considered": min(len(eligible_cut_candidates), _TOP_CUT_LIMIT),
+        "adds_considered": min(len(add_candidates_dedup), _TOP_ADD_LIMIT),
+        "swap_evaluations_total": int(swap_evaluations_total),
+    }
+    if swap_search_summary_v1 is not None:
+        evaluation_summary_v1["swap_search_v1"] = swap_search_summary_v1
+
     return _attach_dev_metrics(
         payload={
             "version": VERSION,
@@ -1156,11 +1269,7 @@ def run_deck_tune_engine_v1(
             "codes": [],
             "baseline_summary_v1": baseline_summary_v1,
             "recommended_swaps_v1": recommended_swaps_v1,
-            "evaluation_summary_v1": {
-                "cuts_considered": min(len(eligible_cut_candidates), _TOP_CUT_LIMIT),
-                "adds_considered": min(len(add_candidates_dedup), _TOP_ADD_LIMIT),
-                "swap_evaluations_total": int(swap_evaluations_total),
-            },
+            "evaluation_summary_v1": evaluation_summary_v1,
         },
         collect_dev_metrics=collect_dev_metrics,
         candidate_pool_ms=candidate_pool_ms,
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Sequence, Set, Tuple
+
+VERSION = "deck_tune_local_search_v1"
+
+SWAP_SEARCH_K_MIN_V1 = 1
+SWAP_SEARCH_K_MAX_V1 = 3
+MAX_LOCAL_SEARCH_EVALUATIONS_V1 = 20000
+REASON_MULTI_SWAP_GROUP = "MULTI_SWAP_GROUP"
+
+
+class _SwapPair:
+    """One legal (cut, add) pair with primitive vectors over the target primitives."""
+
+    __slots__ = (
+        "index",
+        "cut_key",
+        "add_key",
+        "cut_indices",
+        "add_indices",
+        "add_mask",
+        "coherence_delta",
+        "row",
+    )
+
+    def __init__(
+        self,
+        *,
+        index: int,
+        cut_key: str,
+        add_key: str,
+        cut_indices: Tuple[int, ...],
+        add_indices: Tuple[int, ...],
+        coherence_delta: float,
+        row: Dict[str, Any],
+    ) -> None:
+        self.index = index
+        self.cut_key = cut_key
+        self.add_key = add_key
+        self.cut_indices = cut_indices
+        self.add_indices = add_indices
+        add_mask = 0
+        for target_index in add_indices:
+            add_mask |= 1 << target_index
+        self.add_mask = add_mask
+        self.coherence_delta = float(coherence_delta)
+        self.row = row
+
+
+class _SearchState:
+    """Target primitive counts and used cut/add keys, updated incrementally per inserted pair."""
+
+    def __init__(self, counts: List[int]) -> None:
+        self.counts = counts
+        self.used_cut_keys: Set[str] = set()
+        self.used_add_keys: Set[str] = set()
+
+    def uncovered_mask(self) -> int:
+        mask = 0
+        for target_index, value in enumerate(self.counts):
+            if value <= 0:
+                mask |= 1 << target_index
+        return mask
+
+    def insert(self, pair: _SwapPair) -> None:
+        for target_index in pair.cut_indices:
+            self.counts[target_index] -= 1
+        for target_index in pair.add_indices:
+            self.counts[target_index] += 1
+        self.used_cut_keys.add(pair.cut_key)
+        self.used_add_keys.add(pair.add_key)
+
+
+def _coverage_gain(counts: List[int], group: Sequence[_SwapPair]) -> int:
+    """Covered-target change from applying group to counts, touching only affected targets."""
+    deltas: Dict[int, int] = {}
+    for pair in group:
+        for target_index in pair.cut_indices:
+            deltas[target_index] = deltas.get(target_index, 0) - 1
+        for target_index in pair.add_indices:
+            deltas[target_index] = deltas.get(target_index, 0) + 1
+    gain = 0
+    for target_index, delta in deltas.items():
+        before = counts[target_index]
+        after = before + delta
+        gain += int(after > 0) - int(before > 0)
+    return gain
+
+
+def _find_best_group(
+    *,
+    state: _SearchState,
+    candidates: List[_SwapPair],
+    max_group_size: int,
+    min_gain: float,
+    require_coverage_gain: bool,
+    rejected_groups: Set[Tuple[int, ...]],
+    budget: List[int],
+) -> Tuple[float, Tuple[_SwapPair, ...]]:
+    """Best group of 2..max_group_size pairs to insert, found by bounded depth-first search."""
+    uncovered = state.uncovered_mask()
+    # A group cannot cover more targets than its adds newly reach, so each pair is
+    # bounded by its coherence plus the uncovered targets its add carries.
+    bounded = sorted(
+        (
+            (pair.coherence_delta + float((pair.add_mask & uncovered).bit_count()), pair)
+            for pair in candidates
+            if pair.cut_key not in state.used_cut_keys and pair.add_key not in state.used_add_keys
+        ),
+        key=lambda item: (-item[0], item[1].index),
+    )
+    bounds = [bound for bound, _pair in bounded]
+    pairs = [pair for _bound, pair in bounded]
+
+    best_gain = float(min_gain)
+    best_group: Tuple[_SwapPair, ...] = ()
+    chosen: List[_SwapPair] = []
+    chosen_cut_keys: Set[str] = set()
+    chosen_add_keys: Set[str] = set()
+
+    def _beats(upper_bound: float) -> bool:
+        return upper_bound > best_gain if best_group else upper_bound >= best_gain
+
+    def _visit(start: int, remaining: int, prefix_bound: float) -> None:
+        nonlocal best_gain, best_group
+        for position in range(start, len(pairs) - remaining + 1):
+            if budget[0] <= 0:
+                return
+            # Bounds are sorted descending: if the best completion from here cannot
+            # beat the incumbent, no later position can either.
+            if not _beats(prefix_bound + sum(bounds[position:position + remaining])):
+                return
+            pair = pairs[position]
+            if pair.cut_key in chosen_cut_keys or pair.add_key in chosen_add_keys:
+                continue
+            budget[0] -= 1
+            chosen.append(pair)
+            chosen_cut_keys.add(pair.cut_key)
+            chosen_add_keys.add(pair.add_key)
+            if remaining == 1:
+                group = tuple(chosen)
+                if tuple(sorted(item.index for item in group)) not in rejected_groups:
+                    coverage_gain = _coverage_gain(state.counts, group)
+                    gain = sum(item.coherence_delta for item in group) + float(coverage_gain)
+                    if (coverage_gain >= 1 or not require_coverage_gain) and _beats(gain):
+                        best_gain = gain
+                        best_group = group
+            else:
+                _visit(position + 1, remaining - 1, prefix_bound + bounds[position])
+            chosen.pop()
+            chosen_cut_keys.discard(pair.cut_key)
+            chosen_add_keys.discard(pair.add_key)
+
+    for group_size in range(2, max_group_size + 1):
+        _visit(0, group_size, 0.0)
+    return best_gain, best_group
+
+
+def _marginal_rows(
+    *,
+    base_counts: List[int],
+    group: Sequence[_SwapPair],
+    required_target_indices: Set[int],
+) -> List[Dict[str, Any]]:
+    counts = list(base_counts)
+    rows: List[Dict[str, Any]] = []
+    for pair in group:
+        missing_before = sum(1 for target_index in required_target_indices if counts[target_index] <= 0)
+        coverage_gain = _coverage_gain(counts, [pair])
+        for target_index in pair.cut_indices:
+            counts[target_index] -= 1
+        for target_index in pair.add_indices:
+            counts[target_index] += 1
+        missing_after = sum(1 for target_index in required_target_indices if counts[target_index] <= 0)
+
+        row_out = dict(pair.row)
+        reasons = [reason for reason in (row_out.get("reasons_v1") or []) if isinstance(reason, str)]
+        if coverage_gain > 0 and "ADD_PRIMITIVE_COVERAGE" not in reasons:
+            reasons.append("ADD_PRIMITIVE_COVERAGE")
+        reasons.append(REASON_MULTI_SWAP_GROUP)
+        row_out["reasons_v1"] = sorted(set(reasons))
+        row_out["delta_summary_v1"] = {
+            "total_score_delta_v1": float(f"{pair.coherence_delta + float(coverage_gain):.6f}"),
+            "coherence_delta_v1": float(f"{pair.coherence_delta:.6f}"),
+            "primitive_coverage_delta_v1": int(coverage_gain),
+            "missing_required_count_delta_v1": int(missing_before - missing_after),
+            "gc_compliance_preserved_v1": True,
+        }
+        rows.append(row_out)
+    return rows
+
+
+def run_swap_local_search_v1(
+    *,
+    selected_swaps: List[Dict[str, Any]],
+    legal_pairs: List[Dict[str, Any]],
+    primitive_counts_by_id: Dict[str, int],
+    target_primitives: Set[str],
+    required_missing_primitives: Set[str],
+    require_coverage_gain: bool,
+    max_swaps: int,
+    swap_search_k: int,
+    min_gain: float,
+    cut_key_fn: Callable[[Any], str],
+    add_key_fn: Callable[[Any], str],
+    is_group_allowed: Callable[[List[Dict[str, Any]]], bool],
+    max_evaluations: int = MAX_LOCAL_SEARCH_EVALUATIONS_V1,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Extend the greedy single-swap selection with improving groups of 2..k swaps.
+
+    Groups are inserted while they raise coherence plus combined target coverage by
+    at least min_gain and the selection stays within max_swaps. Pair coherence is
+    additive; coverage is evaluated on the combined primitive counts, which is what
+    lets two individually sub-par swaps fix a requirement together.
+    """
+    group_size_max = max(min(int(swap_search_k), SWAP_SEARCH_K_MAX_V1), SWAP_SEARCH_K_MIN_V1)
+    summary: Dict[str, Any] = {
+        "version": VERSION,
+        "swap_search_k": int(group_size_max),
+        "evaluations": 0,
+        "groups_applied": 0,
+        "groups_rejected": 0,
+        "evaluation_cap_hit": False,
+    }
+    if group_size_max < 2:
+        return list(selected_swaps), summary
+
+    target_order = sorted(target_primitives)
+    target_index_by_primitive = {primitive: idx for idx, primitive in enumerate(target_order)}
+    required_target_indices = {
+        target_index_by_primitive[primitive]
+        for primitive in required_missing_primitives
+        if primitive in target_index_by_primitive
+    }
+
+    def _vector(primitives: Any) -> Tuple[int, ...]:
+        values = primitives if isinstance(primitives, list) else []
+        return tuple(sorted({
+            target_index_by_primitive[primitive]
+            for primitive in values
+            if isinstance(primitive, str) and primitive in target_index_by_primitive
+        }))
+
+    candidates: List[_SwapPair] = []
+    for idx, row in enumerate(legal_pairs):
+        if not isinstance(row, dict):
+            continue
+        cut_key = cut_key_fn(row)
+        add_key = add_key_fn(row)
+        if cut_key == "" or add_key == "":
+            continue
+        candidates.append(
+            _SwapPair(
+                index=idx,
+                cut_key=cut_key,
+                add_key=add_key,
+                cut_indices=_vector(row.get("cut_primitives")),
+                add_indices=_vector(row.get("add_primitives")),
+                coherence_delta=float(row.get("coherence_delta") or 0.0),
+                row={
+                    "cut_name": row.get("cut_name"),
+                    "add_name": row.get("add_name"),
+                    "cut_oracle_id": row.get("cut_oracle_id"),
+                    "add_oracle_id": row.get("add_oracle_id"),
+                    "reasons_v1": list(row.get("reasons_v1") or []),
+                },
+            )
+        )
+
+    state = _SearchState([int(primitive_counts_by_id.get(primitive, 0)) for primitive in target_order])
+    pairs_by_keys = {(pair.cut_key, pair.add_key): pair for pair in candidates}
+    kept_rows: List[Dict[str, Any]] = []
+    for row in selected_swaps:
+        pair = pairs_by_keys.get((cut_key_fn(row), add_key_fn(row)))
+        if pair is not None and pair.cut_key not in state.used_cut_keys and pair.add_key not in state.used_add_keys:
+            state.insert(pair)
+        kept_rows.append(row)
+
+    budget = [max(int(max_evaluations), 0)]
+    rejected_groups: Set[Tuple[int, ...]] = set()
+    group_rows: List[Dict[str, Any]] = []
+
+    while budget[0] > 0:
+        slots_left = max(int(max_swaps), 0) - len(kept_rows) - len(group_rows)
+        if slots_left < 2:
+            break
+        _gain, group = _find_best_group(
+            state=state,
+            candidates=candidates,
+            max_group_size=min(group_size_max, slots_left),
+            min_gain=float(min_gain),
+            require_coverage_gain=require_coverage_gain,
+            rejected_groups=rejected_groups,
+            budget=budget,
+        )
+        if len(group) == 0:
+            break
+
+        ordered_group = sorted(group, key=lambda pair: (pair.cut_key, pair.add_key))
+        new_rows = _marginal_rows(
+            base_counts=state.counts,
+            group=ordered_group,
+            required_target_indices=required_target_indices,
+        )
+        if not is_group_allowed(kept_rows + group_rows + new_rows):
+            rejected_groups.add(tuple(sorted(pair.index for pair in group)))
+            summary["groups_rejected"] = int(summary["groups_rejected"]) + 1
+            continue
+
+        for pair in ordered_group:
+            state.insert(pair)
+        group_rows.extend(new_rows)
+        summary["groups_applied"] = int(summary["groups_applied"]) + 1
+
+    summary["evaluations"] = int(max(int(max_evaluations), 0) - budget[0])
+    summary["evaluation_cap_hit"] = bool(budget[0] <= 0)
+    return kept_rows + group_rows, summary
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import re
+import sqlite3
 from typing import Any, Dict, Iterable, List, Tuple
 
-from engine.db import connect as cards_db_connect
+from engine.db import connect as cards_db_connect, get_card_name_index, resolve_db_path
+from engine.snapshot_cache import SnapshotScopedCache, snapshot_cards_signature, table_rows_signature
 
 from api.engine.decklist_parse_v1 import normalize_decklist_name
 
 
 DECKLIST_RESOLVE_VERSION = "decklist_resolve_v1"
 
+NOT_FOUND_CANDIDATES_LIMIT = 5
+
+DECKLIST_NAME_INDEX_VERSION = "decklist_name_index_v1"
+DECKLIST_NAME_INDEX_TABLE = "decklist_name_index_v1"
+_NAME_INDEX_LOOKUP_FIELDS = (
+    "exact_index",
+    "normalized_index",
+    "dfc_combined_normalized_index",
+    "dfc_face_exact_index",
+    "dfc_face_normalized_index",
+    "alias_index",
+)
+
 _ALIAS_TABLE_CANDIDATES = (
     "card_aliases",
     "card_name_aliases",
@@ -37,6 +54,8 @@ _ALIAS_SNAPSHOT_COLUMN_CANDIDATES = (
 )
 _DFC_DELIMITER_VARIANTS_RE = re.compile(r"\s*/{1,2}\s*")
 
+_NAME_INDEX_CACHE = SnapshotScopedCache()
+
 
 def _nonempty_str(value: Any) -> str | None:
     if isinstance(value, str):
@@ -233,15 +252,7 @@ def _load_cards_index(con, db_snapshot_id: str) -> Tuple[
     )
 
 
-def _load_alias_index(
-    con,
-    *,
-    db_snapshot_id: str,
-    cards_by_oracle: Dict[str, Dict[str, str]],
-    exact_index: Dict[str, List[Dict[str, str]]],
-) -> Dict[str, List[Dict[str, str]]]:
-    alias_index: Dict[str, List[Dict[str, str]]] = {}
-
+def _alias_table_names(con) -> List[str]:
     table_names = _list_table_names(con)
     table_name_set = set(table_names)
 
@@ -251,8 +262,19 @@ def _load_alias_index(
         for table_name in table_names
         if "alias" in table_name.casefold() and table_name not in alias_tables
     )
+    return alias_tables
 
-    for table_name in alias_tables:
+
+def _load_alias_index(
+    con,
+    *,
+    db_snapshot_id: str,
+    cards_by_oracle: Dict[str, Dict[str, str]],
+    exact_index: Dict[str, List[Dict[str, str]]],
+) -> Dict[str, List[Dict[str, str]]]:
+    alias_index: Dict[str, List[Dict[str, str]]] = {}
+
+    for table_name in _alias_table_names(con):
         columns = _table_columns(con, table_name)
         if len(columns) == 0:
             continue
@@ -461,6 +483,248 @@ def _resolve_override_candidates(
     )
 
 
+class DecklistNameIndexV1:
+    """Compiled name-resolution lookups for one snapshot; shared read-only across requests."""
+
+    __slots__ = (
+        "snapshot_id",
+        "cards_by_oracle",
+        "exact_index",
+        "normalized_index",
+        "dfc_combined_normalized_index",
+        "dfc_face_exact_index",
+        "dfc_face_normalized_index",
+        "alias_index",
+    )
+
+    def __init__(
+        self,
+        *,
+        snapshot_id: str,
+        cards_by_oracle: Dict[str, Dict[str, str]],
+        exact_index: Dict[str, List[Dict[str, str]]],
+        normalized_index: Dict[str, List[Dict[str, str]]],
+        dfc_combined_normalized_index: Dict[str, List[Dict[str, str]]],
+        dfc_face_exact_index: Dict[str, List[Dict[str, str]]],
+        dfc_face_normalized_index: Dict[str, List[Dict[str, str]]],
+        alias_index: Dict[str, List[Dict[str, str]]],
+    ) -> None:
+        self.snapshot_id = snapshot_id
+        self.cards_by_oracle = cards_by_oracle
+        self.exact_index = exact_index
+        self.normalized_index = normalized_index
+        self.dfc_combined_normalized_index = dfc_combined_normalized_index
+        self.dfc_face_exact_index = dfc_face_exact_index
+        self.dfc_face_normalized_index = dfc_face_normalized_index
+        self.alias_index = alias_index
+
+
+def compile_decklist_name_index_v1(con, db_snapshot_id: str) -> DecklistNameIndexV1:
+    (
+        cards_by_oracle,
+        exact_index,
+        normalized_index,
+        dfc_combined_normalized_index,
+        dfc_face_exact_index,
+        dfc_face_normalized_index,
+    ) = _load_cards_index(con, db_snapshot_id)
+    alias_index = _load_alias_index(
+        con,
+        db_snapshot_id=db_snapshot_id,
+        cards_by_oracle=cards_by_oracle,
+        exact_index=exact_index,
+    )
+    return DecklistNameIndexV1(
+        snapshot_id=db_snapshot_id,
+        cards_by_oracle=cards_by_oracle,
+        exact_index=exact_index,
+        normalized_index=normalized_index,
+        dfc_combined_normalized_index=dfc_combined_normalized_index,
+        dfc_face_exact_index=dfc_face_exact_index,
+        dfc_face_normalized_index=dfc_face_normalized_index,
+        alias_index=alias_index,
+    )
+
+
+def decklist_name_index_to_payload_v1(index: DecklistNameIndexV1) -> Dict[str, Any]:
+    candidate_ids: Dict[Tuple[str, str], int] = {}
+    candidates: List[List[str]] = []
+
+    def _candidate_id(candidate: Dict[str, str]) -> int:
+        key = (candidate["oracle_id"], candidate["name"])
+        if key not in candidate_ids:
+            candidate_ids[key] = len(candidates)
+            candidates.append([key[0], key[1]])
+        return candidate_ids[key]
+
+    cards_by_oracle = {oracle_id: _candidate_id(candidate) for oracle_id, candidate in index.cards_by_oracle.items()}
+    lookups = {
+        field: {
+            key: [_candidate_id(candidate) for candidate in bucket]
+            for key, bucket in getattr(index, field).items()
+        }
+        for field in _NAME_INDEX_LOOKUP_FIELDS
+    }
+    return {
+        "version": DECKLIST_NAME_INDEX_VERSION,
+        "snapshot_id": index.snapshot_id,
+        "candidates": candidates,
+        "cards_by_oracle": cards_by_oracle,
+        "lookups": lookups,
+    }
+
+
+def decklist_name_index_from_payload_v1(payload: Any) -> DecklistNameIndexV1 | None:
+    if not isinstance(payload, dict) or payload.get("version") != DECKLIST_NAME_INDEX_VERSION:
+        return None
+    snapshot_id = _nonempty_str(payload.get("snapshot_id"))
+    raw_candidates = payload.get("candidates")
+    raw_cards_by_oracle = payload.get("cards_by_oracle")
+    raw_lookups = payload.get("lookups")
+    if snapshot_id is None or not isinstance(raw_candidates, list):
+        return None
+    if not isinstance(raw_cards_by_oracle, dict) or not isinstance(raw_lookups, dict):
+        return None
+
+    try:
+        candidates = [_make_candidate(oracle_id=oracle_id, name=name) for oracle_id, name in raw_candidates]
+        cards_by_oracle = {oracle_id: candidates[position] for oracle_id, position in raw_cards_by_oracle.items()}
+        lookups = {
+            field: {key: [candidates[position] for position in bucket] for key, bucket in raw_lookups[field].items()}
+            for field in _NAME_INDEX_LOOKUP_FIELDS
+        }
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+        return None
+
+    return DecklistNameIndexV1(snapshot_id=snapshot_id, cards_by_oracle=cards_by_oracle, **lookups)
+
+
+def _name_index_source_signature(con, db_snapshot_id: str) -> str:
+    # Staleness check for the persisted artifact: a content hash of the snapshot's card
+    # names and of every alias table row, so edits that keep row counts still invalidate it.
+    # Rows are quote()d and concatenated in SQL so only one string crosses into Python per table.
+    digest = hashlib.sha256()
+
+    def _hash_table(label: str, columns: List[str], where_sql: str, params: Tuple[Any, ...]) -> None:
+        row_sql = " || ',' || ".join(f"quote({column})" for column in columns)
+        order_sql = ", ".join(str(position) for position in range(1, len(columns) + 1))
+        row = con.execute(
+            f"SELECT group_concat(row_text, char(10)) FROM "
+            f"(SELECT {row_sql} AS row_text, {', '.join(columns)} FROM {label}{where_sql} ORDER BY {order_sql})",
+            params,
+        ).fetchone()
+        digest.update(f"{label}({','.join(columns)})\n".encode("utf-8"))
+        digest.update(str(row[0] or "").encode("utf-8"))
+        digest.update(b"\n")
+
+    _hash_table("cards", ["oracle_id", "name"], " WHERE snapshot_id = ?", (db_snapshot_id,))
+    for table_name in _alias_table_names(con):
+        columns = _table_columns(con, table_name)
+        if len(columns) > 0:
+            _hash_table(table_name, columns, "", ())
+    return f"sha256:{digest.hexdigest()}"
+
+
+def ensure_decklist_name_index_table(con) -> None:
+    con.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {DECKLIST_NAME_INDEX_TABLE} (
+          snapshot_id TEXT PRIMARY KEY,
+          index_version TEXT NOT NULL,
+          source_signature TEXT NOT NULL,
+          payload_json TEXT NOT NULL
+        )
+        """
+    )
+
+
+def write_decklist_name_index_artifact_v1(con, db_snapshot_id: str) -> Dict[str, Any]:
+    index = compile_decklist_name_index_v1(con, db_snapshot_id)
+    payload = decklist_name_index_to_payload_v1(index)
+    signature = _name_index_source_signature(con, db_snapshot_id)
+    ensure_decklist_name_index_table(con)
+    con.execute(
+        f"INSERT OR REPLACE INTO {DECKLIST_NAME_INDEX_TABLE} "
+        "(snapshot_id, index_version, source_signature, payload_json) VALUES (?, ?, ?, ?)",
+        (db_snapshot_id, DECKLIST_NAME_INDEX_VERSION, signature, json.dumps(payload, separators=(",", ":"))),
+    )
+    return {
+        "snapshot_id": db_snapshot_id,
+        "index_version": DECKLIST_NAME_INDEX_VERSION,
+        "source_signature": signature,
+        "candidates": len(payload["candidates"]),
+    }
+
+
+def _load_persisted_name_index(con, db_snapshot_id: str) -> DecklistNameIndexV1 | None:
+    try:
+        row = con.execute(
+            f"SELECT index_version, source_signature, payload_json FROM {DECKLIST_NAME_INDEX_TABLE} "
+            "WHERE snapshot_id = ?",
+            (db_snapshot_id,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if row is None or row[0] != DECKLIST_NAME_INDEX_VERSION:
+        return None
+    if row[1] != _name_index_source_signature(con, db_snapshot_id):
+        return None
+    try:
+        payload = json.loads(row[2])
+    except (TypeError, ValueError):
+        return None
+    return decklist_name_index_from_payload_v1(payload)
+
+
+def get_decklist_name_index_v1(db_snapshot_id: str) -> DecklistNameIndexV1:
+    """Process-cached index; a fresh snapshot_build artifact is preferred over recompiling."""
+
+    def _build() -> DecklistNameIndexV1:
+        with cards_db_connect() as con:
+            persisted = _load_persisted_name_index(con, db_snapshot_id)
+            if persisted is not None:
+                return persisted
+            return compile_decklist_name_index_v1(con, db_snapshot_id)
+
+    def _signature(con) -> Tuple[Any, ...]:
+        # Alias tables are global, so their rows are part of every snapshot's signature.
+        return (
+            snapshot_cards_signature(con, db_snapshot_id),
+            table_rows_signature(con, DECKLIST_NAME_INDEX_TABLE, " WHERE snapshot_id = ?", (db_snapshot_id,)),
+            tuple((table_name, table_rows_signature(con, table_name)) for table_name in _alias_table_names(con)),
+        )
+
+    return _NAME_INDEX_CACHE.get_or_build(
+        resolve_db_path(),
+        (DECKLIST_NAME_INDEX_VERSION, db_snapshot_id),
+        _build,
+        _signature,
+    )
+
+
+def clear_decklist_name_index_cache_v1() -> None:
+    _NAME_INDEX_CACHE.clear()
+
+
+def _not_found_candidates(db_snapshot_id: str, name_norm: str) -> List[Dict[str, str]]:
+    try:
+        matches = get_card_name_index(db_snapshot_id).fuzzy_matches(name_norm, NOT_FOUND_CANDIDATES_LIMIT)
+    except sqlite3.OperationalError:
+        return []
+
+    # Kept in match-rank order (edit distance first), not _sort_candidates order.
+    candidates: List[Dict[str, str]] = []
+    seen: set[Tuple[str, str]] = set()
+    for name, oracle_id, _distance in matches:
+        oracle_id_clean = _nonempty_str(oracle_id)
+        name_clean = _nonempty_str(name)
+        if oracle_id_clean is None or name_clean is None or (oracle_id_clean, name_clean) in seen:
+            continue
+        seen.add((oracle_id_clean, name_clean))
+        candidates.append(_make_candidate(oracle_id=oracle_id_clean, name=name_clean))
+    return candidates
+
+
 def _unknown_row(
     *,
     name_raw: str,
@@ -483,24 +747,14 @@ def _unknown_row(
 def resolve_parsed_decklist(parsed: Any, db_snapshot_id: str, name_overrides_v1: Any = None) -> Dict[str, Any]:
     parsed_items = parsed.get("items") if isinstance(parsed, dict) and isinstance(parsed.get("items"), list) else []
 
-    con = cards_db_connect()
-    try:
-        (
-            cards_by_oracle,
-            exact_index,
-            normalized_index,
-            dfc_combined_normalized_index,
-            dfc_face_exact_index,
-            dfc_face_normalized_index,
-        ) = _load_cards_index(con, db_snapshot_id)
-        alias_index = _load_alias_index(
-            con,
-            db_snapshot_id=db_snapshot_id,
-            cards_by_oracle=cards_by_oracle,
-            exact_index=exact_index,
-        )
-    finally:
-        con.close()
+    name_index = get_decklist_name_index_v1(db_snapshot_id)
+    cards_by_oracle = name_index.cards_by_oracle
+    exact_index = name_index.exact_index
+    normalized_index = name_index.normalized_index
+    dfc_combined_normalized_index = name_index.dfc_combined_normalized_index
+    dfc_face_exact_index = name_index.dfc_face_exact_index
+    dfc_face_normalized_index = name_index.dfc_face_normalized_index
+    alias_index = name_index.alias_index
 
     overrides_by_name_norm = _normalize_name_overrides_v1_for_resolution(name_overrides_v1)
 
@@ -599,7 +853,7 @@ def resolve_parsed_decklist(parsed: Any, db_snapshot_id: str, name_overrides_v1:
                     count=count,
                     line_no=line_no,
                     reason_code="CARD_NOT_FOUND",
-                    candidates=[],
+                    candidates=_not_found_candidates(db_snapshot_id, name_norm),
                 )
             )
             continue
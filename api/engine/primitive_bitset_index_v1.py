@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from api.engine.utils import normalize_primitives_source
+from engine.db import connect as cards_db_connect, resolve_db_path
+from engine.snapshot_cache import SnapshotScopedCache, snapshot_cards_signature, table_rows_signature
+
+VERSION = "primitive_bitset_index_v1"
+SOURCE_PRIMITIVE_TO_CARDS = "primitive_to_cards"
+SOURCE_CARDS_PRIMITIVES_JSON = "cards.primitives_json"
+
+# Bit positions set in each byte value, used to expand int bitsets into card ordinals.
+_BYTE_BIT_POSITIONS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(bit for bit in range(8) if value & (1 << bit)) for value in range(256)
+)
+
+_INDEX_CACHE = SnapshotScopedCache()
+
+
+def _bitset_from_ordinals(ordinals: Iterable[int], card_count: int) -> int:
+    buffer = bytearray((card_count + 7) // 8)
+    for ordinal in ordinals:
+        buffer[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bytes(buffer), "little")
+
+
+def iter_bitset_ordinals(bitset: int) -> Iterator[int]:
+    if bitset <= 0:
+        return
+    data = bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+    for byte_index, value in enumerate(data):
+        if value == 0:
+            continue
+        base = byte_index << 3
+        for bit in _BYTE_BIT_POSITIONS[value]:
+            yield base + bit
+
+
+class PrimitiveBitsetIndexV1:
+    """Per-snapshot primitive -> card posting lists stored as int bitsets.
+
+    Card ordinals follow ascending (name, oracle_id), assigned once at build
+    time, so expanding any bitset (a posting list, union or intersection)
+    yields name-ordered results without a per-request sort.
+    """
+
+    __slots__ = ("source", "snapshot_id", "taxonomy_version", "oracle_ids", "names", "_postings", "_primitives_by_ordinal")
+
+    def __init__(
+        self,
+        *,
+        source: str,
+        snapshot_id: str,
+        taxonomy_version: Optional[str],
+        oracle_ids: List[str],
+        names: List[str],
+        primitives_by_ordinal: List[List[str]],
+    ) -> None:
+        self.source = source
+        self.snapshot_id = snapshot_id
+        self.taxonomy_version = taxonomy_version
+        self.oracle_ids = oracle_ids
+        self.names = names
+        self._primitives_by_ordinal = primitives_by_ordinal
+
+        ordinals_by_primitive: Dict[str, List[int]] = {}
+        for ordinal, primitives in enumerate(primitives_by_ordinal):
+            for primitive in primitives:
+                ordinals_by_primitive.setdefault(primitive, []).append(ordinal)
+        card_count = len(oracle_ids)
+        self._postings: Dict[str, int] = {
+            primitive: _bitset_from_ordinals(ordinals, card_count)
+            for primitive, ordinals in sorted(ordinals_by_primitive.items())
+        }
+
+    @property
+    def card_count(self) -> int:
+        return len(self.oracle_ids)
+
+    @property
+    def all_cards(self) -> int:
+        return (1 << len(self.oracle_ids)) - 1
+
+    def primitive_ids(self) -> List[str]:
+        return list(self._postings.keys())
+
+    def bitset_for(self, primitive_id: str) -> int:
+        return self._postings.get(primitive_id, 0)
+
+    def union(self, primitive_ids: Iterable[str]) -> int:
+        out = 0
+        for primitive_id in primitive_ids:
+            out |= self._postings.get(primitive_id, 0)
+        return out
+
+    def intersection(self, primitive_ids: Iterable[str]) -> int:
+        out: Optional[int] = None
+        for primitive_id in primitive_ids:
+            posting = self._postings.get(primitive_id, 0)
+            out = posting if out is None else (out & posting)
+            if out == 0:
+                return 0
+        return out if out is not None else 0
+
+    def count(self, bitset: int) -> int:
+        return int(bitset).bit_count()
+
+    def match_counts(self, primitive_ids: Iterable[str], within: Optional[int] = None) -> Dict[int, int]:
+        """Number of the given primitives carried by each card (ordinal -> count)."""
+        counts: Dict[int, int] = {}
+        for primitive_id in sorted(set(primitive_ids)):
+            posting = self._postings.get(primitive_id, 0)
+            if within is not None:
+                posting &= within
+            for ordinal in iter_bitset_ordinals(posting):
+                counts[ordinal] = counts.get(ordinal, 0) + 1
+        return counts
+
+    def ordinals(self, bitset: int) -> List[int]:
+        return list(iter_bitset_ordinals(bitset))
+
+    def oracle_ids_for(self, bitset: int) -> List[str]:
+        return [self.oracle_ids[ordinal] for ordinal in iter_bitset_ordinals(bitset)]
+
+    def primitives_for(self, ordinal: int) -> List[str]:
+        return list(self._primitives_by_ordinal[ordinal])
+
+
+def _index_in_name_order(
+    *,
+    source: str,
+    snapshot_id: str,
+    taxonomy_version: Optional[str],
+    entries: List[Tuple[str, str, List[str]]],
+) -> PrimitiveBitsetIndexV1:
+    entries.sort(key=lambda entry: (entry[1], entry[0]))
+    return PrimitiveBitsetIndexV1(
+        source=source,
+        snapshot_id=snapshot_id,
+        taxonomy_version=taxonomy_version,
+        oracle_ids=[oracle_id for oracle_id, _name, _primitives in entries],
+        names=[name for _oracle_id, name, _primitives in entries],
+        primitives_by_ordinal=[primitives for _oracle_id, _name, primitives in entries],
+    )
+
+
+def _build_from_primitive_to_cards(con: sqlite3.Connection, snapshot_id: str, taxonomy_version: str) -> PrimitiveBitsetIndexV1:
+    try:
+        rows = con.execute(
+            """
+            SELECT p.oracle_id, c.name, p.primitive_id
+            FROM primitive_to_cards p
+            JOIN cards c
+              ON c.snapshot_id = p.snapshot_id
+             AND c.oracle_id = p.oracle_id
+            WHERE p.snapshot_id = ?
+              AND p.taxonomy_version = ?
+            ORDER BY p.oracle_id ASC, p.primitive_id ASC
+            """,
+            (snapshot_id, taxonomy_version),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+
+    entries: List[Tuple[str, str, List[str]]] = []
+    for row in rows:
+        oracle_id = row[0]
+        name = row[1]
+        primitive_id = row[2]
+        if not isinstance(oracle_id, str) or oracle_id == "":
+            continue
+        if not isinstance(primitive_id, str) or primitive_id == "":
+            continue
+        if not entries or entries[-1][0] != oracle_id:
+            entries.append((oracle_id, name if isinstance(name, str) else "", []))
+        entries[-1][2].append(primitive_id)
+
+    return _index_in_name_order(
+        source=SOURCE_PRIMITIVE_TO_CARDS,
+        snapshot_id=snapshot_id,
+        taxonomy_version=taxonomy_version,
+        entries=[(oracle_id, name, sorted(set(primitives))) for oracle_id, name, primitives in entries],
+    )
+
+
+def _build_from_cards_primitives_json(con: sqlite3.Connection, snapshot_id: str) -> PrimitiveBitsetIndexV1:
+    try:
+        rows = con.execute(
+            """
+            SELECT oracle_id, name, primitives_json
+            FROM cards
+            WHERE snapshot_id = ?
+            ORDER BY oracle_id ASC
+            """,
+            (snapshot_id,),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+
+    entries: List[Tuple[str, str, List[str]]] = []
+    for row in rows:
+        oracle_id = row[0]
+        if not isinstance(oracle_id, str) or oracle_id == "":
+            continue
+        entries.append((oracle_id, row[1] if isinstance(row[1], str) else "", normalize_primitives_source(row[2])))
+
+    return _index_in_name_order(
+        source=SOURCE_CARDS_PRIMITIVES_JSON,
+        snapshot_id=snapshot_id,
+        taxonomy_version=None,
+        entries=entries,
+    )
+
+
+def get_primitive_bitset_index_v1(snapshot_id: str, taxonomy_version: str) -> PrimitiveBitsetIndexV1:
+    """Compiled taxonomy primitives (primitive_to_cards) for one snapshot/taxonomy_version."""
+
+    def _build() -> PrimitiveBitsetIndexV1:
+        with cards_db_connect() as con:
+            return _build_from_primitive_to_cards(con, snapshot_id, taxonomy_version)
+
+    def _signature(con: sqlite3.Connection) -> Tuple[object, ...]:
+        scope = " WHERE snapshot_id = ? AND taxonomy_version = ?"
+        return (
+            snapshot_cards_signature(con, snapshot_id),
+            table_rows_signature(con, "primitive_to_cards", scope, (snapshot_id, taxonomy_version)),
+            table_rows_signature(con, "inverted_index_builds_v1", scope, (snapshot_id, taxonomy_version)),
+        )
+
+    return _INDEX_CACHE.get_or_build(
+        resolve_db_path(),
+        (SOURCE_PRIMITIVE_TO_CARDS, snapshot_id, taxonomy_version),
+        _build,
+        _signature,
+    )
+
+
+def get_cards_primitives_bitset_index_v1(snapshot_id: str) -> PrimitiveBitsetIndexV1:
+    """Ingest-time primitives (cards.primitives_json) for one snapshot."""
+
+    def _build() -> PrimitiveBitsetIndexV1:
+        with cards_db_connect() as con:
+            return _build_from_cards_primitives_json(con, snapshot_id)
+
+    return _INDEX_CACHE.get_or_build(
+        resolve_db_path(),
+        (SOURCE_CARDS_PRIMITIVES_JSON, snapshot_id),
+        _build,
+        lambda con: snapshot_cards_signature(con, snapshot_id),
+    )
+
+
+def clear_primitive_bitset_index_cache_v1() -> None:
+    _INDEX_CACHE.clear()
+
@@ -3,7 +3,8 @@ from typing import Any, Dict, List
 
 from api.engine.constants import TagsNotCompiledError
 from api.engine.pipeline_build import run_build_pipeline
-from api.engine.utils import normalize_primitives_source, sorted_unique
+from api.engine.primitive_bitset_index_v1 import get_primitive_bitset_index_v1
+from api.engine.utils import sorted_unique
 from api.engine.version_resolve_v1 import resolve_runtime_taxonomy_version
 from engine.db import connect as cards_db_connect
 
@@ -60,53 +61,34 @@ def _query_cards_for_primitive(snapshot_id: str, primitive: str, limit: int = 64
     if primitive_clean == "":
         return []
 
-    rows: List[Dict[str, Any]] = []
     with cards_db_connect() as con:
         taxonomy_version = resolve_runtime_taxonomy_version(
             snapshot_id=snapshot_id,
             requested=None,
             db=con,
         )
-        taxonomy_version = _ensure_runtime_primitive_index(
-            con=con,
-            snapshot_id=snapshot_id,
-            taxonomy_version=taxonomy_version,
+        primitive_index = (
+            get_primitive_bitset_index_v1(snapshot_id=snapshot_id, taxonomy_version=taxonomy_version)
+            if isinstance(taxonomy_version, str) and taxonomy_version != ""
+            else None
         )
-        db_rows = con.execute(
-            """
-            SELECT DISTINCT
-              c.name,
-              t.primitive_ids_json AS primitives_json
-            FROM primitive_to_cards p
-            JOIN cards c
-              ON c.snapshot_id = p.snapshot_id
-             AND c.oracle_id = p.oracle_id
-            LEFT JOIN card_tags t
-              ON t.snapshot_id = p.snapshot_id
-             AND t.taxonomy_version = p.taxonomy_version
-             AND t.oracle_id = p.oracle_id
-            WHERE p.snapshot_id = ?
-              AND p.taxonomy_version = ?
-              AND p.primitive_id = ?
-            ORDER BY c.name ASC
-            LIMIT ?
-            """,
-            (snapshot_id, taxonomy_version, primitive_clean, int(limit)),
-        ).fetchall()
-
-    for row in db_rows:
-        row_dict = dict(row)
-        name = row_dict.get("name")
-        if not isinstance(name, str) or name == "":
-            continue
-        primitives = normalize_primitives_source(row_dict.get("primitives_json"))
-        rows.append({"name": name, "primitives": primitives})
+        if primitive_index is None or primitive_index.card_count == 0:
+            _ensure_runtime_primitive_index(
+                con=con,
+                snapshot_id=snapshot_id,
+                taxonomy_version=taxonomy_version,
+            )
+            return []
 
     unique: Dict[str, Dict[str, Any]] = {}
-    for row in rows:
-        name = row["name"]
-        if name not in unique:
-            unique[name] = row
+    # Ordinals are assigned in (name, oracle_id) order, so the posting list is already sorted.
+    for ordinal in primitive_index.ordinals(primitive_index.bitset_for(primitive_clean)):
+        if len(unique) >= int(limit):
+            break
+        name = primitive_index.names[ordinal]
+        if name == "" or name in unique:
+            continue
+        unique[name] = {"name": name, "primitives": primitive_index.primitives_for(ordinal)}
 
     return [unique[name] for name in sorted(unique.keys())]
 
@@ -2,6 +2,12 @@ import json
 import sqlite3
 from typing import Any, Dict, List
 
+from engine.color_identity_mask import (
+    COLOR_IDENTITY_MASK_COLUMN,
+    color_identity_mask,
+    snapshot_has_color_identity_mask,
+)
+
 
 def _connect(db_path: str) -> sqlite3.Connection:
     con = sqlite3.connect(str(db_path))
@@ -63,6 +69,10 @@ def _ensure_schema(con: sqlite3.Connection) -> None:
     con.execute(
         "CREATE INDEX IF NOT EXISTS idx_cpt_v0_oracle ON card_primitive_tags_v0(oracle_id, ruleset_version)"
     )
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cpt_v0_primitive_rank ON card_primitive_tags_v0"
+        "(ruleset_version, primitive_id, confidence DESC, card_name, oracle_id)"
+    )
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS primitive_tag_runs_v0 (
@@ -231,116 +241,207 @@ def get_candidates_for_primitives_v0(
     ]))
 
     out: Dict[str, List[Dict[str, Any]]] = {}
+    if not primitive_ids_clean:
+        return out
 
     with _connect(db_path) as con:
         snapshot_id = _latest_snapshot_for_ruleset(con=con, ruleset_version=ruleset_version)
-        json1_available = _supports_json1(con)
-
-        for primitive_id in primitive_ids_clean:
-            applied_sql_ci_filter = bool(snapshot_id is not None and requested_ci and json1_available)
-            if snapshot_id is not None:
-                sql_params: List[Any] = [snapshot_id, ruleset_version, primitive_id]
-                ci_clause = ""
-                # Use SQL color-identity filtering when JSON1 is available.
-                if applied_sql_ci_filter:
-                    placeholders = ",".join(["?"] * len(requested_ci))
-                    ci_clause = (
-                        " AND NOT EXISTS ("
-                        "   SELECT 1 "
-                        "   FROM json_each(COALESCE(c.color_identity, '[]')) card_ci "
-                        f"   WHERE card_ci.value NOT IN ({placeholders})"
-                        " )"
-                    )
-                    sql_params.extend(requested_ci)
-
-                sql_params.append(limit_safe * 4)
-                query = (
-                    "SELECT "
-                    "  t.oracle_id, "
-                    "  t.card_name, "
-                    "  t.confidence, "
-                    "  c.color_identity AS card_color_identity "
-                    "FROM card_primitive_tags_v0 t "
-                    "LEFT JOIN cards c "
-                    "  ON c.snapshot_id = ? "
-                    " AND c.oracle_id = t.oracle_id "
-                    "WHERE t.ruleset_version = ? "
-                    "  AND t.primitive_id = ?"
-                    f"{ci_clause} "
-                    "ORDER BY t.confidence DESC, t.card_name ASC, t.oracle_id ASC "
-                    "LIMIT ?"
+
+        ci_clause = ""
+        ci_params: List[Any] = []
+        if snapshot_id is not None and requested_ci:
+            # Prefer the materialized color_identity_mask; fall back to JSON1 parsing.
+            if snapshot_has_color_identity_mask(con, snapshot_id):
+                ci_clause = f" AND (COALESCE(c.{COLOR_IDENTITY_MASK_COLUMN}, 0) & ~?) = 0"
+                ci_params = [color_identity_mask(requested_ci)]
+            elif _supports_json1(con):
+                placeholders = ",".join(["?"] * len(requested_ci))
+                ci_clause = (
+                    " AND NOT EXISTS ("
+                    "   SELECT 1 "
+                    "   FROM json_each(COALESCE(c.color_identity, '[]')) card_ci "
+                    f"   WHERE card_ci.value NOT IN ({placeholders})"
+                    " )"
                 )
+                ci_params = list(requested_ci)
 
-                try:
-                    rows = con.execute(query, tuple(sql_params)).fetchall()
-                except sqlite3.OperationalError:
-                    try:
-                        rows = con.execute(
-                            """
-                            SELECT
-                              t.oracle_id,
-                              t.card_name,
-                              t.confidence,
-                              c.color_identity AS card_color_identity
-                            FROM card_primitive_tags_v0 t
-                            LEFT JOIN cards c
-                              ON c.snapshot_id = ?
-                             AND c.oracle_id = t.oracle_id
-                            WHERE t.ruleset_version = ?
-                              AND t.primitive_id = ?
-                            ORDER BY t.confidence DESC, t.card_name ASC, t.oracle_id ASC
-                            LIMIT ?
-                            """,
-                            (snapshot_id, ruleset_version, primitive_id, limit_safe * 4),
-                        ).fetchall()
-                    except sqlite3.OperationalError:
-                        rows = []
-            else:
-                # No snapshot context available; omit color-identity filtering in v0.
-                try:
-                    rows = con.execute(
-                        """
-                        SELECT
-                          oracle_id,
-                          card_name,
-                          confidence,
-                          NULL AS card_color_identity
-                        FROM card_primitive_tags_v0
-                        WHERE ruleset_version = ?
-                          AND primitive_id = ?
-                        ORDER BY confidence DESC, card_name ASC, oracle_id ASC
-                        LIMIT ?
-                        """,
-                        (ruleset_version, primitive_id, limit_safe * 4),
-                    ).fetchall()
-                except sqlite3.OperationalError:
-                    rows = []
-
-            candidates: List[Dict[str, Any]] = []
-            for row in rows:
-                oracle_id = row["oracle_id"]
-                if not isinstance(oracle_id, str) or oracle_id in exclude_ids:
-                    continue
-                if requested_ci and not applied_sql_ci_filter:
-                    card_ci_raw = row["card_color_identity"] if "card_color_identity" in row.keys() else None
-                    if not _ci_allowed(card_ci_raw=card_ci_raw, requested_ci=requested_ci):
-                        continue
-
-                candidates.append(
-                    {
-                        "oracle_id": oracle_id,
-                        "name": row["card_name"],
-                        "confidence": float(row["confidence"]),
-                    }
+        applied_sql_ci_filter = ci_clause != ""
+        try:
+            rows_by_primitive = _query_ranked_rows_batched(
+                con=con,
+                snapshot_id=snapshot_id,
+                ruleset_version=ruleset_version,
+                primitive_ids=primitive_ids_clean,
+                ci_clause=ci_clause,
+                ci_params=ci_params,
+                window=limit_safe * 4,
+            )
+        except sqlite3.OperationalError:
+            rows_by_primitive = None
+
+        if rows_by_primitive is None and applied_sql_ci_filter:
+            applied_sql_ci_filter = False
+            try:
+                rows_by_primitive = _query_ranked_rows_batched(
+                    con=con,
+                    snapshot_id=snapshot_id,
+                    ruleset_version=ruleset_version,
+                    primitive_ids=primitive_ids_clean,
+                    ci_clause="",
+                    ci_params=[],
+                    window=limit_safe * 4,
                 )
-                if len(candidates) >= limit_safe:
-                    break
+            except sqlite3.OperationalError:
+                rows_by_primitive = None
+
+        if rows_by_primitive is None:
+            # SQLite builds without window functions (< 3.25): one ranked query per primitive.
+            rows_by_primitive = {
+                primitive_id: _query_ranked_rows_single(
+                    con=con,
+                    snapshot_id=snapshot_id,
+                    ruleset_version=ruleset_version,
+                    primitive_id=primitive_id,
+                    window=limit_safe * 4,
+                )
+                for primitive_id in primitive_ids_clean
+            }
+
+    for primitive_id in primitive_ids_clean:
+        candidates: List[Dict[str, Any]] = []
+        for row in rows_by_primitive.get(primitive_id) or []:
+            oracle_id = row["oracle_id"]
+            if not isinstance(oracle_id, str) or oracle_id in exclude_ids:
+                continue
+            if requested_ci and not applied_sql_ci_filter:
+                if not _ci_allowed(card_ci_raw=row["card_color_identity"], requested_ci=requested_ci):
+                    continue
+
+            candidates.append(
+                {
+                    "oracle_id": oracle_id,
+                    "name": row["card_name"],
+                    "confidence": float(row["confidence"]),
+                }
+            )
+            if len(candidates) >= limit_safe:
+                break
 
-            out[primitive_id] = candidates
+        out[primitive_id] = candidates
 
     return out
 
 
+def _query_ranked_rows_batched(
+    con: sqlite3.Connection,
+    snapshot_id: str | None,
+    ruleset_version: str,
+    primitive_ids: list[str],
+    ci_clause: str,
+    ci_params: list[Any],
+    window: int,
+) -> dict[str, list[sqlite3.Row]]:
+    primitive_placeholders = ",".join(["?"] * len(primitive_ids))
+    if snapshot_id is not None:
+        source_sql = (
+            "SELECT "
+            "  t.primitive_id, "
+            "  t.oracle_id, "
+            "  t.card_name, "
+            "  t.confidence, "
+            "  c.color_identity AS card_color_identity, "
+            "  ROW_NUMBER() OVER ("
+            "    PARTITION BY t.primitive_id "
+            "    ORDER BY t.confidence DESC, t.card_name ASC, t.oracle_id ASC"
+            "  ) AS rank_in_primitive "
+            "FROM card_primitive_tags_v0 t "
+            "LEFT JOIN cards c "
+            "  ON c.snapshot_id = ? "
+            " AND c.oracle_id = t.oracle_id "
+            "WHERE t.ruleset_version = ? "
+            f"  AND t.primitive_id IN ({primitive_placeholders})"
+            f"{ci_clause}"
+        )
+        params: List[Any] = [snapshot_id, ruleset_version, *primitive_ids, *ci_params]
+    else:
+        # No snapshot context available; omit color-identity filtering in v0.
+        source_sql = (
+            "SELECT "
+            "  t.primitive_id, "
+            "  t.oracle_id, "
+            "  t.card_name, "
+            "  t.confidence, "
+            "  NULL AS card_color_identity, "
+            "  ROW_NUMBER() OVER ("
+            "    PARTITION BY t.primitive_id "
+            "    ORDER BY t.confidence DESC, t.card_name ASC, t.oracle_id ASC"
+            "  ) AS rank_in_primitive "
+            "FROM card_primitive_tags_v0 t "
+            "WHERE t.ruleset_version = ? "
+            f"  AND t.primitive_id IN ({primitive_placeholders})"
+        )
+        params = [ruleset_version, *primitive_ids]
+
+    rows = con.execute(
+        "SELECT primitive_id, oracle_id, card_name, confidence, card_color_identity "
+        f"FROM ({source_sql}) ranked "
+        "WHERE rank_in_primitive <= ? "
+        "ORDER BY primitive_id ASC, rank_in_primitive ASC",
+        (*params, int(window)),
+    ).fetchall()
+
+    out: Dict[str, List[sqlite3.Row]] = {}
+    for row in rows:
+        out.setdefault(row["primitive_id"], []).append(row)
+    return out
+
+
+def _query_ranked_rows_single(
+    con: sqlite3.Connection,
+    snapshot_id: str | None,
+    ruleset_version: str,
+    primitive_id: str,
+    window: int,
+) -> list[sqlite3.Row]:
+    try:
+        if snapshot_id is not None:
+            return con.execute(
+                """
+                SELECT
+                  t.oracle_id,
+                  t.card_name,
+                  t.confidence,
+                  c.color_identity AS card_color_identity
+                FROM card_primitive_tags_v0 t
+                LEFT JOIN cards c
+                  ON c.snapshot_id = ?
+                 AND c.oracle_id = t.oracle_id
+                WHERE t.ruleset_version = ?
+                  AND t.primitive_id = ?
+                ORDER BY t.confidence DESC, t.card_name ASC, t.oracle_id ASC
+                LIMIT ?
+                """,
+                (snapshot_id, ruleset_version, primitive_id, int(window)),
+            ).fetchall()
+        return con.execute(
+            """
+            SELECT
+              oracle_id,
+              card_name,
+              confidence,
+              NULL AS card_color_identity
+            FROM card_primitive_tags_v0
+            WHERE ruleset_version = ?
+              AND primitive_id = ?
+            ORDER BY confidence DESC, card_name ASC, oracle_id ASC
+            LIMIT ?
+            """,
+            (ruleset_version, primitive_id, int(window)),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+
 def get_primitive_tag_index_status_v0(db_path: str, db_snapshot_id: str | None) -> dict:
     with _connect(db_path) as con:
         try:
@@ -3,20 +3,42 @@ import os
 from datetime import datetime
 from pathlib import Path
 from time import perf_counter
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from uuid import UUID
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, ConfigDict, Field
 
 from engine.db import DB_PATH as CARDS_DB_PATH, connect as cards_db_connect, list_snapshots
 from engine.image_cache_contract import (
     IMAGE_CACHE_ALLOWED_SIZES,
     normalize_image_size,
-    resolve_local_image_path,
+)
+from engine.image_cache_index import DEFAULT_IMAGE_BYTES_CACHE_MAX_BYTES, ImageBytesLRU, get_image_cache_index
+from engine.image_pack import get_image_pack_reader
+from api.engine.card_image_bundle_v1 import (
+    CARD_IMAGE_BUNDLE_MAX_IDS,
+    CARD_IMAGE_BUNDLE_MEDIA_TYPE,
+    card_image_bundle_etag,
+    encode_card_image_bundle_v1,
+)
+from api.engine.card_name_resolve_stream_v1 import (
+    RESOLVE_STREAM_MAX_BODY_BYTES,
+    ResolveStreamBodyTooLargeError,
+    get_card_name_resolve_index_v1,
+    iter_spooled_chunks,
+    spool_body_chunks,
+    stream_resolved_names_v1,
+)
+from api.engine.card_suggest_index_v1 import (
+    SUGGEST_OPTIONAL_COLUMNS,
+    SUGGEST_REQUIRED_COLUMNS,
+    get_card_suggest_index_v1,
+    query_has_like_wildcards,
 )
 from api.engine.constants import (
     ENGINE_VERSION,
@@ -357,6 +379,14 @@ if UI_STATIC_ENABLED and os.path.isdir(UI_ASSETS_PATH):
 DEFAULT_CARD_IMAGE_CACHE_DIR = (Path(REPO_ROOT) / "data" / "card_images").resolve()
 CARD_IMAGE_CACHE_DIR_ENV = "MTG_ENGINE_IMAGE_CACHE_DIR"
 CARD_IMAGE_CACHE_CONTROL = "public, max-age=31536000"
+CARD_IMAGE_BUNDLE_INCOMPLETE_CACHE_CONTROL = "no-cache"
+CARD_IMAGE_BYTES_CACHE_MB_ENV = "MTG_ENGINE_IMAGE_BYTES_CACHE_MB"
+CARD_IMAGE_MEDIA_TYPE_BY_EXTENSION = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
 
 
 @app.get("/health")
@@ -391,6 +421,33 @@ def snapshots(limit: int = 20):
     return {"snapshots": list_snapshots(limit=limit)}
 
 
+def _suggest_result_row(row: Any) -> Dict[str, Any] | None:
+    if not isinstance(row, (dict,)):
+        try:
+            row_dict = dict(row)
+        except Exception:
+            return None
+    else:
+        row_dict = row
+
+    name = _coerce_nonempty_str(row_dict.get("name"))
+    oracle_id = _coerce_nonempty_str(row_dict.get("oracle_id"))
+    if name == "":
+        return None
+
+    mana_cost_raw = row_dict.get("mana_cost")
+    type_line_raw = row_dict.get("type_line")
+    image_uri = _extract_image_uri_from_card_row(row_dict)
+
+    return {
+        "oracle_id": oracle_id,
+        "name": name,
+        "mana_cost": mana_cost_raw if isinstance(mana_cost_raw, str) and mana_cost_raw != "" else None,
+        "type_line": type_line_raw if isinstance(type_line_raw, str) and type_line_raw != "" else None,
+        "image_uri": image_uri,
+    }
+
+
 @app.get("/cards/suggest")
 def cards_suggest(q: str, snapshot_id: Optional[str] = None, limit: int = 20):
     query = _coerce_nonempty_str(q).lower()
@@ -416,97 +473,74 @@ def cards_suggest(q: str, snapshot_id: Optional[str] = None, limit: int = 20):
             "results": [],
         }
 
-    def _to_result_row(row: Any) -> Dict[str, Any] | None:
-        if not isinstance(row, (dict,)):
-            try:
-                row_dict = dict(row)
-            except Exception:
-                return None
-        else:
-            row_dict = row
-
-        name = _coerce_nonempty_str(row_dict.get("name"))
-        oracle_id = _coerce_nonempty_str(row_dict.get("oracle_id"))
-        if name == "":
-            return None
+    results: List[Dict[str, Any]] = []
+    dedupe_keys: set[str] = set()
 
-        mana_cost_raw = row_dict.get("mana_cost")
-        type_line_raw = row_dict.get("type_line")
-        image_uri = _extract_image_uri_from_card_row(row_dict)
+    def _append_rows(rows: Any) -> None:
+        for result_row in rows:
+            if result_row is None:
+                continue
+            oracle_id_key = result_row.get("oracle_id")
+            if isinstance(oracle_id_key, str) and oracle_id_key != "":
+                dedupe_key = f"oracle:{oracle_id_key}"
+            else:
+                dedupe_key = f"name:{str(result_row.get('name') or '').lower()}"
+            if dedupe_key in dedupe_keys:
+                continue
+            dedupe_keys.add(dedupe_key)
+            results.append(dict(result_row))
+            if len(results) >= safe_limit:
+                return
 
-        return {
-            "oracle_id": oracle_id,
-            "name": name,
-            "mana_cost": mana_cost_raw if isinstance(mana_cost_raw, str) and mana_cost_raw != "" else None,
-            "type_line": type_line_raw if isinstance(type_line_raw, str) and type_line_raw != "" else None,
-            "image_uri": image_uri,
-        }
+    suggest_index = None
+    if not query_has_like_wildcards(query):
+        try:
+            suggest_index = get_card_suggest_index_v1(normalized_snapshot_id, _suggest_result_row)
+        except Exception:
+            suggest_index = None
 
     try:
-        with cards_db_connect() as con:
-            pragma_rows = con.execute("PRAGMA table_info(cards)").fetchall()
-            available_columns: set[str] = set()
-            for pragma_row in pragma_rows:
-                try:
-                    pragma_row_dict = dict(pragma_row)
-                except Exception:
-                    continue
-                col_name = pragma_row_dict.get("name")
-                if isinstance(col_name, str) and col_name != "":
-                    available_columns.add(col_name)
-
-            select_fields = ["oracle_id", "name", "mana_cost", "type_line"]
-            for optional_field in [
-                "image_uri",
-                "image_url",
-                "art_uri",
-                "art_url",
-                "image_uris_json",
-                "card_faces_json",
-            ]:
-                if optional_field in available_columns:
-                    select_fields.append(optional_field)
-
-            select_clause = ", ".join(select_fields)
-
-            prefix_rows = con.execute(
-                f"SELECT {select_clause} FROM cards "
-                "WHERE snapshot_id = ? AND LOWER(name) LIKE ? "
-                "ORDER BY name ASC LIMIT ?",
-                (normalized_snapshot_id, query + "%", safe_limit),
-            ).fetchall()
-
-            results: List[Dict[str, Any]] = []
-            dedupe_keys: set[str] = set()
-
-            def _append_rows(rows: Any) -> None:
-                for row in rows:
-                    result_row = _to_result_row(row)
-                    if result_row is None:
-                        continue
-                    oracle_id_key = result_row.get("oracle_id")
-                    if isinstance(oracle_id_key, str) and oracle_id_key != "":
-                        dedupe_key = f"oracle:{oracle_id_key}"
-                    else:
-                        dedupe_key = f"name:{str(result_row.get('name') or '').lower()}"
-                    if dedupe_key in dedupe_keys:
+        if suggest_index is not None:
+            _append_rows(suggest_index.prefix_matches(query, safe_limit))
+            if len(results) < safe_limit:
+                _append_rows(suggest_index.contains_matches(query, safe_limit - len(results)))
+        else:
+            with cards_db_connect() as con:
+                pragma_rows = con.execute("PRAGMA table_info(cards)").fetchall()
+                available_columns: set[str] = set()
+                for pragma_row in pragma_rows:
+                    try:
+                        pragma_row_dict = dict(pragma_row)
+                    except Exception:
                         continue
-                    dedupe_keys.add(dedupe_key)
-                    results.append(result_row)
-                    if len(results) >= safe_limit:
-                        return
+                    col_name = pragma_row_dict.get("name")
+                    if isinstance(col_name, str) and col_name != "":
+                        available_columns.add(col_name)
 
-            _append_rows(prefix_rows)
+                select_fields = list(SUGGEST_REQUIRED_COLUMNS)
+                for optional_field in SUGGEST_OPTIONAL_COLUMNS:
+                    if optional_field in available_columns:
+                        select_fields.append(optional_field)
 
-            if len(results) < safe_limit:
-                remaining = safe_limit - len(results)
-                contains_rows = con.execute(
+                select_clause = ", ".join(select_fields)
+
+                prefix_rows = con.execute(
                     f"SELECT {select_clause} FROM cards "
-                    "WHERE snapshot_id = ? AND LOWER(name) LIKE ? AND LOWER(name) NOT LIKE ? "
+                    "WHERE snapshot_id = ? AND LOWER(name) LIKE ? "
                     "ORDER BY name ASC LIMIT ?",
-                    (normalized_snapshot_id, "%" + query + "%", query + "%", remaining),
+                    (normalized_snapshot_id, query + "%", safe_limit),
                 ).fetchall()
-                _append_rows(contains_rows)
+                _append_rows(_suggest_result_row(row) for row in prefix_rows)
+
+                if len(results) < safe_limit:
+                    remaining = safe_limit - len(results)
+                    contains_rows = con.execute(
+                        f"SELECT {select_clause} FROM cards "
+                        "WHERE snapshot_id = ? AND LOWER(name) LIKE ? AND LOWER(name) NOT LIKE ? "
+                        "ORDER BY name ASC LIMIT ?",
+                        (normalized_snapshot_id, "%" + query + "%", query + "%", remaining),
+                    ).fetchall()
+                    _append_rows(_suggest_result_row(row) for row in contains_rows)
 
     except Exception:
         return {
@@ -525,20 +559,31 @@ def cards_suggest(q: str, snapshot_id: Optional[str] = None, limit: int = 20):
 
 
 @app.get("/cards/image/{oracle_id}")
-def cards_image(oracle_id: str, size: str = "normal"):
+def cards_image(oracle_id: str, request: Request, size: str = "normal"):
     normalized_size = _normalize_card_image_size(size)
     normalized_oracle_id = _normalize_oracle_id(oracle_id)
     cache_dir = _resolve_card_image_cache_dir()
+
+    pack_reader = get_image_pack_reader(cache_dir, normalized_size)
+    packed_entry = pack_reader.lookup(normalized_oracle_id)
+    if packed_entry is not None:
+        packed_headers = {"Cache-Control": CARD_IMAGE_CACHE_CONTROL, "ETag": packed_entry.etag}
+        if _etag_matches(request.headers.get("if-none-match"), packed_entry.etag):
+            return Response(status_code=304, headers=packed_headers)
+        packed_bytes = pack_reader.read(packed_entry)
+        if packed_bytes is not None:
+            return Response(
+                content=packed_bytes,
+                media_type=CARD_IMAGE_MEDIA_TYPE_BY_EXTENSION.get(packed_entry.extension, "image/jpeg"),
+                headers=packed_headers,
+            )
+
     try:
-        image_path_value = resolve_local_image_path(
-            cache_root=str(cache_dir),
-            oracle_id=normalized_oracle_id,
-            size=normalized_size,
-        )
+        image_entry = get_image_cache_index(cache_dir).lookup(normalized_oracle_id, normalized_size)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail="Invalid image cache path.") from exc
 
-    if image_path_value is None:
+    if image_entry is None:
         return JSONResponse(
             status_code=404,
             content={
@@ -548,19 +593,85 @@ def cards_image(oracle_id: str, size: str = "normal"):
             },
         )
 
-    image_path = Path(image_path_value)
-    suffix = image_path.suffix.lower()
-    if suffix == ".png":
-        media_type = "image/png"
-    elif suffix == ".webp":
-        media_type = "image/webp"
-    else:
-        media_type = "image/jpeg"
-    response = FileResponse(path=str(image_path), media_type=media_type)
-    response.headers["Cache-Control"] = CARD_IMAGE_CACHE_CONTROL
+    cache_headers = {"Cache-Control": CARD_IMAGE_CACHE_CONTROL, "ETag": image_entry.etag}
+    if _etag_matches(request.headers.get("if-none-match"), image_entry.etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    media_type = CARD_IMAGE_MEDIA_TYPE_BY_EXTENSION.get(image_entry.extension, "image/jpeg")
+    image_bytes = _CARD_IMAGE_BYTES_CACHE.get(image_entry.etag)
+    if image_bytes is None and _CARD_IMAGE_BYTES_CACHE.accepts(image_entry.length):
+        try:
+            image_bytes = Path(image_entry.path).read_bytes()
+        except OSError:
+            image_bytes = None
+        if image_bytes is not None:
+            _CARD_IMAGE_BYTES_CACHE.put(image_entry.etag, image_bytes)
+    if image_bytes is not None:
+        return Response(content=image_bytes, media_type=media_type, headers=cache_headers)
+
+    response = FileResponse(path=image_entry.path, media_type=media_type)
+    response.headers.update(cache_headers)
     return response
 
 
+@app.get("/cards/images_bundle")
+def cards_images_bundle(request: Request, ids: str = "", size: str = "small"):
+    normalized_size = _normalize_card_image_size(size)
+    oracle_ids: List[str] = []
+    seen_oracle_ids: set[str] = set()
+    for raw_oracle_id in ids.split(","):
+        if raw_oracle_id.strip() == "":
+            continue
+        oracle_id = _normalize_oracle_id(raw_oracle_id)
+        if oracle_id not in seen_oracle_ids:
+            seen_oracle_ids.add(oracle_id)
+            oracle_ids.append(oracle_id)
+    if len(oracle_ids) == 0:
+        raise HTTPException(status_code=400, detail="ids must list at least one oracle_id.")
+    if len(oracle_ids) > CARD_IMAGE_BUNDLE_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"ids supports at most {CARD_IMAGE_BUNDLE_MAX_IDS} entries.")
+
+    cache_dir = _resolve_card_image_cache_dir()
+    sources = [_card_image_source(cache_dir, oracle_id, normalized_size) for oracle_id in oracle_ids]
+    bundle_etag = card_image_bundle_etag(
+        normalized_size,
+        oracle_ids,
+        [source[0] if source is not None else "" for source in sources],
+    )
+    # Only a bundle with every image may be cached for a year; an incomplete
+    # one must be revalidated so images fetched later show up.
+    complete = all(source is not None for source in sources)
+    if _etag_matches(request.headers.get("if-none-match"), bundle_etag):
+        return Response(status_code=304, headers=_card_image_bundle_headers(bundle_etag, complete=complete))
+
+    # Only complete bundles are kept in the byte cache, so a hit is complete.
+    bundle = _CARD_IMAGE_BYTES_CACHE.get(bundle_etag) if complete else None
+    if bundle is None:
+        images: List[Tuple[str, str, bytes]] = []
+        missing: List[str] = []
+        for oracle_id, source in zip(oracle_ids, sources):
+            image_bytes = source[2]() if source is not None else None
+            if source is None or image_bytes is None:
+                missing.append(oracle_id)
+                continue
+            images.append((oracle_id, CARD_IMAGE_MEDIA_TYPE_BY_EXTENSION.get(source[1], "image/jpeg"), image_bytes))
+        bundle = encode_card_image_bundle_v1(size=normalized_size, images=images, missing=missing)
+        complete = len(missing) == 0
+        if complete:
+            _CARD_IMAGE_BYTES_CACHE.put(bundle_etag, bundle)
+
+    return Response(
+        content=bundle,
+        media_type=CARD_IMAGE_BUNDLE_MEDIA_TYPE,
+        headers=_card_image_bundle_headers(bundle_etag, complete=complete),
+    )
+
+
+def _card_image_bundle_headers(bundle_etag: str, complete: bool) -> Dict[str, str]:
+    cache_control = CARD_IMAGE_CACHE_CONTROL if complete else CARD_IMAGE_BUNDLE_INCOMPLETE_CACHE_CONTROL
+    return {"Cache-Control": cache_control, "ETag": bundle_etag}
+
+
 @app.post("/cards/resolve_names", response_model=CardsResolveNamesResponse)
 def cards_resolve_names(req: CardsResolveNamesRequest):
     if len(req.names) > 200:
@@ -687,6 +798,48 @@ def cards_resolve_names(req: CardsResolveNamesRequest):
     }
 
 
+@app.post("/cards/resolve_names_stream")
+async def cards_resolve_names_stream(request: Request, snapshot_id: Optional[str] = None):
+    """Bulk name resolution: NDJSON (or text/plain, one name per line) in, NDJSON rows out."""
+    normalized_snapshot_id = _coerce_nonempty_str(snapshot_id)
+    if normalized_snapshot_id == "":
+        normalized_snapshot_id = await run_in_threadpool(_latest_snapshot_id)
+
+    resolve_index = None
+    if normalized_snapshot_id != "":
+        try:
+            resolve_index = await run_in_threadpool(
+                get_card_name_resolve_index_v1,
+                normalized_snapshot_id,
+                _suggest_result_row,
+            )
+        except Exception:
+            resolve_index = None
+
+    content_length = request.headers.get("content-length", "").strip()
+    if content_length.isdigit() and int(content_length) > RESOLVE_STREAM_MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail=f"Request body exceeds {RESOLVE_STREAM_MAX_BODY_BYTES} bytes.")
+
+    # The body is spooled chunk by chunk before the response starts: under
+    # ASGI spec < 2.4 (uvicorn) StreamingResponse reads receive() for
+    # disconnects while streaming and would swallow request body messages.
+    try:
+        body_spool = await spool_body_chunks(request.stream())
+    except ResolveStreamBodyTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return StreamingResponse(
+        stream_resolved_names_v1(
+            iter_spooled_chunks(body_spool),
+            snapshot_id=normalized_snapshot_id,
+            index=resolve_index,
+            plain_text=content_type == "text/plain",
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.post("/build", response_model=BuildResponse)
 def build(req: BuildRequest):
     canonical_request = build_canonical_deck_input_v1(
@@ -820,6 +973,56 @@ def _latest_snapshot_id() -> str:
     return _coerce_nonempty_str(first_row.get("snapshot_id"))
 
 
+def _card_image_bytes_cache_max_bytes() -> int:
+    raw_value = os.getenv(CARD_IMAGE_BYTES_CACHE_MB_ENV, "").strip()
+    if raw_value == "":
+        return DEFAULT_IMAGE_BYTES_CACHE_MAX_BYTES
+    try:
+        return max(int(float(raw_value) * 1024 * 1024), 0)
+    except ValueError:
+        return DEFAULT_IMAGE_BYTES_CACHE_MAX_BYTES
+
+
+_CARD_IMAGE_BYTES_CACHE = ImageBytesLRU(max_bytes=_card_image_bytes_cache_max_bytes())
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not isinstance(if_none_match, str) or if_none_match.strip() == "":
+        return False
+    tokens = [token.strip() for token in if_none_match.split(",")]
+    return "*" in tokens or etag in tokens or f"W/{etag}" in tokens
+
+
+def _card_image_source(
+    cache_dir: Path, oracle_id: str, size: str
+) -> Optional[Tuple[str, str, Callable[[], Optional[bytes]]]]:
+    """(etag, extension, read) for a cached image, packed archive first then per-card files."""
+    pack_reader = get_image_pack_reader(cache_dir, size)
+    packed_entry = pack_reader.lookup(oracle_id)
+    if packed_entry is not None:
+        return packed_entry.etag, packed_entry.extension, lambda: pack_reader.read(packed_entry)
+
+    try:
+        image_entry = get_image_cache_index(cache_dir).lookup(oracle_id, size)
+    except ValueError:
+        return None
+    if image_entry is None:
+        return None
+
+    def _read_file() -> Optional[bytes]:
+        image_bytes = _CARD_IMAGE_BYTES_CACHE.get(image_entry.etag)
+        if image_bytes is not None:
+            return image_bytes
+        try:
+            image_bytes = Path(image_entry.path).read_bytes()
+        except OSError:
+            return None
+        _CARD_IMAGE_BYTES_CACHE.put(image_entry.etag, image_bytes)
+        return image_bytes
+
+    return image_entry.etag, image_entry.extension, _read_file
+
+
 def _resolve_card_image_cache_dir() -> Path:
     env_value = os.getenv(CARD_IMAGE_CACHE_DIR_ENV, "")
     if isinstance(env_value, str) and env_value.strip() != "":
@@ -3,6 +3,7 @@
 __all__ = [
     "build_context",
     "canonical",
+    "color_identity_mask",
     "cards_db",
     "db",
     "db_tags",
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from engine.folded_name_index import FoldedNameIndex, sqlite_ascii_lower
+
+VERSION = "card_name_index_v1"
+
+_GRAM_SIZE = 3
+_PAD = "\x02"
+# An adjacent transposition touches one more trigram than a single-character edit.
+_GRAMS_PER_EDIT = _GRAM_SIZE + 1
+
+# Allowed optimal-string-alignment distance by query length.
+FUZZY_MAX_DISTANCE_BY_LENGTH: Tuple[Tuple[int, int], ...] = ((4, 1), (11, 2))
+FUZZY_MAX_DISTANCE_CEILING = 3
+
+
+def fuzzy_key(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+def fuzzy_max_distance(query_length: int) -> int:
+    for length_max, distance in FUZZY_MAX_DISTANCE_BY_LENGTH:
+        if query_length <= length_max:
+            return distance
+    return FUZZY_MAX_DISTANCE_CEILING
+
+
+def _padded_grams(value: str) -> Set[str]:
+    padded = f"{_PAD}{value}{_PAD}"
+    return {padded[idx:idx + _GRAM_SIZE] for idx in range(len(padded) - _GRAM_SIZE + 1)}
+
+
+def bounded_osa_distance(left: str, right: str, max_distance: int) -> int | None:
+    """Optimal string alignment distance (adjacent transpositions cost 1), or None above max_distance.
+
+    Only the diagonal band |i - j| <= max_distance is filled: every cell outside
+    it is already above the bound, so it is held at max_distance + 1.
+    """
+    if abs(len(left) - len(right)) > max_distance:
+        return None
+    if left == right:
+        return 0
+
+    over = max_distance + 1
+    right_length = len(right)
+    previous_previous: List[int] = []
+    previous = [j if j <= max_distance else over for j in range(right_length + 1)]
+    for i in range(1, len(left) + 1):
+        current = [over] * (right_length + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        left_char = left[i - 1]
+        for j in range(max(i - max_distance, 1), min(i + max_distance, right_length) + 1):
+            cost = 0 if left_char == right[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and left_char == right[j - 2] and left[i - 2] == right[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        previous_previous, previous = previous, current
+
+    distance = previous[right_length]
+    return distance if distance <= max_distance else None
+
+
+class CardNameIndex:
+    """Per-snapshot in-memory index over cards.name.
+
+    Serves the prefix/contains lookups of ``suggest_card_names`` through a
+    shared FoldedNameIndex, plus a typo-tolerant lookup: trigram postings are
+    bucketed by fuzzy-key length, so only names whose length is within the
+    allowed edit distance are counted at all. Candidates sharing enough
+    padded trigrams with the query (q-gram lemma for that distance) are then
+    verified with a bounded OSA distance and ranked by (distance, shared
+    trigrams desc, name).
+    """
+
+    __slots__ = (
+        "snapshot_id",
+        "_names",
+        "_oracle_ids",
+        "_keys",
+        "_key_gram_counts",
+        "_positions_by_key_length",
+        "_postings_by_key_length",
+        "_folded_index",
+    )
+
+    def __init__(self, *, snapshot_id: str, rows: Iterable[Tuple[str, str]]) -> None:
+        self.snapshot_id = snapshot_id
+        entries = sorted(
+            ((name, oracle_id) for name, oracle_id in rows if isinstance(name, str)),
+            key=lambda entry: (entry[0], entry[1] if isinstance(entry[1], str) else ""),
+        )
+        self._names = [name for name, _oracle_id in entries]
+        self._oracle_ids = [oracle_id if isinstance(oracle_id, str) else "" for _name, oracle_id in entries]
+        self._keys = [fuzzy_key(name) for name in self._names]
+        self._folded_index = FoldedNameIndex([sqlite_ascii_lower(name) for name in self._names])
+
+        key_gram_counts: List[int] = []
+        positions_by_key_length: Dict[int, List[int]] = {}
+        postings_by_key_length: Dict[int, Dict[str, List[int]]] = {}
+        for position, key in enumerate(self._keys):
+            key_grams = _padded_grams(key)
+            key_gram_counts.append(len(key_grams))
+            positions_by_key_length.setdefault(len(key), []).append(position)
+            postings = postings_by_key_length.setdefault(len(key), {})
+            for gram in key_grams:
+                postings.setdefault(gram, []).append(position)
+        self._key_gram_counts = key_gram_counts
+        self._positions_by_key_length = positions_by_key_length
+        self._postings_by_key_length = postings_by_key_length
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._names)
+
+    def prefix_names(self, query: str, limit: int) -> List[str]:
+        """Names of ``LOWER(name) LIKE 'query%' ORDER BY name LIMIT limit``."""
+        return [self._names[position] for position in self._folded_index.prefix_positions(query, limit)]
+
+    def contains_names(self, query: str, limit: int) -> List[str]:
+        """Names of ``LOWER(name) LIKE '%query%' AND NOT LIKE 'query%' ORDER BY name LIMIT limit``."""
+        return [self._names[position] for position in self._folded_index.contains_positions(query, limit)]
+
+    def fuzzy_matches(
+        self,
+        query: str,
+        limit: int,
+        max_distance: Optional[int] = None,
+    ) -> List[Tuple[str, str, int]]:
+        """(name, oracle_id, distance) rows within the edit-distance bound, best first."""
+        key = fuzzy_key(query)
+        limit_clean = max(int(limit), 0)
+        if key == "" or limit_clean == 0:
+            return []
+        bound = fuzzy_max_distance(len(key)) if max_distance is None else max(int(max_distance), 0)
+        lengths = range(max(len(key) - bound, 0), len(key) + bound + 1)
+
+        grams = _padded_grams(key)
+        shared_counts: Counter = Counter()
+        candidates: Iterable[int]
+        if len(key) <= _GRAM_SIZE:
+            candidates = [
+                position for length in lengths for position in self._positions_by_key_length.get(length, ())
+            ]
+        else:
+            # Each edit touches at most _GRAMS_PER_EDIT trigrams of either string, so a
+            # match shares at least max(|query grams|, |name grams|) - _GRAMS_PER_EDIT * bound
+            # of them. At least one shared trigram is always required, which drops only
+            # names whose edits hit every trigram of a short query.
+            slack = _GRAMS_PER_EDIT * bound
+            for length in lengths:
+                postings = self._postings_by_key_length.get(length)
+                if postings is None:
+                    continue
+                for gram in grams:
+                    posting = postings.get(gram)
+                    if posting is not None:
+                        shared_counts.update(posting)
+            key_gram_counts = self._key_gram_counts
+            query_gram_count = len(grams)
+            candidates = [
+                position
+                for position, shared in shared_counts.items()
+                if shared + slack >= max(query_gram_count, key_gram_counts[position])
+            ]
+
+        scored: List[Tuple[int, int, str, str, int]] = []
+        for position in candidates:
+            distance = bounded_osa_distance(key, self._keys[position], bound)
+            if distance is None:
+                continue
+            shared = shared_counts[position] if shared_counts else len(grams & _padded_grams(self._keys[position]))
+            scored.append((distance, -shared, self._names[position], self._oracle_ids[position], position))
+
+        scored.sort()
+        return [(name, oracle_id, distance) for distance, _shared, name, oracle_id, _position in scored[:limit_clean]]
+
+
+def build_card_name_index(con: sqlite3.Connection, snapshot_id: str) -> CardNameIndex:
+    rows = con.execute(
+        "SELECT name, oracle_id FROM cards WHERE snapshot_id = ? AND name IS NOT NULL",
+        (snapshot_id,),
+    ).fetchall()
+    return CardNameIndex(snapshot_id=snapshot_id, rows=((row[0], row[1]) for row in rows))
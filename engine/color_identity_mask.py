@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+COLOR_IDENTITY_MASK_COLUMN = "color_identity_mask"
+COLOR_IDENTITY_MASK_INDEX = "idx_cards_snapshot_color_identity_mask"
+COLOR_IDENTITY_MASK_ORDER: Sequence[str] = ("W", "U", "B", "R", "G")
+COLOR_IDENTITY_MASK_BIT_BY_COLOR: Dict[str, int] = {
+    color: 1 << index for index, color in enumerate(COLOR_IDENTITY_MASK_ORDER)
+}
+COLOR_IDENTITY_MASK_ALL = sum(COLOR_IDENTITY_MASK_BIT_BY_COLOR.values())
+
+
+def color_identity_mask(colors: Iterable[Any]) -> int:
+    mask = 0
+    for color in colors:
+        if not isinstance(color, str):
+            continue
+        mask |= COLOR_IDENTITY_MASK_BIT_BY_COLOR.get(color.strip().upper(), 0)
+    return mask
+
+
+def color_identity_mask_from_field(raw: Any) -> Optional[int]:
+    """Encode a cards.color_identity value; None when the identity is unavailable."""
+    if isinstance(raw, list):
+        parsed = raw
+    elif isinstance(raw, str):
+        stripped = raw.strip()
+        if stripped == "":
+            return None
+        try:
+            parsed = json.loads(stripped)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(parsed, list):
+            return None
+    else:
+        return None
+    return color_identity_mask(parsed)
+
+
+def colors_from_mask(mask: int) -> List[str]:
+    return [
+        color
+        for color in COLOR_IDENTITY_MASK_ORDER
+        if int(mask) & COLOR_IDENTITY_MASK_BIT_BY_COLOR[color]
+    ]
+
+
+def is_mask_subset(card_mask: int, commander_mask: int) -> bool:
+    return (int(card_mask) & ~int(commander_mask)) == 0
+
+
+def snapshot_has_color_identity_mask(con: sqlite3.Connection, snapshot_id: str) -> bool:
+    """True when the mask column exists and was materialized for the snapshot.
+
+    Rows of a materialized snapshot that still carry NULL have an unavailable identity.
+    """
+    try:
+        row = con.execute(
+            f"""
+            SELECT 1
+            FROM cards
+            WHERE snapshot_id = ?
+              AND {COLOR_IDENTITY_MASK_COLUMN} IS NOT NULL
+            LIMIT 1
+            """,
+            (snapshot_id,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return row is not None
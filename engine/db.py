@@ -5,6 +5,9 @@ import sqlite3
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 
+from engine.card_name_index import VERSION as CARD_NAME_INDEX_VERSION, CardNameIndex, build_card_name_index
+from engine.snapshot_cache import SnapshotScopedCache, snapshot_cards_signature
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_DB_RELATIVE_PATH = Path("data") / "mtg.sqlite"
 DB_PATH = (REPO_ROOT / DEFAULT_DB_RELATIVE_PATH).resolve()
@@ -12,6 +15,8 @@ EXTERNAL_DB_PATH = (REPO_ROOT.parent / DEFAULT_DB_RELATIVE_PATH).resolve()
 SQLITE_HEADER_PREFIX = b"SQLite format 3\x00"
 logger = logging.getLogger(__name__)
 
+_CARD_NAME_INDEX_CACHE = SnapshotScopedCache()
+
 
 class _ManagedConnection(sqlite3.Connection):
     def __exit__(self, exc_type, exc_value, traceback):
@@ -299,12 +304,19 @@ def list_snapshots(limit: int = 20):
         ).fetchall()
         return [dict(r) for r in rows]
 
-def suggest_card_names(snapshot_id: str, query: str, limit: int = 5) -> list[str]:
-    q = (query or "").strip().lower()
-    if not q:
-        return []
+def get_card_name_index(snapshot_id: str) -> CardNameIndex:
+    def _build() -> CardNameIndex:
+        with connect() as con:
+            return build_card_name_index(con, snapshot_id)
+
+    return _CARD_NAME_INDEX_CACHE.get_or_build(
+        resolve_db_path(),
+        (CARD_NAME_INDEX_VERSION, snapshot_id),
+        _build,
+        lambda con: snapshot_cards_signature(con, snapshot_id),
+    )
 
-    # Deterministic: prefix first, then contains
+def _suggest_card_names_sql(snapshot_id: str, q: str, limit: int) -> list[str]:
     with connect() as con:
         prefix = con.execute(
             "SELECT name FROM cards "
@@ -327,6 +339,31 @@ def suggest_card_names(snapshot_id: str, query: str, limit: int = 5) -> list[str
 
         return names
 
+def suggest_card_names(snapshot_id: str, query: str, limit: int = 5) -> list[str]:
+    q = (query or "").strip().lower()
+    if not q:
+        return []
+
+    # LIKE wildcards in the query keep their SQL meaning.
+    if "%" in q or "_" in q:
+        return _suggest_card_names_sql(snapshot_id, q, limit)
+
+    # Deterministic: prefix first, then contains, then typo-tolerant matches
+    index = get_card_name_index(snapshot_id)
+    names = index.prefix_names(q, limit)
+    if len(names) < limit:
+        names.extend(index.contains_names(q, limit - len(names)))
+    if len(names) < limit:
+        seen = set(names)
+        for name, _oracle_id, _distance in index.fuzzy_matches(q, limit + len(names)):
+            if name in seen:
+                continue
+            seen.add(name)
+            names.append(name)
+            if len(names) >= limit:
+                break
+    return names
+
 def is_legal_in_format(card: dict, fmt: str) -> tuple[bool, str]:
     legalities = card.get("legalities") or {}
     status = legalities.get(fmt)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import Dict, List, Sequence, Set
+
+# SQLite LOWER() and LIKE only fold ASCII letters; prefix/contains lookups fold the same way.
+_ASCII_LOWER_TABLE = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_NGRAM_SIZES = (2, 3)
+
+
+def sqlite_ascii_lower(value: str) -> str:
+    return value.translate(_ASCII_LOWER_TABLE)
+
+
+def ngrams(value: str, size: int) -> Set[str]:
+    return {value[idx:idx + size] for idx in range(len(value) - size + 1)}
+
+
+class FoldedNameIndex:
+    """Prefix/contains lookups over ASCII-folded names, answered as entry positions.
+
+    Callers keep their entries in ``ORDER BY name`` order and map the returned
+    positions back to their own rows. Prefix lookups binary-search a sorted
+    array of folded names; substring lookups intersect 2-/3-gram posting
+    lists of entry positions.
+    """
+
+    __slots__ = ("_folded_names", "_sorted_folded", "_sorted_positions", "_postings")
+
+    def __init__(self, folded_names: List[str]) -> None:
+        self._folded_names = folded_names
+
+        order = sorted(range(len(folded_names)), key=lambda position: (folded_names[position], position))
+        self._sorted_folded = [folded_names[position] for position in order]
+        self._sorted_positions = order
+
+        postings: Dict[str, List[int]] = {}
+        for position, folded in enumerate(folded_names):
+            for size in _NGRAM_SIZES:
+                for gram in ngrams(folded, size):
+                    postings.setdefault(gram, []).append(position)
+        self._postings = postings
+
+    def __len__(self) -> int:
+        return len(self._folded_names)
+
+    def prefix_positions(self, query: str, limit: int) -> List[int]:
+        """Positions of ``LOWER(name) LIKE 'query%' ORDER BY name LIMIT limit``."""
+        start = bisect.bisect_left(self._sorted_folded, query)
+        positions: List[int] = []
+        for idx in range(start, len(self._sorted_folded)):
+            if not self._sorted_folded[idx].startswith(query):
+                break
+            positions.append(self._sorted_positions[idx])
+        return heapq.nsmallest(max(int(limit), 0), positions)
+
+    def contains_positions(self, query: str, limit: int) -> List[int]:
+        """Positions of ``LOWER(name) LIKE '%query%' AND NOT LIKE 'query%' ORDER BY name LIMIT limit``."""
+        limit_clean = max(int(limit), 0)
+        if limit_clean == 0 or query == "":
+            return []
+
+        size = 3 if len(query) >= 3 else len(query)
+        if size < min(_NGRAM_SIZES):
+            candidates: Sequence[int] = range(len(self._folded_names))
+        else:
+            posting_lists: List[List[int]] = []
+            for gram in ngrams(query, size):
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                posting_lists.append(posting)
+            posting_lists.sort(key=len)
+            if len(posting_lists) == 1:
+                candidates = posting_lists[0]
+            else:
+                remaining = set(posting_lists[0])
+                for posting in posting_lists[1:]:
+                    remaining.intersection_update(posting)
+                    if not remaining:
+                        return []
+                candidates = sorted(remaining)
+
+        out: List[int] = []
+        for position in candidates:
+            folded = self._folded_names[position]
+            if query not in folded or folded.startswith(query):
+                continue
+            out.append(position)
+            if len(out) >= limit_clean:
+                break
+        return out
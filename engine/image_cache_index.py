@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import os
+import stat as stat_module
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from engine.image_cache_contract import (
+    IMAGE_CACHE_EXTENSIONS_PREFERRED,
+    IMAGE_CACHE_SIZE_DIR_BY_SIZE,
+    normalize_image_size,
+    normalize_oracle_id,
+)
+
+DEFAULT_IMAGE_BYTES_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_IMAGE_BYTES_CACHE_MAX_ITEM_BYTES = 2 * 1024 * 1024
+
+# Directory mtimes are coarse (filesystem and kernel tick granularity): a scan taken
+# this close to the last modification may have missed a same-tick change.
+_RACY_MTIME_WINDOW_NS = 1_000_000_000
+# A size directory is rescanned at most this often; lookups in between that cannot
+# trust the last scan stat their own files instead.
+_RESCAN_MIN_INTERVAL_NS = 1_000_000_000
+
+_EXTENSION_RANK = {extension: rank for rank, extension in enumerate(IMAGE_CACHE_EXTENSIONS_PREFERRED)}
+
+
+class CachedImageEntry:
+    __slots__ = ("oracle_id", "size", "path", "extension", "length", "mtime_ns", "etag")
+
+    def __init__(self, *, oracle_id: str, size: str, path: str, extension: str, length: int, mtime_ns: int) -> None:
+        self.oracle_id = oracle_id
+        self.size = size
+        self.path = path
+        self.extension = extension
+        self.length = int(length)
+        self.mtime_ns = int(mtime_ns)
+        # Files are replaced atomically per oracle_id, so (mtime, length) pins the bytes.
+        self.etag = f'"{oracle_id}-{size}-{extension}-{self.mtime_ns:x}-{self.length:x}"'
+
+
+def _within(path: Path, root: Path) -> bool:
+    try:
+        path.resolve().relative_to(root)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _scan_size_dir(cache_root: Path, size_dir: Path, size: str) -> Dict[str, CachedImageEntry]:
+    ranked: Dict[str, Tuple[int, CachedImageEntry]] = {}
+    if not _within(size_dir, cache_root):
+        return {}
+    try:
+        iterator = os.scandir(size_dir)
+    except OSError:
+        return {}
+    with iterator:
+        for dir_entry in iterator:
+            stem, dot, extension = dir_entry.name.rpartition(".")
+            extension = extension.lower()
+            if dot == "" or extension not in _EXTENSION_RANK:
+                continue
+            try:
+                oracle_id = normalize_oracle_id(stem)
+            except ValueError:
+                continue
+            if stem != oracle_id:
+                continue
+            try:
+                if not dir_entry.is_file():
+                    continue
+                if dir_entry.is_symlink() and not _within(Path(dir_entry.path), cache_root):
+                    continue
+                stat = dir_entry.stat()
+            except OSError:
+                continue
+            rank = _EXTENSION_RANK[extension]
+            current = ranked.get(oracle_id)
+            if current is not None and current[0] <= rank:
+                continue
+            ranked[oracle_id] = (
+                rank,
+                CachedImageEntry(
+                    oracle_id=oracle_id,
+                    size=size,
+                    path=dir_entry.path,
+                    extension=extension,
+                    length=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns,
+                ),
+            )
+    return {oracle_id: entry for oracle_id, (_rank, entry) in ranked.items()}
+
+
+def _stat_entry(cache_root: Path, size_dir: Path, size: str, oracle_id: str) -> Optional[CachedImageEntry]:
+    """The entry a scan would pick for one oracle_id, from at most one stat per extension."""
+    if not _within(size_dir, cache_root):
+        return None
+    for extension in IMAGE_CACHE_EXTENSIONS_PREFERRED:
+        path = size_dir / f"{oracle_id}.{extension}"
+        try:
+            stat = os.stat(path)
+            if not stat_module.S_ISREG(stat.st_mode):
+                continue
+            if path.is_symlink() and not _within(path, cache_root):
+                continue
+        except OSError:
+            continue
+        return CachedImageEntry(
+            oracle_id=oracle_id,
+            size=size,
+            path=str(path),
+            extension=extension,
+            length=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+        )
+    return None
+
+
+class ImageCacheIndex:
+    """oracle_id+size -> cached file entry, from one directory scan per size.
+
+    A lookup costs a single stat of the size directory while the last scan is
+    current. When the directory changed (the prefetcher adds or atomically
+    replaces files) or was modified too recently for the scan to be trusted,
+    one thread rescans it, at most every _RESCAN_MIN_INTERVAL_NS; lookups that
+    cannot use a trusted scan meanwhile stat their own oracle_id's files, so
+    results stay exact without every request listing the directory.
+    """
+
+    def __init__(self, cache_root: Path) -> None:
+        self.cache_root = cache_root.resolve()
+        self._lock = threading.Lock()
+        self._entries_by_size: Dict[str, Tuple[Optional[int], int, Dict[str, CachedImageEntry]]] = {}
+        self._scan_locks: Dict[str, threading.Lock] = {}
+
+    def _scan(self, size: str, size_dir: Path, dir_mtime_ns: int) -> Tuple[Dict[str, CachedImageEntry], bool]:
+        scanned_at_ns = time.time_ns()
+        entries = _scan_size_dir(self.cache_root, size_dir, size)
+        with self._lock:
+            self._entries_by_size[size] = (dir_mtime_ns, scanned_at_ns, entries)
+        return entries, scanned_at_ns - dir_mtime_ns > _RACY_MTIME_WINDOW_NS
+
+    def _size_entries(self, size: str) -> Tuple[Dict[str, CachedImageEntry], bool]:
+        """(entries, trusted); untrusted entries may miss or misreport files changed since the scan."""
+        size_dir = self.cache_root / IMAGE_CACHE_SIZE_DIR_BY_SIZE[size]
+        try:
+            dir_mtime_ns = size_dir.stat().st_mtime_ns
+        except OSError:
+            return {}, True
+
+        with self._lock:
+            cached = self._entries_by_size.get(size)
+            scan_lock = self._scan_locks.setdefault(size, threading.Lock())
+
+        if cached is None:
+            with scan_lock:
+                with self._lock:
+                    cached = self._entries_by_size.get(size)
+                if cached is not None:
+                    # Another thread scanned while this one waited.
+                    return cached[2], False
+                return self._scan(size, size_dir, dir_mtime_ns)
+
+        cached_mtime_ns, scanned_at_ns, entries = cached
+        if cached_mtime_ns == dir_mtime_ns and scanned_at_ns - dir_mtime_ns > _RACY_MTIME_WINDOW_NS:
+            return entries, True
+        if time.time_ns() - scanned_at_ns < _RESCAN_MIN_INTERVAL_NS:
+            return entries, False
+        if not scan_lock.acquire(blocking=False):
+            return entries, False
+        try:
+            return self._scan(size, size_dir, dir_mtime_ns)
+        finally:
+            scan_lock.release()
+
+    def lookup(self, oracle_id: str, size: str) -> Optional[CachedImageEntry]:
+        normalized_size = normalize_image_size(size)
+        normalized_oracle_id = normalize_oracle_id(oracle_id)
+        entries, trusted = self._size_entries(normalized_size)
+        if trusted:
+            return entries.get(normalized_oracle_id)
+        size_dir = self.cache_root / IMAGE_CACHE_SIZE_DIR_BY_SIZE[normalized_size]
+        return _stat_entry(self.cache_root, size_dir, normalized_size, normalized_oracle_id)
+
+
+class ImageBytesLRU:
+    """Size-bounded LRU of hot image bytes keyed by ETag."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_IMAGE_BYTES_CACHE_MAX_BYTES,
+        max_item_bytes: int = DEFAULT_IMAGE_BYTES_CACHE_MAX_ITEM_BYTES,
+    ) -> None:
+        self.max_bytes = max(int(max_bytes), 0)
+        self.max_item_bytes = max(int(max_item_bytes), 0)
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def accepts(self, length: int) -> bool:
+        return 0 < int(length) <= min(self.max_item_bytes, self.max_bytes)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is not None:
+                self._items.move_to_end(key)
+            return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        if not self.accepts(len(payload)):
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+            self._items[key] = payload
+            self._total_bytes += len(payload)
+            while self._total_bytes > self.max_bytes and self._items:
+                _evicted_key, evicted = self._items.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._total_bytes = 0
+
+
+_INDEXES: Dict[str, ImageCacheIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_image_cache_index(cache_root: Path) -> ImageCacheIndex:
+    key = str(cache_root)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = ImageCacheIndex(cache_root)
+            _INDEXES[key] = index
+        return index
+
+
+def clear_image_cache_indexes() -> None:
+    with _INDEXES_LOCK:
+        _INDEXES.clear()
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from engine.image_cache_contract import (
+    IMAGE_CACHE_SIZE_DIR_BY_SIZE,
+    normalize_image_extension,
+    normalize_image_size,
+    normalize_oracle_id,
+)
+
+IMAGE_PACK_DIR = "packs"
+IMAGE_PACK_DATA_SUFFIX = ".pack"
+IMAGE_PACK_INDEX_SUFFIX = ".idx"
+
+# Pending index lines are published (after one data-file fsync) at whichever limit is hit first.
+IMAGE_PACK_SYNC_EVERY = 256
+IMAGE_PACK_SYNC_INTERVAL_SECONDS = 2.0
+
+
+def image_pack_paths(cache_root: Path, size: str) -> Tuple[Path, Path]:
+    """(data file, index file) for one size; the data file is append-only."""
+    size_name = IMAGE_CACHE_SIZE_DIR_BY_SIZE[normalize_image_size(size)]
+    pack_dir = cache_root / IMAGE_PACK_DIR
+    return pack_dir / f"{size_name}{IMAGE_PACK_DATA_SUFFIX}", pack_dir / f"{size_name}{IMAGE_PACK_INDEX_SUFFIX}"
+
+
+class PackedImageRecord:
+    __slots__ = ("oracle_id", "size", "offset", "length", "extension", "etag")
+
+    def __init__(
+        self, *, oracle_id: str, size: str, offset: int, length: int, extension: str, generation: int = 0
+    ) -> None:
+        self.oracle_id = oracle_id
+        self.size = size
+        self.offset = int(offset)
+        self.length = int(length)
+        self.extension = extension
+        # The pack is append-only, so a byte range within one data file (generation) never changes.
+        self.etag = f'"{oracle_id}-{size}-{extension}-p{int(generation):x}-{self.offset:x}-{self.length:x}"'
+
+
+def _parse_index_lines(
+    raw: bytes,
+    size: str,
+    data_length: int,
+    generation: int,
+    records: Dict[str, PackedImageRecord],
+) -> int:
+    """Apply the complete index lines in raw to records; returns the bytes consumed.
+
+    Index lines are appended after their bytes; later lines supersede earlier
+    ones. A trailing line without its newline is left unconsumed, and torn
+    lines or records pointing past the end of the data file (an interrupted
+    append) are ignored.
+    """
+    consumed = raw.rfind(b"\n") + 1
+    for line in raw[:consumed].split(b"\n"):
+        if line.strip() == b"":
+            continue
+        try:
+            parsed = json.loads(line)
+            record = PackedImageRecord(
+                oracle_id=normalize_oracle_id(parsed["oracle_id"]),
+                size=size,
+                offset=parsed["offset"],
+                length=parsed["length"],
+                extension=normalize_image_extension(parsed["ext"]),
+                generation=generation,
+            )
+        except (ValueError, KeyError, TypeError):
+            continue
+        if record.offset < 0 or record.length <= 0 or record.offset + record.length > data_length:
+            continue
+        records[record.oracle_id] = record
+    return consumed
+
+
+def _load_index(
+    index_path: Path, size: str, data_length: int, generation: int = 0
+) -> Dict[str, PackedImageRecord]:
+    records: Dict[str, PackedImageRecord] = {}
+    try:
+        raw = index_path.read_bytes()
+    except OSError:
+        return records
+    _parse_index_lines(raw, size, data_length, generation, records)
+    return records
+
+
+class ImagePackWriter:
+    """Appends images to one size's pack; safe to share across prefetch worker threads.
+
+    Index lines are held back and published in batches: one fsync of the data
+    file makes every pending image durable before the lines that point at it
+    are written. A batch is published every IMAGE_PACK_SYNC_EVERY appends,
+    after IMAGE_PACK_SYNC_INTERVAL_SECONDS, and on flush()/close().
+    """
+
+    def __init__(self, cache_root: Path, size: str) -> None:
+        self.size = normalize_image_size(size)
+        self.data_path, self.index_path = image_pack_paths(cache_root, self.size)
+        self._lock = threading.Lock()
+        self._oracle_ids: Optional[set[str]] = None
+        self._data_file: Optional[BinaryIO] = None
+        self._pending_lines: List[bytes] = []
+        self._last_sync = time.monotonic()
+
+    def __enter__(self) -> "ImagePackWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _known_oracle_ids(self) -> set[str]:
+        if self._oracle_ids is None:
+            try:
+                data_length = self.data_path.stat().st_size
+            except OSError:
+                data_length = 0
+            self._oracle_ids = set(_load_index(self.index_path, self.size, data_length))
+        return self._oracle_ids
+
+    def contains(self, oracle_id: str) -> bool:
+        with self._lock:
+            return normalize_oracle_id(oracle_id) in self._known_oracle_ids()
+
+    def append(self, oracle_id: str, extension: str, payload: bytes) -> PackedImageRecord:
+        normalized_oracle_id = normalize_oracle_id(oracle_id)
+        normalized_extension = normalize_image_extension(extension)
+        if len(payload) == 0:
+            raise ValueError("empty payload")
+
+        with self._lock:
+            known_oracle_ids = self._known_oracle_ids()
+            if self._data_file is None:
+                self.data_path.parent.mkdir(parents=True, exist_ok=True)
+                self._data_file = self.data_path.open("ab")
+            offset = self._data_file.seek(0, os.SEEK_END)
+            self._data_file.write(payload)
+            record = PackedImageRecord(
+                oracle_id=normalized_oracle_id,
+                size=self.size,
+                offset=offset,
+                length=len(payload),
+                extension=normalized_extension,
+            )
+            line = json.dumps(
+                {"oracle_id": record.oracle_id, "offset": record.offset, "length": record.length, "ext": record.extension},
+                separators=(",", ":"),
+                sort_keys=True,
+            )
+            self._pending_lines.append(line.encode("utf-8") + b"\n")
+            known_oracle_ids.add(normalized_oracle_id)
+            if (
+                len(self._pending_lines) >= IMAGE_PACK_SYNC_EVERY
+                or time.monotonic() - self._last_sync >= IMAGE_PACK_SYNC_INTERVAL_SECONDS
+            ):
+                self._publish_pending()
+            return record
+
+    def _publish_pending(self) -> None:
+        self._last_sync = time.monotonic()
+        if not self._pending_lines or self._data_file is None:
+            return
+        # Bytes are durable before the index lines that point at them are written.
+        self._data_file.flush()
+        os.fsync(self._data_file.fileno())
+        payload = b"".join(self._pending_lines)
+        with self.index_path.open("a+b") as index_file:
+            # Terminate a line torn by an interrupted append so these records parse.
+            if index_file.seek(0, os.SEEK_END) > 0:
+                index_file.seek(-1, os.SEEK_END)
+                if index_file.read(1) != b"\n":
+                    payload = b"\n" + payload
+            index_file.write(payload)
+        self._pending_lines = []
+
+    def flush(self) -> None:
+        """Publish every appended image to readers."""
+        with self._lock:
+            self._publish_pending()
+
+    def close(self) -> None:
+        with self._lock:
+            self._publish_pending()
+            if self._data_file is not None:
+                self._data_file.close()
+                self._data_file = None
+
+
+class ImagePackReader:
+    """mmap-backed reader for one size's pack, refreshed when the index file changes.
+
+    The index is append-only, so a refresh parses only the bytes added since
+    the last one; a shrunken index or a replaced data file forces a full reload.
+    """
+
+    def __init__(self, cache_root: Path, size: str) -> None:
+        self.size = normalize_image_size(size)
+        self.data_path, self.index_path = image_pack_paths(cache_root, self.size)
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._records: Dict[str, PackedImageRecord] = {}
+        self._mapped: Optional[mmap.mmap] = None
+        self._generation: Optional[int] = None
+        self._index_offset = 0
+
+    def _reset(self) -> None:
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        self._records = {}
+        self._generation = None
+        self._index_offset = 0
+
+    def _refresh(self) -> None:
+        try:
+            stat = self.index_path.stat()
+            signature: Optional[Tuple[int, int]] = (int(stat.st_mtime_ns), int(stat.st_size))
+        except OSError:
+            signature = None
+
+        with self._lock:
+            if signature == self._signature:
+                return
+            self._signature = signature
+            if signature is None:
+                self._reset()
+                return
+            try:
+                with self.data_path.open("rb") as data_file:
+                    data_stat = os.fstat(data_file.fileno())
+                    generation = data_stat.st_ino
+                    mapped_length = len(self._mapped) if self._mapped is not None else 0
+                    if (
+                        generation != self._generation
+                        or data_stat.st_size < mapped_length
+                        or signature[1] < self._index_offset
+                    ):
+                        self._reset()
+                        mapped_length = 0
+                    self._generation = generation
+                    with self.index_path.open("rb") as index_file:
+                        index_file.seek(self._index_offset)
+                        tail = index_file.read()
+                    # Measured after reading the index: every byte a line points at was written first.
+                    data_length = os.fstat(data_file.fileno()).st_size
+                    if data_length > mapped_length:
+                        remapped = mmap.mmap(data_file.fileno(), data_length, access=mmap.ACCESS_READ)
+                        if self._mapped is not None:
+                            self._mapped.close()
+                        self._mapped = remapped
+            except (OSError, ValueError):
+                self._reset()
+                return
+            if self._mapped is None:
+                return
+            self._index_offset += _parse_index_lines(tail, self.size, len(self._mapped), generation, self._records)
+
+    def lookup(self, oracle_id: str) -> Optional[PackedImageRecord]:
+        self._refresh()
+        return self._records.get(normalize_oracle_id(oracle_id))
+
+    def read(self, record: PackedImageRecord) -> Optional[bytes]:
+        with self._lock:
+            if self._mapped is None or self._records.get(record.oracle_id) is not record:
+                return None
+            return self._mapped[record.offset:record.offset + record.length]
+
+    def close(self) -> None:
+        with self._lock:
+            self._reset()
+            self._signature = None
+
+
+_READERS: Dict[Tuple[str, str], ImagePackReader] = {}
+_READERS_LOCK = threading.Lock()
+
+
+def get_image_pack_reader(cache_root: Path, size: str) -> ImagePackReader:
+    key = (str(cache_root), normalize_image_size(size))
+    with _READERS_LOCK:
+        reader = _READERS.get(key)
+        if reader is None:
+            reader = ImagePackReader(cache_root, key[1])
+            _READERS[key] = reader
+        return reader
+
+
+def clear_image_pack_readers() -> None:
+    with _READERS_LOCK:
+        readers = list(_READERS.values())
+        _READERS.clear()
+    for reader in readers:
+        reader.close()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_SNAPSHOT_CACHE_MAX_ENTRIES = 8
+
+SnapshotSignature = Callable[[sqlite3.Connection], Tuple[Any, ...]]
+
+
+def db_file_signature(db_path: Path) -> Tuple[Any, ...]:
+    """Cheap change detector for a SQLite file, including its WAL sidecar."""
+    parts: list[Any] = []
+    for candidate in (db_path, db_path.with_name(db_path.name + "-wal")):
+        try:
+            stat = candidate.stat()
+        except OSError:
+            parts.append(None)
+            continue
+        parts.append((int(stat.st_mtime_ns), int(stat.st_size)))
+    return tuple(parts)
+
+
+def table_rows_signature(
+    con: sqlite3.Connection,
+    table_name: str,
+    where_sql: str = "",
+    params: Tuple[Any, ...] = (),
+) -> Tuple[Any, ...] | None:
+    """(row count, max rowid) of the scoped rows, or None when the table is missing.
+
+    Inserts and deletes change the count, and INSERT OR REPLACE hands the
+    replacement row a new rowid, so a rebuilt scope changes the signature.
+    """
+    try:
+        row = con.execute(f"SELECT COUNT(*), MAX(rowid) FROM {table_name}{where_sql}", params).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return (row[0], row[1])
+
+
+def snapshot_cards_signature(con: sqlite3.Connection, snapshot_id: str) -> Tuple[Any, ...]:
+    """The snapshots row plus the snapshot's cards rows.
+
+    Writers that update card rows in place (image enrichment) stamp
+    snapshots.manifest_json, which is how those edits show up here.
+    """
+    try:
+        snapshot_row = con.execute(
+            "SELECT created_at, scryfall_bulk_updated_at, manifest_json FROM snapshots WHERE snapshot_id = ?",
+            (snapshot_id,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        snapshot_row = None
+    return (
+        tuple(snapshot_row) if snapshot_row is not None else None,
+        table_rows_signature(con, "cards", " WHERE snapshot_id = ?", (snapshot_id,)),
+    )
+
+
+class _Entry:
+    __slots__ = ("file_signature", "data_signature", "value")
+
+    def __init__(self, file_signature: Tuple[Any, ...], data_signature: Tuple[Any, ...] | None, value: Any) -> None:
+        self.file_signature = file_signature
+        self.data_signature = data_signature
+        self.value = value
+
+
+class _Flight:
+    __slots__ = ("data_signature", "done", "value", "error")
+
+    def __init__(self, data_signature: Tuple[Any, ...] | None) -> None:
+        self.data_signature = data_signature
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SnapshotScopedCache:
+    """Process-local cache of per-snapshot derived structures.
+
+    Entries are keyed by the resolved DB path plus caller-provided key parts.
+    An unchanged DB file signature serves the entry without touching SQLite;
+    after any write to the file the caller's per-snapshot data signature is
+    re-read, and only a change there (e.g. a snapshot rebuild) rebuilds the
+    entry, so writes to unrelated tables such as run_history_v0 keep it.
+
+    Builders run outside the cache lock with one build in flight per key:
+    concurrent misses on the same key wait for that build, and lookups for
+    other keys are never blocked by it.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_SNAPSHOT_CACHE_MAX_ENTRIES) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._entries: Dict[Tuple[Hashable, ...], _Entry] = {}
+        self._flights: Dict[Tuple[Hashable, ...], _Flight] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _data_signature(db_path: Path, signature: SnapshotSignature) -> Tuple[Any, ...] | None:
+        # None never matches a cached entry, so a missing or unreadable DB always rebuilds.
+        if not db_path.is_file():
+            return None
+        try:
+            with closing(sqlite3.connect(str(db_path))) as con:
+                con.row_factory = sqlite3.Row
+                return signature(con)
+        except sqlite3.Error:
+            return None
+
+    def get_or_build(
+        self,
+        db_path: Path,
+        key: Tuple[Hashable, ...],
+        builder: Callable[[], T],
+        signature: SnapshotSignature,
+    ) -> T:
+        cache_key = (str(db_path),) + tuple(key)
+        file_signature = db_file_signature(db_path)
+        with self._lock:
+            cached = self._entries.get(cache_key)
+            if cached is not None and cached.file_signature == file_signature:
+                return cached.value
+
+        data_signature = self._data_signature(db_path, signature)
+        while True:
+            with self._lock:
+                cached = self._entries.get(cache_key)
+                if cached is not None and data_signature is not None and cached.data_signature == data_signature:
+                    cached.file_signature = file_signature
+                    return cached.value
+                flight = self._flights.get(cache_key)
+                leader = flight is None
+                if flight is None:
+                    flight = _Flight(data_signature)
+                    self._flights[cache_key] = flight
+
+            if leader:
+                break
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.data_signature is not None and flight.data_signature == data_signature:
+                return flight.value
+            # That build read an older snapshot state than this caller saw; look again.
+
+        try:
+            value = builder()
+        except BaseException as exc:
+            flight.error = exc
+            with self._lock:
+                self._flights.pop(cache_key, None)
+            flight.done.set()
+            raise
+
+        flight.value = value
+        with self._lock:
+            self._entries.pop(cache_key, None)
+            self._entries[cache_key] = _Entry(file_signature, data_signature, value)
+            while len(self._entries) > self._max_entries:
+                oldest_key = next(iter(self._entries))
+                self._entries.pop(oldest_key, None)
+            self._flights.pop(cache_key, None)
+        flight.done.set()
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -32,6 +32,7 @@ CREATE TABLE IF NOT EXISTS cards (
   oracle_text TEXT,
   colors TEXT,
   color_identity TEXT,
+  color_identity_mask INTEGER,
   produced_mana TEXT,
   keywords TEXT,
   legalities_json TEXT,
@@ -119,6 +120,9 @@ ON card_primitive_tags_v0(primitive_id, ruleset_version);
 CREATE INDEX IF NOT EXISTS idx_cpt_v0_oracle
 ON card_primitive_tags_v0(oracle_id, ruleset_version);
 
+CREATE INDEX IF NOT EXISTS idx_cpt_v0_primitive_rank
+ON card_primitive_tags_v0(ruleset_version, primitive_id, confidence DESC, card_name, oracle_id);
+
 CREATE TABLE IF NOT EXISTS primitive_tag_runs_v0 (
   run_id TEXT PRIMARY KEY,
   db_snapshot_id TEXT NOT NULL,
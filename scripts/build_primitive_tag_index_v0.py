@@ -3,9 +3,13 @@ import json
 import re
 import sqlite3
 import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Sequence, Tuple
 
 
 def _repo_root() -> Path:
@@ -18,6 +22,7 @@ if str(REPO_ROOT) not in sys.path:
 
 from api.engine.utils import sha256_hex, stable_json_dumps
 from engine.db import DB_PATH, list_snapshots
+from snapshot_build.rule_matcher import RuleMatcher
 
 
 PRIMITIVE_DEFS_REL = Path("data/primitives/primitive_defs_v0.json")
@@ -25,6 +30,22 @@ PRIMITIVE_RULES_REL = Path("data/primitives/primitive_rules_v0.json")
 
 TAG_BATCH_SIZE = 2000
 
+# Bump when tagging output changes for identical card text and rules, so
+# stored fingerprints stop matching and every card is re-tagged.
+CARD_FINGERPRINT_VERSION = "primitive_tag_card_fp_v1"
+
+SHARDS_PER_WORKER = 4
+MIN_CARDS_PER_WORKER = 500
+RULE_COST_REPORT_DEFAULT = 10
+
+REGEX_RULE_FIELDS = {"oracle_regex": "oracle_text", "type_line_regex": "type_line"}
+
+# Tables holding one card's build output, keyed by (oracle_id, ruleset_version).
+PER_CARD_TABLES = ("card_primitive_tags_v0", "primitive_tag_unknowns_v0", "primitive_tag_card_fingerprints_v0")
+
+# (oracle_id, card_name, oracle_text, type_line, keywords) as read from cards.
+CardRow = Tuple[str, str, Any, Any, Any]
+
 
 def _ensure_schema(con: sqlite3.Connection) -> None:
     con.executescript(
@@ -65,6 +86,9 @@ def _ensure_schema(con: sqlite3.Connection) -> None:
         CREATE INDEX IF NOT EXISTS idx_cpt_v0_oracle
         ON card_primitive_tags_v0(oracle_id, ruleset_version);
 
+        CREATE INDEX IF NOT EXISTS idx_cpt_v0_primitive_rank
+        ON card_primitive_tags_v0(ruleset_version, primitive_id, confidence DESC, card_name, oracle_id);
+
         CREATE TABLE IF NOT EXISTS primitive_tag_runs_v0 (
           run_id TEXT PRIMARY KEY,
           db_snapshot_id TEXT NOT NULL,
@@ -84,6 +108,14 @@ def _ensure_schema(con: sqlite3.Connection) -> None:
           ruleset_version TEXT NOT NULL,
           PRIMARY KEY (oracle_id, reason, ruleset_version)
         );
+
+        CREATE TABLE IF NOT EXISTS primitive_tag_card_fingerprints_v0 (
+          oracle_id TEXT NOT NULL,
+          ruleset_version TEXT NOT NULL,
+          text_hash TEXT NOT NULL,
+          rules_hash TEXT NOT NULL,
+          PRIMARY KEY (oracle_id, ruleset_version)
+        );
         """
     )
 
@@ -220,48 +252,6 @@ def _matches_keyword_rule(pattern_raw: str, keywords: List[str]) -> Tuple[bool,
     return False, ""
 
 
-def _match_rule(
-    rule: Dict[str, Any],
-    regex_cache: Dict[str, re.Pattern[str]],
-    oracle_text: str,
-    type_line: str,
-    keywords: List[str],
-) -> Tuple[bool, str, str]:
-    rule_id = rule.get("rule_id")
-    rule_type = rule.get("rule_type")
-    if not isinstance(rule_id, str) or not isinstance(rule_type, str):
-        return False, "", ""
-
-    if rule_type == "oracle_regex":
-        pattern = regex_cache.get(rule_id)
-        if pattern is None:
-            return False, "", ""
-        match = pattern.search(oracle_text)
-        if match is None:
-            return False, "", ""
-        snippet = _snippet_from_match(oracle_text, match.start(), match.end())
-        return True, "oracle_text", snippet
-
-    if rule_type == "type_line_regex":
-        pattern = regex_cache.get(rule_id)
-        if pattern is None:
-            return False, "", ""
-        match = pattern.search(type_line)
-        if match is None:
-            return False, "", ""
-        snippet = _snippet_from_match(type_line, match.start(), match.end())
-        return True, "type_line", snippet
-
-    if rule_type == "keyword":
-        matched, snippet = _matches_keyword_rule(pattern_raw=str(rule.get("pattern") or ""), keywords=keywords)
-        if not matched:
-            return False, "", ""
-        # Keep evidence field constrained to oracle_text/type_line in v0.
-        return True, "oracle_text", snippet
-
-    return False, "", ""
-
-
 def _select_matched_field(matched_fields: List[str]) -> str:
     normalized = {field for field in matched_fields if isinstance(field, str)}
     if "oracle_text" in normalized:
@@ -281,6 +271,288 @@ def _compute_confidence(rule_weights: List[float]) -> float:
     return float(f"{confidence:.6f}")
 
 
+@dataclass(frozen=True)
+class _MatcherRule:
+    pattern: str
+    field: str
+    match_mode: str = "regex"
+
+
+class _TagContext:
+    """Active rules prepared for tagging: regexes behind one RuleMatcher prefilter, keyword rules as-is."""
+
+    def __init__(self, active_rules: List[Dict[str, Any]]) -> None:
+        self.active_rules = active_rules
+        self.regex_cache = _compile_regex_rules(active_rules)
+        self.regex_rule_indices: List[int] = []
+        matcher_rules: List[_MatcherRule] = []
+        self.keyword_rule_indices: List[int] = []
+        for rule_index, rule in enumerate(active_rules):
+            rule_type = rule.get("rule_type")
+            if rule_type in REGEX_RULE_FIELDS and rule.get("rule_id") in self.regex_cache:
+                self.regex_rule_indices.append(rule_index)
+                matcher_rules.append(_MatcherRule(pattern=str(rule["pattern"]), field=REGEX_RULE_FIELDS[rule_type]))
+            elif rule_type == "keyword":
+                self.keyword_rule_indices.append(rule_index)
+        self.matcher = RuleMatcher(matcher_rules)
+        self.rule_hashes = [sha256_hex(stable_json_dumps(rule)) for rule in active_rules]
+
+
+def _rule_stats_add(rule_stats: Dict[str, List[int]], rule_id: str, hit: bool, elapsed_ns: int) -> None:
+    stats = rule_stats.setdefault(rule_id, [0, 0, 0])
+    stats[0] += 1
+    stats[1] += 1 if hit else 0
+    stats[2] += elapsed_ns
+
+
+def _match_card_rules(
+    context: _TagContext,
+    oracle_text: str,
+    type_line: str,
+    keywords: List[str],
+    candidate_indices: List[int],
+    rule_stats: Dict[str, List[int]],
+) -> Dict[int, Tuple[str, str]]:
+    """active rule index -> (matched_field, snippet) for the rules that match one card."""
+    matched: Dict[int, Tuple[str, str]] = {}
+    for rule_index in candidate_indices:
+        rule = context.active_rules[rule_index]
+        rule_id = str(rule["rule_id"])
+        if rule.get("rule_type") == "keyword":
+            started = time.perf_counter_ns()
+            hit, snippet = _matches_keyword_rule(pattern_raw=str(rule.get("pattern") or ""), keywords=keywords)
+            _rule_stats_add(rule_stats, rule_id, hit, time.perf_counter_ns() - started)
+            if hit:
+                # Keep evidence field constrained to oracle_text/type_line in v0.
+                matched[rule_index] = ("oracle_text", snippet)
+            continue
+
+        field = REGEX_RULE_FIELDS[str(rule.get("rule_type"))]
+        text = oracle_text if field == "oracle_text" else type_line
+        started = time.perf_counter_ns()
+        match = context.regex_cache[rule_id].search(text)
+        _rule_stats_add(rule_stats, rule_id, match is not None, time.perf_counter_ns() - started)
+        if match is not None:
+            matched[rule_index] = (field, _snippet_from_match(text, match.start(), match.end()))
+    return matched
+
+
+def _tag_cards(
+    context: _TagContext,
+    cards: List[CardRow],
+    ruleset_version: str,
+    previous_fingerprints: Dict[str, Tuple[str, str]],
+) -> Dict[str, Any]:
+    tags: List[Tuple[Any, ...]] = []
+    unknowns: List[Tuple[Any, ...]] = []
+    run_hash_rows: List[Tuple[str, str, str]] = []
+    fingerprints: List[Tuple[str, str, str, str]] = []
+    reused_oracle_ids: List[str] = []
+    rule_stats: Dict[str, List[int]] = {}
+
+    for oracle_id, card_name, oracle_text_raw, type_line_raw, keywords_raw in cards:
+        oracle_text = _normalize_text(oracle_text_raw)
+        type_line = _normalize_text(type_line_raw)
+        keywords = _parse_keywords(keywords_raw)
+
+        # Only these rules can match this card: regexes whose required literals
+        # occur in the text, and keyword rules when the card has keywords.
+        candidate_indices = sorted(
+            [context.regex_rule_indices[idx] for idx in context.matcher.regex_candidates("oracle_text", oracle_text)]
+            + [context.regex_rule_indices[idx] for idx in context.matcher.regex_candidates("type_line", type_line)]
+            + (context.keyword_rule_indices if keywords else [])
+        )
+        text_hash = sha256_hex("\x1f".join((CARD_FINGERPRINT_VERSION, card_name, oracle_text, type_line, "\x1e".join(keywords))))
+        rules_hash = sha256_hex(",".join(context.rule_hashes[idx] for idx in candidate_indices))
+        fingerprints.append((oracle_id, ruleset_version, text_hash, rules_hash))
+        if previous_fingerprints.get(oracle_id) == (text_hash, rules_hash):
+            reused_oracle_ids.append(oracle_id)
+            continue
+
+        matched = _match_card_rules(context, oracle_text, type_line, keywords, candidate_indices, rule_stats)
+        matches_by_primitive: Dict[str, Dict[str, Any]] = {}
+
+        for rule_index in sorted(matched):
+            rule = context.active_rules[rule_index]
+            matched_field, snippet = matched[rule_index]
+
+            primitive_id = rule.get("primitive_id")
+            rule_id = rule.get("rule_id")
+            weight = float(rule.get("weight", 1.0))
+            if not isinstance(primitive_id, str) or not isinstance(rule_id, str):
+                continue
+
+            bucket = matches_by_primitive.setdefault(
+                primitive_id,
+                {
+                    "rule_ids": [],
+                    "weights": [],
+                    "snippets": [],
+                    "matched_fields": [],
+                },
+            )
+            bucket["rule_ids"].append(rule_id)
+            bucket["weights"].append(weight)
+            bucket["snippets"].append({"rule_id": rule_id, "snippet": snippet[:80]})
+            bucket["matched_fields"].append(matched_field)
+
+        primitive_ids_sorted = sorted(matches_by_primitive.keys())
+        for primitive_id in primitive_ids_sorted:
+            match_obj = matches_by_primitive[primitive_id]
+            rule_ids = [rid for rid in match_obj.get("rule_ids", []) if isinstance(rid, str)]
+            weights = [float(w) for w in match_obj.get("weights", [])]
+            if not rule_ids or not weights:
+                continue
+
+            confidence = _compute_confidence(rule_weights=weights)
+            low_weight_present = any(float(w) < 0.5 for w in weights)
+
+            snippets = [
+                {
+                    "rule_id": snippet_obj.get("rule_id"),
+                    "snippet": str(snippet_obj.get("snippet") or "")[:80],
+                }
+                for snippet_obj in match_obj.get("snippets", [])
+                if isinstance(snippet_obj, dict)
+            ]
+
+            matched_fields = [
+                field
+                for field in match_obj.get("matched_fields", [])
+                if isinstance(field, str)
+            ]
+            matched_field_value = _select_matched_field(matched_fields)
+
+            evidence_obj = {
+                "matched_rule_ids": rule_ids,
+                "matched_field": matched_field_value,
+                "snippets": snippets,
+            }
+            evidence_json = stable_json_dumps(evidence_obj)
+
+            if low_weight_present or confidence < 0.60:
+                reason = "LOW_RULE_WEIGHT" if low_weight_present else "LOW_CONFIDENCE"
+                reason_with_primitive = f"{reason}:{primitive_id}"
+                details_json = stable_json_dumps(
+                    {
+                        "primitive_id": primitive_id,
+                        "confidence": confidence,
+                        "avg_rule_weight": float(f"{(sum(weights) / float(len(weights))):.6f}"),
+                        "matched_rule_ids": rule_ids,
+                        "matched_field": matched_field_value,
+                    }
+                )
+                unknowns.append(
+                    (
+                        oracle_id,
+                        card_name,
+                        reason_with_primitive,
+                        details_json,
+                        ruleset_version,
+                    )
+                )
+            else:
+                confidence_rounded_6 = float(f"{confidence:.6f}")
+                confidence_for_hash = f"{confidence_rounded_6:.6f}"
+                tags.append(
+                    (
+                        oracle_id,
+                        card_name,
+                        primitive_id,
+                        ruleset_version,
+                        confidence_rounded_6,
+                        evidence_json,
+                    )
+                )
+                run_hash_rows.append((oracle_id, primitive_id, confidence_for_hash))
+
+    return {
+        "tags": tags,
+        "unknowns": unknowns,
+        "run_hash_rows": run_hash_rows,
+        "fingerprints": fingerprints,
+        "reused_oracle_ids": reused_oracle_ids,
+        "rule_stats": rule_stats,
+    }
+
+
+_worker_context: _TagContext | None = None
+
+
+def _init_tag_worker(active_rules: List[Dict[str, Any]]) -> None:
+    global _worker_context
+    _worker_context = _TagContext(active_rules)
+
+
+def _tag_card_shard(shard: Tuple[List[CardRow], str, Dict[str, Tuple[str, str]]]) -> Dict[str, Any]:
+    cards, ruleset_version, previous_fingerprints = shard
+    assert _worker_context is not None
+    return _tag_cards(_worker_context, cards, ruleset_version, previous_fingerprints)
+
+
+def _iter_tagged_batches(
+    active_rules: List[Dict[str, Any]],
+    card_batches: Iterable[List[CardRow]],
+    ruleset_version: str,
+    previous_fingerprints: Dict[str, Tuple[str, str]],
+    workers: int,
+) -> Iterator[Dict[str, Any]]:
+    """_tag_cards results per card batch, in card order, so output matches a single process.
+
+    With workers > 1 the batches are tagged by a process pool with a bounded
+    number in flight; only those batches and their results are held at once.
+    """
+
+    def _shard(batch: List[CardRow]) -> Tuple[List[CardRow], str, Dict[str, Tuple[str, str]]]:
+        shard_previous = {card[0]: previous_fingerprints[card[0]] for card in batch if card[0] in previous_fingerprints}
+        return batch, ruleset_version, shard_previous
+
+    if workers <= 1:
+        context = _TagContext(active_rules)
+        for batch in card_batches:
+            yield _tag_cards(context, *_shard(batch))
+        return
+
+    max_in_flight = workers * SHARDS_PER_WORKER
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_tag_worker,
+        initargs=(active_rules,),
+    ) as executor:
+        pending: Deque[Future] = deque()
+        for batch in card_batches:
+            pending.append(executor.submit(_tag_card_shard, _shard(batch)))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _iter_card_batches(cards_cursor: Iterable[Any], batch_size: int) -> Iterator[List[CardRow]]:
+    batch: List[CardRow] = []
+    for row in cards_cursor:
+        oracle_id = row["oracle_id"]
+        card_name = row["name"]
+        if not isinstance(oracle_id, str) or oracle_id == "":
+            continue
+        if not isinstance(card_name, str) or card_name == "":
+            continue
+        batch.append((oracle_id, card_name, row["oracle_text"], row["type_line"], row["keywords"]))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _print_rule_costs(rule_stats: Dict[str, List[int]], top: int) -> None:
+    ranked = sorted(rule_stats.items(), key=lambda item: (-item[1][2], item[0]))
+    print("rule_id\tevaluations\thits\ttotal_ms\tavg_us", file=sys.stderr)
+    for rule_id, (evaluations, hits, elapsed_ns) in ranked[: max(int(top), 0)]:
+        avg_us = (elapsed_ns / 1000.0 / evaluations) if evaluations else 0.0
+        print(f"{rule_id}\t{evaluations}\t{hits}\t{elapsed_ns / 1e6:.3f}\t{avg_us:.2f}", file=sys.stderr)
+
+
 def _insert_batches(
     con: sqlite3.Connection,
     tags_batch: List[Tuple[Any, ...]],
@@ -318,10 +590,24 @@ def _insert_batches(
         unknowns_batch.clear()
 
 
-def main() -> int:
+def main(argv: Sequence[str] | None = None) -> int:
     ap = argparse.ArgumentParser(description="Build deterministic global primitive tag index v0")
+    ap.add_argument("--db", default=str(DB_PATH), help=f"SQLite DB to build into (default {DB_PATH}).")
     ap.add_argument("--snapshot-id", default=None, help="Optional snapshot_id. Defaults to latest local snapshot.")
-    args = ap.parse_args()
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes for rule matching (default 1).")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep stored tags for cards whose text and candidate rules are unchanged since the last build of this ruleset.",
+    )
+    ap.add_argument(
+        "--rule-cost-top",
+        type=int,
+        default=RULE_COST_REPORT_DEFAULT,
+        help=f"Rules to list in the per-rule cost report on stderr (default {RULE_COST_REPORT_DEFAULT}).",
+    )
+    args = ap.parse_args(argv)
+    started = time.perf_counter()
 
     db_snapshot_id = _resolve_snapshot_id(args.snapshot_id)
 
@@ -373,9 +659,10 @@ def main() -> int:
     ]
 
     active_rules = [row for row in rules if int(row.get("enabled", 0)) == 1]
-    regex_cache = _compile_regex_rules(active_rules)
+    # Fail fast on invalid patterns before touching the DB.
+    _compile_regex_rules(active_rules)
 
-    con = sqlite3.connect(str(DB_PATH))
+    con = sqlite3.connect(str(Path(args.db).expanduser().resolve()))
     con.row_factory = sqlite3.Row
     try:
         _ensure_schema(con)
@@ -411,14 +698,36 @@ def main() -> int:
             primitive_rules_rows,
         )
 
-        con.execute(
-            "DELETE FROM card_primitive_tags_v0 WHERE ruleset_version = ?",
-            (ruleset_version,),
-        )
-        con.execute(
-            "DELETE FROM primitive_tag_unknowns_v0 WHERE ruleset_version = ?",
-            (ruleset_version,),
+        card_count = int(
+            con.execute(
+                "SELECT COUNT(*) FROM cards WHERE snapshot_id = ? AND oracle_id <> '' AND name <> ''",
+                (db_snapshot_id,),
+            ).fetchone()[0]
         )
+        workers = max(int(args.workers), 1)
+        if card_count < workers * MIN_CARDS_PER_WORKER:
+            workers = 1
+        # Shards per worker keep the pool busy; TAG_BATCH_SIZE caps what one batch holds.
+        batch_size = min(TAG_BATCH_SIZE, max(card_count // (workers * SHARDS_PER_WORKER), 1)) if workers > 1 else TAG_BATCH_SIZE
+
+        previous_fingerprints: Dict[str, Tuple[str, str]] = {}
+        if args.incremental:
+            previous_fingerprints = {
+                row["oracle_id"]: (row["text_hash"], row["rules_hash"])
+                for row in con.execute(
+                    "SELECT oracle_id, text_hash, rules_hash FROM primitive_tag_card_fingerprints_v0 WHERE ruleset_version = ?",
+                    (ruleset_version,),
+                )
+            }
+        if not previous_fingerprints:
+            # Nothing can be reused: clear the ruleset once instead of per card.
+            for table_name in PER_CARD_TABLES:
+                con.execute(f"DELETE FROM {table_name} WHERE ruleset_version = ?", (ruleset_version,))
+
+        con.execute("DROP TABLE IF EXISTS temp.primitive_tag_reused_v0")
+        con.execute("CREATE TEMP TABLE primitive_tag_reused_v0 (oracle_id TEXT PRIMARY KEY)")
+        con.execute("DROP TABLE IF EXISTS temp.primitive_tag_seen_v0")
+        con.execute("CREATE TEMP TABLE primitive_tag_seen_v0 (oracle_id TEXT PRIMARY KEY)")
 
         cards_cursor = con.execute(
             """
@@ -438,137 +747,95 @@ def main() -> int:
             (db_snapshot_id,),
         )
 
-        tags_batch: List[Tuple[Any, ...]] = []
-        unknowns_batch: List[Tuple[Any, ...]] = []
-        run_hash_rows: List[Tuple[str, str, str]] = []
-
+        # Tags and unknowns are written per batch; only run-hash tuples accumulate.
         cards_processed = 0
-        tags_emitted = 0
-        unknowns_emitted = 0
-
-        for row in cards_cursor:
-            oracle_id = row["oracle_id"]
-            card_name = row["name"]
-            if not isinstance(oracle_id, str) or oracle_id == "":
-                continue
-            if not isinstance(card_name, str) or card_name == "":
-                continue
-
-            cards_processed += 1
-
-            oracle_text = _normalize_text(row["oracle_text"])
-            type_line = _normalize_text(row["type_line"])
-            keywords = _parse_keywords(row["keywords"])
-
-            matches_by_primitive: Dict[str, Dict[str, Any]] = {}
-
-            for rule in active_rules:
-                matched, matched_field, snippet = _match_rule(
-                    rule=rule,
-                    regex_cache=regex_cache,
-                    oracle_text=oracle_text,
-                    type_line=type_line,
-                    keywords=keywords,
+        cards_reused = 0
+        tags_written = 0
+        unknowns_written = 0
+        run_hash_rows: List[Tuple[str, str, str]] = []
+        rule_stats: Dict[str, List[int]] = {}
+        tag_started = time.perf_counter()
+        for tagged in _iter_tagged_batches(
+            active_rules=active_rules,
+            card_batches=_iter_card_batches(cards_cursor, batch_size),
+            ruleset_version=ruleset_version,
+            previous_fingerprints=previous_fingerprints,
+            workers=workers,
+        ):
+            batch_oracle_ids = [fingerprint[0] for fingerprint in tagged["fingerprints"]]
+            reused_oracle_ids = set(tagged["reused_oracle_ids"])
+            if previous_fingerprints:
+                retagged = [(ruleset_version, oracle_id) for oracle_id in batch_oracle_ids if oracle_id not in reused_oracle_ids]
+                for table_name in PER_CARD_TABLES:
+                    con.executemany(f"DELETE FROM {table_name} WHERE ruleset_version = ? AND oracle_id = ?", retagged)
+                con.executemany(
+                    "INSERT INTO temp.primitive_tag_seen_v0 (oracle_id) VALUES (?)",
+                    [(oracle_id,) for oracle_id in batch_oracle_ids],
                 )
-                if not matched:
-                    continue
-
-                primitive_id = rule.get("primitive_id")
-                rule_id = rule.get("rule_id")
-                weight = float(rule.get("weight", 1.0))
-                if not isinstance(primitive_id, str) or not isinstance(rule_id, str):
-                    continue
-
-                bucket = matches_by_primitive.setdefault(
-                    primitive_id,
-                    {
-                        "rule_ids": [],
-                        "weights": [],
-                        "snippets": [],
-                        "matched_fields": [],
-                    },
+            con.executemany(
+                "INSERT INTO temp.primitive_tag_reused_v0 (oracle_id) VALUES (?)",
+                [(oracle_id,) for oracle_id in tagged["reused_oracle_ids"]],
+            )
+            tags_written += len(tagged["tags"])
+            unknowns_written += len(tagged["unknowns"])
+            _insert_batches(con=con, tags_batch=tagged["tags"], unknowns_batch=tagged["unknowns"])
+            con.executemany(
+                """
+                INSERT OR REPLACE INTO primitive_tag_card_fingerprints_v0 (
+                  oracle_id,
+                  ruleset_version,
+                  text_hash,
+                  rules_hash
+                ) VALUES (?, ?, ?, ?)
+                """,
+                tagged["fingerprints"],
+            )
+
+            cards_processed += len(batch_oracle_ids)
+            cards_reused += len(reused_oracle_ids)
+            run_hash_rows.extend(tagged["run_hash_rows"])
+            for rule_id, (evaluations, hits, elapsed_ns) in tagged["rule_stats"].items():
+                stats = rule_stats.setdefault(rule_id, [0, 0, 0])
+                stats[0] += evaluations
+                stats[1] += hits
+                stats[2] += elapsed_ns
+        tag_seconds = time.perf_counter() - tag_started
+
+        if previous_fingerprints:
+            # Cards that left the snapshot since the last build.
+            for table_name in PER_CARD_TABLES:
+                con.execute(
+                    f"DELETE FROM {table_name} WHERE ruleset_version = ? "
+                    "AND oracle_id NOT IN (SELECT oracle_id FROM temp.primitive_tag_seen_v0)",
+                    (ruleset_version,),
                 )
-                bucket["rule_ids"].append(rule_id)
-                bucket["weights"].append(weight)
-                bucket["snippets"].append({"rule_id": rule_id, "snippet": snippet[:80]})
-                bucket["matched_fields"].append(matched_field)
-
-            primitive_ids_sorted = sorted(matches_by_primitive.keys())
-            for primitive_id in primitive_ids_sorted:
-                match_obj = matches_by_primitive[primitive_id]
-                rule_ids = [rid for rid in match_obj.get("rule_ids", []) if isinstance(rid, str)]
-                weights = [float(w) for w in match_obj.get("weights", [])]
-                if not rule_ids or not weights:
-                    continue
-
-                confidence = _compute_confidence(rule_weights=weights)
-                low_weight_present = any(float(w) < 0.5 for w in weights)
-
-                snippets = [
-                    {
-                        "rule_id": snippet_obj.get("rule_id"),
-                        "snippet": str(snippet_obj.get("snippet") or "")[:80],
-                    }
-                    for snippet_obj in match_obj.get("snippets", [])
-                    if isinstance(snippet_obj, dict)
-                ]
-
-                matched_fields = [
-                    field
-                    for field in match_obj.get("matched_fields", [])
-                    if isinstance(field, str)
-                ]
-                matched_field_value = _select_matched_field(matched_fields)
-
-                evidence_obj = {
-                    "matched_rule_ids": rule_ids,
-                    "matched_field": matched_field_value,
-                    "snippets": snippets,
-                }
-                evidence_json = stable_json_dumps(evidence_obj)
-
-                if low_weight_present or confidence < 0.60:
-                    reason = "LOW_RULE_WEIGHT" if low_weight_present else "LOW_CONFIDENCE"
-                    reason_with_primitive = f"{reason}:{primitive_id}"
-                    details_json = stable_json_dumps(
-                        {
-                            "primitive_id": primitive_id,
-                            "confidence": confidence,
-                            "avg_rule_weight": float(f"{(sum(weights) / float(len(weights))):.6f}"),
-                            "matched_rule_ids": rule_ids,
-                            "matched_field": matched_field_value,
-                        }
-                    )
-                    unknowns_batch.append(
-                        (
-                            oracle_id,
-                            card_name,
-                            reason_with_primitive,
-                            details_json,
-                            ruleset_version,
-                        )
-                    )
-                    unknowns_emitted += 1
-                else:
-                    confidence_rounded_6 = float(f"{confidence:.6f}")
-                    confidence_for_hash = f"{confidence_rounded_6:.6f}"
-                    tags_batch.append(
-                        (
-                            oracle_id,
-                            card_name,
-                            primitive_id,
-                            ruleset_version,
-                            confidence_rounded_6,
-                            evidence_json,
-                        )
-                    )
-                    run_hash_rows.append((oracle_id, primitive_id, confidence_for_hash))
-                    tags_emitted += 1
+        con.execute("DROP TABLE temp.primitive_tag_seen_v0")
 
-                if len(tags_batch) >= TAG_BATCH_SIZE or len(unknowns_batch) >= TAG_BATCH_SIZE:
-                    _insert_batches(con=con, tags_batch=tags_batch, unknowns_batch=unknowns_batch)
+        reused_tag_rows = con.execute(
+            """
+            SELECT oracle_id, primitive_id, confidence
+            FROM card_primitive_tags_v0
+            WHERE ruleset_version = ?
+              AND oracle_id IN (SELECT oracle_id FROM temp.primitive_tag_reused_v0)
+            """,
+            (ruleset_version,),
+        ).fetchall()
+        run_hash_rows.extend(
+            (row["oracle_id"], row["primitive_id"], f"{float(row['confidence']):.6f}") for row in reused_tag_rows
+        )
+        reused_unknowns_row = con.execute(
+            """
+            SELECT COUNT(*)
+            FROM primitive_tag_unknowns_v0
+            WHERE ruleset_version = ?
+              AND oracle_id IN (SELECT oracle_id FROM temp.primitive_tag_reused_v0)
+            """,
+            (ruleset_version,),
+        ).fetchone()
+        con.execute("DROP TABLE temp.primitive_tag_reused_v0")
 
-        _insert_batches(con=con, tags_batch=tags_batch, unknowns_batch=unknowns_batch)
+        tags_emitted = tags_written + len(reused_tag_rows)
+        unknowns_emitted = unknowns_written + int(reused_unknowns_row[0])
 
         run_hash_rows_sorted = sorted(run_hash_rows)
         run_hash_v1 = sha256_hex(stable_json_dumps(run_hash_rows_sorted))
@@ -612,7 +879,14 @@ def main() -> int:
         "unknowns_emitted": unknowns_emitted,
         "run_hash_v1": run_hash_v1,
         "run_id": run_id,
+        "workers": workers,
+        "cards_reused": cards_reused,
+        "cards_retagged": cards_processed - cards_reused,
+        "tag_seconds": round(tag_seconds, 3),
+        "cards_per_sec": round(cards_processed / tag_seconds, 1) if tag_seconds > 0 else None,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
     }
+    _print_rule_costs(rule_stats, top=args.rule_cost_top)
     print(stable_json_dumps(summary))
     return 0
 
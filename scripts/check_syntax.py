@@ -8,6 +8,9 @@ FILES = [
     "taxonomy/loader.py",
     "snapshot_build/index_build.py",
     "snapshot_build/tag_snapshot.py",
+    "snapshot_build/rule_matcher.py",
+    "snapshot_build/profile_taxonomy_rules.py",
+    "snapshot_build/export_taxonomy_pack.py",
     "api/engine/pipeline_build.py",
     "api/main.py",
     "tests/test_taxonomy_compiler.py",
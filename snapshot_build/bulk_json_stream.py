@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import codecs
+import json
+from pathlib import Path
+from typing import Any, Iterator, List, TypeVar
+
+DEFAULT_READ_CHUNK_BYTES = 1024 * 1024
+
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+T = TypeVar("T")
+
+
+def iter_json_array(path: Path, *, chunk_bytes: int = DEFAULT_READ_CHUNK_BYTES) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array file one at a time.
+
+    Only the element being decoded (plus one read chunk) is held in memory, so
+    multi-hundred-MB Scryfall bulk files parse in roughly constant space.
+    Raises ValueError when the file is not a single well-formed JSON array.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    read_size = max(int(chunk_bytes), 1)
+
+    with path.open("rb") as file_obj:
+        buffer = ""
+        position = 0
+        eof = False
+
+        def _fill() -> bool:
+            nonlocal buffer, position, eof
+            if eof:
+                return False
+            raw = file_obj.read(read_size)
+            if raw == b"":
+                eof = True
+                buffer = buffer[position:] + decoder.decode(b"", final=True)
+            else:
+                buffer = buffer[position:] + decoder.decode(raw)
+            position = 0
+            return True
+
+        def _skip_whitespace() -> bool:
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in _WHITESPACE:
+                    position += 1
+                if position < len(buffer):
+                    return True
+                if not _fill():
+                    return False
+
+        if not _skip_whitespace() or buffer[position] != "[":
+            raise ValueError("Bulk JSON must be a top-level list")
+        position += 1
+
+        expect_element = True
+        first = True
+        while True:
+            if not _skip_whitespace():
+                raise ValueError("Unterminated JSON array")
+            token = buffer[position]
+            if token == "]" and (first or not expect_element):
+                position += 1
+                break
+            if not expect_element:
+                if token != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, found {token!r}")
+                position += 1
+                expect_element = True
+                continue
+
+            while True:
+                try:
+                    element, end = _DECODER.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if not _fill():
+                        raise
+                    continue
+                # A number cut by the chunk edge ("-500." of "-500.0") still decodes; only trust it
+                # once the delimiter after it has been read.
+                if not eof and isinstance(element, (int, float)) and not isinstance(element, bool):
+                    follow = end
+                    while follow < len(buffer) and buffer[follow] in _WHITESPACE:
+                        follow += 1
+                    if (follow == len(buffer) or buffer[follow] not in ",]") and _fill():
+                        continue
+                break
+            position = end
+            first = False
+            expect_element = False
+            yield element
+
+        if _skip_whitespace():
+            raise ValueError("Unexpected data after JSON array")
+
+
+def iter_batches(items: Iterator[T], batch_size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    size = max(int(batch_size), 1)
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
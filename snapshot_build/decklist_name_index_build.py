@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from api.engine.decklist_resolve_v1 import write_decklist_name_index_artifact_v1
+from engine.db import resolve_db_path
+
+
+def _nonempty_str(value: Any) -> str:
+    if isinstance(value, str):
+        token = value.strip()
+        if token != "":
+            return token
+    return ""
+
+
+def _resolve_db_path_from_cli(raw_db_path: Any) -> Path:
+    token = _nonempty_str(raw_db_path)
+    if token == "":
+        return resolve_db_path()
+
+    candidate = Path(token).expanduser()
+    if not candidate.is_absolute():
+        candidate = (Path.cwd() / candidate).resolve()
+    if not candidate.is_file():
+        raise RuntimeError(f"Database file not found: {candidate}")
+    return candidate
+
+
+def _snapshot_ids(con: sqlite3.Connection, snapshot_id: str) -> List[str]:
+    if snapshot_id != "":
+        return [snapshot_id]
+    rows = con.execute("SELECT DISTINCT snapshot_id FROM cards ORDER BY snapshot_id ASC").fetchall()
+    return [row[0] for row in rows if isinstance(row[0], str) and row[0] != ""]
+
+
+def build_decklist_name_index_artifacts(*, db_path: Path, snapshot_id: str = "") -> Dict[str, Any]:
+    con = sqlite3.connect(str(db_path))
+    con.row_factory = sqlite3.Row
+    try:
+        table_exists = con.execute(
+            "SELECT COUNT(1) FROM sqlite_master WHERE type = 'table' AND name = 'cards'"
+        ).fetchone()
+        if not table_exists or int(table_exists[0]) <= 0:
+            raise RuntimeError("cards table not found in target DB")
+
+        artifacts = [
+            write_decklist_name_index_artifact_v1(con, snapshot_token)
+            for snapshot_token in _snapshot_ids(con, _nonempty_str(snapshot_id))
+        ]
+        con.commit()
+
+        return {
+            "db_path": str(db_path),
+            "snapshot_id": _nonempty_str(snapshot_id) or None,
+            "artifacts": artifacts,
+        }
+    finally:
+        con.close()
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compile the per-snapshot decklist name-resolution index artifact")
+    parser.add_argument("--db", default="", help="Path to SQLite DB (defaults to MTG_ENGINE_DB_PATH / ./data/mtg.sqlite)")
+    parser.add_argument("--snapshot_id", default="", help="Optional snapshot id; defaults to every snapshot")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_arg_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        db_path = _resolve_db_path_from_cli(args.db)
+        summary = build_decklist_name_index_artifacts(db_path=db_path, snapshot_id=args.snapshot_id)
+    except RuntimeError as exc:
+        print(f"ERROR: {exc}")
+        return 2
+    except Exception as exc:
+        print(f"ERROR: unexpected failure: {exc}")
+        return 2
+
+    for artifact in summary.get("artifacts") or []:
+        print(
+            "decklist name index ready | "
+            f"snapshot_id={artifact.get('snapshot_id')} candidates={artifact.get('candidates')} "
+            f"signature={artifact.get('source_signature')}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,14 +6,16 @@ import json
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
 from uuid import UUID
 
 from engine.determinism import stable_json_dumps
+from snapshot_build.bulk_json_stream import iter_batches, iter_json_array
 from snapshot_build.migrate_card_images_table import ensure_card_images_table
 
 IMG_SOURCE = "scryfall_bulk_default_cards"
 DEFAULT_REPORT_SAMPLE_SIZE = 10
+UPSERT_BATCH_SIZE = 2000
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
 
@@ -103,11 +105,11 @@ def _load_table_columns(con: sqlite3.Connection, table_name: str) -> List[str]:
     return sorted(set(columns))
 
 
-def _load_bulk_rows(bulk_json_path: Path) -> List[Any]:
-    payload = json.loads(bulk_json_path.read_text(encoding="utf-8"))
-    if not isinstance(payload, list):
-        raise RuntimeError("Bulk JSON must be a top-level list")
-    return payload
+def _iter_bulk_rows(bulk_json_path: Path) -> Iterator[Any]:
+    try:
+        yield from iter_json_array(bulk_json_path)
+    except ValueError as exc:
+        raise RuntimeError(f"Invalid bulk JSON: {exc}") from exc
 
 
 def _extract_uri(image_uris: Any, key: str) -> str | None:
@@ -135,7 +137,8 @@ def _extract_normal_small_uris(card_row: Dict[str, Any]) -> Tuple[str | None, st
     return normal_uri, small_uri
 
 
-def _build_bulk_image_map(*, bulk_rows: Sequence[Any], limit: int) -> Dict[str, Dict[str, Any]]:
+def _build_bulk_image_map(*, bulk_rows: Iterable[Any], limit: int) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """(oracle_id -> best image payload, rows scanned); bulk_rows is consumed lazily."""
     by_oracle_id: Dict[str, Dict[str, Any]] = {}
     max_rows = int(limit)
 
@@ -163,7 +166,7 @@ def _build_bulk_image_map(*, bulk_rows: Sequence[Any], limit: int) -> Dict[str,
                 "score": score,
             }
 
-    return by_oracle_id
+    return by_oracle_id, scanned_rows
 
 
 def _load_db_oracle_ids(con: sqlite3.Connection) -> List[str]:
@@ -258,8 +261,10 @@ def enrich_images_from_scryfall_bulk(
     if resolved_bulk_version == "":
         resolved_bulk_version = _sha256_file(bulk_json_path)
 
-    bulk_rows = _load_bulk_rows(bulk_json_path)
-    image_payload_by_oracle_id = _build_bulk_image_map(bulk_rows=bulk_rows, limit=int(limit))
+    image_payload_by_oracle_id, total_cards_scanned = _build_bulk_image_map(
+        bulk_rows=_iter_bulk_rows(bulk_json_path),
+        limit=int(limit),
+    )
 
     con = sqlite3.connect(str(db_path))
     con.row_factory = sqlite3.Row
@@ -284,17 +289,29 @@ def enrich_images_from_scryfall_bulk(
         enriched_count = 0
         missing_image_uris_count = 0
 
-        for oracle_id in matched_oracle_ids:
-            payload = image_payload_by_oracle_id[oracle_id]
-            img_normal_uri = payload.get("img_normal_uri") if isinstance(payload.get("img_normal_uri"), str) else None
-            img_small_uri = payload.get("img_small_uri") if isinstance(payload.get("img_small_uri"), str) else None
+        def _upsert_rows() -> Iterator[Tuple[Any, ...]]:
+            nonlocal enriched_count, missing_image_uris_count
+            for oracle_id in matched_oracle_ids:
+                payload = image_payload_by_oracle_id[oracle_id]
+                img_normal_uri = payload.get("img_normal_uri") if isinstance(payload.get("img_normal_uri"), str) else None
+                img_small_uri = payload.get("img_small_uri") if isinstance(payload.get("img_small_uri"), str) else None
 
-            if img_normal_uri is None and img_small_uri is None:
-                missing_image_uris_count += 1
-            else:
-                enriched_count += 1
+                if img_normal_uri is None and img_small_uri is None:
+                    missing_image_uris_count += 1
+                else:
+                    enriched_count += 1
 
-            con.execute(
+                yield (
+                    oracle_id,
+                    img_normal_uri,
+                    img_small_uri,
+                    IMG_SOURCE,
+                    img_enriched_at,
+                    resolved_bulk_version,
+                )
+
+        for batch in iter_batches(_upsert_rows(), UPSERT_BATCH_SIZE):
+            con.executemany(
                 """
                 INSERT INTO card_images (
                   oracle_id,
@@ -311,16 +328,10 @@ def enrich_images_from_scryfall_bulk(
                   img_enriched_at = excluded.img_enriched_at,
                   img_bulk_version = excluded.img_bulk_version
                 """,
-                (
-                    oracle_id,
-                    img_normal_uri,
-                    img_small_uri,
-                    IMG_SOURCE,
-                    img_enriched_at,
-                    resolved_bulk_version,
-                ),
+                batch,
             )
-            rows_upserted += 1
+            con.commit()
+            rows_upserted += len(batch)
 
         if rows_upserted == 0 and not allow_empty:
             raise RuntimeError(
@@ -353,7 +364,7 @@ def enrich_images_from_scryfall_bulk(
         "img_enriched_at": img_enriched_at,
         "limit": int(limit),
         "allow_empty": bool(allow_empty),
-        "total_cards_scanned": min(len(bulk_rows), int(limit)) if int(limit) > 0 else len(bulk_rows),
+        "total_cards_scanned": total_cards_scanned,
         "bulk_oracle_ids_scanned": len(image_payload_by_oracle_id),
         "oracle_ids_in_db": len(db_oracle_ids),
         "oracle_ids_matched_to_db": len(matched_oracle_ids),
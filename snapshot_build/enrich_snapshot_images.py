@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import sqlite3
 import urllib.request
 from pathlib import Path
-from typing import Any, Dict, List, Sequence, Tuple
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
 from uuid import UUID
 
 from engine.determinism import stable_json_dumps
+from snapshot_build.bulk_json_stream import iter_batches, iter_json_array
 from snapshot_build.migrate_cards_image_columns import ensure_cards_image_columns
 
 DEFAULT_BULK_INDEX_URL = "https://api.scryfall.com/bulk-data"
@@ -17,6 +19,7 @@ HTTP_HEADERS = {
     "User-Agent": "mtg-engine/1.0 (local-update-mode)",
     "Accept": "application/json",
 }
+UPDATE_BATCH_SIZE = 2000
 
 
 def _nonempty_str(value: Any) -> str:
@@ -162,17 +165,20 @@ def _extract_image_payload(card_row: Dict[str, Any]) -> Dict[str, Any] | None:
     }
 
 
+def _iter_bulk_rows(bulk_json_path: Path) -> Iterator[Any]:
+    try:
+        yield from iter_json_array(bulk_json_path)
+    except ValueError as exc:
+        raise RuntimeError(f"Invalid bulk JSON: {exc}") from exc
+
+
 def _build_bulk_image_map(*, bulk_json_path: Path) -> Dict[str, Dict[str, Any]]:
     if not bulk_json_path.is_file():
         raise RuntimeError(f"Bulk JSON file not found: {bulk_json_path}")
 
-    payload = json.loads(bulk_json_path.read_text(encoding="utf-8"))
-    if not isinstance(payload, list):
-        raise RuntimeError("Bulk JSON must be a top-level list")
-
     by_oracle_id: Dict[str, Dict[str, Any]] = {}
 
-    for card_row in payload:
+    for card_row in _iter_bulk_rows(bulk_json_path):
         if not isinstance(card_row, dict):
             continue
 
@@ -226,6 +232,33 @@ def _load_all_oracle_ids(*, con: sqlite3.Connection) -> List[str]:
     return [str(row[0]) for row in rows if isinstance(row[0], str) and row[0] != ""]
 
 
+def _stamp_snapshot_manifest(*, con: sqlite3.Connection, snapshot_id: str, updated_rows: int, payload_sha256: str) -> bool:
+    # Card rows were updated in place; recording the enrichment in the snapshot
+    # manifest is what lets snapshot-scoped API caches notice the new image data.
+    try:
+        row = con.execute("SELECT manifest_json FROM snapshots WHERE snapshot_id = ? LIMIT 1", (snapshot_id,)).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    if row is None:
+        return False
+
+    manifest: Dict[str, Any] = {}
+    if isinstance(row[0], str) and row[0].strip() != "":
+        try:
+            parsed = json.loads(row[0])
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, dict):
+            manifest = parsed
+
+    manifest["snapshot_image_enrichment_v1"] = {"updated_rows": int(updated_rows), "payload_sha256": payload_sha256}
+    con.execute(
+        "UPDATE snapshots SET manifest_json = ? WHERE snapshot_id = ?",
+        (stable_json_dumps(manifest), snapshot_id),
+    )
+    return True
+
+
 def enrich_snapshot_images(
     *,
     db_path: Path,
@@ -259,45 +292,57 @@ def enrich_snapshot_images(
         missing_oracle_ids = sorted(snapshot_oracle_id_set.difference(bulk_oracle_ids))
         bulk_oracle_ids_not_in_db = sorted(bulk_oracle_ids.difference(snapshot_oracle_id_set))
 
-        updated_rows = 0
-        for oracle_id in to_update:
-            payload = image_payload_by_oracle[oracle_id]
-            if snapshot_scoped:
-                con.execute(
-                    """
-                    UPDATE cards
-                    SET image_uris_json = ?,
-                        card_faces_json = ?,
-                        image_status = ?
-                    WHERE snapshot_id = ?
-                      AND oracle_id = ?
-                    """,
-                    (
-                        payload.get("image_uris_json"),
-                        payload.get("card_faces_json"),
-                        payload.get("image_status"),
-                        normalized_snapshot_id,
-                        oracle_id,
-                    ),
+        if snapshot_scoped:
+            update_sql = """
+                UPDATE cards
+                SET image_uris_json = ?,
+                    card_faces_json = ?,
+                    image_status = ?
+                WHERE snapshot_id = ?
+                  AND oracle_id = ?
+                """
+            key_params: Tuple[str, ...] = (normalized_snapshot_id,)
+        else:
+            update_sql = """
+                UPDATE cards
+                SET image_uris_json = ?,
+                    card_faces_json = ?,
+                    image_status = ?
+                WHERE oracle_id = ?
+                """
+            key_params = ()
+
+        payload_digest = hashlib.sha256()
+
+        def _update_rows() -> Iterator[Tuple[Any, ...]]:
+            for oracle_id in to_update:
+                payload = image_payload_by_oracle[oracle_id]
+                payload_digest.update(
+                    stable_json_dumps(
+                        [oracle_id, payload.get("image_uris_json"), payload.get("card_faces_json"), payload.get("image_status")]
+                    ).encode("utf-8")
                 )
-            else:
-                con.execute(
-                    """
-                    UPDATE cards
-                    SET image_uris_json = ?,
-                        card_faces_json = ?,
-                        image_status = ?
-                    WHERE oracle_id = ?
-                    """,
-                    (
-                        payload.get("image_uris_json"),
-                        payload.get("card_faces_json"),
-                        payload.get("image_status"),
-                        oracle_id,
-                    ),
+                yield (
+                    payload.get("image_uris_json"),
+                    payload.get("card_faces_json"),
+                    payload.get("image_status"),
+                    *key_params,
+                    oracle_id,
                 )
-            updated_rows += 1
 
+        updated_rows = 0
+        for batch in iter_batches(_update_rows(), UPDATE_BATCH_SIZE):
+            con.executemany(update_sql, batch)
+            con.commit()
+            updated_rows += len(batch)
+
+        if snapshot_scoped:
+            _stamp_snapshot_manifest(
+                con=con,
+                snapshot_id=normalized_snapshot_id,
+                updated_rows=updated_rows,
+                payload_sha256=payload_digest.hexdigest(),
+            )
         con.commit()
     finally:
         con.close()
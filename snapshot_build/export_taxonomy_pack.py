@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+from taxonomy.exporter import export_workbook_to_pack
+
+from .profile_taxonomy_rules import DEFAULT_RULE_TIMEOUT_SECONDS, build_rule_profile_report
+from .tag_snapshot import COMPILED_PACK_FILE_NAME, load_compiled_pack
+
+
+def _publish_staged_pack(staged_pack_dir: Path, output_base: Path) -> Path:
+    pack_dir = output_base / staged_pack_dir.name
+    if pack_dir.exists():
+        shutil.rmtree(pack_dir)
+    os.replace(staged_pack_dir, pack_dir)
+    return pack_dir
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Export a taxonomy workbook, optionally gate it on rule cost, and cache its compiled pack"
+    )
+    ap.add_argument("--workbook", required=True, help="Workbook path (xlsx)")
+    ap.add_argument("--out", required=True, help="Output packs folder")
+    ap.add_argument("--taxonomy_version", default=None, help="Optional explicit taxonomy version")
+    ap.add_argument(
+        "--profile_snapshot_id",
+        default=None,
+        help="Profile the exported rules over this snapshot and fail the build on rule budget violations",
+    )
+    ap.add_argument("--rule_budget_ms", type=float, default=None, help="Max total ms per rule over the profile sample")
+    ap.add_argument("--rule_input_budget_ms", type=float, default=None, help="Max ms per rule on a single card text")
+    ap.add_argument(
+        "--rule_timeout_seconds",
+        type=float,
+        default=DEFAULT_RULE_TIMEOUT_SECONDS,
+        help="Fail a rule still running over the profile sample after this long; 0 = no limit",
+    )
+    args = ap.parse_args()
+
+    profile_snapshot_id = args.profile_snapshot_id.strip() if isinstance(args.profile_snapshot_id, str) else ""
+    if profile_snapshot_id == "":
+        pack_dir = export_workbook_to_pack(
+            workbook_path=args.workbook,
+            out_dir=args.out,
+            taxonomy_version=args.taxonomy_version,
+        )
+    else:
+        # Export and profile in a staging folder so a pack that fails its rule
+        # budget never lands in (or replaces one in) the packs folder.
+        output_base = Path(args.out).resolve()
+        output_base.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix=".export_staging_", dir=output_base) as staging_dir:
+            staged_pack_dir = export_workbook_to_pack(
+                workbook_path=args.workbook,
+                out_dir=staging_dir,
+                taxonomy_version=args.taxonomy_version,
+            )
+            report = build_rule_profile_report(
+                snapshot_id=profile_snapshot_id,
+                taxonomy_pack_folder=str(staged_pack_dir),
+                budget_ms=args.rule_budget_ms,
+                single_input_budget_ms=args.rule_input_budget_ms,
+                rule_timeout_seconds=args.rule_timeout_seconds if args.rule_timeout_seconds > 0 else None,
+            )
+            for rule_id in report["flagged_rules"]:
+                print(f"WARNING: rule {rule_id} has a catastrophic-backtracking shape", file=sys.stderr)
+            if report["budget_violations"]:
+                for violation in report["budget_violations"]:
+                    print(f"ERROR: rule budget exceeded: {violation}", file=sys.stderr)
+                return 1
+            pack_dir = _publish_staged_pack(staged_pack_dir, output_base)
+
+    # Compile (or, after profiling, re-validate) the pack once here so tagging
+    # runs start from the cached compiled pack.
+    compiled_pack = load_compiled_pack(pack_dir)
+
+    out: Dict[str, Any] = {
+        "taxonomy_version": pack_dir.name,
+        "pack_folder": str(pack_dir),
+        "pack_manifest": str((pack_dir / "pack_manifest.json").resolve()),
+        "pack_sha256": compiled_pack.pack_sha256,
+        "compiled_pack": str((pack_dir / COMPILED_PACK_FILE_NAME).resolve()),
+        "compiled_rules": len(compiled_pack.rules),
+    }
+    print(json.dumps(out, separators=(",", ":"), sort_keys=True, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
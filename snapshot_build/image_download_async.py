@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+ASYNC_DOWNLOAD_AVAILABLE = httpx is not None
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_TARGET_LATENCY_SECONDS = 1.5
+MAX_RETRY_DELAY_SECONDS = 60.0
+THROTTLE_STATUS_CODES = {429, 503}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_USER_AGENT = "mtg-engine-image-prefetch/1.0"
+
+
+class AdaptiveConcurrency:
+    """AIMD cap on in-flight requests.
+
+    Each fast response grows the cap by 1/cap (about +1 per round of
+    requests); a slow response shrinks it by 10%, and a throttling response
+    halves it and pauses every request for the server's Retry-After.
+    """
+
+    def __init__(self, *, initial: int, minimum: int = 1, maximum: int, target_latency_seconds: float) -> None:
+        self.minimum = max(int(minimum), 1)
+        self.maximum = max(int(maximum), self.minimum)
+        self.limit = float(min(max(int(initial), self.minimum), self.maximum))
+        self.target_latency_seconds = float(target_latency_seconds)
+        self.peak_limit = self.limit
+        self.throttled = 0
+        self._in_flight = 0
+        self._pause_until = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _cond(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self) -> None:
+        condition = self._cond()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        delay = self._pause_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self) -> None:
+        condition = self._cond()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    def on_response(self, latency_seconds: float) -> None:
+        if latency_seconds <= self.target_latency_seconds:
+            self.limit = min(self.limit + 1.0 / self.limit, float(self.maximum))
+            self.peak_limit = max(self.peak_limit, self.limit)
+        else:
+            self.limit = max(self.limit * 0.9, float(self.minimum))
+
+    def on_throttle(self, retry_after_seconds: float) -> None:
+        self.throttled += 1
+        self.limit = max(self.limit / 2.0, float(self.minimum))
+        self._pause_until = max(self._pause_until, time.monotonic() + max(retry_after_seconds, 0.0))
+
+
+class _AsyncRateLimiter:
+    def __init__(self, rate_limit_per_sec: float) -> None:
+        self._min_interval_seconds = 1.0 / max(float(rate_limit_per_sec), 0.1)
+        self._next_allowed_time = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def wait_turn(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            wait_seconds = self._next_allowed_time - time.monotonic()
+            if wait_seconds > 0.0:
+                await asyncio.sleep(wait_seconds)
+            self._next_allowed_time = time.monotonic() + self._min_interval_seconds
+
+
+class _RetryableResponse(Exception):
+    def __init__(self, message: str, *, retry_after_seconds: Optional[float], throttled: bool) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+        self.throttled = throttled
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not isinstance(value, str) or value.strip() == "":
+        return None
+    try:
+        return min(max(float(value.strip()), 0.0), MAX_RETRY_DELAY_SECONDS)
+    except ValueError:
+        return None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    return min(0.5 * (2 ** (attempt - 1)), MAX_RETRY_DELAY_SECONDS)
+
+
+async def _stream_to_file(
+    client: Any,
+    *,
+    image_url: str,
+    temp_path: Path,
+    timeout_seconds: float,
+    gate: AdaptiveConcurrency,
+) -> int:
+    started = time.monotonic()
+    async with client.stream("GET", image_url, timeout=timeout_seconds) as response:
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise _RetryableResponse(
+                f"HTTP {response.status_code}",
+                retry_after_seconds=_parse_retry_after(response.headers.get("retry-after")),
+                throttled=response.status_code in THROTTLE_STATUS_CODES,
+            )
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+
+        written = 0
+        temp_path.parent.mkdir(parents=True, exist_ok=True)
+        with temp_path.open("wb") as file_obj:
+            async for chunk in response.aiter_bytes():
+                file_obj.write(chunk)
+                written += len(chunk)
+    gate.on_response(time.monotonic() - started)
+    if written == 0:
+        raise RuntimeError("empty payload")
+    return written
+
+
+async def _download_items(
+    items: Sequence[Tuple[str, str, str]],
+    *,
+    temp_path_for: Callable[[str, str], Path],
+    finalize: Callable[[str, str, str, Path], str],
+    on_result: Callable[[str, str, str, str], None],
+    timeout_seconds: float,
+    rate_limit_per_sec: float,
+    gate: AdaptiveConcurrency,
+    max_attempts: int,
+) -> Dict[str, int]:
+    stats = {"requests": 0, "retries": 0}
+    rate_limiter = _AsyncRateLimiter(rate_limit_per_sec)
+    pending: Iterator[Tuple[str, str, str]] = iter(items)
+
+    async def _download_one(client: Any, oracle_id: str, size: str, image_url: str) -> Tuple[str, str]:
+        temp_path = temp_path_for(oracle_id, size)
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_delay: Optional[float] = None
+            await gate.acquire()
+            try:
+                await rate_limiter.wait_turn()
+                stats["requests"] += 1
+                await _stream_to_file(
+                    client,
+                    image_url=image_url,
+                    temp_path=temp_path,
+                    timeout_seconds=timeout_seconds,
+                    gate=gate,
+                )
+            except (_RetryableResponse, httpx.TransportError) as exc:
+                retry_after = getattr(exc, "retry_after_seconds", None)
+                if getattr(exc, "throttled", False):
+                    # The gate pauses every request; no extra per-item delay.
+                    gate.on_throttle(retry_after if retry_after is not None else _backoff_seconds(attempt))
+                    retry_delay = 0.0
+                else:
+                    retry_delay = retry_after if retry_after is not None else _backoff_seconds(attempt)
+                if attempt >= max_attempts:
+                    _discard(temp_path)
+                    return "FAIL", str(exc) or type(exc).__name__
+            except Exception as exc:
+                _discard(temp_path)
+                return "FAIL", str(exc)
+            finally:
+                await gate.release()
+
+            if retry_delay is not None:
+                stats["retries"] += 1
+                if retry_delay > 0:
+                    await asyncio.sleep(retry_delay)
+                continue
+
+            try:
+                return "OK", await asyncio.to_thread(finalize, oracle_id, size, image_url, temp_path)
+            except Exception as exc:
+                _discard(temp_path)
+                return "FAIL", str(exc)
+
+    async def _worker(client: Any) -> None:
+        for oracle_id, size, image_url in pending:
+            status, details = await _download_one(client, oracle_id, size, image_url)
+            on_result(status, oracle_id, size, details)
+
+    # Workers only pull items; the adaptive gate decides how many are in flight.
+    limits = httpx.Limits(max_connections=gate.maximum, max_keepalive_connections=gate.maximum)
+    async with httpx.AsyncClient(
+        limits=limits,
+        headers={"User-Agent": _USER_AGENT},
+        follow_redirects=True,
+    ) as client:
+        await asyncio.gather(*(_worker(client) for _ in range(min(gate.maximum, max(len(items), 1)))))
+    return stats
+
+
+def _discard(path: Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def download_items_async(
+    items: Sequence[Tuple[str, str, str]],
+    *,
+    temp_path_for: Callable[[str, str], Path],
+    finalize: Callable[[str, str, str, Path], str],
+    on_result: Callable[[str, str, str, str], None],
+    timeout_seconds: float,
+    rate_limit_per_sec: float,
+    initial_concurrency: int,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    target_latency_seconds: float = DEFAULT_TARGET_LATENCY_SECONDS,
+) -> Dict[str, Any]:
+    """Download (oracle_id, size, url) items over pooled keep-alive connections.
+
+    Each body is streamed into temp_path_for(oracle_id, size); finalize moves
+    it into the cache and returns the result details. on_result is called on
+    the caller's thread once per item, in completion order.
+    """
+    if httpx is None:
+        raise RuntimeError("Async image download requires httpx (pip install httpx)")
+
+    gate = AdaptiveConcurrency(
+        initial=initial_concurrency,
+        maximum=max(max_concurrency, initial_concurrency),
+        target_latency_seconds=target_latency_seconds,
+    )
+    stats = asyncio.run(
+        _download_items(
+            items,
+            temp_path_for=temp_path_for,
+            finalize=finalize,
+            on_result=on_result,
+            timeout_seconds=timeout_seconds,
+            rate_limit_per_sec=rate_limit_per_sec,
+            gate=gate,
+            max_attempts=max(int(max_attempts), 1),
+        )
+    )
+    return {
+        **stats,
+        "throttled": gate.throttled,
+        "final_concurrency": int(gate.limit),
+        "peak_concurrency": int(gate.peak_limit),
+    }
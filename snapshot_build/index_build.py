@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Tuple
 
 from engine.db import connect
 
@@ -56,6 +56,13 @@ def ensure_runtime_tag_indices(con: sqlite3.Connection) -> None:
 
         CREATE INDEX IF NOT EXISTS idx_equiv_to_cards_lookup
           ON equiv_to_cards(snapshot_id, taxonomy_version, equiv_id);
+
+        CREATE TABLE IF NOT EXISTS inverted_index_builds_v1 (
+          snapshot_id TEXT NOT NULL,
+          taxonomy_version TEXT NOT NULL,
+          card_tags_created_at TEXT,
+          PRIMARY KEY (snapshot_id, taxonomy_version)
+        );
         """
     )
 
@@ -85,96 +92,253 @@ def ensure_runtime_tag_indices(con: sqlite3.Connection) -> None:
         )
 
 
-def rebuild_inverted_indices(
+# (table, id column, card_tags JSON column) for each inverted index.
+INVERTED_INDEX_SOURCES: Tuple[Tuple[str, str, str], ...] = (
+    ("primitive_to_cards", "primitive_id", "primitive_ids_json"),
+    ("equiv_to_cards", "equiv_id", "equiv_class_ids_json"),
+)
+
+
+def json1_available(con: sqlite3.Connection) -> bool:
+    try:
+        con.execute("SELECT value FROM json_each('[]')").fetchall()
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def drop_secondary_indexes_for_bulk_load(con: sqlite3.Connection, table_name: str, rows_to_load: int) -> List[str]:
+    """Drop table_name's secondary indexes when the load dominates the table; returns their DDL to recreate.
+
+    Rebuilding an index costs a pass over the whole table, so indexes stay
+    live when the rows already in the table outnumber the load.
+    """
+    remaining_row = con.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()
+    remaining = int(remaining_row[0] if remaining_row else 0)
+    if rows_to_load <= 0 or remaining > rows_to_load:
+        return []
+
+    index_rows = con.execute(
+        """
+        SELECT name, sql
+        FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+        ORDER BY name ASC
+        """,
+        (table_name,),
+    ).fetchall()
+    for index_row in index_rows:
+        con.execute(f'DROP INDEX IF EXISTS "{index_row[0]}"')
+    return [str(index_row[1]) for index_row in index_rows]
+
+
+def _oracle_filter_sql(column: str) -> str:
+    return f"AND {column} IN (SELECT oracle_id FROM temp.index_build_oracle_ids)"
+
+
+def _insert_inverted_rows_json1(
     con: sqlite3.Connection,
     snapshot_id: str,
     taxonomy_version: str,
+    oracle_filter_sql: str,
 ) -> Dict[str, int]:
-    con.execute(
-        "DELETE FROM primitive_to_cards WHERE snapshot_id = ? AND taxonomy_version = ?",
-        (snapshot_id, taxonomy_version),
-    )
-    con.execute(
-        "DELETE FROM equiv_to_cards WHERE snapshot_id = ? AND taxonomy_version = ?",
-        (snapshot_id, taxonomy_version),
-    )
+    counts: Dict[str, int] = {}
+    for table_name, id_column, json_column in INVERTED_INDEX_SOURCES:
+        # Mirrors _json_list: malformed JSON or non-list payloads contribute nothing,
+        # and only non-empty string members are indexed.
+        cursor = con.execute(
+            f"""
+            INSERT OR IGNORE INTO {table_name} ({id_column}, oracle_id, snapshot_id, taxonomy_version)
+            SELECT DISTINCT j.value, ct.oracle_id, ?, ?
+            FROM card_tags ct,
+                 json_each(
+                   CASE
+                     WHEN json_valid(ct.{json_column}) AND json_type(ct.{json_column}) = 'array'
+                       THEN ct.{json_column}
+                     ELSE '[]'
+                   END
+                 ) j
+            WHERE ct.snapshot_id = ?
+              AND ct.taxonomy_version = ?
+              AND typeof(ct.oracle_id) = 'text'
+              AND ct.oracle_id <> ''
+              AND j.type = 'text'
+              AND j.value <> ''
+              {oracle_filter_sql}
+            ORDER BY j.value ASC, ct.oracle_id ASC
+            """,
+            (snapshot_id, taxonomy_version, snapshot_id, taxonomy_version),
+        )
+        counts[table_name] = max(int(cursor.rowcount), 0)
+    return counts
 
-    rows = con.execute(
-        """
-        SELECT oracle_id, primitive_ids_json, equiv_class_ids_json
-        FROM card_tags
-        WHERE snapshot_id = ? AND taxonomy_version = ?
-        ORDER BY oracle_id ASC
+
+def _insert_inverted_rows_python(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    taxonomy_version: str,
+    oracle_filter_sql: str,
+) -> Dict[str, int]:
+    index_rows: Dict[str, set[Tuple[str, str]]] = {table_name: set() for table_name, _, _ in INVERTED_INDEX_SOURCES}
+    cursor = con.execute(
+        f"""
+        SELECT ct.oracle_id, ct.primitive_ids_json, ct.equiv_class_ids_json
+        FROM card_tags ct
+        WHERE ct.snapshot_id = ? AND ct.taxonomy_version = ?
+          {oracle_filter_sql}
         """,
         (snapshot_id, taxonomy_version),
-    ).fetchall()
-
-    primitive_rows: List[Tuple[str, str, str, str]] = []
-    equiv_rows: List[Tuple[str, str, str, str]] = []
-
-    for row in rows:
-        row_dict = dict(row)
-        oracle_id = row_dict.get("oracle_id")
+    )
+    for row in cursor:
+        oracle_id = row[0]
         if not isinstance(oracle_id, str) or oracle_id == "":
             continue
+        for (table_name, _, _), raw in zip(INVERTED_INDEX_SOURCES, (row[1], row[2])):
+            index_rows[table_name].update((item_id, oracle_id) for item_id in _json_list(raw))
 
-        primitive_ids = _json_list(row_dict.get("primitive_ids_json"))
-        equiv_ids = _json_list(row_dict.get("equiv_class_ids_json"))
+    counts: Dict[str, int] = {}
+    for table_name, id_column, _ in INVERTED_INDEX_SOURCES:
+        con.executemany(
+            f"""
+            INSERT OR IGNORE INTO {table_name} ({id_column}, oracle_id, snapshot_id, taxonomy_version)
+            VALUES (?, ?, ?, ?)
+            """,
+            ((item_id, oracle_id, snapshot_id, taxonomy_version) for item_id, oracle_id in sorted(index_rows[table_name])),
+        )
+        counts[table_name] = len(index_rows[table_name])
+    return counts
 
-        for primitive_id in primitive_ids:
-            primitive_rows.append((primitive_id, oracle_id, snapshot_id, taxonomy_version))
-        for equiv_id in equiv_ids:
-            equiv_rows.append((equiv_id, oracle_id, snapshot_id, taxonomy_version))
 
-    primitive_rows = sorted(
-        set(primitive_rows),
-        key=lambda row: (row[0], row[1], row[2], row[3]),
-    )
-    equiv_rows = sorted(
-        set(equiv_rows),
-        key=lambda row: (row[0], row[1], row[2], row[3]),
-    )
+def indices_built_from(con: sqlite3.Connection, snapshot_id: str, taxonomy_version: str) -> str | None:
+    """created_at of the card_tags run the scope's inverted indices were last built from, if recorded."""
+    if not _table_exists(con, "inverted_index_builds_v1"):
+        return None
+    row = con.execute(
+        "SELECT card_tags_created_at FROM inverted_index_builds_v1 WHERE snapshot_id = ? AND taxonomy_version = ?",
+        (snapshot_id, taxonomy_version),
+    ).fetchone()
+    return row[0] if row is not None and isinstance(row[0], str) else None
 
-    if primitive_rows:
-        con.executemany(
-            """
-            INSERT OR REPLACE INTO primitive_to_cards (
-              primitive_id,
-              oracle_id,
-              snapshot_id,
-              taxonomy_version
-            ) VALUES (?, ?, ?, ?)
+
+def _copy_base_inverted_rows(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    taxonomy_version: str,
+    base_snapshot_id: str,
+) -> None:
+    """Copy base_snapshot_id's index rows for cards in card_tags that are not being rebuilt."""
+    for table_name, id_column, _ in INVERTED_INDEX_SOURCES:
+        con.execute(
+            f"""
+            INSERT OR IGNORE INTO {table_name} ({id_column}, oracle_id, snapshot_id, taxonomy_version)
+            SELECT {id_column}, oracle_id, ?, taxonomy_version
+            FROM {table_name}
+            WHERE snapshot_id = ?
+              AND taxonomy_version = ?
+              AND oracle_id IN (SELECT oracle_id FROM card_tags WHERE snapshot_id = ? AND taxonomy_version = ?)
+              AND oracle_id NOT IN (SELECT oracle_id FROM temp.index_build_oracle_ids)
+            ORDER BY {id_column} ASC, oracle_id ASC
             """,
-            primitive_rows,
+            (snapshot_id, base_snapshot_id, taxonomy_version, snapshot_id, taxonomy_version),
         )
 
-    if equiv_rows:
+
+def rebuild_inverted_indices(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    taxonomy_version: str,
+    oracle_ids: Iterable[str] | None = None,
+    base_snapshot_id: str | None = None,
+) -> Dict[str, int]:
+    """Rebuild primitive_to_cards / equiv_to_cards for one snapshot and taxonomy from card_tags.
+
+    Rows are derived inside SQLite with json_each when JSON1 is available and
+    inserted in primary-key order. With oracle_ids, only those cards' index
+    rows are replaced; otherwise the whole scope is rebuilt and, when it
+    dominates the tables, their secondary indexes are rebuilt after the load.
+    With base_snapshot_id as well, the other cards' rows are copied from that
+    snapshot's index instead of being kept, which is only correct when their
+    card_tags rows were carried forward unchanged from it.
+    """
+    if base_snapshot_id is not None and oracle_ids is None:
+        raise ValueError("base_snapshot_id requires oracle_ids")
+    scope_params: Tuple[str, ...] = (snapshot_id, taxonomy_version)
+    oracle_filter_sql = ""
+    card_filter_sql = ""
+    if oracle_ids is not None:
+        con.execute("DROP TABLE IF EXISTS temp.index_build_oracle_ids")
+        con.execute("CREATE TEMP TABLE index_build_oracle_ids (oracle_id TEXT PRIMARY KEY)")
         con.executemany(
+            "INSERT OR IGNORE INTO temp.index_build_oracle_ids (oracle_id) VALUES (?)",
+            ((oracle_id,) for oracle_id in oracle_ids if isinstance(oracle_id, str) and oracle_id != ""),
+        )
+        oracle_filter_sql = _oracle_filter_sql("oracle_id")
+        card_filter_sql = _oracle_filter_sql("ct.oracle_id")
+
+    copy_from_base = base_snapshot_id is not None and base_snapshot_id != snapshot_id
+    for table_name, _, _ in INVERTED_INDEX_SOURCES:
+        con.execute(
+            f"DELETE FROM {table_name} WHERE snapshot_id = ? AND taxonomy_version = ? "
+            f"{'' if copy_from_base else oracle_filter_sql}",
+            scope_params,
+        )
+
+    scanned_row = con.execute(
+        f"SELECT COUNT(*) FROM card_tags WHERE snapshot_id = ? AND taxonomy_version = ? {oracle_filter_sql}",
+        scope_params,
+    ).fetchone()
+    card_tags_scanned = int(scanned_row[0] if scanned_row else 0)
+
+    deferred_index_sql: List[str] = []
+    if oracle_ids is None:
+        for table_name, _, _ in INVERTED_INDEX_SOURCES:
+            deferred_index_sql.extend(
+                drop_secondary_indexes_for_bulk_load(con, table_name, rows_to_load=card_tags_scanned)
+            )
+
+    if copy_from_base:
+        _copy_base_inverted_rows(con, snapshot_id, taxonomy_version, str(base_snapshot_id))
+
+    if json1_available(con):
+        counts = _insert_inverted_rows_json1(con, snapshot_id, taxonomy_version, card_filter_sql)
+    else:
+        counts = _insert_inverted_rows_python(con, snapshot_id, taxonomy_version, card_filter_sql)
+
+    for index_sql in deferred_index_sql:
+        con.execute(index_sql)
+    if oracle_ids is not None:
+        con.execute("DROP TABLE temp.index_build_oracle_ids")
+
+    if _table_exists(con, "inverted_index_builds_v1"):
+        con.execute(
             """
-            INSERT OR REPLACE INTO equiv_to_cards (
-              equiv_id,
-              oracle_id,
-              snapshot_id,
-              taxonomy_version
-            ) VALUES (?, ?, ?, ?)
+            INSERT OR REPLACE INTO inverted_index_builds_v1 (snapshot_id, taxonomy_version, card_tags_created_at)
+            SELECT ?, ?, MAX(created_at) FROM card_tags WHERE snapshot_id = ? AND taxonomy_version = ?
             """,
-            equiv_rows,
+            (snapshot_id, taxonomy_version, snapshot_id, taxonomy_version),
         )
 
     return {
-        "card_tags_scanned": len(rows),
-        "primitive_to_cards_rows": len(primitive_rows),
-        "equiv_to_cards_rows": len(equiv_rows),
+        "card_tags_scanned": card_tags_scanned,
+        "primitive_to_cards_rows": counts["primitive_to_cards"],
+        "equiv_to_cards_rows": counts["equiv_to_cards"],
     }
 
 
-def build_indices(snapshot_id: str, taxonomy_version: str) -> Dict[str, Any]:
+def build_indices(
+    snapshot_id: str,
+    taxonomy_version: str,
+    oracle_ids: Iterable[str] | None = None,
+    base_snapshot_id: str | None = None,
+) -> Dict[str, Any]:
     with connect() as con:
         ensure_runtime_tag_indices(con)
         summary = rebuild_inverted_indices(
             con=con,
             snapshot_id=snapshot_id,
             taxonomy_version=taxonomy_version,
+            oracle_ids=oracle_ids,
+            base_snapshot_id=base_snapshot_id,
         )
         con.commit()
 
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from engine.color_identity_mask import (
+    COLOR_IDENTITY_MASK_COLUMN,
+    COLOR_IDENTITY_MASK_INDEX,
+    color_identity_mask_from_field,
+)
+from engine.db import resolve_db_path
+
+_BACKFILL_BATCH_SIZE = 5000
+
+
+def _nonempty_str(value: Any) -> str:
+    if isinstance(value, str):
+        token = value.strip()
+        if token != "":
+            return token
+    return ""
+
+
+def _resolve_db_path_from_cli(raw_db_path: Any) -> Path:
+    token = _nonempty_str(raw_db_path)
+    if token == "":
+        return resolve_db_path()
+
+    candidate = Path(token).expanduser()
+    if not candidate.is_absolute():
+        candidate = (Path.cwd() / candidate).resolve()
+    if not candidate.is_file():
+        raise RuntimeError(f"Database file not found: {candidate}")
+    return candidate
+
+
+def _load_cards_columns(con: sqlite3.Connection) -> List[str]:
+    rows = con.execute("PRAGMA table_info(cards)").fetchall()
+    columns: List[str] = []
+    for row in rows:
+        row_dict = dict(row) if isinstance(row, sqlite3.Row) else {}
+        name = row_dict.get("name")
+        if isinstance(name, str) and name != "":
+            columns.append(name)
+    return sorted(set(columns))
+
+
+def _backfill_masks(con: sqlite3.Connection, snapshot_id: str) -> Tuple[int, int]:
+    where_sql = f"{COLOR_IDENTITY_MASK_COLUMN} IS NULL"
+    params: Tuple[Any, ...] = ()
+    if snapshot_id != "":
+        where_sql = f"snapshot_id = ? AND {where_sql}"
+        params = (snapshot_id,)
+
+    rows = con.execute(
+        f"SELECT snapshot_id, oracle_id, color_identity FROM cards WHERE {where_sql} "
+        "ORDER BY snapshot_id ASC, oracle_id ASC",
+        params,
+    ).fetchall()
+
+    updates: List[Tuple[int, str, str]] = []
+    unavailable = 0
+    for row in rows:
+        mask = color_identity_mask_from_field(row["color_identity"])
+        if mask is None:
+            unavailable += 1
+            continue
+        updates.append((mask, row["snapshot_id"], row["oracle_id"]))
+
+    for start in range(0, len(updates), _BACKFILL_BATCH_SIZE):
+        con.executemany(
+            f"UPDATE cards SET {COLOR_IDENTITY_MASK_COLUMN} = ? WHERE snapshot_id = ? AND oracle_id = ?",
+            updates[start : start + _BACKFILL_BATCH_SIZE],
+        )
+    return len(updates), unavailable
+
+
+def ensure_cards_color_identity_mask(*, db_path: Path, snapshot_id: str = "") -> Dict[str, Any]:
+    con = sqlite3.connect(str(db_path))
+    con.row_factory = sqlite3.Row
+    try:
+        table_exists = con.execute(
+            "SELECT COUNT(1) FROM sqlite_master WHERE type = 'table' AND name = 'cards'"
+        ).fetchone()
+        if not table_exists or int(table_exists[0]) <= 0:
+            raise RuntimeError("cards table not found in target DB")
+
+        column_added = False
+        if COLOR_IDENTITY_MASK_COLUMN not in set(_load_cards_columns(con)):
+            con.execute(f"ALTER TABLE cards ADD COLUMN {COLOR_IDENTITY_MASK_COLUMN} INTEGER")
+            column_added = True
+
+        snapshot_token = _nonempty_str(snapshot_id)
+        rows_updated, rows_unavailable = _backfill_masks(con, snapshot_token)
+
+        con.execute(
+            f"CREATE INDEX IF NOT EXISTS {COLOR_IDENTITY_MASK_INDEX} "
+            f"ON cards(snapshot_id, {COLOR_IDENTITY_MASK_COLUMN})"
+        )
+        con.commit()
+
+        return {
+            "db_path": str(db_path),
+            "snapshot_id": snapshot_token or None,
+            "column_added": column_added,
+            "rows_updated": rows_updated,
+            "rows_unavailable": rows_unavailable,
+        }
+    finally:
+        con.close()
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Materialize cards.color_identity_mask (W=1,U=2,B=4,R=8,G=16)")
+    parser.add_argument("--db", default="", help="Path to SQLite DB (defaults to MTG_ENGINE_DB_PATH / ./data/mtg.sqlite)")
+    parser.add_argument("--snapshot_id", default="", help="Optional snapshot id; defaults to every snapshot")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = _build_arg_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        db_path = _resolve_db_path_from_cli(args.db)
+        summary = ensure_cards_color_identity_mask(db_path=db_path, snapshot_id=args.snapshot_id)
+    except RuntimeError as exc:
+        print(f"ERROR: {exc}")
+        return 2
+    except Exception as exc:
+        print(f"ERROR: unexpected failure: {exc}")
+        return 2
+
+    print(
+        "cards color_identity_mask ready | "
+        f"db={summary.get('db_path')} column_added={summary.get('column_added')} "
+        f"rows_updated={summary.get('rows_updated')} rows_unavailable={summary.get('rows_unavailable')}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -11,7 +11,7 @@ import urllib.parse
 import urllib.request
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from engine.db import resolve_db_path
 from engine.image_cache_contract import (
@@ -24,6 +24,13 @@ from engine.image_cache_contract import (
     normalize_oracle_id,
     resolve_local_image_path,
 )
+from engine.image_pack import ImagePackWriter
+from snapshot_build.image_download_async import (
+    ASYNC_DOWNLOAD_AVAILABLE,
+    DEFAULT_MAX_CONCURRENCY,
+    download_items_async,
+)
+from snapshot_build.snapshot_diff_ingest import load_snapshot_changes
 
 IMAGE_URI_COLUMNS: Sequence[str] = (
     "image_uri",
@@ -40,12 +47,16 @@ CARD_IMAGES_URI_BY_SIZE: Dict[str, str] = {
 }
 
 PREFETCH_SOURCE_MODES = {"auto", "card_images", "legacy"}
+PREFETCH_LAYOUTS = {"files", "pack"}
+PREFETCH_ENGINES = {"auto", "async", "threads"}
 
 DEFAULT_LIMIT = 0
 DEFAULT_RATE_LIMIT_PER_SEC = 10.0
 DEFAULT_TIMEOUT_SECONDS = 20.0
 DEFAULT_WORKERS = 4
+DEFAULT_ASYNC_MAX_WORKERS = DEFAULT_MAX_CONCURRENCY
 DEFAULT_PROGRESS_EVERY = 100
+PARTIAL_DOWNLOAD_DIR = ".partial"
 
 
 def _nonempty_str(value: Any) -> str:
@@ -420,18 +431,18 @@ class _GlobalRateLimiter:
             time.sleep(wait_seconds)
 
 
-def _download_plan_item(
+def _precheck_plan_item(
     *,
     out_dir: Path,
     oracle_id: str,
     size: str,
     image_url: str,
     resume: bool,
-    timeout_seconds: float,
-    rate_limiter: _GlobalRateLimiter,
-    download_fn: Callable[[str, float], bytes],
-) -> Tuple[str, str]:
+    pack_writer: Optional[ImagePackWriter],
+) -> Tuple[str, str] | None:
     if resume:
+        if pack_writer is not None and pack_writer.contains(oracle_id):
+            return "SKIP", "already packed"
         existing_path = resolve_local_image_path(
             cache_root=str(out_dir),
             oracle_id=oracle_id,
@@ -443,6 +454,63 @@ def _download_plan_item(
     url_lower = image_url.lower()
     if not (url_lower.startswith("http://") or url_lower.startswith("https://")):
         return "FAIL", "unsupported URL scheme"
+    return None
+
+
+def _partial_download_path(*, out_dir: Path, oracle_id: str, size: str) -> Path:
+    return out_dir / PARTIAL_DOWNLOAD_DIR / size / f"{oracle_id}.part"
+
+
+def _commit_downloaded_file(
+    *,
+    out_dir: Path,
+    oracle_id: str,
+    size: str,
+    image_url: str,
+    temp_path: Path,
+    pack_writer: Optional[ImagePackWriter],
+) -> str:
+    with temp_path.open("rb") as file_obj:
+        head = file_obj.read(16)
+    extension = _resolve_target_extension(image_url=image_url, payload=head)
+    if pack_writer is not None:
+        record = pack_writer.append(oracle_id, extension, temp_path.read_bytes())
+        temp_path.unlink()
+        return f"{pack_writer.data_path}@{record.offset}+{record.length}"
+
+    ensure_size_dir(cache_root=str(out_dir), size=size)
+    target_path = _target_image_path(
+        out_dir=out_dir,
+        size=size,
+        oracle_id=oracle_id,
+        extension=extension,
+    )
+    os.replace(temp_path, target_path)
+    return str(target_path)
+
+
+def _download_plan_item(
+    *,
+    out_dir: Path,
+    oracle_id: str,
+    size: str,
+    image_url: str,
+    resume: bool,
+    timeout_seconds: float,
+    rate_limiter: _GlobalRateLimiter,
+    download_fn: Callable[[str, float], bytes],
+    pack_writer: Optional[ImagePackWriter] = None,
+) -> Tuple[str, str]:
+    precheck = _precheck_plan_item(
+        out_dir=out_dir,
+        oracle_id=oracle_id,
+        size=size,
+        image_url=image_url,
+        resume=resume,
+        pack_writer=pack_writer,
+    )
+    if precheck is not None:
+        return precheck
 
     try:
         rate_limiter.wait_turn()
@@ -452,6 +520,10 @@ def _download_plan_item(
 
         normalized_payload = bytes(payload)
         extension = _resolve_target_extension(image_url=image_url, payload=normalized_payload)
+        if pack_writer is not None:
+            record = pack_writer.append(oracle_id, extension, normalized_payload)
+            return "OK", f"{pack_writer.data_path}@{record.offset}+{record.length}"
+
         ensure_size_dir(cache_root=str(out_dir), size=size)
         target_path = _target_image_path(
             out_dir=out_dir,
@@ -479,6 +551,10 @@ def prefetch_card_images(
     timeout_seconds: float,
     source_mode: str = "auto",
     download_fn: Callable[[str, float], bytes] = _download_bytes,
+    layout: str = "files",
+    engine: str = "auto",
+    max_workers: int = DEFAULT_ASYNC_MAX_WORKERS,
+    changes_only: bool = False,
 ) -> Dict[str, Any]:
     normalized_snapshot_id = _nonempty_str(snapshot_id)
     if normalized_snapshot_id == "":
@@ -490,6 +566,22 @@ def prefetch_card_images(
     if normalized_source_mode not in PREFETCH_SOURCE_MODES:
         allowed = ",".join(sorted(PREFETCH_SOURCE_MODES))
         raise RuntimeError(f"Invalid source mode '{source_mode}'. Allowed: {allowed}")
+    normalized_layout = _nonempty_str(layout).lower() or "files"
+    if normalized_layout not in PREFETCH_LAYOUTS:
+        allowed = ",".join(sorted(PREFETCH_LAYOUTS))
+        raise RuntimeError(f"Invalid layout '{layout}'. Allowed: {allowed}")
+    normalized_engine = _nonempty_str(engine).lower() or "auto"
+    if normalized_engine not in PREFETCH_ENGINES:
+        allowed = ",".join(sorted(PREFETCH_ENGINES))
+        raise RuntimeError(f"Invalid engine '{engine}'. Allowed: {allowed}")
+    if normalized_engine == "async" and not ASYNC_DOWNLOAD_AVAILABLE:
+        raise RuntimeError("--engine async requires httpx (pip install httpx)")
+    if normalized_engine == "async" and download_fn is not _download_bytes:
+        raise RuntimeError("--engine async downloads over its own connection pool; download_fn is threads-only")
+    selected_engine = normalized_engine
+    if normalized_engine == "auto":
+        # A caller-supplied download_fn only plugs into the thread engine.
+        selected_engine = "async" if ASYNC_DOWNLOAD_AVAILABLE and download_fn is _download_bytes else "threads"
 
     selected_source_mode = normalized_source_mode
     if normalized_source_mode == "card_images":
@@ -523,6 +615,19 @@ def prefetch_card_images(
                 sizes=normalized_sizes,
                 limit=limit,
             )
+    if changes_only:
+        con = sqlite3.connect(str(db_path))
+        try:
+            changed_oracle_ids = load_snapshot_changes(con, normalized_snapshot_id)
+        finally:
+            con.close()
+        if changed_oracle_ids is None:
+            raise RuntimeError(
+                f"Snapshot {normalized_snapshot_id} has no change manifest; ingest it with --incremental "
+                "or run prefetch without --changes_only"
+            )
+        changed_oracle_id_set = set(changed_oracle_ids)
+        plan = [item for item in plan if item[0] in changed_oracle_id_set]
     planned_cards = len({oracle_id for oracle_id, _, _ in plan})
     safe_workers = max(int(workers), 1)
     safe_progress_every = max(int(progress_every), 0)
@@ -537,59 +642,124 @@ def prefetch_card_images(
     )
     print(
         f"Prefetch plan | snapshot_id={normalized_snapshot_id} source={selected_source_mode} sizes={','.join(normalized_sizes)} "
-        f"cards={planned_cards} images={len(plan)} out={target_out_dir} workers={safe_workers} resume={resume}"
+        f"cards={planned_cards} images={len(plan)} out={target_out_dir} workers={safe_workers} resume={resume} "
+        f"layout={normalized_layout} engine={selected_engine}"
     )
 
-    rate_limiter = _GlobalRateLimiter(rate_limit_per_sec)
+    pack_writers: Dict[str, ImagePackWriter] = {}
+    if normalized_layout == "pack":
+        pack_writers = {size: ImagePackWriter(target_out_dir, size) for size in normalized_sizes}
+
+    images_remaining_by_card: Dict[str, int] = {}
+    for oracle_id, _, _ in plan:
+        images_remaining_by_card[oracle_id] = images_remaining_by_card.get(oracle_id, 0) + 1
+    processed = 0
+    completed_cards = 0
+
+    def _report(status: str, oracle_id: str, size: str, details: str) -> None:
+        nonlocal processed, completed_cards, downloaded, skipped, failed
+        processed += 1
+        images_remaining_by_card[oracle_id] -= 1
+        card_completed = images_remaining_by_card[oracle_id] == 0
+        if card_completed:
+            completed_cards += 1
+
+        if status == "OK":
+            downloaded += 1
+            print(f"[{processed}/{len(plan)}] OK {oracle_id} [{size}] -> {details}")
+        elif status == "SKIP":
+            skipped += 1
+            print(f"[{processed}/{len(plan)}] SKIP {oracle_id} [{size}] ({details})")
+        else:
+            failed += 1
+            print(f"[{processed}/{len(plan)}] FAIL {oracle_id} [{size}] ({details})")
+
+        if safe_progress_every > 0 and (
+            (card_completed and completed_cards % safe_progress_every == 0) or processed == len(plan)
+        ):
+            print(
+                "Progress | "
+                f"cards={completed_cards}/{planned_cards} images={processed}/{len(plan)} "
+                f"downloaded={downloaded} skipped={skipped} failed={failed}"
+            )
 
-    def _run_plan_item(item: Tuple[str, str, str]) -> Tuple[str, str, str, str]:
-        oracle_id, size, image_url = item
-        status, details = _download_plan_item(
-            out_dir=target_out_dir,
-            oracle_id=oracle_id,
-            size=size,
-            image_url=image_url,
-            resume=resume,
-            timeout_seconds=timeout_seconds,
-            rate_limiter=rate_limiter,
-            download_fn=download_fn,
-        )
-        return status, oracle_id, size, details
-
-    with ThreadPoolExecutor(max_workers=safe_workers) as executor:
-        completed_cards = 0
-        last_oracle_id = ""
-        for index, result in enumerate(executor.map(_run_plan_item, plan), start=1):
-            status, oracle_id, size, details = result
-
-            if oracle_id != last_oracle_id:
-                completed_cards += 1
-                last_oracle_id = oracle_id
-
-            if status == "OK":
-                downloaded += 1
-                print(f"[{index}/{len(plan)}] OK {oracle_id} [{size}] -> {details}")
-            elif status == "SKIP":
-                skipped += 1
-                print(f"[{index}/{len(plan)}] SKIP {oracle_id} [{size}] ({details})")
-            else:
-                failed += 1
-                print(f"[{index}/{len(plan)}] FAIL {oracle_id} [{size}] ({details})")
-
-            if safe_progress_every > 0 and (
-                completed_cards % safe_progress_every == 0 or index == len(plan)
-            ):
+    try:
+        async_stats: Dict[str, Any] = {}
+        if selected_engine == "async":
+            to_download: List[Tuple[str, str, str]] = []
+            for oracle_id, size, image_url in plan:
+                precheck = _precheck_plan_item(
+                    out_dir=target_out_dir,
+                    oracle_id=oracle_id,
+                    size=size,
+                    image_url=image_url,
+                    resume=resume,
+                    pack_writer=pack_writers.get(size),
+                )
+                if precheck is not None:
+                    _report(precheck[0], oracle_id, size, precheck[1])
+                else:
+                    to_download.append((oracle_id, size, image_url))
+
+            if to_download:
+                async_stats = download_items_async(
+                    to_download,
+                    temp_path_for=lambda oracle_id, size: _partial_download_path(
+                        out_dir=target_out_dir, oracle_id=oracle_id, size=size
+                    ),
+                    finalize=lambda oracle_id, size, image_url, temp_path: _commit_downloaded_file(
+                        out_dir=target_out_dir,
+                        oracle_id=oracle_id,
+                        size=size,
+                        image_url=image_url,
+                        temp_path=temp_path,
+                        pack_writer=pack_writers.get(size),
+                    ),
+                    on_result=_report,
+                    timeout_seconds=timeout_seconds,
+                    rate_limit_per_sec=rate_limit_per_sec,
+                    initial_concurrency=safe_workers,
+                    max_concurrency=max(int(max_workers), safe_workers),
+                )
                 print(
-                    "Progress | "
-                    f"cards={completed_cards}/{planned_cards} images={index}/{len(plan)} "
-                    f"downloaded={downloaded} skipped={skipped} failed={failed}"
+                    "Async download | "
+                    f"requests={async_stats['requests']} retries={async_stats['retries']} "
+                    f"throttled={async_stats['throttled']} peak_concurrency={async_stats['peak_concurrency']} "
+                    f"final_concurrency={async_stats['final_concurrency']}"
+                )
+        else:
+            rate_limiter = _GlobalRateLimiter(rate_limit_per_sec)
+
+            def _run_plan_item(item: Tuple[str, str, str]) -> Tuple[str, str, str, str]:
+                oracle_id, size, image_url = item
+                status, details = _download_plan_item(
+                    out_dir=target_out_dir,
+                    oracle_id=oracle_id,
+                    size=size,
+                    image_url=image_url,
+                    resume=resume,
+                    timeout_seconds=timeout_seconds,
+                    rate_limiter=rate_limiter,
+                    download_fn=download_fn,
+                    pack_writer=pack_writers.get(size),
                 )
+                return status, oracle_id, size, details
+
+            with ThreadPoolExecutor(max_workers=safe_workers) as executor:
+                for result in executor.map(_run_plan_item, plan):
+                    _report(*result)
+    finally:
+        # Publishes the last batch of packed images to readers.
+        for pack_writer in pack_writers.values():
+            pack_writer.close()
 
     summary = {
         "planned": len(plan),
         "planned_images": len(plan),
         "planned_cards": planned_cards,
         "source_mode": selected_source_mode,
+        "layout": normalized_layout,
+        "engine": selected_engine,
         "downloaded": downloaded,
         "skipped": skipped,
         "failed": failed,
@@ -613,10 +783,38 @@ def _build_arg_parser() -> argparse.ArgumentParser:
         help="Image URL source mode: auto (prefer card_images), card_images, or legacy cards metadata",
     )
     parser.add_argument("--out", default="./data/card_images", help="Output cache root directory")
+    parser.add_argument(
+        "--layout",
+        default="files",
+        choices=sorted(PREFETCH_LAYOUTS),
+        help="Cache layout: one file per card (files) or one append-only pack per size with an offset index (pack)",
+    )
     parser.add_argument("--sizes", default="normal", help="Comma-separated image sizes (normal,small)")
     parser.add_argument("--size", default="", help=argparse.SUPPRESS)
     parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Max cards to prefetch (<=0 means no limit; default: full snapshot)")
-    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent download workers")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Concurrent download workers (async engine: starting concurrency)",
+    )
+    parser.add_argument(
+        "--engine",
+        default="auto",
+        choices=sorted(PREFETCH_ENGINES),
+        help="Download engine: async keep-alive pool with adaptive concurrency (needs httpx), threads, or auto",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=DEFAULT_ASYNC_MAX_WORKERS,
+        help="Upper bound the async engine may grow concurrency to",
+    )
+    parser.add_argument(
+        "--changes_only",
+        action="store_true",
+        help="Only prefetch cards added or changed in this snapshot's incremental-ingest change manifest",
+    )
     resume_group = parser.add_mutually_exclusive_group()
     resume_group.add_argument("--resume", dest="resume", action="store_true", help="Skip files already cached (default)")
     resume_group.add_argument("--no-resume", dest="resume", action="store_false", help="Redownload even if cached")
@@ -658,6 +856,10 @@ def main(argv: Sequence[str] | None = None) -> int:
             rate_limit_per_sec=float(args.rate_limit),
             timeout_seconds=float(args.timeout),
             source_mode=args.source,
+            layout=args.layout,
+            engine=args.engine,
+            max_workers=int(args.max_workers),
+            changes_only=bool(args.changes_only),
         )
     except RuntimeError as exc:
         print(f"ERROR: {exc}")
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import multiprocessing
+import sys
+import time
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Pattern, Sequence, Tuple
+
+from engine.determinism import stable_json_dumps
+
+from .rule_matcher import RULE_FIELDS, RuleMatcher, regex_backtracking_risks
+from .tag_snapshot import CompiledRule, _fetch_snapshot_cards, _normalize_text, load_compiled_pack
+
+VERSION = "profile_taxonomy_rules_v1"
+
+DEFAULT_SAMPLE_SIZE = 2000
+WORST_INPUTS_PER_RULE = 3
+SNIPPET_MAX_CHARS = 120
+DEFAULT_RULE_TIMEOUT_SECONDS = 10.0
+
+# (oracle_id, field, text, lowered text, rule indexes the prefilter keeps for this text)
+ProfileText = Tuple[str, str, str, str, FrozenSet[int]]
+
+
+def _rule_fields(rule: CompiledRule) -> Tuple[str, ...]:
+    if rule.field == "both":
+        return RULE_FIELDS
+    if rule.field == "type_line":
+        return ("type_line",)
+    return ("oracle_text",)
+
+
+def sample_cards(cards: Sequence[Dict[str, Any]], sample_size: int) -> List[Dict[str, Any]]:
+    """Deterministic evenly strided sample; sample_size <= 0 keeps every card."""
+    if sample_size <= 0 or len(cards) <= sample_size:
+        return list(cards)
+    stride = len(cards) / float(sample_size)
+    return [cards[int(idx * stride)] for idx in range(sample_size)]
+
+
+def _profile_texts(cards: Sequence[Dict[str, Any]], matcher: RuleMatcher) -> List[ProfileText]:
+    texts: List[ProfileText] = []
+    for card in cards:
+        oracle_id = str(card.get("oracle_id") or "")
+        for field_name in RULE_FIELDS:
+            text = _normalize_text(card.get(field_name))
+            if text == "":
+                continue
+            candidates = frozenset(matcher.regex_candidates(field_name, text))
+            texts.append((oracle_id, field_name, text, text.lower(), candidates))
+    return texts
+
+
+def _time_rule(
+    rule_index: int,
+    rule: CompiledRule,
+    pattern: Pattern[str] | None,
+    texts: Sequence[ProfileText],
+) -> Dict[str, Any]:
+    evaluations = 0
+    candidate_evaluations = 0
+    hits = 0
+    total_ns = 0
+    worst: List[Tuple[int, str, str, str]] = []
+    if rule.match_mode != "regex" or pattern is not None:
+        fields = _rule_fields(rule)
+        needle = rule.pattern.lower()
+        for oracle_id, field_name, text, lowered, candidates in texts:
+            if field_name not in fields:
+                continue
+            started = time.perf_counter_ns()
+            if pattern is not None:
+                hit = pattern.search(text) is not None
+            else:
+                hit = lowered.find(needle) >= 0
+            elapsed_ns = time.perf_counter_ns() - started
+
+            evaluations += 1
+            hits += 1 if hit else 0
+            total_ns += elapsed_ns
+            if pattern is None or rule_index in candidates:
+                candidate_evaluations += 1
+            entry = (elapsed_ns, oracle_id, field_name, text[:SNIPPET_MAX_CHARS])
+            if len(worst) < WORST_INPUTS_PER_RULE:
+                heapq.heappush(worst, entry)
+            elif entry > worst[0]:
+                heapq.heapreplace(worst, entry)
+
+    return {
+        "evaluations": evaluations,
+        "candidate_evaluations": candidate_evaluations,
+        "hits": hits,
+        "total_ns": total_ns,
+        "worst": sorted(worst, reverse=True),
+    }
+
+
+def _profile_rules_worker(
+    connection: Connection,
+    compiled_rules: Sequence[CompiledRule],
+    matcher: RuleMatcher,
+    cards: Sequence[Dict[str, Any]],
+    start_index: int,
+) -> None:
+    texts = _profile_texts(cards, matcher)
+    connection.send(None)
+    for rule_index in range(start_index, len(compiled_rules)):
+        pattern = matcher.compiled_pattern(rule_index)
+        connection.send((rule_index, _time_rule(rule_index, compiled_rules[rule_index], pattern, texts)))
+    connection.close()
+
+
+def _time_rules_in_worker(
+    compiled_rules: Sequence[CompiledRule],
+    matcher: RuleMatcher,
+    cards: Sequence[Dict[str, Any]],
+    rule_timeout_seconds: float,
+) -> List[Dict[str, Any] | None]:
+    """Per-rule stats from a killable worker process; None marks a rule that timed out.
+
+    A rule still running after rule_timeout_seconds cannot be interrupted
+    inside re, so its worker is killed and a fresh one resumes at the next rule.
+    """
+    stats: List[Dict[str, Any] | None] = [None] * len(compiled_rules)
+    next_index = 0
+    while next_index < len(compiled_rules):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        worker = multiprocessing.Process(
+            target=_profile_rules_worker,
+            args=(sender, compiled_rules, matcher, cards, next_index),
+            daemon=True,
+        )
+        worker.start()
+        sender.close()
+        worker_failed = False
+        try:
+            receiver.recv()
+            while next_index < len(compiled_rules):
+                if not receiver.poll(rule_timeout_seconds):
+                    next_index += 1
+                    break
+                rule_index, rule_stats = receiver.recv()
+                stats[rule_index] = rule_stats
+                next_index = rule_index + 1
+        except EOFError:
+            worker_failed = True
+        finally:
+            if worker.is_alive():
+                worker.kill()
+            worker.join()
+            receiver.close()
+        if worker_failed:
+            raise RuntimeError(
+                f"rule profile worker exited with code {worker.exitcode} before rule {compiled_rules[next_index].rule_id}"
+            )
+    return stats
+
+
+def profile_rules(
+    compiled_rules: Sequence[CompiledRule],
+    cards: Sequence[Dict[str, Any]],
+    matcher: RuleMatcher | None = None,
+    rule_timeout_seconds: float | None = DEFAULT_RULE_TIMEOUT_SECONDS,
+) -> List[Dict[str, Any]]:
+    """Time every rule on every card text it targets, without the RuleMatcher prefilter.
+
+    candidate_evaluations counts the texts the prefilter would still hand to a
+    regex in tag_snapshot; evaluations/total_ms is the rule's unfiltered cost,
+    which is what a pathological pattern multiplies.
+
+    Rules run in a worker process. A rule that has not finished the whole
+    sample within rule_timeout_seconds is reported as timed_out (total_ms is
+    then the timeout, a lower bound). rule_timeout_seconds=None times every
+    rule in this process without a limit.
+    """
+    if matcher is None:
+        matcher = RuleMatcher(compiled_rules)
+    if rule_timeout_seconds is None:
+        texts = _profile_texts(cards, matcher)
+        stats: List[Dict[str, Any] | None] = [
+            _time_rule(rule_index, rule, matcher.compiled_pattern(rule_index), texts)
+            for rule_index, rule in enumerate(compiled_rules)
+        ]
+    else:
+        stats = _time_rules_in_worker(compiled_rules, matcher, cards, float(rule_timeout_seconds))
+
+    profiles: List[Dict[str, Any]] = []
+    for rule_index, rule in enumerate(compiled_rules):
+        rule_stats = stats[rule_index]
+        timed_out = rule_stats is None
+        if rule_stats is None:
+            rule_stats = {
+                "evaluations": 0,
+                "candidate_evaluations": 0,
+                "hits": 0,
+                "total_ns": int(float(rule_timeout_seconds or 0.0) * 1e9),
+                "worst": [],
+            }
+        evaluations = rule_stats["evaluations"]
+        total_ns = rule_stats["total_ns"]
+        worst_inputs = rule_stats["worst"]
+        profiles.append(
+            {
+                "rule_id": rule.rule_id,
+                "primitive_id": rule.primitive_id,
+                "match_mode": rule.match_mode,
+                "field": rule.field,
+                "pattern": rule.pattern,
+                "timed_out": timed_out,
+                "evaluations": evaluations,
+                "candidate_evaluations": rule_stats["candidate_evaluations"],
+                "hits": rule_stats["hits"],
+                "total_ms": round(total_ns / 1e6, 3),
+                "mean_us": round(total_ns / 1e3 / evaluations, 3) if evaluations else 0.0,
+                "max_ms": round(worst_inputs[0][0] / 1e6, 3) if worst_inputs else 0.0,
+                "worst_inputs": [
+                    {"oracle_id": oracle_id, "field": field_name, "ms": round(elapsed_ns / 1e6, 3), "text": text}
+                    for elapsed_ns, oracle_id, field_name, text in worst_inputs
+                ],
+                "backtracking_risks": regex_backtracking_risks(rule.pattern) if rule.match_mode == "regex" else [],
+            }
+        )
+
+    profiles.sort(key=lambda profile: (-float(profile["total_ms"]), str(profile["rule_id"])))
+    return profiles
+
+
+def rule_budget_violations(
+    profiles: Sequence[Dict[str, Any]],
+    budget_ms: float | None = None,
+    single_input_budget_ms: float | None = None,
+) -> List[str]:
+    violations: List[str] = []
+    for profile in profiles:
+        if profile.get("timed_out"):
+            violations.append(f"{profile['rule_id']}: did not finish the sample within {profile['total_ms']} ms")
+            continue
+        if budget_ms is not None and float(profile["total_ms"]) > float(budget_ms):
+            violations.append(
+                f"{profile['rule_id']}: {profile['total_ms']} ms over the sample exceeds budget {budget_ms} ms"
+            )
+        if single_input_budget_ms is not None and float(profile["max_ms"]) > float(single_input_budget_ms):
+            violations.append(
+                f"{profile['rule_id']}: {profile['max_ms']} ms on one input exceeds budget {single_input_budget_ms} ms"
+            )
+    return violations
+
+
+def build_rule_profile_report(
+    *,
+    snapshot_id: str,
+    taxonomy_pack_folder: str,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    budget_ms: float | None = None,
+    single_input_budget_ms: float | None = None,
+    rule_timeout_seconds: float | None = DEFAULT_RULE_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    compiled_pack = load_compiled_pack(taxonomy_pack_folder)
+    taxonomy_pack = compiled_pack.pack
+    cards = sample_cards(_fetch_snapshot_cards(snapshot_id=snapshot_id), sample_size)
+
+    started = time.perf_counter()
+    profiles = profile_rules(compiled_pack.rules, cards, compiled_pack.matcher, rule_timeout_seconds)
+    elapsed = time.perf_counter() - started
+    violations = rule_budget_violations(profiles, budget_ms, single_input_budget_ms)
+
+    return {
+        "version": VERSION,
+        "snapshot_id": snapshot_id,
+        "taxonomy_version": taxonomy_pack.taxonomy_version,
+        "ruleset_version": taxonomy_pack.ruleset_version,
+        "cards_sampled": len(cards),
+        "rules_profiled": len(profiles),
+        "profile_seconds": round(elapsed, 3),
+        "budget_ms": budget_ms,
+        "single_input_budget_ms": single_input_budget_ms,
+        "rule_timeout_seconds": rule_timeout_seconds,
+        "budget_violations": violations,
+        "timed_out_rules": [profile["rule_id"] for profile in profiles if profile["timed_out"]],
+        "flagged_rules": [profile["rule_id"] for profile in profiles if profile["backtracking_risks"]],
+        "rules": profiles,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Per-rule match cost profile of a taxonomy pack over a snapshot sample")
+    ap.add_argument("--snapshot_id", required=True, help="Snapshot id from cards.snapshot_id")
+    ap.add_argument("--taxonomy_pack", required=True, help="Path to taxonomy pack folder")
+    ap.add_argument(
+        "--sample",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        help=f"Cards to profile, evenly strided over the snapshot; 0 = all (default {DEFAULT_SAMPLE_SIZE})",
+    )
+    ap.add_argument("--budget_ms", type=float, default=None, help="Fail when one rule's total time over the sample exceeds this")
+    ap.add_argument(
+        "--single_input_budget_ms",
+        type=float,
+        default=None,
+        help="Fail when one rule takes longer than this on a single card text",
+    )
+    ap.add_argument(
+        "--rule_timeout_seconds",
+        type=float,
+        default=DEFAULT_RULE_TIMEOUT_SECONDS,
+        help=f"Kill and report a rule still running over the sample after this long; 0 = no limit (default {DEFAULT_RULE_TIMEOUT_SECONDS})",
+    )
+    ap.add_argument("--out", default=None, help="Optional output JSON file path")
+    args = ap.parse_args()
+
+    report = build_rule_profile_report(
+        snapshot_id=args.snapshot_id,
+        taxonomy_pack_folder=args.taxonomy_pack,
+        sample_size=args.sample,
+        budget_ms=args.budget_ms,
+        single_input_budget_ms=args.single_input_budget_ms,
+        rule_timeout_seconds=args.rule_timeout_seconds if args.rule_timeout_seconds > 0 else None,
+    )
+    serialized = stable_json_dumps(report)
+    if isinstance(args.out, str) and args.out.strip() != "":
+        target = Path(args.out).expanduser().resolve()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(serialized, encoding="utf-8")
+    print(serialized)
+
+    for violation in report["budget_violations"]:
+        print(f"ERROR: rule budget exceeded: {violation}", file=sys.stderr)
+    return 1 if report["budget_violations"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import re
+import string
+import sys
+from collections import deque
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:  # Python 3.11+
+    from re import _constants as _sre_constants
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants as _sre_constants  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+SNIPPET_MAX_CHARS = 120
+RULE_FIELDS: Tuple[str, ...] = ("oracle_text", "type_line")
+
+# (start, end, snippet) of the first match of one rule on one text.
+RuleSpan = Tuple[int, int, str]
+
+# Overlapping unbounded repeats in one sequence from which an unanchored search
+# turns polynomial enough to notice, e.g. .*a.*b.*c or \w+\s*\w+\s*\w+.
+STACKED_REPEAT_LIMIT = 3
+# A bounded repeat this large around an unbounded one, e.g. (.*a){10}, backtracks
+# like an unbounded nesting on realistic card text.
+NESTED_REPEAT_MAX_LIMIT = 10
+
+_REPEAT_OPS = tuple(
+    op
+    for op in (
+        getattr(_sre_constants, "MAX_REPEAT", None),
+        getattr(_sre_constants, "MIN_REPEAT", None),
+        getattr(_sre_constants, "POSSESSIVE_REPEAT", None),
+    )
+    if op is not None
+)
+_ATOMIC_GROUP = getattr(_sre_constants, "ATOMIC_GROUP", None)
+
+_fold_table: Dict[int, int] | None = None
+
+
+def _ascii_fold_table() -> Dict[int, int]:
+    """str.translate table mapping every char that re.IGNORECASE-matches an ASCII letter to that letter.
+
+    Folding both sides this way keeps the required-literal prefilter exact for
+    case-insensitive regexes, including the few non-ASCII equivalents
+    (e.g. KELVIN SIGN, LATIN SMALL LETTER LONG S) that str.lower() misses.
+    """
+    global _fold_table
+    if _fold_table is None:
+        table = {ord(upper): ord(upper.lower()) for upper in string.ascii_uppercase}
+        non_ascii = "".join(map(chr, range(0x80, sys.maxunicode + 1)))
+        for char in set(re.compile("[a-z]", re.IGNORECASE).findall(non_ascii)):
+            for letter in string.ascii_lowercase:
+                if re.fullmatch(letter, char, re.IGNORECASE):
+                    table[ord(char)] = ord(letter)
+                    break
+        _fold_table = table
+    return _fold_table
+
+
+def _anchor_score(anchors: Tuple[str, ...]) -> int:
+    return min(len(anchor) for anchor in anchors)
+
+
+def _required_literals(items: Iterable[Tuple[Any, Any]]) -> Optional[Tuple[str, ...]]:
+    """ASCII substrings (case-folded) at least one of which occurs in every match of a parsed regex."""
+    best: Optional[Tuple[str, ...]] = None
+    run: List[str] = []
+
+    def _consider(candidate: Optional[Tuple[str, ...]]) -> None:
+        nonlocal best
+        if candidate and (best is None or _anchor_score(candidate) > _anchor_score(best)):
+            best = candidate
+
+    for op, av in items:
+        if op is _sre_constants.LITERAL and av < 0x80:
+            run.append(chr(av).lower())
+            continue
+        if run:
+            _consider(("".join(run),))
+            run = []
+        if op is _sre_constants.SUBPATTERN:
+            _consider(_required_literals(av[-1]))
+        elif op in _REPEAT_OPS and int(av[0]) >= 1:
+            _consider(_required_literals(av[2]))
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            _consider(_required_literals(av))
+        elif op is _sre_constants.BRANCH:
+            alternatives = [_required_literals(branch) for branch in av[1]]
+            if alternatives and all(alternatives):
+                _consider(tuple(sorted({anchor for alternative in alternatives for anchor in alternative or ()})))
+    if run:
+        _consider(("".join(run),))
+    return best
+
+
+def regex_required_literals(pattern: str) -> Optional[Tuple[str, ...]]:
+    """Prefilter anchors for a re.IGNORECASE regex, or None when it has no required literal."""
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE)
+    except (re.error, RecursionError):
+        return None
+    return _required_literals(parsed)
+
+
+def _is_unbounded(av: Any) -> bool:
+    return int(av[1]) == int(_sre_constants.MAXREPEAT)
+
+
+def _group_body(op: Any, av: Any) -> Any:
+    if op is _sre_constants.SUBPATTERN:
+        return av[-1]
+    if _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+        return av
+    return None
+
+
+def _contains_unbounded_repeat(items: Iterable[Tuple[Any, Any]]) -> bool:
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            if _is_unbounded(av) or _contains_unbounded_repeat(av[2]):
+                return True
+        elif op is _sre_constants.BRANCH:
+            if any(_contains_unbounded_repeat(branch) for branch in av[1]):
+                return True
+        else:
+            body = _group_body(op, av)
+            if body is not None and _contains_unbounded_repeat(body):
+                return True
+    return False
+
+
+_PROBE_CHARS: FrozenSet[str] = frozenset(string.printable)
+_CATEGORY_PROBES: Dict[Any, FrozenSet[str]] = {
+    getattr(_sre_constants, name): frozenset(char for char in _PROBE_CHARS if re.match(probe, char))
+    for name, probe in (
+        ("CATEGORY_DIGIT", r"\d"),
+        ("CATEGORY_NOT_DIGIT", r"\D"),
+        ("CATEGORY_SPACE", r"\s"),
+        ("CATEGORY_NOT_SPACE", r"\S"),
+        ("CATEGORY_WORD", r"\w"),
+        ("CATEGORY_NOT_WORD", r"\W"),
+    )
+}
+
+
+def _folded(code: int) -> FrozenSet[str]:
+    char = chr(code)
+    return frozenset((char.lower(), char.upper())) & _PROBE_CHARS
+
+
+def _element_chars(op: Any, av: Any) -> Optional[FrozenSet[str]]:
+    """Printable-ASCII characters one single-character element matches; None when it is not one."""
+    if op is _sre_constants.ANY:
+        return _PROBE_CHARS - {"\n"}
+    if op is _sre_constants.LITERAL:
+        return _folded(av)
+    if op is _sre_constants.NOT_LITERAL:
+        return _PROBE_CHARS - _folded(av)
+    if op is not _sre_constants.IN:
+        return None
+    negate = False
+    out: Set[str] = set()
+    for item_op, item_av in av:
+        if item_op is _sre_constants.NEGATE:
+            negate = True
+        elif item_op is _sre_constants.LITERAL:
+            out |= _folded(item_av)
+        elif item_op is _sre_constants.RANGE:
+            for code in range(int(item_av[0]), min(int(item_av[1]), 0x7F) + 1):
+                out |= _folded(code)
+        elif item_op is _sre_constants.CATEGORY and item_av in _CATEGORY_PROBES:
+            out |= _CATEGORY_PROBES[item_av]
+        else:
+            return None
+    return _PROBE_CHARS - out if negate else frozenset(out)
+
+
+def _first_chars(items: Sequence[Tuple[Any, Any]]) -> Optional[FrozenSet[str]]:
+    """Characters a match of items can start with (case-folded, printable ASCII); None when unknown."""
+    out: Set[str] = set()
+    for op, av in items:
+        if op is _sre_constants.AT:
+            continue
+        optional = False
+        if op is _sre_constants.SUBPATTERN:
+            chars = _first_chars(av[-1])
+        elif op in _REPEAT_OPS:
+            chars = _first_chars(av[2])
+            optional = int(av[0]) == 0
+        elif op is _sre_constants.BRANCH:
+            branch_chars = [_first_chars(branch) for branch in av[1]]
+            chars = None if any(item is None for item in branch_chars) else frozenset().union(*branch_chars)
+        else:
+            chars = _element_chars(op, av)
+        if chars is None:
+            return None
+        out |= chars
+        if not optional:
+            return frozenset(out)
+    return None
+
+
+def _branches_overlap(branches: Sequence[Any]) -> bool:
+    seen: Set[str] = set()
+    for branch in branches:
+        chars = _first_chars(branch)
+        if chars is None or chars & seen:
+            return True
+        seen |= chars
+    return False
+
+
+def _alternation_in(items: Iterable[Tuple[Any, Any]]) -> List[Any]:
+    out: List[Any] = []
+    for op, av in items:
+        if op is _sre_constants.BRANCH:
+            out.append(av[1])
+        elif op is _sre_constants.SUBPATTERN:
+            out.extend(_alternation_in(av[-1]))
+    return out
+
+
+def _backtracking_risks(items: Iterable[Tuple[Any, Any]], risks: Set[str]) -> None:
+    # Unbounded repeats of one sequence that no mandatory, disjoint element
+    # separates; the text between two overlapping ones can be split either way.
+    run: List[FrozenSet[str]] = []
+    overlapping: Set[int] = set()
+
+    def close_run() -> None:
+        if len(overlapping) >= STACKED_REPEAT_LIMIT:
+            risks.add("stacked_repeats")
+        run.clear()
+        overlapping.clear()
+
+    for op, av in items:
+        if op is _sre_constants.AT:
+            continue
+        if op in _REPEAT_OPS:
+            body = av[2]
+            unbounded = _is_unbounded(av)
+            if (unbounded or int(av[1]) >= NESTED_REPEAT_MAX_LIMIT) and _contains_unbounded_repeat(body):
+                risks.add("nested_quantifier")
+            if unbounded and any(_branches_overlap(branches) for branches in _alternation_in(body)):
+                risks.add("overlapping_alternation_in_repeat")
+            _backtracking_risks(body, risks)
+            chars = _first_chars(body)
+            if unbounded and chars is not None:
+                for run_index, run_chars in enumerate(run):
+                    if chars & run_chars:
+                        overlapping.update((run_index, len(run)))
+                run.append(chars)
+                continue
+            if int(av[0]) == 0:
+                continue
+        else:
+            if op is _sre_constants.BRANCH:
+                for branch in av[1]:
+                    _backtracking_risks(branch, risks)
+            else:
+                body = _group_body(op, av)
+                if body is not None:
+                    _backtracking_risks(body, risks)
+            chars = _first_chars([(op, av)])
+        # A mandatory element only separates the run when the repeats before it cannot consume it.
+        if chars is None or not any(chars & run_chars for run_chars in run):
+            close_run()
+    close_run()
+
+
+def regex_backtracking_risks(pattern: str) -> List[str]:
+    """Sorted names of catastrophic-backtracking shapes in a re.IGNORECASE regex.
+
+    nested_quantifier: an unbounded (or NESTED_REPEAT_MAX_LIMIT+ bounded) repeat around
+    an unbounded repeat, e.g. (\\w+\\s?)+ or (.*a){10}.
+    overlapping_alternation_in_repeat: an unbounded repeat over alternatives that can
+    start with the same character, e.g. (a|ab)*.
+    stacked_repeats: STACKED_REPEAT_LIMIT or more unbounded repeats in one sequence whose
+    character sets overlap with no disjoint mandatory element between them,
+    e.g. .*a.*b.*c or \\w+\\s*\\w+\\s*\\w+.
+    Unparseable patterns report nothing; they never match anyway.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE)
+    except (re.error, RecursionError):
+        return []
+    risks: Set[str] = set()
+    _backtracking_risks(parsed, risks)
+    return sorted(risks)
+
+
+class _LiteralAutomaton:
+    """Aho-Corasick automaton reporting the first (leftmost) end offset of every key in one pass.
+
+    Failure links are folded into a full transition table at build time, so a
+    scan costs one dict lookup per character. Small key sets are cheaper to
+    probe with str.find (which runs in C), so those skip the automaton.
+    """
+
+    FIND_MAX_KEYS = 48
+
+    def __init__(self, keys: Sequence[str]) -> None:
+        self.keys = tuple(keys)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        for key_id, key in enumerate(self.keys):
+            state = 0
+            for char in key:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(())
+                    goto[state][char] = nxt
+                state = nxt
+            out[state] = out[state] + (key_id,)
+
+        # Breadth-first: a state's failure target is always shallower, so its
+        # transitions are complete by the time they are inherited.
+        delta: List[Dict[str, int]] = [dict(goto[0]) for _ in goto]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(char, 0) if state != 0 else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+                queue.append(nxt)
+
+        self._delta = delta
+        self._out = out
+
+    def first_ends(self, text: str) -> Dict[int, int]:
+        found: Dict[int, int] = {}
+        if len(self.keys) <= self.FIND_MAX_KEYS:
+            for key_id, key in enumerate(self.keys):
+                idx = text.find(key)
+                if idx >= 0:
+                    found[key_id] = idx + len(key)
+            return found
+
+        delta = self._delta
+        out = self._out
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            hits = out[state]
+            if hits:
+                for key_id in hits:
+                    if key_id not in found:
+                        found[key_id] = position + 1
+        return found
+
+
+class _FieldMatcher:
+    def __init__(self, rules: Sequence[Tuple[int, Any]], regex_anchors: Dict[str, Optional[Tuple[str, ...]]]) -> None:
+        key_ids: Dict[str, int] = {}
+        self.literal_rules: List[List[int]] = []
+        self.anchored_rules: List[List[int]] = []
+        self.unanchored_regex: List[int] = []
+        # Regexes whose anchors came from regex_anchors are already known to
+        # compile; they are compiled on first use instead of up front.
+        self.pattern_sources: Dict[int, str] = {}
+        self._patterns: Dict[int, re.Pattern[str]] = {}
+
+        def _key_id(key: str) -> int:
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = len(key_ids)
+                key_ids[key] = key_id
+                self.literal_rules.append([])
+                self.anchored_rules.append([])
+            return key_id
+
+        for rule_index, rule in rules:
+            if rule.match_mode == "regex":
+                if rule.pattern not in regex_anchors:
+                    try:
+                        self._patterns[rule_index] = re.compile(rule.pattern, re.IGNORECASE)
+                    except re.error:
+                        continue
+                    regex_anchors[rule.pattern] = regex_required_literals(rule.pattern)
+                self.pattern_sources[rule_index] = rule.pattern
+                anchors = regex_anchors[rule.pattern]
+                if anchors is None:
+                    self.unanchored_regex.append(rule_index)
+                    continue
+                for anchor in anchors:
+                    self.anchored_rules[_key_id(anchor)].append(rule_index)
+            else:
+                self.literal_rules[_key_id(rule.pattern.lower())].append(rule_index)
+
+        self.automaton = _LiteralAutomaton(sorted(key_ids, key=key_ids.__getitem__))
+
+    def pattern(self, rule_index: int) -> re.Pattern[str]:
+        compiled = self._patterns.get(rule_index)
+        if compiled is None:
+            compiled = re.compile(self.pattern_sources[rule_index], re.IGNORECASE)
+            self._patterns[rule_index] = compiled
+        return compiled
+
+    def may_match(self, text: str) -> bool:
+        if text == "":
+            return False
+        if self.unanchored_regex:
+            return True
+        lowered = text.lower()
+        lowered_ends = self.automaton.first_ends(lowered)
+        if any(self.literal_rules[key_id] for key_id in lowered_ends):
+            return True
+        anchor_ends = lowered_ends if text.isascii() else self.automaton.first_ends(text.translate(_ascii_fold_table()))
+        return any(self.anchored_rules[key_id] for key_id in anchor_ends)
+
+    def _regex_candidates(self, text: str, lowered_ends: Dict[int, int]) -> Set[int]:
+        if text.isascii():
+            anchor_ends = lowered_ends
+        else:
+            anchor_ends = self.automaton.first_ends(text.translate(_ascii_fold_table()))
+        candidates = set(self.unanchored_regex)
+        for key_id in anchor_ends:
+            candidates.update(self.anchored_rules[key_id])
+        return candidates
+
+    def regex_candidates(self, text: str) -> Set[int]:
+        return self._regex_candidates(text, self.automaton.first_ends(text.lower()))
+
+    def match(self, text: str) -> Dict[int, RuleSpan]:
+        hits: Dict[int, RuleSpan] = {}
+        if text == "":
+            return hits
+
+        lowered = text.lower()
+        lowered_ends = self.automaton.first_ends(lowered)
+        for key_id, end in lowered_ends.items():
+            rule_indices = self.literal_rules[key_id]
+            if rule_indices:
+                start = end - len(self.automaton.keys[key_id])
+                span = (start, end, text[start:end][:SNIPPET_MAX_CHARS])
+                for rule_index in rule_indices:
+                    hits[rule_index] = span
+
+        for rule_index in self._regex_candidates(text, lowered_ends):
+            found = self.pattern(rule_index).search(text)
+            if found is None:
+                continue
+            start, end = found.span()
+            hits[rule_index] = (start, end, text[start:end][:SNIPPET_MAX_CHARS])
+        return hits
+
+
+class RuleMatcher:
+    """All rules of one taxonomy pack compiled for single-pass matching per card field.
+
+    Substring rules share one Aho-Corasick automaton per field; regexes are
+    compiled once and only run on texts containing one of their required
+    literals. match() returns, for every rule that hits, the same first-match
+    span as text.lower().find() / re.search(pattern, text, re.IGNORECASE).
+
+    regex_anchors maps a regex pattern that compiles to its
+    regex_required_literals(); patterns missing from it are compiled and
+    derived here, and the complete map is kept on self.regex_anchors so callers
+    can cache it as plain data. Patterns taken from it compile on first use.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Any],
+        regex_anchors: Optional[Dict[str, Optional[Tuple[str, ...]]]] = None,
+    ) -> None:
+        self.rules = tuple(rules)
+        self.regex_anchors: Dict[str, Optional[Tuple[str, ...]]] = dict(regex_anchors or {})
+        per_field: Dict[str, List[Tuple[int, Any]]] = {field_name: [] for field_name in RULE_FIELDS}
+        for rule_index, rule in enumerate(self.rules):
+            if rule.field == "both":
+                fields: Tuple[str, ...] = RULE_FIELDS
+            elif rule.field == "type_line":
+                fields = ("type_line",)
+            else:
+                fields = ("oracle_text",)
+            for field_name in fields:
+                per_field[field_name].append((rule_index, rule))
+        self._fields = {
+            field_name: _FieldMatcher(rules_for_field, self.regex_anchors)
+            for field_name, rules_for_field in per_field.items()
+        }
+
+    def match(self, field_name: str, text: str) -> Dict[int, RuleSpan]:
+        """rule index -> first match on text, for the rules that target field_name and match."""
+        field_matcher = self._fields.get(field_name)
+        if field_matcher is None:
+            return {}
+        return field_matcher.match(text)
+
+    def may_match(self, field_name: str, text: str) -> bool:
+        """Cheap prefilter: False guarantees match(field_name, text) is empty."""
+        field_matcher = self._fields.get(field_name)
+        if field_matcher is None:
+            return False
+        return field_matcher.may_match(text)
+
+    def regex_candidates(self, field_name: str, text: str) -> List[int]:
+        """Sorted indices of the regex rules for field_name whose required literals occur in text.
+
+        Only these can match; callers that evaluate regexes themselves (e.g. to
+        time each rule) run compiled_pattern(rule_index).search on exactly these.
+        """
+        field_matcher = self._fields.get(field_name)
+        if field_matcher is None:
+            return []
+        return sorted(field_matcher.regex_candidates(text))
+
+    def compiled_pattern(self, rule_index: int) -> Optional[re.Pattern[str]]:
+        for field_matcher in self._fields.values():
+            if rule_index in field_matcher.pattern_sources:
+                return field_matcher.pattern(rule_index)
+        return None
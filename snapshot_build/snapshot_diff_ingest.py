@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from snapshot_build.bulk_json_stream import iter_batches
+
+VERSION = "snapshot_diff_ingest_v1"
+
+CHANGE_ADDED = "ADDED"
+CHANGE_CHANGED = "CHANGED"
+CHANGE_REMOVED = "REMOVED"
+CHANGE_KINDS = (CHANGE_ADDED, CHANGE_CHANGED, CHANGE_REMOVED)
+
+DEFAULT_BATCH_SIZE = 2000
+
+# Column order of the normalized row written by update_scryfall_bulk (after snapshot_id).
+CARD_ROW_COLUMNS: Sequence[str] = (
+    "oracle_id",
+    "name",
+    "mana_cost",
+    "cmc",
+    "type_line",
+    "oracle_text",
+    "colors",
+    "color_identity",
+    "color_identity_mask",
+    "produced_mana",
+    "keywords",
+    "legalities_json",
+    "primitives_json",
+)
+CARD_RAW_ROW_COLUMNS: Sequence[str] = ("scryfall_id", "oracle_id", "lang", "name", "json")
+
+_CARD_COLUMN_INDEX = {column: idx for idx, column in enumerate(CARD_ROW_COLUMNS)}
+_NOT_SEEN = object()
+
+
+def ensure_snapshot_diff_tables(con: sqlite3.Connection) -> None:
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS card_fingerprints_v1 (
+          snapshot_id TEXT NOT NULL,
+          oracle_id TEXT NOT NULL,
+          fingerprint TEXT NOT NULL,
+          PRIMARY KEY (snapshot_id, oracle_id)
+        )
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS snapshot_changes_v1 (
+          snapshot_id TEXT NOT NULL,
+          base_snapshot_id TEXT NOT NULL,
+          oracle_id TEXT NOT NULL,
+          change TEXT NOT NULL,
+          PRIMARY KEY (snapshot_id, oracle_id)
+        )
+        """
+    )
+
+
+def card_fingerprint(card_row: Sequence[Any]) -> str:
+    """sha256 over the runtime columns of one CARD_ROW_COLUMNS row, normalized the way SQLite stores them."""
+    values: List[Any] = list(card_row)
+    cmc = values[_CARD_COLUMN_INDEX["cmc"]]
+    if isinstance(cmc, (int, float)) and not isinstance(cmc, bool):
+        values[_CARD_COLUMN_INDEX["cmc"]] = float(cmc)
+    payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _table_columns(con: sqlite3.Connection, table_name: str) -> List[str]:
+    return [row[1] for row in con.execute(f"PRAGMA table_info({table_name})").fetchall() if isinstance(row[1], str)]
+
+
+def load_snapshot_fingerprints(con: sqlite3.Connection, snapshot_id: str) -> Dict[str, str]:
+    """oracle_id -> fingerprint; computed from cards rows when the snapshot was ingested without them."""
+    rows = con.execute(
+        "SELECT oracle_id, fingerprint FROM card_fingerprints_v1 WHERE snapshot_id = ?",
+        (snapshot_id,),
+    ).fetchall()
+    if rows:
+        return {row[0]: row[1] for row in rows}
+
+    select_columns = ", ".join(CARD_ROW_COLUMNS)
+    return {
+        row[0]: card_fingerprint(row)
+        for row in con.execute(f"SELECT {select_columns} FROM cards WHERE snapshot_id = ?", (snapshot_id,))
+    }
+
+
+def resolve_base_snapshot_id(con: sqlite3.Connection, snapshot_id: str) -> Optional[str]:
+    """Most recently created snapshot other than snapshot_id that has cards, if any."""
+    row = con.execute(
+        """
+        SELECT s.snapshot_id
+        FROM snapshots s
+        WHERE s.snapshot_id <> ?
+          AND EXISTS (SELECT 1 FROM cards c WHERE c.snapshot_id = s.snapshot_id)
+        ORDER BY s.created_at DESC, s.snapshot_id DESC
+        LIMIT 1
+        """,
+        (snapshot_id,),
+    ).fetchone()
+    return row[0] if row is not None else None
+
+
+def ingest_card_rows_incremental(
+    con: sqlite3.Connection,
+    *,
+    snapshot_id: str,
+    base_snapshot_id: str,
+    card_rows: Iterable[Tuple[Sequence[Any], Sequence[Any]]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Write a new snapshot as a delta against base_snapshot_id.
+
+    card_rows yields (raw_row, card_row) pairs in CARD_RAW_ROW_COLUMNS /
+    CARD_ROW_COLUMNS order. Every raw row is written, so cards_raw always
+    matches the downloaded bulk file. Added and changed cards rows are
+    inserted; unchanged ones (including their image enrichment) are copied
+    from the base snapshot with one INSERT ... SELECT. As in a full ingest,
+    the last copy of a repeated oracle_id wins. Every added, changed or
+    removed oracle_id is recorded in snapshot_changes_v1.
+    """
+    ensure_snapshot_diff_tables(con)
+    base_fingerprints = load_snapshot_fingerprints(con, base_snapshot_id)
+
+    raw_placeholders = ", ".join("?" for _ in range(len(CARD_RAW_ROW_COLUMNS) + 1))
+    card_placeholders = ", ".join("?" for _ in range(len(CARD_ROW_COLUMNS) + 1))
+    insert_raw_sql = (
+        f"INSERT OR REPLACE INTO cards_raw (snapshot_id, {', '.join(CARD_RAW_ROW_COLUMNS)}) VALUES ({raw_placeholders})"
+    )
+    insert_card_sql = (
+        f"INSERT OR REPLACE INTO cards (snapshot_id, {', '.join(CARD_ROW_COLUMNS)}) VALUES ({card_placeholders})"
+    )
+
+    con.execute("DROP TABLE IF EXISTS temp.snapshot_diff_unchanged")
+    con.execute("CREATE TEMP TABLE snapshot_diff_unchanged (oracle_id TEXT PRIMARY KEY)")
+
+    # oracle_id -> change kind of its latest copy (None when that copy is unchanged).
+    latest_changes: Dict[str, Optional[str]] = {}
+
+    for batch in iter_batches(iter(card_rows), batch_size):
+        raw_inserts: List[Tuple[Any, ...]] = []
+        card_inserts: List[Tuple[Any, ...]] = []
+        fingerprint_inserts: List[Tuple[str, str, str]] = []
+        # oracle_id -> its state before this batch, to undo what an earlier copy wrote.
+        previous_changes: Dict[str, Any] = {}
+
+        for raw_row, card_row in batch:
+            oracle_id = card_row[0]
+            fingerprint = card_fingerprint(card_row)
+            raw_inserts.append((snapshot_id, *raw_row))
+            fingerprint_inserts.append((snapshot_id, oracle_id, fingerprint))
+            previous_changes.setdefault(oracle_id, latest_changes.get(oracle_id, _NOT_SEEN))
+
+            base_fingerprint = base_fingerprints.get(oracle_id)
+            if base_fingerprint == fingerprint:
+                latest_changes[oracle_id] = None
+                continue
+            latest_changes[oracle_id] = CHANGE_ADDED if base_fingerprint is None else CHANGE_CHANGED
+            card_inserts.append((snapshot_id, *card_row))
+
+        unchanged = [oracle_id for oracle_id in previous_changes if latest_changes[oracle_id] is None]
+        changed = [oracle_id for oracle_id in previous_changes if latest_changes[oracle_id] is not None]
+
+        con.executemany(insert_raw_sql, raw_inserts)
+        con.executemany(insert_card_sql, card_inserts)
+        con.executemany(
+            "INSERT OR REPLACE INTO card_fingerprints_v1 (snapshot_id, oracle_id, fingerprint) VALUES (?, ?, ?)",
+            fingerprint_inserts,
+        )
+        con.executemany(
+            "INSERT OR REPLACE INTO snapshot_changes_v1 (snapshot_id, base_snapshot_id, oracle_id, change) "
+            "VALUES (?, ?, ?, ?)",
+            [(snapshot_id, base_snapshot_id, oracle_id, latest_changes[oracle_id]) for oracle_id in changed],
+        )
+        con.executemany(
+            "DELETE FROM snapshot_changes_v1 WHERE snapshot_id = ? AND oracle_id = ?",
+            [(snapshot_id, oracle_id) for oracle_id in unchanged if previous_changes[oracle_id] not in (None, _NOT_SEEN)],
+        )
+        con.executemany(
+            "INSERT OR IGNORE INTO temp.snapshot_diff_unchanged (oracle_id) VALUES (?)",
+            [(oracle_id,) for oracle_id in unchanged],
+        )
+        con.executemany(
+            "DELETE FROM temp.snapshot_diff_unchanged WHERE oracle_id = ?",
+            [(oracle_id,) for oracle_id in changed if previous_changes[oracle_id] is None],
+        )
+        con.commit()
+
+    card_columns = [column for column in _table_columns(con, "cards") if column != "snapshot_id"]
+    con.execute(
+        f"INSERT OR REPLACE INTO cards (snapshot_id, {', '.join(card_columns)}) "
+        f"SELECT ?, {', '.join(card_columns)} FROM cards "
+        "WHERE snapshot_id = ? AND oracle_id IN (SELECT oracle_id FROM temp.snapshot_diff_unchanged)",
+        (snapshot_id, base_snapshot_id),
+    )
+
+    removed = sorted(set(base_fingerprints).difference(latest_changes))
+    con.executemany(
+        "INSERT OR REPLACE INTO snapshot_changes_v1 (snapshot_id, base_snapshot_id, oracle_id, change) "
+        "VALUES (?, ?, ?, ?)",
+        [(snapshot_id, base_snapshot_id, oracle_id, CHANGE_REMOVED) for oracle_id in removed],
+    )
+    con.execute("DROP TABLE temp.snapshot_diff_unchanged")
+    con.commit()
+
+    counts = Counter(latest_changes.values())
+    return {
+        "version": VERSION,
+        "snapshot_id": snapshot_id,
+        "base_snapshot_id": base_snapshot_id,
+        "added": counts[CHANGE_ADDED],
+        "changed": counts[CHANGE_CHANGED],
+        "removed": len(removed),
+        "unchanged": counts[None],
+    }
+
+
+def load_snapshot_changes(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    changes: Sequence[str] = (CHANGE_ADDED, CHANGE_CHANGED),
+) -> Optional[List[str]]:
+    """Sorted oracle_ids with the given change kinds, or None when the snapshot has no change manifest."""
+    try:
+        manifest_row = con.execute(
+            "SELECT 1 FROM card_fingerprints_v1 WHERE snapshot_id = ? LIMIT 1",
+            (snapshot_id,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if manifest_row is None:
+        return None
+
+    placeholders = ", ".join("?" for _ in changes)
+    rows = con.execute(
+        f"SELECT oracle_id FROM snapshot_changes_v1 WHERE snapshot_id = ? AND change IN ({placeholders}) "
+        "ORDER BY oracle_id ASC",
+        (snapshot_id, *changes),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def load_snapshot_change_base(con: sqlite3.Connection, snapshot_id: str) -> Optional[str]:
+    """base_snapshot_id an incremental ingest diffed snapshot_id against, from its manifest_json; None otherwise."""
+    try:
+        row = con.execute("SELECT manifest_json FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if row is None or not isinstance(row[0], str):
+        return None
+    try:
+        manifest = json.loads(row[0])
+    except ValueError:
+        return None
+    change_manifest = manifest.get("change_manifest_v1") if isinstance(manifest, dict) else None
+    base_snapshot_id = change_manifest.get("base_snapshot_id") if isinstance(change_manifest, dict) else None
+    return base_snapshot_id if isinstance(base_snapshot_id, str) and base_snapshot_id != "" else None
@@ -10,8 +10,7 @@ from typing import Any, Dict, Iterable, List, Set
 
 from engine.db import resolve_db_path
 from engine.determinism import stable_json_dumps
-from snapshot_build.tag_snapshot import compile_snapshot_tags
-from taxonomy.loader import load
+from snapshot_build.tag_snapshot import compile_snapshot_tags, load_compiled_pack, pack_allowed_primitive_ids
 
 
 VERSION = "tag_import_v1"
@@ -110,40 +109,10 @@ def _load_import_pack(pack_path: Path) -> Dict[str, Any]:
 
 
 def _load_allowed_primitive_ids(taxonomy_pack: Any) -> Set[str]:
-    allowed: Set[str] = set()
-
-    rules = taxonomy_pack.rulespec_rules if hasattr(taxonomy_pack, "rulespec_rules") else []
-    for rule in rules if isinstance(rules, (list, tuple)) else []:
-        if not isinstance(rule, dict):
-            continue
-        primitive_id = _nonempty_str(
-            rule.get("primitive_id")
-            or rule.get("primitive")
-            or rule.get("tag")
-            or rule.get("primitive_tag")
-        )
-        if primitive_id != "":
-            allowed.add(primitive_id)
-
-    other_sheets = taxonomy_pack.other_sheets if hasattr(taxonomy_pack, "other_sheets") else {}
-    primitives_sheet = other_sheets.get("primitives.json") if isinstance(other_sheets, dict) else None
-    if isinstance(primitives_sheet, list):
-        for row in primitives_sheet:
-            if isinstance(row, dict):
-                primitive_id = _nonempty_str(
-                    row.get("primitive_id")
-                    or row.get("id")
-                    or row.get("tag_id")
-                    or row.get("name")
-                )
-            elif isinstance(row, str):
-                primitive_id = _nonempty_str(row)
-            else:
-                primitive_id = ""
-            if primitive_id != "":
-                allowed.add(primitive_id)
-
-    return allowed
+    compiled_ids = getattr(taxonomy_pack, "allowed_primitive_ids", None)
+    if compiled_ids is not None:
+        return set(compiled_ids)
+    return pack_allowed_primitive_ids(taxonomy_pack)
 
 
 def _chunked(items: List[str], size: int) -> Iterable[List[str]]:
@@ -280,14 +249,15 @@ def run_tag_import_v1(
 
     db_path_resolved = _resolve_db_path_from_cli(db_path)
 
-    taxonomy_pack = load(taxonomy_pack_folder_clean)
+    compiled_pack = load_compiled_pack(taxonomy_pack_folder_clean)
+    taxonomy_pack = compiled_pack.pack
     taxonomy_version = _nonempty_str(getattr(taxonomy_pack, "taxonomy_version", ""))
     if taxonomy_version == "":
         raise ValueError("taxonomy pack missing taxonomy_version")
 
     import_pack_obj = _load_import_pack(Path(import_pack_path_clean))
     entries = import_pack_obj["entries"]
-    allowed_primitives = _load_allowed_primitive_ids(taxonomy_pack)
+    allowed_primitives = _load_allowed_primitive_ids(compiled_pack)
 
     requested_oracle_ids = sorted(
         {
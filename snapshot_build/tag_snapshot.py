@@ -2,32 +2,61 @@ from __future__ import annotations
 
 import argparse
 import json
-import re
+import os
 import sqlite3
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Tuple
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
 
 from engine.db import connect, snapshot_exists
 from engine.determinism import sha256_hex, stable_json_dumps
 from taxonomy.loader import load
 from taxonomy.pack_manifest import sha256_file
-from taxonomy.schema import TaxonomyPack
+from taxonomy.schema import ManifestFileHash, PackManifest, TaxonomyPack
 from taxonomy.taxonomy_pack_v1 import TAXONOMY_PACK_V1_VERSION
 
 from .index_build import build_indices as build_runtime_indices
+from .index_build import drop_secondary_indexes_for_bulk_load, indices_built_from
 from .patch_apply import (
     PatchAppliedRow,
     apply_patch_overrides,
     ensure_patches_applied_table,
     record_patch_rows,
 )
+from .rule_matcher import RuleMatcher
+from .snapshot_diff_ingest import load_snapshot_change_base, load_snapshot_changes
 from .unknowns_queue import (
     UnknownQueueRow,
     ensure_unknowns_queue_table,
     insert_unknowns,
 )
 
+# Shards per worker keep the pool busy when card texts are uneven; small
+# snapshots are not worth the process start-up cost.
+TAG_SHARDS_PER_WORKER = 4
+TAG_MIN_CARDS_PER_WORKER = 500
+
+# Bump when tagging semantics change outside the rulespec (baseline facets,
+# evidence shape, ...) so --incremental never reuses rows from older code.
+TAGGER_VERSION = "tag_snapshot_v1"
+
+# Compiled-pack cache written next to a taxonomy pack by load_compiled_pack.
+# It holds plain JSON data only; the cache key also covers the source of the
+# modules that produce that data, so code changes invalidate it by themselves.
+COMPILED_PACK_FILE_NAME = "compiled_pack.json"
+COMPILED_PACK_FORMAT = "compiled_taxonomy_pack_v2"
+
+# Per-connection pragmas for the card_tags bulk load; cache_size is in KiB when negative.
+TAG_BULK_LOAD_PRAGMAS: Dict[str, int] = {
+    "synchronous": 0,
+    "cache_size": -262144,
+    "temp_store": 2,
+}
+
 
 @dataclass(frozen=True)
 class CompiledRule:
@@ -72,6 +101,29 @@ def ensure_card_tags_table(con: Any) -> None:
     )
 
 
+def ensure_card_tag_fingerprint_tables(con: Any) -> None:
+    con.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS card_tag_fingerprints_v1 (
+          snapshot_id TEXT NOT NULL,
+          taxonomy_version TEXT NOT NULL,
+          oracle_id TEXT NOT NULL,
+          text_hash TEXT NOT NULL,
+          PRIMARY KEY (snapshot_id, taxonomy_version, oracle_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS card_tag_rulesets_v1 (
+          snapshot_id TEXT NOT NULL,
+          taxonomy_version TEXT NOT NULL,
+          tagger_version TEXT NOT NULL,
+          rules_json TEXT NOT NULL,
+          created_at TEXT NOT NULL,
+          PRIMARY KEY (snapshot_id, taxonomy_version)
+        );
+        """
+    )
+
+
 def _safe_str(value: Any) -> str | None:
     if not isinstance(value, str):
         return None
@@ -188,6 +240,216 @@ def _compile_rules(rulespec_rules: Iterable[Any]) -> List[CompiledRule]:
     return compiled
 
 
+
+@dataclass(frozen=True)
+class CompiledTaxonomyPack:
+    """A loaded pack with everything tagging derives from it, cached next to the pack by load_compiled_pack."""
+
+    pack: TaxonomyPack
+    pack_sha256: str
+    rules: Tuple[CompiledRule, ...]
+    matcher: RuleMatcher
+    exclusive_groups: Dict[str, Tuple[str, ...]]
+    allowed_primitive_ids: FrozenSet[str]
+
+
+def pack_allowed_primitive_ids(taxonomy_pack: Any) -> Set[str]:
+    """Primitive ids a pack defines: every rule's primitive plus the primitives.json sheet."""
+    allowed: Set[str] = set()
+
+    rules = taxonomy_pack.rulespec_rules if hasattr(taxonomy_pack, "rulespec_rules") else []
+    for rule in rules if isinstance(rules, (list, tuple)) else []:
+        if not isinstance(rule, dict):
+            continue
+        primitive_id = _safe_str(
+            rule.get("primitive_id")
+            or rule.get("primitive")
+            or rule.get("tag")
+            or rule.get("primitive_tag")
+        )
+        if primitive_id is not None:
+            allowed.add(primitive_id)
+
+    other_sheets = taxonomy_pack.other_sheets if hasattr(taxonomy_pack, "other_sheets") else {}
+    primitives_sheet = other_sheets.get("primitives.json") if isinstance(other_sheets, dict) else None
+    if isinstance(primitives_sheet, list):
+        for row in primitives_sheet:
+            if isinstance(row, dict):
+                primitive_id = _safe_str(
+                    row.get("primitive_id")
+                    or row.get("id")
+                    or row.get("tag_id")
+                    or row.get("name")
+                )
+            else:
+                primitive_id = _safe_str(row)
+            if primitive_id is not None:
+                allowed.add(primitive_id)
+
+    return allowed
+
+
+def _exclusive_groups(compiled_rules: Iterable[CompiledRule]) -> Dict[str, Tuple[str, ...]]:
+    groups: Dict[str, Set[str]] = {}
+    for rule in compiled_rules:
+        if isinstance(rule.exclusive_group, str) and rule.exclusive_group != "" and rule.primitive_id is not None:
+            groups.setdefault(rule.exclusive_group, set()).add(rule.primitive_id)
+    return {group: tuple(sorted(primitive_ids)) for group, primitive_ids in sorted(groups.items())}
+
+
+def _pack_file_stats(pack_folder: Path, manifest: Any) -> List[List[Any]]:
+    stats: List[List[Any]] = []
+    for entry in manifest.files:
+        stat = (pack_folder / entry.file_name).stat()
+        stats.append([entry.file_name, int(stat.st_size), int(stat.st_mtime_ns)])
+    return stats
+
+
+_compiled_pack_code_version: str | None = None
+
+
+def compiled_pack_code_version() -> str:
+    """sha256 over TAGGER_VERSION and the sources that shape a compiled pack.
+
+    Covers the pack loader, rule compilation (this module) and the regex
+    anchor derivation in rule_matcher, so a fix to any of them retires every
+    cached compiled pack without a manual format bump.
+    """
+    global _compiled_pack_code_version
+    if _compiled_pack_code_version is None:
+        from taxonomy import loader as taxonomy_loader
+        from taxonomy import schema as taxonomy_schema
+
+        from . import rule_matcher
+
+        sources = [TAGGER_VERSION, COMPILED_PACK_FORMAT]
+        for module_file in (__file__, rule_matcher.__file__, taxonomy_loader.__file__, taxonomy_schema.__file__):
+            sources.append(sha256_file(Path(module_file)))
+        _compiled_pack_code_version = sha256_hex("\n".join(sources))
+    return _compiled_pack_code_version
+
+
+def _compiled_pack_to_json(compiled: CompiledTaxonomyPack, file_stats: List[List[Any]]) -> Dict[str, Any]:
+    pack = compiled.pack
+    return {
+        "format": COMPILED_PACK_FORMAT,
+        "code_version": compiled_pack_code_version(),
+        "pack_sha256": compiled.pack_sha256,
+        "file_stats": file_stats,
+        "pack": {
+            "taxonomy_version": pack.taxonomy_version,
+            "ruleset_version": pack.ruleset_version,
+            "manifest": asdict(pack.manifest),
+            "rulespec_rules": list(pack.rulespec_rules),
+            "rulespec_facets": list(pack.rulespec_facets),
+            "qa_rules": list(pack.qa_rules),
+            "other_sheets": dict(pack.other_sheets),
+        },
+        "rules": [asdict(rule) for rule in compiled.rules],
+        "regex_anchors": [
+            [pattern, list(anchors) if anchors is not None else None]
+            for pattern, anchors in sorted(compiled.matcher.regex_anchors.items())
+        ],
+        "exclusive_groups": {group: list(primitive_ids) for group, primitive_ids in compiled.exclusive_groups.items()},
+        "allowed_primitive_ids": sorted(compiled.allowed_primitive_ids),
+    }
+
+
+def _compiled_pack_from_json(cached: Dict[str, Any], pack_folder: Path) -> CompiledTaxonomyPack:
+    pack_data = cached["pack"]
+    manifest_data = pack_data["manifest"]
+    pack = TaxonomyPack(
+        taxonomy_version=pack_data["taxonomy_version"],
+        ruleset_version=pack_data["ruleset_version"],
+        pack_folder=pack_folder,
+        manifest=PackManifest(
+            taxonomy_version=manifest_data["taxonomy_version"],
+            generated_at=manifest_data["generated_at"],
+            files=tuple(ManifestFileHash(**entry) for entry in manifest_data["files"]),
+        ),
+        rulespec_rules=tuple(pack_data["rulespec_rules"]),
+        rulespec_facets=tuple(pack_data["rulespec_facets"]),
+        qa_rules=tuple(pack_data["qa_rules"]),
+        other_sheets=pack_data["other_sheets"],
+    )
+    rules = tuple(CompiledRule(**rule) for rule in cached["rules"])
+    regex_anchors = {
+        pattern: tuple(anchors) if anchors is not None else None for pattern, anchors in cached["regex_anchors"]
+    }
+    return CompiledTaxonomyPack(
+        pack=pack,
+        pack_sha256=cached["pack_sha256"],
+        rules=rules,
+        matcher=RuleMatcher(rules, regex_anchors),
+        exclusive_groups={group: tuple(primitive_ids) for group, primitive_ids in cached["exclusive_groups"].items()},
+        allowed_primitive_ids=frozenset(cached["allowed_primitive_ids"]),
+    )
+
+
+def _read_compiled_pack_cache(cache_path: Path, pack_folder: Path, pack_sha256: str) -> CompiledTaxonomyPack | None:
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("format") != COMPILED_PACK_FORMAT:
+        return None
+    if cached.get("code_version") != compiled_pack_code_version() or cached.get("pack_sha256") != pack_sha256:
+        return None
+    try:
+        compiled = _compiled_pack_from_json(cached, pack_folder)
+        file_stats = _pack_file_stats(pack_folder, compiled.pack.manifest)
+    except (OSError, KeyError, TypeError, ValueError, AttributeError):
+        # Unreadable stats or a payload that does not fit: rebuild.
+        return None
+    if file_stats != cached.get("file_stats"):
+        return None
+    return compiled
+
+
+def load_compiled_pack(taxonomy_pack_folder: str | Path, write_cache: bool = True) -> CompiledTaxonomyPack:
+    """taxonomy.loader.load plus rule compilation, cached in the pack folder.
+
+    The cache is plain JSON keyed by the sha256 of pack_manifest.json (which
+    pins every pack file's hash) and by compiled_pack_code_version(); it is
+    only reused while the size and mtime of each manifest file are unchanged.
+    Anything else falls back to a full load, which re-validates the manifest
+    hashes, and rewrites the cache. The RuleMatcher is always rebuilt from the
+    cached rules and regex anchors. A pack folder that is not writable just
+    skips the write.
+    """
+    pack_folder = Path(taxonomy_pack_folder).resolve()
+    manifest_path = pack_folder / "pack_manifest.json"
+    cache_path = pack_folder / COMPILED_PACK_FILE_NAME
+    pack_sha256 = sha256_file(manifest_path) if manifest_path.is_file() else ""
+
+    if pack_sha256 != "":
+        cached = _read_compiled_pack_cache(cache_path, pack_folder, pack_sha256)
+        if cached is not None:
+            return cached
+
+    taxonomy_pack = load(pack_folder)
+    pack_sha256 = sha256_file(manifest_path)
+    rules = tuple(_compile_rules(taxonomy_pack.rulespec_rules))
+    compiled = CompiledTaxonomyPack(
+        pack=taxonomy_pack,
+        pack_sha256=pack_sha256,
+        rules=rules,
+        matcher=RuleMatcher(rules),
+        exclusive_groups=_exclusive_groups(rules),
+        allowed_primitive_ids=frozenset(pack_allowed_primitive_ids(taxonomy_pack)),
+    )
+
+    if write_cache:
+        payload = _compiled_pack_to_json(compiled, _pack_file_stats(pack_folder, taxonomy_pack.manifest))
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+    return compiled
+
+
 def _normalize_text(value: Any) -> str:
     if not isinstance(value, str):
         return ""
@@ -212,32 +474,6 @@ def _baseline_facets_v1(type_line: str, oracle_text: str) -> Dict[str, str]:
     }
 
 
-def _match_rule_on_text(rule: CompiledRule, text: str) -> Tuple[bool, int, int, str]:
-    if text == "":
-        return (False, -1, -1, "")
-
-    if rule.match_mode == "regex":
-        try:
-            pattern = re.compile(rule.pattern, re.IGNORECASE)
-        except re.error:
-            return (False, -1, -1, "")
-        match = pattern.search(text)
-        if match is None:
-            return (False, -1, -1, "")
-        start, end = match.span()
-        snippet = text[start:end]
-        return (True, start, end, snippet[:120])
-
-    haystack = text.lower()
-    needle = rule.pattern.lower()
-    idx = haystack.find(needle)
-    if idx < 0:
-        return (False, -1, -1, "")
-    end = idx + len(needle)
-    snippet = text[idx:end]
-    return (True, idx, end, snippet[:120])
-
-
 def _derive_equiv_class_ids(primitive_ids: List[str], facets: Dict[str, List[str]]) -> List[str]:
     components: List[str] = [f"prim:{pid}" for pid in sorted(set(primitive_ids))]
     for facet_key in sorted(facets.keys()):
@@ -275,12 +511,14 @@ def _fetch_snapshot_cards(snapshot_id: str) -> List[Dict[str, Any]]:
     return [dict(row) for row in rows]
 
 
-def _build_card_rows(
+def _tag_cards(
     cards: List[Dict[str, Any]],
     compiled_rules: List[CompiledRule],
     snapshot_id: str,
     taxonomy_version: str,
     ruleset_version: str,
+    rule_matcher: RuleMatcher,
+    created_at: str,
 ) -> Tuple[List[Dict[str, Any]], List[UnknownQueueRow]]:
     tag_rows: List[Dict[str, Any]] = []
     unknown_rows: List[UnknownQueueRow] = []
@@ -300,70 +538,61 @@ def _build_card_rows(
         exclusivity_hits: Dict[str, set[str]] = {}
         card_unknowns: List[UnknownQueueRow] = []
 
-        for rule in compiled_rules:
-            targets: List[Tuple[str, str]]
-            if rule.field == "type_line":
-                targets = [("type_line", type_line)]
-            elif rule.field == "both":
-                targets = [("oracle_text", oracle_text), ("type_line", type_line)]
+        oracle_hits = rule_matcher.match("oracle_text", oracle_text)
+        type_line_hits = rule_matcher.match("type_line", type_line)
+
+        for rule_index in sorted(oracle_hits.keys() | type_line_hits.keys()):
+            rule = compiled_rules[rule_index]
+            # Deterministic behavior: consume first match for each rule, oracle_text before type_line.
+            if rule_index in oracle_hits:
+                field_name = "oracle_text"
+                start, end, snippet = oracle_hits[rule_index]
             else:
-                targets = [("oracle_text", oracle_text)]
+                field_name = "type_line"
+                start, end, snippet = type_line_hits[rule_index]
 
-            matched = False
-            for field_name, target_text in targets:
-                ok, start, end, snippet = _match_rule_on_text(rule, target_text)
-                if not ok:
-                    continue
-                matched = True
+            evidence.append(
+                {
+                    "rule_id": rule.rule_id,
+                    "field": field_name,
+                    "span": [start, end],
+                    "snippet": snippet,
+                }
+            )
 
-                evidence.append(
-                    {
-                        "rule_id": rule.rule_id,
-                        "field": field_name,
-                        "span": [start, end],
-                        "snippet": snippet,
-                    }
+            if isinstance(rule.primitive_id, str) and rule.primitive_id != "":
+                primitive_ids_set.add(rule.primitive_id)
+                if isinstance(rule.exclusive_group, str) and rule.exclusive_group != "":
+                    exclusivity_hits.setdefault(rule.exclusive_group, set()).add(rule.primitive_id)
+            else:
+                card_unknowns.append(
+                    UnknownQueueRow(
+                        oracle_id=oracle_id,
+                        snapshot_id=snapshot_id,
+                        taxonomy_version=taxonomy_version,
+                        rule_id=rule.rule_id,
+                        reason="MATCH_WITHOUT_PRIMITIVE",
+                        snippet=snippet,
+                        created_at=created_at,
+                    )
                 )
 
-                if isinstance(rule.primitive_id, str) and rule.primitive_id != "":
-                    primitive_ids_set.add(rule.primitive_id)
-                    if isinstance(rule.exclusive_group, str) and rule.exclusive_group != "":
-                        exclusivity_hits.setdefault(rule.exclusive_group, set()).add(rule.primitive_id)
-                else:
-                    card_unknowns.append(
-                        UnknownQueueRow(
-                            oracle_id=oracle_id,
-                            snapshot_id=snapshot_id,
-                            taxonomy_version=taxonomy_version,
-                            rule_id=rule.rule_id,
-                            reason="MATCH_WITHOUT_PRIMITIVE",
-                            snippet=snippet,
-                            created_at=utc_now_iso(),
-                        )
-                    )
+            if isinstance(rule.facet_key, str) and rule.facet_key != "":
+                facet_value = rule.facet_value if isinstance(rule.facet_value, str) and rule.facet_value != "" else "true"
+                facets_temp.setdefault(rule.facet_key, set()).add(facet_value)
 
-                if isinstance(rule.facet_key, str) and rule.facet_key != "":
-                    facet_value = rule.facet_value if isinstance(rule.facet_value, str) and rule.facet_value != "" else "true"
-                    facets_temp.setdefault(rule.facet_key, set()).add(facet_value)
-
-                if rule.unknown_on_match:
-                    card_unknowns.append(
-                        UnknownQueueRow(
-                            oracle_id=oracle_id,
-                            snapshot_id=snapshot_id,
-                            taxonomy_version=taxonomy_version,
-                            rule_id=rule.rule_id,
-                            reason="RULE_MARKED_UNKNOWN_ON_MATCH",
-                            snippet=snippet,
-                            created_at=utc_now_iso(),
-                        )
+            if rule.unknown_on_match:
+                card_unknowns.append(
+                    UnknownQueueRow(
+                        oracle_id=oracle_id,
+                        snapshot_id=snapshot_id,
+                        taxonomy_version=taxonomy_version,
+                        rule_id=rule.rule_id,
+                        reason="RULE_MARKED_UNKNOWN_ON_MATCH",
+                        snippet=snippet,
+                        created_at=created_at,
                     )
-
-                # Deterministic behavior: consume first match for each rule.
-                break
-
-            if not matched:
-                continue
+                )
 
         for group_id, group_primitives in sorted(exclusivity_hits.items(), key=lambda item: item[0]):
             if len(group_primitives) > 1:
@@ -375,7 +604,7 @@ def _build_card_rows(
                         rule_id=f"EXCLUSIVE_GROUP:{group_id}",
                         reason="AMBIGUOUS_GROUP_MATCH",
                         snippet="|".join(sorted(group_primitives)),
-                        created_at=utc_now_iso(),
+                        created_at=created_at,
                     )
                 )
 
@@ -412,11 +641,18 @@ def _build_card_rows(
                 "equiv_class_ids": equiv_class_ids,
                 "facets": facets_final,
                 "evidence": evidence_sorted,
-                "created_at": utc_now_iso(),
+                "created_at": created_at,
                 "card_name": card_name,
             }
         )
 
+    return tag_rows, unknown_rows
+
+
+def _sort_card_rows(
+    tag_rows: List[Dict[str, Any]],
+    unknown_rows: List[UnknownQueueRow],
+) -> Tuple[List[Dict[str, Any]], List[UnknownQueueRow]]:
     tag_rows_sorted = sorted(
         tag_rows,
         key=lambda row: (
@@ -424,7 +660,11 @@ def _build_card_rows(
             str(row.get("card_name") or ""),
         ),
     )
-    unknown_rows_sorted = sorted(
+    return tag_rows_sorted, _sort_unknown_rows(unknown_rows)
+
+
+def _sort_unknown_rows(unknown_rows: List[UnknownQueueRow]) -> List[UnknownQueueRow]:
+    return sorted(
         unknown_rows,
         key=lambda row: (
             str(row.snapshot_id),
@@ -435,7 +675,265 @@ def _build_card_rows(
         ),
     )
 
-    return tag_rows_sorted, unknown_rows_sorted
+
+def _build_card_rows(
+    cards: List[Dict[str, Any]],
+    compiled_rules: List[CompiledRule],
+    snapshot_id: str,
+    taxonomy_version: str,
+    ruleset_version: str,
+    matcher: RuleMatcher | None = None,
+    created_at: str | None = None,
+) -> Tuple[List[Dict[str, Any]], List[UnknownQueueRow]]:
+    tag_rows, unknown_rows = _tag_cards(
+        cards=cards,
+        compiled_rules=compiled_rules,
+        snapshot_id=snapshot_id,
+        taxonomy_version=taxonomy_version,
+        ruleset_version=ruleset_version,
+        rule_matcher=matcher if matcher is not None else RuleMatcher(compiled_rules),
+        created_at=created_at or utc_now_iso(),
+    )
+    return _sort_card_rows(tag_rows, unknown_rows)
+
+
+_worker_rules: List[CompiledRule] = []
+_worker_matcher: RuleMatcher | None = None
+
+
+def _init_tag_worker(compiled_rules: List[CompiledRule], matcher: RuleMatcher | None = None) -> None:
+    global _worker_rules, _worker_matcher
+    _worker_rules = compiled_rules
+    _worker_matcher = matcher if matcher is not None else RuleMatcher(compiled_rules)
+
+
+def _tag_card_shard(
+    shard: Tuple[List[Dict[str, Any]], str, str, str, str],
+) -> Tuple[List[Dict[str, Any]], List[UnknownQueueRow]]:
+    cards, snapshot_id, taxonomy_version, ruleset_version, created_at = shard
+    return _tag_cards(
+        cards=cards,
+        compiled_rules=_worker_rules,
+        snapshot_id=snapshot_id,
+        taxonomy_version=taxonomy_version,
+        ruleset_version=ruleset_version,
+        rule_matcher=_worker_matcher if _worker_matcher is not None else RuleMatcher(_worker_rules),
+        created_at=created_at,
+    )
+
+
+def _build_card_rows_parallel(
+    cards: List[Dict[str, Any]],
+    compiled_rules: List[CompiledRule],
+    snapshot_id: str,
+    taxonomy_version: str,
+    ruleset_version: str,
+    workers: int,
+    created_at: str | None = None,
+    matcher: RuleMatcher | None = None,
+) -> Tuple[List[Dict[str, Any]], List[UnknownQueueRow]]:
+    """Same rows as _build_card_rows, tagged on a process pool.
+
+    Cards are split into contiguous shards in fetch order; each worker takes
+    the given rule matcher (or compiles one) once. Shard results are concatenated in order before the
+    usual (stable) sort, so the merged output equals the single-process output.
+    """
+    shard_count = min(len(cards), workers * TAG_SHARDS_PER_WORKER)
+    shard_size = -(-len(cards) // shard_count)
+    run_created_at = created_at or utc_now_iso()
+    shards = [
+        (cards[start : start + shard_size], snapshot_id, taxonomy_version, ruleset_version, run_created_at)
+        for start in range(0, len(cards), shard_size)
+    ]
+
+    tag_rows: List[Dict[str, Any]] = []
+    unknown_rows: List[UnknownQueueRow] = []
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(shards)),
+        initializer=_init_tag_worker,
+        initargs=(compiled_rules, matcher),
+    ) as executor:
+        for shard_tag_rows, shard_unknown_rows in executor.map(_tag_card_shard, shards):
+            tag_rows.extend(shard_tag_rows)
+            unknown_rows.extend(shard_unknown_rows)
+    return _sort_card_rows(tag_rows, unknown_rows)
+
+
+@contextmanager
+def _bulk_load_settings(con: Any) -> Iterator[None]:
+    """Build-time pragmas for the card_tags load, restored afterwards on shared connections.
+
+    journal_mode is left alone: snapshot DBs are already WAL (update_scryfall_bulk)
+    and switching it is persistent and database-wide.
+    """
+    previous = {name: con.execute(f"PRAGMA {name}").fetchone()[0] for name in TAG_BULK_LOAD_PRAGMAS}
+    for name, value in TAG_BULK_LOAD_PRAGMAS.items():
+        con.execute(f"PRAGMA {name} = {value}")
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            con.execute(f"PRAGMA {name} = {int(value)}")
+
+
+@dataclass(frozen=True)
+class RetagPlan:
+    base_snapshot_id: str
+    base_taxonomy_version: str
+    rules_changed: int
+    # oracle_id -> (primitive_ids_json, equiv_class_ids_json) of rows copied from the base run.
+    reused_rows: Dict[str, Tuple[str, str]]
+    reused_unknowns: List[UnknownQueueRow]
+    # True when the snapshot's ingest change manifest, not text hashes, picked the unchanged cards.
+    used_change_manifest: bool = False
+    # created_at of the base run's card_tags, to tell whether the base's inverted indices match them.
+    base_created_at: str | None = None
+
+
+def _card_text_hash(card: Dict[str, Any]) -> str:
+    return sha256_hex(
+        stable_json_dumps([_normalize_text(card.get("oracle_text")), _normalize_text(card.get("type_line"))])
+    )
+
+
+def _rules_json(compiled_rules: List[CompiledRule]) -> str:
+    return stable_json_dumps([asdict(rule) for rule in compiled_rules])
+
+
+def _patched_oracle_ids(patch_rows: List[Dict[str, Any]] | None) -> set[str]:
+    return {
+        str(patch.get("oracle_id") or "").strip()
+        for patch in (patch_rows or [])
+        if isinstance(patch, dict) and str(patch.get("oracle_id") or "").strip() != ""
+    }
+
+
+def _plan_retag_reuse(
+    snapshot_id: str,
+    taxonomy_version: str,
+    compiled_rules: List[CompiledRule],
+    cards: List[Dict[str, Any]],
+    text_hashes: Dict[str, str],
+    patch_rows: List[Dict[str, Any]] | None,
+    created_at: str,
+) -> RetagPlan | None:
+    """Pick the most recent tagged run and the cards whose rows can be copied from it.
+
+    A card is reused when its text is unchanged, no patch touched it in
+    either run, and no added/removed/edited rule passes its literal prefilter
+    on the card's text. Everything else is re-tagged. When snapshot_id was
+    ingested incrementally against the base run's snapshot, its change
+    manifest says which cards changed and no text hashes are compared.
+    """
+    with connect() as con:
+        ensure_card_tag_fingerprint_tables(con)
+        base = con.execute(
+            """
+            SELECT snapshot_id, taxonomy_version, tagger_version, rules_json, created_at
+            FROM card_tag_rulesets_v1
+            ORDER BY created_at DESC, rowid DESC
+            LIMIT 1
+            """
+        ).fetchone()
+        if base is None or base[2] != TAGGER_VERSION:
+            return None
+        base_snapshot_id, base_taxonomy_version = str(base[0]), str(base[1])
+        base_key = (base_snapshot_id, base_taxonomy_version)
+
+        try:
+            base_rules = [CompiledRule(**record) for record in json.loads(base[3])]
+        except (TypeError, ValueError):
+            return None
+
+        changed_oracle_ids: Set[str] | None = None
+        if load_snapshot_change_base(con, snapshot_id) == base_snapshot_id:
+            manifest_changes = load_snapshot_changes(con, snapshot_id)
+            if manifest_changes is not None:
+                changed_oracle_ids = set(manifest_changes)
+        base_text_hashes: Dict[str, str] = {}
+        if changed_oracle_ids is None:
+            base_text_hashes = {
+                row[0]: row[1]
+                for row in con.execute(
+                    "SELECT oracle_id, text_hash FROM card_tag_fingerprints_v1 WHERE snapshot_id = ? AND taxonomy_version = ?",
+                    base_key,
+                )
+            }
+        base_rows = {
+            row[0]: (row[1], row[2])
+            for row in con.execute(
+                """
+                SELECT oracle_id, primitive_ids_json, equiv_class_ids_json
+                FROM card_tags
+                WHERE snapshot_id = ? AND taxonomy_version = ?
+                """,
+                base_key,
+            )
+        }
+        ensure_patches_applied_table(con)
+        excluded = _patched_oracle_ids(patch_rows)
+        excluded.update(
+            row[0]
+            for row in con.execute(
+                "SELECT DISTINCT oracle_id FROM patches_applied WHERE snapshot_id = ? AND taxonomy_version = ?",
+                base_key,
+            )
+        )
+        ensure_unknowns_queue_table(con)
+        base_unknowns = con.execute(
+            """
+            SELECT oracle_id, rule_id, reason, snippet
+            FROM unknowns_queue
+            WHERE snapshot_id = ? AND taxonomy_version = ?
+            ORDER BY id ASC
+            """,
+            base_key,
+        ).fetchall()
+
+    rule_counts = Counter(stable_json_dumps(asdict(rule)) for rule in compiled_rules)
+    rule_counts.subtract(stable_json_dumps(asdict(rule)) for rule in base_rules)
+    changed_rules = [CompiledRule(**json.loads(rule_json)) for rule_json, count in rule_counts.items() if count != 0]
+    changed_matcher = RuleMatcher(changed_rules) if changed_rules else None
+
+    reused_rows: Dict[str, Tuple[str, str]] = {}
+    for card in cards:
+        oracle_id = _safe_str(card.get("oracle_id"))
+        if oracle_id is None or oracle_id in excluded or oracle_id not in base_rows:
+            continue
+        if changed_oracle_ids is not None:
+            if oracle_id in changed_oracle_ids:
+                continue
+        elif base_text_hashes.get(oracle_id) != text_hashes.get(oracle_id):
+            continue
+        if changed_matcher is not None and (
+            changed_matcher.may_match("oracle_text", _normalize_text(card.get("oracle_text")))
+            or changed_matcher.may_match("type_line", _normalize_text(card.get("type_line")))
+        ):
+            continue
+        reused_rows[oracle_id] = base_rows[oracle_id]
+
+    reused_unknowns = [
+        UnknownQueueRow(
+            oracle_id=row[0],
+            snapshot_id=snapshot_id,
+            taxonomy_version=taxonomy_version,
+            rule_id=row[1],
+            reason=row[2],
+            snippet=row[3],
+            created_at=created_at,
+        )
+        for row in base_unknowns
+        if row[0] in reused_rows
+    ]
+    return RetagPlan(
+        base_snapshot_id=base_snapshot_id,
+        base_taxonomy_version=base_taxonomy_version,
+        rules_changed=len(changed_rules),
+        reused_rows=reused_rows,
+        reused_unknowns=reused_unknowns,
+        used_change_manifest=changed_oracle_ids is not None,
+        base_created_at=base[4] if isinstance(base[4], str) else None,
+    )
 
 
 def _persist_rows(
@@ -444,6 +942,10 @@ def _persist_rows(
     tag_rows: List[Dict[str, Any]],
     unknown_rows: List[UnknownQueueRow],
     patch_rows_applied: List[PatchAppliedRow],
+    text_hashes: Dict[str, str] | None = None,
+    rules_json: str | None = None,
+    retag_plan: RetagPlan | None = None,
+    created_at: str | None = None,
 ) -> Dict[str, Any]:
     def _read_snapshot_manifest_json(con: Any, target_snapshot_id: str) -> Dict[str, Any]:
         try:
@@ -530,10 +1032,35 @@ def _persist_rows(
     taxonomy_version = taxonomy_pack.taxonomy_version
     manifest_summary: Dict[str, Any] = {}
 
-    with connect() as con:
+    run_created_at = created_at or utc_now_iso()
+
+    with connect() as con, _bulk_load_settings(con):
         ensure_card_tags_table(con)
         ensure_unknowns_queue_table(con)
         ensure_patches_applied_table(con)
+        ensure_card_tag_fingerprint_tables(con)
+
+        reused_written = 0
+        if retag_plan is not None and retag_plan.reused_rows:
+            # Stage the reused rows first: the base run may be this very snapshot/taxonomy pair.
+            con.execute("DROP TABLE IF EXISTS temp.retag_reused_ids")
+            con.execute("DROP TABLE IF EXISTS temp.retag_reused_card_tags")
+            con.execute("CREATE TEMP TABLE retag_reused_ids (oracle_id TEXT PRIMARY KEY)")
+            con.executemany(
+                "INSERT INTO temp.retag_reused_ids (oracle_id) VALUES (?)",
+                [(oracle_id,) for oracle_id in sorted(retag_plan.reused_rows)],
+            )
+            con.execute(
+                """
+                CREATE TEMP TABLE retag_reused_card_tags AS
+                SELECT oracle_id, primitive_ids_json, equiv_class_ids_json, facets_json, evidence_json
+                FROM card_tags
+                WHERE snapshot_id = ?
+                  AND taxonomy_version = ?
+                  AND oracle_id IN (SELECT oracle_id FROM temp.retag_reused_ids)
+                """,
+                (retag_plan.base_snapshot_id, retag_plan.base_taxonomy_version),
+            )
 
         con.execute(
             "DELETE FROM card_tags WHERE snapshot_id = ? AND taxonomy_version = ?",
@@ -548,7 +1075,12 @@ def _persist_rows(
             (snapshot_id, taxonomy_version),
         )
 
-        tag_insert_rows = [
+        rows_to_load = len(tag_rows) + (len(retag_plan.reused_rows) if retag_plan is not None else 0)
+        deferred_index_sql = drop_secondary_indexes_for_bulk_load(con, "card_tags", rows_to_load=rows_to_load)
+
+        # Serialized lazily: executemany consumes the generator, so the JSON
+        # payloads for the whole snapshot are never held in memory at once.
+        tag_insert_rows = (
             (
                 row["oracle_id"],
                 row["snapshot_id"],
@@ -561,10 +1093,26 @@ def _persist_rows(
                 row["created_at"],
             )
             for row in tag_rows
-        ]
+        )
+        con.executemany(
+            """
+            INSERT INTO card_tags (
+              oracle_id,
+              snapshot_id,
+              taxonomy_version,
+              ruleset_version,
+              primitive_ids_json,
+              equiv_class_ids_json,
+              facets_json,
+              evidence_json,
+              created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            tag_insert_rows,
+        )
 
-        if tag_insert_rows:
-            con.executemany(
+        if retag_plan is not None and retag_plan.reused_rows:
+            reused_written = con.execute(
                 """
                 INSERT INTO card_tags (
                   oracle_id,
@@ -576,13 +1124,45 @@ def _persist_rows(
                   facets_json,
                   evidence_json,
                   created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                )
+                SELECT oracle_id, ?, ?, ?, primitive_ids_json, equiv_class_ids_json, facets_json, evidence_json, ?
+                FROM temp.retag_reused_card_tags
                 """,
-                tag_insert_rows,
-            )
+                (snapshot_id, taxonomy_version, taxonomy_pack.ruleset_version, run_created_at),
+            ).rowcount
+            con.execute("DROP TABLE temp.retag_reused_card_tags")
+            con.execute("DROP TABLE temp.retag_reused_ids")
+
+        for index_sql in deferred_index_sql:
+            con.execute(index_sql)
 
         unknown_inserted = insert_unknowns(con=con, rows=unknown_rows)
 
+        if text_hashes is not None and rules_json is not None:
+            con.execute(
+                "DELETE FROM card_tag_fingerprints_v1 WHERE snapshot_id = ? AND taxonomy_version = ?",
+                (snapshot_id, taxonomy_version),
+            )
+            con.executemany(
+                """
+                INSERT INTO card_tag_fingerprints_v1 (snapshot_id, taxonomy_version, oracle_id, text_hash)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(snapshot_id, taxonomy_version, oracle_id, text_hash) for oracle_id, text_hash in text_hashes.items()],
+            )
+            con.execute(
+                """
+                INSERT OR REPLACE INTO card_tag_rulesets_v1 (
+                  snapshot_id,
+                  taxonomy_version,
+                  tagger_version,
+                  rules_json,
+                  created_at
+                ) VALUES (?, ?, ?, ?, ?)
+                """,
+                (snapshot_id, taxonomy_version, TAGGER_VERSION, rules_json, run_created_at),
+            )
+
         patch_rows_with_meta: List[PatchAppliedRow] = []
         for row in patch_rows_applied:
             patch_rows_with_meta.append(
@@ -606,7 +1186,7 @@ def _persist_rows(
         con.commit()
 
     summary = {
-        "card_tags_written": len(tag_insert_rows),
+        "card_tags_written": len(tag_rows) + int(reused_written),
         "unknowns_written": int(unknown_inserted),
         "patches_written": int(patches_inserted),
     }
@@ -615,26 +1195,90 @@ def _persist_rows(
     return summary
 
 
+def _plan_index_delta(
+    retag_plan: RetagPlan | None,
+    taxonomy_version: str,
+    cards_to_tag: List[Dict[str, Any]],
+) -> Tuple[List[str] | None, str | None]:
+    """(oracle_ids, base_snapshot_id) for build_indices after an incremental run; (None, None) means a full rebuild.
+
+    Only re-tagged cards need new index rows when the reused ones came from a
+    run whose inverted indices were built from exactly those card_tags rows.
+    """
+    if retag_plan is None or retag_plan.base_taxonomy_version != taxonomy_version or retag_plan.base_created_at is None:
+        return None, None
+    with connect() as con:
+        built_from = indices_built_from(con, retag_plan.base_snapshot_id, taxonomy_version)
+    if built_from != retag_plan.base_created_at:
+        return None, None
+    oracle_ids = sorted(
+        oracle_id for oracle_id in (_safe_str(card.get("oracle_id")) for card in cards_to_tag) if oracle_id is not None
+    )
+    return oracle_ids, retag_plan.base_snapshot_id
+
+
 def compile_snapshot_tags(
     snapshot_id: str,
     taxonomy_pack_folder: str,
     patch_rows: List[Dict[str, Any]] | None = None,
     build_indices: bool = False,
+    workers: int = 1,
+    incremental: bool = False,
 ) -> Dict[str, Any]:
     if not snapshot_exists(snapshot_id):
         raise ValueError(f"snapshot_id not found: {snapshot_id}")
 
-    taxonomy_pack = load(taxonomy_pack_folder)
-    compiled_rules = _compile_rules(taxonomy_pack.rulespec_rules)
+    compiled_pack = load_compiled_pack(taxonomy_pack_folder)
+    taxonomy_pack = compiled_pack.pack
+    compiled_rules = list(compiled_pack.rules)
 
+    run_created_at = utc_now_iso()
     cards = _fetch_snapshot_cards(snapshot_id=snapshot_id)
-    tag_rows, unknown_rows = _build_card_rows(
-        cards=cards,
-        compiled_rules=compiled_rules,
-        snapshot_id=snapshot_id,
-        taxonomy_version=taxonomy_pack.taxonomy_version,
-        ruleset_version=taxonomy_pack.ruleset_version,
-    )
+    text_hashes: Dict[str, str] = {}
+    for card in cards:
+        card_oracle_id = _safe_str(card.get("oracle_id"))
+        if card_oracle_id is not None:
+            text_hashes[card_oracle_id] = _card_text_hash(card)
+    retag_plan = None
+    if incremental:
+        retag_plan = _plan_retag_reuse(
+            snapshot_id=snapshot_id,
+            taxonomy_version=taxonomy_pack.taxonomy_version,
+            compiled_rules=compiled_rules,
+            cards=cards,
+            text_hashes=text_hashes,
+            patch_rows=patch_rows,
+            created_at=run_created_at,
+        )
+    reused_rows = retag_plan.reused_rows if retag_plan is not None else {}
+    cards_to_tag = [card for card in cards if _safe_str(card.get("oracle_id")) not in reused_rows] if reused_rows else cards
+
+    tag_workers = max(int(workers), 1)
+    if len(cards_to_tag) < tag_workers * TAG_MIN_CARDS_PER_WORKER:
+        tag_workers = 1
+    if tag_workers > 1:
+        tag_rows, unknown_rows = _build_card_rows_parallel(
+            cards=cards_to_tag,
+            compiled_rules=compiled_rules,
+            snapshot_id=snapshot_id,
+            taxonomy_version=taxonomy_pack.taxonomy_version,
+            ruleset_version=taxonomy_pack.ruleset_version,
+            workers=tag_workers,
+            created_at=run_created_at,
+            matcher=compiled_pack.matcher,
+        )
+    else:
+        tag_rows, unknown_rows = _build_card_rows(
+            cards=cards_to_tag,
+            compiled_rules=compiled_rules,
+            snapshot_id=snapshot_id,
+            taxonomy_version=taxonomy_pack.taxonomy_version,
+            ruleset_version=taxonomy_pack.ruleset_version,
+            created_at=run_created_at,
+            matcher=compiled_pack.matcher,
+        )
+    if retag_plan is not None and retag_plan.reused_unknowns:
+        unknown_rows = _sort_unknown_rows(unknown_rows + retag_plan.reused_unknowns)
 
     tag_rows_after_patch, patch_rows_applied = apply_patch_overrides(tag_rows, patch_rows)
 
@@ -644,6 +1288,10 @@ def compile_snapshot_tags(
         tag_rows=tag_rows_after_patch,
         unknown_rows=unknown_rows,
         patch_rows_applied=patch_rows_applied,
+        text_hashes=text_hashes,
+        rules_json=_rules_json(compiled_rules),
+        retag_plan=retag_plan,
+        created_at=run_created_at,
     )
 
     run_hash_rows = [
@@ -655,6 +1303,10 @@ def compile_snapshot_tags(
         for row in tag_rows_after_patch
         if isinstance(row.get("oracle_id"), str)
     ]
+    run_hash_rows.extend(
+        (oracle_id, primitive_ids_json, equiv_class_ids_json)
+        for oracle_id, (primitive_ids_json, equiv_class_ids_json) in reused_rows.items()
+    )
     run_hash_rows_sorted = sorted(run_hash_rows)
     run_hash = sha256_hex(stable_json_dumps(run_hash_rows_sorted))
 
@@ -664,14 +1316,30 @@ def compile_snapshot_tags(
         "ruleset_version": taxonomy_pack.ruleset_version,
         "cards_seen": len(cards),
         "rules_compiled": len(compiled_rules),
+        "tag_workers": tag_workers,
+        "cards_reused": len(reused_rows),
+        "cards_retagged": len(cards_to_tag),
         **persist_summary,
         "run_hash": run_hash,
     }
 
+    if retag_plan is not None:
+        summary["retag_base_snapshot_id"] = retag_plan.base_snapshot_id
+        summary["retag_base_taxonomy_version"] = retag_plan.base_taxonomy_version
+        summary["rules_changed"] = retag_plan.rules_changed
+        summary["retag_used_change_manifest"] = retag_plan.used_change_manifest
+
     if build_indices:
+        index_oracle_ids, index_base_snapshot_id = _plan_index_delta(
+            retag_plan=retag_plan,
+            taxonomy_version=taxonomy_pack.taxonomy_version,
+            cards_to_tag=cards_to_tag,
+        )
         index_summary = build_runtime_indices(
             snapshot_id=snapshot_id,
             taxonomy_version=taxonomy_pack.taxonomy_version,
+            oracle_ids=index_oracle_ids,
+            base_snapshot_id=index_base_snapshot_id,
         )
         summary.update(
             {
@@ -855,6 +1523,17 @@ def main() -> int:
         action="store_true",
         help="Build lookup and inverted indices after successful compile",
     )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Tag cards on N worker processes (output is identical to a single-process run)",
+    )
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Copy tag rows forward from the previous run for cards whose text and matching rules are unchanged",
+    )
     ap.add_argument(
         "--unknowns_report",
         action="store_true",
@@ -905,6 +1584,8 @@ def main() -> int:
         taxonomy_pack_folder=args.taxonomy_pack,
         patch_rows=patch_rows,
         build_indices=bool(args.build_indices),
+        workers=int(args.workers),
+        incremental=bool(args.incremental),
     )
     print(json.dumps(summary, separators=(",", ":"), sort_keys=True, ensure_ascii=False))
     return 0
@@ -4,9 +4,10 @@ import argparse
 import json
 import re
 import zipfile
+from contextlib import closing
 from datetime import datetime, timezone
 from pathlib import PurePosixPath, Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Generator, Iterable, Iterator, List, Tuple
 from xml.etree import ElementTree
 
 from .pack_manifest import build_manifest, stable_json_dumps, write_manifest
@@ -17,6 +18,18 @@ MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
 REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
 PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
 
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+_SI_TAG = f"{{{MAIN_NS}}}si"
+_T_TAG = f"{{{MAIN_NS}}}t"
+_C_TAG = f"{{{MAIN_NS}}}c"
+_V_TAG = f"{{{MAIN_NS}}}v"
+_ROW_TAG = f"{{{MAIN_NS}}}row"
+_SHEET_DATA_TAG = f"{{{MAIN_NS}}}sheetData"
+_INLINE_TEXT_PATH = f".//{{{MAIN_NS}}}is/{{{MAIN_NS}}}t"
+
+COL_INDEX_CACHE_MAX = 4096
+_COL_INDEX_CACHE: Dict[str, int] = {}
+
 EXPORTER_VERSION = "taxonomy_exporter_v2"
 PRIMARY_KEY_CANDIDATES = (
     "rule_id",
@@ -99,18 +112,46 @@ def _deterministic_iso_from_file_mtime(path: Path) -> str:
     return dt.isoformat()
 
 
-def _read_shared_strings(zf: zipfile.ZipFile) -> List[str]:
-    if "xl/sharedStrings.xml" not in zf.namelist():
-        return []
-    root = ElementTree.fromstring(zf.read("xl/sharedStrings.xml"))
-    ns = {"a": MAIN_NS}
-    values: List[str] = []
-    for node in root.findall(".//a:si", ns):
-        text_parts: List[str] = []
-        for text_node in node.findall(".//a:t", ns):
-            text_parts.append(text_node.text or "")
-        values.append("".join(text_parts))
-    return values
+class _SharedStrings:
+    """xl/sharedStrings.xml resolved lazily: the part is streamed only as far as the highest index requested."""
+
+    def __init__(self, zf: zipfile.ZipFile) -> None:
+        self._values: List[str] = []
+        self._pending: Generator[str, None, None] | None = None
+        if SHARED_STRINGS_PART in zf.namelist():
+            self._pending = _iter_shared_strings(zf)
+
+    def get(self, idx: int) -> str | None:
+        while idx >= len(self._values) and self._pending is not None:
+            value = next(self._pending, None)
+            if value is None:
+                self._pending = None
+                break
+            self._values.append(value)
+        if idx < 0 or idx >= len(self._values):
+            return None
+        return self._values[idx]
+
+    def close(self) -> None:
+        if self._pending is not None:
+            self._pending.close()
+            self._pending = None
+
+
+def _iter_shared_strings(zf: zipfile.ZipFile) -> Generator[str, None, None]:
+    with zf.open(SHARED_STRINGS_PART) as handle:
+        root: ElementTree.Element | None = None
+        for event, node in ElementTree.iterparse(handle, events=("start", "end")):
+            if root is None:
+                root = node
+                continue
+            if event == "end" and node.tag == _SI_TAG:
+                yield "".join(text_node.text or "" for text_node in node.iter(_T_TAG))
+                root.clear()
+
+
+def _read_shared_strings(zf: zipfile.ZipFile) -> _SharedStrings:
+    return _SharedStrings(zf)
 
 
 def _normalize_relationship_target(target: str) -> str:
@@ -161,24 +202,30 @@ def _workbook_sheet_targets(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
 
 
 def _col_ref_to_index(cell_ref: str) -> int:
-    letters = "".join([ch for ch in str(cell_ref) if ch.isalpha()]).upper()
-    if letters == "":
-        return 0
+    # Keyed by the ref without its row number, so one entry serves a whole column.
+    column_ref = str(cell_ref).rstrip("0123456789")
+    cached = _COL_INDEX_CACHE.get(column_ref)
+    if cached is not None:
+        return cached
+
+    letters = "".join([ch for ch in column_ref if ch.isalpha()]).upper()
     out = 0
     for ch in letters:
         out = (out * 26) + (ord(ch) - ord("A") + 1)
-    return max(0, out - 1)
+    col_idx = max(0, out - 1)
+    if len(_COL_INDEX_CACHE) < COL_INDEX_CACHE_MAX:
+        _COL_INDEX_CACHE[column_ref] = col_idx
+    return col_idx
 
 
-def _decode_cell_value(cell_node: ElementTree.Element, shared_strings: List[str]) -> Any:
-    ns = {"a": MAIN_NS}
+def _decode_cell_value(cell_node: ElementTree.Element, shared_strings: _SharedStrings) -> Any:
     cell_type = cell_node.attrib.get("t")
 
     if cell_type == "inlineStr":
-        text_parts = [node.text or "" for node in cell_node.findall(".//a:is/a:t", ns)]
+        text_parts = [node.text or "" for node in cell_node.iterfind(_INLINE_TEXT_PATH)]
         return "".join(text_parts)
 
-    value_node = cell_node.find("a:v", ns)
+    value_node = cell_node.find(_V_TAG)
     value_text = value_node.text if value_node is not None else None
 
     if cell_type == "s":
@@ -188,9 +235,7 @@ def _decode_cell_value(cell_node: ElementTree.Element, shared_strings: List[str]
             idx = int(value_text)
         except Exception:
             return None
-        if idx < 0 or idx >= len(shared_strings):
-            return None
-        return shared_strings[idx]
+        return shared_strings.get(idx)
 
     if cell_type == "b":
         return "true" if str(value_text or "0") == "1" else "false"
@@ -200,40 +245,52 @@ def _decode_cell_value(cell_node: ElementTree.Element, shared_strings: List[str]
     return value_text
 
 
-def _read_worksheet_rows(zf: zipfile.ZipFile, worksheet_target: str, shared_strings: List[str]) -> List[List[Any]]:
-    ns = {"a": MAIN_NS}
-    root = ElementTree.fromstring(zf.read(worksheet_target))
-
-    rows: List[List[Any]] = []
-    for row_node in root.findall(".//a:sheetData/a:row", ns):
-        cell_map: Dict[int, Any] = {}
-        max_col = -1
-        fallback_col = 0
-
-        for cell_node in row_node.findall("a:c", ns):
-            ref = cell_node.attrib.get("r")
-            col_idx = _col_ref_to_index(ref) if isinstance(ref, str) else fallback_col
-            fallback_col = max(fallback_col, col_idx + 1)
+def _dense_row(row_node: ElementTree.Element, shared_strings: _SharedStrings) -> List[Any]:
+    cell_map: Dict[int, Any] = {}
+    max_col = -1
+    fallback_col = 0
 
-            cell_value = _decode_cell_value(cell_node, shared_strings)
-            if cell_value is None:
-                continue
-            cell_map[col_idx] = cell_value
-            max_col = max(max_col, col_idx)
+    for cell_node in row_node.iterfind(_C_TAG):
+        ref = cell_node.attrib.get("r")
+        col_idx = _col_ref_to_index(ref) if isinstance(ref, str) else fallback_col
+        fallback_col = max(fallback_col, col_idx + 1)
 
-        if max_col < 0:
-            rows.append([])
+        cell_value = _decode_cell_value(cell_node, shared_strings)
+        if cell_value is None:
             continue
+        cell_map[col_idx] = cell_value
+        max_col = max(max_col, col_idx)
 
-        dense_row: List[Any] = [None] * (max_col + 1)
-        for idx, value in cell_map.items():
-            dense_row[idx] = value
-
-        while dense_row and dense_row[-1] is None:
-            dense_row.pop()
-        rows.append(dense_row)
+    if max_col < 0:
+        return []
 
-    return rows
+    dense_row: List[Any] = [None] * (max_col + 1)
+    for idx, value in cell_map.items():
+        dense_row[idx] = value
+
+    while dense_row and dense_row[-1] is None:
+        dense_row.pop()
+    return dense_row
+
+
+def _read_worksheet_rows(
+    zf: zipfile.ZipFile,
+    worksheet_target: str,
+    shared_strings: _SharedStrings,
+) -> Iterator[List[Any]]:
+    """Stream a worksheet's sheetData rows; each parsed row is dropped from the tree once emitted."""
+    with zf.open(worksheet_target) as handle:
+        sheet_data: ElementTree.Element | None = None
+        for event, node in ElementTree.iterparse(handle, events=("start", "end")):
+            if event == "start":
+                if node.tag == _SHEET_DATA_TAG:
+                    sheet_data = node
+                continue
+            if node.tag == _ROW_TAG and sheet_data is not None:
+                yield _dense_row(node, shared_strings)
+                sheet_data.clear()
+            elif node.tag == _SHEET_DATA_TAG:
+                sheet_data = None
 
 
 def _is_empty_row(row: List[Any]) -> bool:
@@ -261,21 +318,21 @@ def _normalize_headers(header_row: List[Any]) -> List[str]:
     return headers
 
 
-def _rows_to_records(rows: List[List[Any]]) -> List[Dict[str, Any]]:
-    header_idx = None
-    for idx, row in enumerate(rows):
+def _rows_to_records(rows: Iterable[List[Any]]) -> List[Dict[str, Any]]:
+    row_iter = iter(rows)
+    header_row = None
+    for row in row_iter:
         if not _is_empty_row(row):
-            header_idx = idx
+            header_row = row
             break
 
-    if header_idx is None:
+    if header_row is None:
         return []
 
-    header_row = rows[header_idx]
     headers = _normalize_headers(header_row)
 
     out: List[Dict[str, Any]] = []
-    for row in rows[header_idx + 1 :]:
+    for row in row_iter:
         if _is_empty_row(row):
             continue
         record: Dict[str, Any] = {}
@@ -478,15 +535,12 @@ def export_workbook_to_pack(
     output_base = Path(out_dir).resolve()
     output_base.mkdir(parents=True, exist_ok=True)
 
-    with zipfile.ZipFile(workbook, "r") as zf:
-        shared_strings = _read_shared_strings(zf)
+    with zipfile.ZipFile(workbook, "r") as zf, closing(_read_shared_strings(zf)) as shared_strings:
         sheet_targets = _workbook_sheet_targets(zf)
 
-        rows_by_sheet: Dict[str, List[List[Any]]] = {}
         records_by_sheet: Dict[str, List[Dict[str, Any]]] = {}
         for sheet_name, target in sheet_targets:
             rows = _read_worksheet_rows(zf=zf, worksheet_target=target, shared_strings=shared_strings)
-            rows_by_sheet[sheet_name] = rows
             records_by_sheet[sheet_name] = _rows_to_records(rows)
 
     available_sheet_names = [name for name, _ in sheet_targets]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import sqlite3
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import scripts.build_primitive_tag_index_v0 as builder
+
+SNAPSHOT_ID = "snap_primitive_index_test"
+RULESET_VERSION = "primitives_test_v1"
+CARD_COUNT = 1200
+
+_RULES = [
+    {"rule_id": "R_RAMP", "primitive_id": "RAMP", "rule_type": "oracle_regex", "pattern": r"\badd\s+\{[WUBRGC]\}", "priority": 10},
+    {"rule_id": "R_ROCK", "primitive_id": "MANA_ROCK", "rule_type": "type_line_regex", "pattern": r"\bartifact\b", "weight": 0.8, "priority": 20},
+    {"rule_id": "R_ROCK_ADD", "primitive_id": "MANA_ROCK", "rule_type": "oracle_regex", "pattern": r"\badd\s+\{[WUBRGC]\}", "priority": 21},
+    {"rule_id": "R_DRAW", "primitive_id": "CARD_DRAW", "rule_type": "oracle_regex", "pattern": r"\bdraw (a|two) cards?\b", "priority": 30},
+    {"rule_id": "R_WIPE", "primitive_id": "BOARD_WIPE", "rule_type": "oracle_regex", "pattern": r"\bdestroy all\b", "weight": 0.4, "priority": 40},
+    {"rule_id": "R_EVASION", "primitive_id": "EVASION", "rule_type": "keyword", "pattern": '{"any": ["Flying", "Menace"]}', "priority": 50},
+    {"rule_id": "R_OFF", "primitive_id": "OFF", "rule_type": "oracle_regex", "pattern": r"draw", "enabled": 0},
+]
+
+_TEXTS = [
+    ("{T}: Add {G}.", "Creature — Elf Druid", []),
+    ("{T}: Add {C}.", "Artifact", []),
+    ("When this enters, draw a card.", "Creature — Human Wizard", ["Flying"]),
+    ("Destroy all creatures.", "Sorcery", []),
+    ("Draw two cards, then add {U}.", "Instant", []),
+    ("Menace", "Creature — Ogre", ["Menace"]),
+    ("", "Basic Land — Forest", []),
+]
+
+
+def _write_ruleset(root: Path, rules: list) -> tuple[Path, Path]:
+    defs_path = root / "primitive_defs.json"
+    rules_path = root / "primitive_rules.json"
+    primitives = sorted({rule["primitive_id"] for rule in rules})
+    defs_path.write_text(
+        json.dumps(
+            {
+                "ruleset_version": RULESET_VERSION,
+                "primitives": [
+                    {"primitive_id": pid, "name": pid, "description": pid, "category": "test"} for pid in primitives
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    rules_path.write_text(json.dumps({"ruleset_version": RULESET_VERSION, "rules": rules}), encoding="utf-8")
+    return defs_path, rules_path
+
+
+def _create_cards_db(db_path: Path) -> None:
+    con = sqlite3.connect(str(db_path))
+    try:
+        con.execute(
+            "CREATE TABLE cards (snapshot_id TEXT, oracle_id TEXT, name TEXT, oracle_text TEXT, type_line TEXT, keywords TEXT, "
+            "PRIMARY KEY (snapshot_id, oracle_id))"
+        )
+        rows = []
+        for idx in range(CARD_COUNT):
+            oracle_text, type_line, keywords = _TEXTS[idx % len(_TEXTS)]
+            rows.append(
+                (SNAPSHOT_ID, f"oracle-{idx:05d}", f"Card {idx:05d}", f"{oracle_text} ({idx})", type_line, json.dumps(keywords))
+            )
+        con.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?)", rows)
+        con.commit()
+    finally:
+        con.close()
+
+
+class BuildPrimitiveTagIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.db_path = self.root / "cards.sqlite"
+        _create_cards_db(self.db_path)
+        self.use_rules(_RULES)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def use_rules(self, rules: list) -> None:
+        self.defs_path, self.rules_path = _write_ruleset(self.root, rules)
+
+    def build(self, db_path: Path, *extra: str) -> dict:
+        stdout = io.StringIO()
+        with patch.object(builder, "PRIMITIVE_DEFS_REL", self.defs_path), patch.object(
+            builder, "PRIMITIVE_RULES_REL", self.rules_path
+        ), redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            exit_code = builder.main(["--db", str(db_path), "--snapshot-id", SNAPSHOT_ID, *extra])
+        self.assertEqual(exit_code, 0)
+        return json.loads(stdout.getvalue().strip().splitlines()[-1])
+
+    def copy_db(self, name: str) -> Path:
+        path = self.root / name
+        shutil.copyfile(self.db_path, path)
+        return path
+
+    @staticmethod
+    def index_rows(db_path: Path) -> dict:
+        con = sqlite3.connect(str(db_path))
+        try:
+            return {
+                "tags": con.execute("SELECT * FROM card_primitive_tags_v0 ORDER BY oracle_id, primitive_id").fetchall(),
+                "unknowns": con.execute("SELECT * FROM primitive_tag_unknowns_v0 ORDER BY oracle_id, reason").fetchall(),
+            }
+        finally:
+            con.close()
+
+    def assertSameBuild(self, left: tuple, right: tuple) -> None:
+        (left_path, left_summary), (right_path, right_summary) = left, right
+        for key in ("run_hash_v1", "cards_processed", "tags_emitted", "unknowns_emitted"):
+            self.assertEqual(left_summary[key], right_summary[key], key)
+        self.assertEqual(self.index_rows(left_path), self.index_rows(right_path))
+
+    def test_full_workers_and_incremental_builds_are_identical(self) -> None:
+        workers_db = self.copy_db("workers.sqlite")
+        full = self.build(self.db_path)
+        self.assertGreater(full["tags_emitted"], 0)
+        self.assertGreater(full["unknowns_emitted"], 0)
+
+        with patch.object(builder, "TAG_BATCH_SIZE", 100):
+            workers = self.build(workers_db, "--workers", "2")
+        self.assertEqual(workers["workers"], 2)
+        self.assertSameBuild((self.db_path, full), (workers_db, workers))
+
+        rebuilt = self.build(self.db_path, "--incremental")
+        self.assertEqual(rebuilt["cards_reused"], CARD_COUNT)
+        self.assertSameBuild((self.db_path, full), (self.db_path, rebuilt))
+
+    def test_incremental_after_text_change_matches_full_build(self) -> None:
+        self.build(self.db_path)
+        con = sqlite3.connect(str(self.db_path))
+        try:
+            con.execute("UPDATE cards SET oracle_text = 'Destroy all artifacts.' WHERE oracle_id = 'oracle-00000'")
+            con.execute("UPDATE cards SET oracle_text = 'Nothing relevant.' WHERE oracle_id = 'oracle-00001'")
+            con.execute("DELETE FROM cards WHERE oracle_id = 'oracle-00002'")
+            con.commit()
+        finally:
+            con.close()
+        full_db = self.copy_db("full.sqlite")
+
+        with patch.object(builder, "TAG_BATCH_SIZE", 100):
+            incremental = self.build(self.db_path, "--incremental", "--workers", "2")
+        full = self.build(full_db)
+
+        self.assertEqual(incremental["cards_retagged"], 2)
+        self.assertSameBuild((self.db_path, incremental), (full_db, full))
+
+    def test_incremental_after_rule_edit_matches_full_build(self) -> None:
+        self.build(self.db_path)
+        full_db = self.copy_db("full.sqlite")
+
+        edited = [dict(rule) for rule in _RULES]
+        edited[3]["pattern"] = r"\bdraw two cards?\b"
+        edited[4]["weight"] = 1.0
+        self.use_rules(edited)
+        incremental = self.build(self.db_path, "--incremental")
+        full = self.build(full_db)
+
+        self.assertGreater(incremental["cards_reused"], 0)
+        self.assertGreater(incremental["cards_retagged"], 0)
+        self.assertSameBuild((self.db_path, incremental), (full_db, full))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from snapshot_build.bulk_json_stream import iter_batches, iter_json_array
+
+
+class BulkJsonStreamTests(unittest.TestCase):
+    def _write(self, root: Path, text: str, *, bom: bool = False) -> Path:
+        path = root / "bulk.json"
+        path.write_bytes((b"\xef\xbb\xbf" if bom else b"") + text.encode("utf-8"))
+        return path
+
+    def test_elements_match_json_loads_for_every_chunk_size(self) -> None:
+        payload = [
+            {"name": "Fire // Ice", "oracle_text": "Deal 2 damage]}, \"quoted\" \\ text", "cmc": 2.0},
+            {"name": "Æther Vial", "faces": [{"image_uris": {"small": "https://x/ä.jpg"}}]},
+            12345,
+            -0.5e3,
+            None,
+            True,
+            "Lim-Dûl's Vault",
+            [],
+            {},
+        ]
+        text = " \n" + json.dumps(payload, ensure_ascii=False, indent=1) + "\n"
+        with TemporaryDirectory() as tmp_dir:
+            path = self._write(Path(tmp_dir), text, bom=True)
+            for chunk_bytes in (1, 2, 3, 7, 64, 1 << 20):
+                self.assertEqual(list(iter_json_array(path, chunk_bytes=chunk_bytes)), payload, chunk_bytes)
+
+    def test_empty_and_malformed_arrays(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            self.assertEqual(list(iter_json_array(self._write(root, " [ ] "))), [])
+            for text in ('{"a": 1}', "", "[1, 2", "[1 2]", "[1,]", "[1] 2", '[{"a": ]'):
+                with self.assertRaises(ValueError, msg=text):
+                    list(iter_json_array(self._write(root, text), chunk_bytes=2))
+
+    def test_elements_are_yielded_before_the_file_is_fully_read(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            path = self._write(Path(tmp_dir), '[{"id": 1}, {"id": 2}, this is not json')
+            rows = iter_json_array(path, chunk_bytes=4)
+            self.assertEqual(next(rows), {"id": 1})
+            self.assertEqual(next(rows), {"id": 2})
+            with self.assertRaises(ValueError):
+                next(rows)
+
+    def test_iter_batches(self) -> None:
+        self.assertEqual(list(iter_batches(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(iter_batches(iter([]), 2)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
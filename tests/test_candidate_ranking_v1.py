@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import unittest
+
+from api.engine.candidate_ranking_v1 import rank_candidates_v1
+
+
+def _candidates() -> list[dict]:
+    return [
+        {"name": "Sol Ring", "primitives": ["RAMP_MANA"], "is_game_changer": True},
+        {"name": "Arcane Signet", "primitives": ["RAMP_MANA", "MANA_FIXING"]},
+        {"name": "Brainstorm", "primitives": [" CARD_DRAW ", "CARD_SELECTION"]},
+        {"name": "Counterspell", "primitives": ["COUNTERSPELL"]},
+        {"name": "Grizzly Bears", "primitives": []},
+        {"name": "", "primitives": ["RAMP_MANA"]},
+        "not-a-row",
+        {"name": "Cultivate", "primitives": ["RAMP_LAND", "RAMP_LAND"]},
+    ]
+
+
+def _rank(**overrides) -> list[dict]:
+    kwargs = {
+        "candidates": _candidates(),
+        "deck_state": {"commander_primitives": ["CARD_DRAW"], "anchor_primitives": ["MANA_FIXING"]},
+        "hypothesis": {"core_primitives": ["COUNTERSPELL"]},
+        "missing_targets": {
+            "missing_primitives": ["RAMP_MANA", "CARD_DRAW"],
+            "missing_by_bucket": {"ramp": 2, "draw": 1, "interaction": 0, "protection": 0, "wincon": 0},
+        },
+        "gc_remaining": 0,
+    }
+    kwargs.update(overrides)
+    return rank_candidates_v1(**kwargs)
+
+
+class CandidateRankingV1Tests(unittest.TestCase):
+    def test_rank_order_and_signals(self) -> None:
+        ranked = _rank()
+
+        self.assertEqual(
+            [row["name"] for row in ranked],
+            ["Brainstorm", "Arcane Signet", "Sol Ring", "Cultivate", "Counterspell", "Grizzly Bears"],
+        )
+        self.assertEqual(
+            ranked[1]["ranking_signals_v1"],
+            {
+                "role_compression_score": 2,
+                "covers_missing_targets_count": 1,
+                "covers_missing_primitives_count": 1,
+                "hypothesis_alignment_score": 0,
+                "commander_alignment_score": 0,
+                "anchor_overlap_score": 1,
+                "gc_penalty": 0,
+            },
+        )
+        self.assertEqual(ranked[2]["ranking_signals_v1"]["gc_penalty"], 2)
+        self.assertEqual(ranked[3]["ranking_signals_v1"]["covers_missing_primitives_count"], 0)
+        self.assertNotIn("_rank_key_v1", ranked[0])
+
+    def test_top_k_matches_full_ranking_prefix(self) -> None:
+        full = _rank()
+        for top_k in (0, 1, 3, len(full), len(full) + 5):
+            with self.subTest(top_k=top_k):
+                self.assertEqual(_rank(top_k=top_k), full[:top_k])
+
+    def test_duplicate_names_keep_input_order(self) -> None:
+        candidates = [
+            {"name": "Island", "primitives": [], "slot_id": "S1"},
+            {"name": "Island", "primitives": [], "slot_id": "S0"},
+        ]
+        ranked = _rank(candidates=candidates, top_k=1)
+        self.assertEqual([row["slot_id"] for row in ranked], ["S1"])
+        self.assertEqual([row["slot_id"] for row in _rank(candidates=candidates)], ["S1", "S0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
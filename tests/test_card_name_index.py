@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from engine import db as engine_db
+from engine.card_name_index import CardNameIndex, bounded_osa_distance, fuzzy_max_distance
+from tests.conftest import TEST_SNAPSHOT_ID
+
+_NAMES = [
+    ("oid-1", "Sol Ring"),
+    ("oid-2", "Solemn Simulacrum"),
+    ("oid-3", "Ring of Three Wishes"),
+    ("oid-4", "Soul Ring"),
+    ("oid-5", "Counterspell"),
+    ("oid-6", "Lightning Greaves"),
+    ("oid-7", "Lightning Bolt"),
+    ("oid-8", "Swiftfoot Boots"),
+]
+
+
+def _seed(db_path: Path) -> None:
+    con = sqlite3.connect(str(db_path))
+    try:
+        con.executemany(
+            "INSERT INTO cards (snapshot_id, oracle_id, name) VALUES (?, ?, ?)",
+            [(TEST_SNAPSHOT_ID, oracle_id, name) for oracle_id, name in _NAMES],
+        )
+        con.commit()
+    finally:
+        con.close()
+
+
+def _sql_suggest(snapshot_id: str, query: str, limit: int) -> list[str]:
+    return engine_db._suggest_card_names_sql(snapshot_id, query.strip().lower(), limit)
+
+
+def test_bounded_osa_distance() -> None:
+    assert bounded_osa_distance("sol rnig", "sol ring", 2) == 1
+    assert bounded_osa_distance("counterspel", "counterspell", 1) == 1
+    assert bounded_osa_distance("abc", "xyz", 2) is None
+    assert bounded_osa_distance("sol", "sol ring", 3) is None
+
+
+def test_fuzzy_ranking_is_deterministic() -> None:
+    index = CardNameIndex(snapshot_id="S", rows=[(name, oracle_id) for oracle_id, name in reversed(_NAMES)])
+
+    assert [name for name, _oracle_id, _distance in index.fuzzy_matches("Sol Rnig", 5)] == ["Sol Ring", "Soul Ring"]
+    assert index.fuzzy_matches("lightnig  bolt", 5) == [("Lightning Bolt", "oid-7", 1)]
+    assert index.fuzzy_matches("Swiftfoot Boots", 5, max_distance=0) == [("Swiftfoot Boots", "oid-8", 0)]
+    assert index.fuzzy_matches("qqqqqqqq", 5) == []
+
+
+
+def test_fuzzy_candidates_match_brute_force_osa() -> None:
+    names = [name for _oracle_id, name in _NAMES] + ["Sol", "Ring", "Sole Ring", "Sol Rings", "Lightning Bolts", "Bolt"]
+    index = CardNameIndex(snapshot_id="S", rows=[(name, f"oid-{idx}") for idx, name in enumerate(names)])
+
+    for query in ["sol rign", "So", "rign", "lightnin bolt", "boltt", "counter spell", "swiftfot boot"]:
+        key = " ".join(query.split()).casefold()
+        bound = fuzzy_max_distance(len(key))
+        expected = sorted(
+            name for name in names if bounded_osa_distance(key, name.casefold(), bound) is not None
+        )
+        found = sorted(name for name, _oracle_id, _distance in index.fuzzy_matches(query, len(names)))
+        assert found == expected, query
+
+def test_suggest_card_names_falls_back_to_fuzzy_matches(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+
+    assert engine_db.suggest_card_names(TEST_SNAPSHOT_ID, "Sol Rnig") == ["Sol Ring", "Soul Ring"]
+    assert engine_db.suggest_card_names(TEST_SNAPSHOT_ID, "Conterspell") == ["Counterspell"]
+
+
+@pytest.mark.parametrize("query", ["sol", "ring", "lightning", "ING", "s", "oot"])
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_prefix_and_contains_match_sql(mtg_test_db_path: Path, query: str, limit: int) -> None:
+    _seed(mtg_test_db_path)
+
+    suggested = engine_db.suggest_card_names(TEST_SNAPSHOT_ID, query, limit)
+    via_sql = _sql_suggest(TEST_SNAPSHOT_ID, query, limit)
+
+    assert suggested[: len(via_sql)] == via_sql
+    assert len(suggested) <= limit
+
+
+def test_wildcard_queries_use_sql(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+
+    assert engine_db.suggest_card_names(TEST_SNAPSHOT_ID, "s_l%", 5) == _sql_suggest(TEST_SNAPSHOT_ID, "s_l%", 5)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from api.engine.card_suggest_index_v1 import (
+    clear_card_suggest_index_cache_v1,
+    get_card_suggest_index_v1,
+    sqlite_ascii_lower,
+)
+from tests.conftest import TEST_SNAPSHOT_ID
+
+fastapi_testclient = pytest.importorskip("fastapi.testclient")
+
+from api.main import _suggest_result_row, app  # noqa: E402
+
+_CARDS = [
+    ("oid-1", "Sol Ring", "{1}", "Artifact", '{"normal": "https://img/sol.jpg"}'),
+    ("oid-2", "Solemn Simulacrum", "{4}", "Artifact Creature — Golem", None),
+    ("oid-3", "Ring of Three Wishes", "{5}", "Artifact", None),
+    ("oid-4", "Æther Vial", "{1}", "Artifact", None),
+    ("oid-5", "Aether Vial", "{1}", "Artifact", None),
+    ("oid-6", "Rings of Brighthearth", "{3}", "Artifact", None),
+    ("oid-7", "Rings of Brighthearth", "{3}", "Artifact", None),
+    ("", "Isolated Chapel", None, "Land", None),
+    ("  ", "isolated chapel", None, "Land", None),
+    ("oid-9", "   ", None, None, None),
+    ("oid-10", "Solitude", "{3}{W}{W}", "Creature — Elemental Incarnation", None),
+]
+
+
+def _seed(db_path: Path) -> None:
+    con = sqlite3.connect(str(db_path))
+    try:
+        for oracle_id, name, mana_cost, type_line, image_uris_json in _CARDS:
+            con.execute(
+                """
+                INSERT INTO cards (snapshot_id, oracle_id, name, mana_cost, type_line, image_uris_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (TEST_SNAPSHOT_ID, oracle_id, name, mana_cost, type_line, image_uris_json),
+            )
+        con.commit()
+    finally:
+        con.close()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_card_suggest_index_cache_v1()
+    yield
+    clear_card_suggest_index_cache_v1()
+
+
+def _suggest(client, q: str, limit: int = 20) -> list:
+    response = client.get("/cards/suggest", params={"q": q, "snapshot_id": TEST_SNAPSHOT_ID, "limit": limit})
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def test_sqlite_ascii_lower_only_folds_ascii() -> None:
+    assert sqlite_ascii_lower("Æther VIAL") == "Æther vial"
+
+
+@pytest.mark.parametrize("q", ["so", "sol", "ring", "rings", "ing", "æther", "aether", "chapel", "isolated", "  ", "l_", "zz"])
+@pytest.mark.parametrize("limit", [1, 2, 20])
+def test_index_matches_sql_path(mtg_test_db_path: Path, q: str, limit: int) -> None:
+    _seed(mtg_test_db_path)
+    client = fastapi_testclient.TestClient(app)
+
+    indexed = _suggest(client, q, limit)
+    with patch("api.main.get_card_suggest_index_v1", side_effect=sqlite3.OperationalError("index unavailable")):
+        via_sql = _suggest(client, q, limit)
+
+    assert indexed == via_sql
+
+
+def test_prefix_rows_precede_contains_rows_and_dedupe(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    client = fastapi_testclient.TestClient(app)
+
+    rows = _suggest(client, "ring")
+    assert [row["name"] for row in rows] == [
+        "Ring of Three Wishes",
+        "Rings of Brighthearth",
+        "Rings of Brighthearth",
+        "Sol Ring",
+    ]
+    assert rows[3]["image_uri"] == "https://img/sol.jpg"
+    assert [row["name"] for row in _suggest(client, "chapel")] == ["Isolated Chapel"]
+
+
+def test_index_is_cached_per_snapshot(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    first = get_card_suggest_index_v1(TEST_SNAPSHOT_ID, _suggest_result_row)
+
+    assert get_card_suggest_index_v1(TEST_SNAPSHOT_ID, _suggest_result_row) is first
+    assert first.entry_count == len(_CARDS)
@@ -83,3 +83,141 @@ def test_cards_image_rejects_invalid_oracle_id(tmp_path, monkeypatch: pytest.Mon
         response = client.get("/cards/image/not-a-uuid", params={"size": "normal"})
 
     assert response.status_code == 400
+
+
+@pytest.mark.skipif(_IMPORT_ERROR is not None, reason="FastAPI integration dependencies unavailable")
+def test_cards_image_etag_revalidation_returns_304(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MTG_ENGINE_IMAGE_CACHE_DIR", str(tmp_path))
+    oracle_id = "123e4567-e89b-12d3-a456-426614174000"
+
+    image_path = tmp_path / "small" / f"{oracle_id}.jpg"
+    image_path.parent.mkdir(parents=True, exist_ok=True)
+    image_path.write_bytes(b"\xff\xd8small\xff\xd9")
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        first = client.get(f"/cards/image/{oracle_id}", params={"size": "small"})
+        etag = first.headers.get("etag")
+        revalidated = client.get(
+            f"/cards/image/{oracle_id}",
+            params={"size": "small"},
+            headers={"If-None-Match": etag or ""},
+        )
+        mismatched = client.get(
+            f"/cards/image/{oracle_id}",
+            params={"size": "small"},
+            headers={"If-None-Match": '"stale"'},
+        )
+
+    assert first.status_code == 200
+    assert isinstance(etag, str) and etag.startswith('"')
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers.get("etag") == etag
+    assert mismatched.status_code == 200
+    assert mismatched.content == b"\xff\xd8small\xff\xd9"
+
+
+@pytest.mark.skipif(_IMPORT_ERROR is not None, reason="FastAPI integration dependencies unavailable")
+def test_cards_image_sees_files_added_after_first_lookup(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("MTG_ENGINE_IMAGE_CACHE_DIR", str(tmp_path))
+    oracle_id = "123e4567-e89b-12d3-a456-426614174000"
+    (tmp_path / "normal").mkdir(parents=True, exist_ok=True)
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        missing = client.get(f"/cards/image/{oracle_id}", params={"size": "normal"})
+        (tmp_path / "normal" / f"{oracle_id}.webp").write_bytes(b"RIFFwebp")
+        present = client.get(f"/cards/image/{oracle_id}", params={"size": "normal"})
+
+    assert missing.status_code == 404
+    assert present.status_code == 200
+    assert present.headers.get("content-type", "").startswith("image/webp")
+
+
+@pytest.mark.skipif(_IMPORT_ERROR is not None, reason="FastAPI integration dependencies unavailable")
+def test_cards_image_serves_pack_before_loose_files(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from engine.image_pack import ImagePackWriter
+
+    monkeypatch.setenv("MTG_ENGINE_IMAGE_CACHE_DIR", str(tmp_path))
+    packed_oracle_id = "123e4567-e89b-12d3-a456-426614174000"
+    loose_oracle_id = "223e4567-e89b-12d3-a456-426614174000"
+
+    with ImagePackWriter(tmp_path, "normal") as writer:
+        writer.append("323e4567-e89b-12d3-a456-426614174000", "jpg", b"\xff\xd8other\xff\xd9")
+        writer.append(packed_oracle_id, "png", b"\x89PNG\r\n\x1a\npacked")
+    (tmp_path / "normal").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "normal" / f"{packed_oracle_id}.jpg").write_bytes(b"\xff\xd8loose\xff\xd9")
+    (tmp_path / "normal" / f"{loose_oracle_id}.jpg").write_bytes(b"\xff\xd8fallback\xff\xd9")
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        packed = client.get(f"/cards/image/{packed_oracle_id}", params={"size": "normal"})
+        revalidated = client.get(
+            f"/cards/image/{packed_oracle_id}",
+            params={"size": "normal"},
+            headers={"If-None-Match": packed.headers.get("etag") or ""},
+        )
+        fallback = client.get(f"/cards/image/{loose_oracle_id}", params={"size": "normal"})
+
+    assert packed.status_code == 200
+    assert packed.headers.get("content-type", "").startswith("image/png")
+    assert packed.content == b"\x89PNG\r\n\x1a\npacked"
+    assert revalidated.status_code == 304
+    assert fallback.status_code == 200
+    assert fallback.content == b"\xff\xd8fallback\xff\xd9"
+
+
+@pytest.mark.skipif(_IMPORT_ERROR is not None, reason="FastAPI integration dependencies unavailable")
+def test_cards_images_bundle_returns_cached_images_in_one_response(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from api.engine.card_image_bundle_v1 import CARD_IMAGE_BUNDLE_MEDIA_TYPE, decode_card_image_bundle_v1
+    from engine.image_pack import ImagePackWriter
+
+    monkeypatch.setenv("MTG_ENGINE_IMAGE_CACHE_DIR", str(tmp_path))
+    packed_oracle_id = "123e4567-e89b-12d3-a456-426614174000"
+    file_oracle_id = "223e4567-e89b-12d3-a456-426614174000"
+    missing_oracle_id = "323e4567-e89b-12d3-a456-426614174000"
+
+    with ImagePackWriter(tmp_path, "small") as writer:
+        writer.append(packed_oracle_id, "png", b"\x89PNG\r\n\x1a\npacked")
+    (tmp_path / "small").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "small" / f"{file_oracle_id}.jpg").write_bytes(b"\xff\xd8file\xff\xd9")
+    ids = ",".join([file_oracle_id, missing_oracle_id, packed_oracle_id.upper(), file_oracle_id])
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        first = client.get("/cards/images_bundle", params={"ids": ids, "size": "small"})
+        revalidated = client.get(
+            "/cards/images_bundle",
+            params={"ids": ids, "size": "small"},
+            headers={"If-None-Match": first.headers.get("etag") or ""},
+        )
+        (tmp_path / "small" / f"{missing_oracle_id}.jpg").write_bytes(b"\xff\xd8late\xff\xd9")
+        changed = client.get(
+            "/cards/images_bundle",
+            params={"ids": ids, "size": "small"},
+            headers={"If-None-Match": first.headers.get("etag") or ""},
+        )
+        complete_revalidated = client.get(
+            "/cards/images_bundle",
+            params={"ids": ids, "size": "small"},
+            headers={"If-None-Match": changed.headers.get("etag") or ""},
+        )
+        invalid = client.get("/cards/images_bundle", params={"ids": "not-a-uuid", "size": "small"})
+        empty = client.get("/cards/images_bundle", params={"ids": " , ", "size": "small"})
+
+    assert first.status_code == 200
+    assert first.headers.get("content-type", "").startswith(CARD_IMAGE_BUNDLE_MEDIA_TYPE)
+    assert first.headers.get("cache-control") == "no-cache"
+    manifest, images = decode_card_image_bundle_v1(first.content)
+    assert [entry["oracle_id"] for entry in manifest["images"]] == [file_oracle_id, packed_oracle_id]
+    assert [entry["media_type"] for entry in manifest["images"]] == ["image/jpeg", "image/png"]
+    assert manifest["missing"] == [missing_oracle_id]
+    assert images == {file_oracle_id: b"\xff\xd8file\xff\xd9", packed_oracle_id: b"\x89PNG\r\n\x1a\npacked"}
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers.get("cache-control") == "no-cache"
+    assert changed.status_code == 200
+    assert changed.headers.get("etag") != first.headers.get("etag")
+    assert changed.headers.get("cache-control") == "public, max-age=31536000"
+    assert complete_revalidated.status_code == 304
+    assert complete_revalidated.headers.get("cache-control") == "public, max-age=31536000"
+    assert decode_card_image_bundle_v1(changed.content)[0]["missing"] == []
+    assert invalid.status_code == 400
+    assert empty.status_code == 400
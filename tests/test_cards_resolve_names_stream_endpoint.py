@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from api.engine import card_name_resolve_stream_v1 as resolve_stream
+from api.engine.card_name_resolve_stream_v1 import (
+    ResolveStreamBodyTooLargeError,
+    clear_card_name_resolve_index_cache_v1,
+    iter_body_lines,
+    iter_spooled_chunks,
+    spool_body_chunks,
+    stream_resolved_names_v1,
+)
+from tests.decklist_fixture_harness import (
+    DECKLIST_FIXTURE_SNAPSHOT_ID,
+    create_decklist_fixture_db,
+    set_decklist_fixture_env,
+)
+
+try:
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    _IMPORT_ERROR: Exception | None = None
+except Exception as exc:  # pragma: no cover - environment-dependent dependency loading
+    TestClient = None
+    app = None
+    _IMPORT_ERROR = exc
+
+
+async def _chunks(parts: list[bytes]):
+    for part in parts:
+        yield part
+
+
+async def _collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+def _ndjson_rows(body: bytes) -> list[dict]:
+    return [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip() != ""]
+
+
+class ResolveStreamHelpersTests(unittest.TestCase):
+    def test_lines_are_reassembled_across_chunks_and_overlong_lines_are_flagged(self) -> None:
+        parts = [b'"Sol', b' Ring"\n"Arc', b'ane"\n', b"x" * 40, b"y\n", b'"tail"']
+        lines = asyncio.run(_collect(iter_body_lines(_chunks(parts), max_line_bytes=32)))
+
+        self.assertEqual(lines, [(1, b'"Sol Ring"'), (2, b'"Arcane"'), (3, None), (4, b'"tail"')])
+
+    def test_line_splitting_does_not_depend_on_chunk_size(self) -> None:
+        body = b"".join(b'"card %d"\n' % idx for idx in range(500)) + b"z" * 40 + b"\n" + b'"last"'
+        expected = asyncio.run(_collect(iter_body_lines(_chunks([body]), max_line_bytes=32)))
+        single_bytes = [body[idx:idx + 1] for idx in range(len(body))]
+
+        self.assertEqual(len(expected), 502)
+        self.assertEqual(expected[500], (501, None))
+        self.assertEqual(asyncio.run(_collect(iter_body_lines(_chunks(single_bytes), max_line_bytes=32))), expected)
+
+    def test_batches_are_emitted_in_input_order_with_summary(self) -> None:
+        body = b'"a"\n\n{"name": "b"}\n42\nnot json\n"c"\n'
+        chunks = asyncio.run(
+            _collect(
+                stream_resolved_names_v1(_chunks([body]), snapshot_id="", index=None, plain_text=False, batch_size=2)
+            )
+        )
+
+        self.assertEqual(len(chunks), 4)
+        rows = _ndjson_rows(b"".join(chunks))
+        self.assertEqual(
+            [(row.get("line_no"), row.get("input"), row.get("status")) for row in rows[:-1]],
+            [
+                (1, "a", "MISSING"),
+                (3, "b", "MISSING"),
+                (4, "42", "INVALID"),
+                (5, "not json", "INVALID"),
+                (6, "c", "MISSING"),
+            ],
+        )
+        self.assertEqual(rows[-1]["summary"]["missing"], 3)
+        self.assertEqual(rows[-1]["summary"]["invalid"], 2)
+
+    def test_spooled_body_rolls_over_to_disk_and_is_replayed_in_chunks(self) -> None:
+        parts = [b'"card %d"\n' % idx for idx in range(300)]
+
+        async def _spool_and_replay() -> tuple[bool, list[bytes]]:
+            spool = await spool_body_chunks(_chunks(parts), max_memory_bytes=256)
+            on_disk = spool._rolled  # noqa: SLF001 - SpooledTemporaryFile exposes no public rollover flag
+            return on_disk, await _collect(iter_spooled_chunks(spool, chunk_size=100))
+
+        on_disk, replayed = asyncio.run(_spool_and_replay())
+        self.assertTrue(on_disk)
+        self.assertEqual(b"".join(replayed), b"".join(parts))
+        self.assertTrue(all(len(chunk) <= 100 for chunk in replayed))
+
+        with self.assertRaises(ResolveStreamBodyTooLargeError):
+            asyncio.run(spool_body_chunks(_chunks(parts), max_body_bytes=100))
+
+
+class CardsResolveNamesStreamEndpointTests(unittest.TestCase):
+    _tmp_dir_ctx: tempfile.TemporaryDirectory[str] | None = None
+    _db_env_ctx = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        if _IMPORT_ERROR is not None:
+            return
+
+        cls._tmp_dir_ctx = tempfile.TemporaryDirectory()
+        db_path = create_decklist_fixture_db(Path(cls._tmp_dir_ctx.name))
+        cls._db_env_ctx = set_decklist_fixture_env(db_path)
+        cls._db_env_ctx.__enter__()
+        clear_card_name_resolve_index_cache_v1()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        try:
+            clear_card_name_resolve_index_cache_v1()
+            if cls._db_env_ctx is not None:
+                cls._db_env_ctx.__exit__(None, None, None)
+                cls._db_env_ctx = None
+        finally:
+            if cls._tmp_dir_ctx is not None:
+                cls._tmp_dir_ctx.cleanup()
+                cls._tmp_dir_ctx = None
+            super().tearDownClass()
+
+    def _post(self, content: bytes, content_type: str) -> list[dict]:
+        with TestClient(app, raise_server_exceptions=False) as client:
+            response = client.post(
+                "/cards/resolve_names_stream",
+                params={"snapshot_id": DECKLIST_FIXTURE_SNAPSHOT_ID},
+                content=content,
+                headers={"content-type": content_type},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers.get("content-type", "").startswith("application/x-ndjson"))
+        return _ndjson_rows(response.content)
+
+    def test_ndjson_names_resolve_with_decklist_normalization(self) -> None:
+        if _IMPORT_ERROR is not None:
+            self.skipTest(f"FastAPI integration dependencies unavailable: {_IMPORT_ERROR}")
+
+        rows = self._post(
+            b'"  arCanE   signet "\n{"name": "krenko, mob boss"}\n"Not A Card"\n',
+            "application/x-ndjson",
+        )
+
+        self.assertEqual([row.get("status") for row in rows[:-1]], ["RESOLVED", "RESOLVED", "MISSING"])
+        self.assertEqual([row.get("name") for row in rows[:2]], ["Arcane Signet", "Krenko, Mob Boss"])
+        self.assertEqual(rows[0].get("oracle_id"), "ORA_SIGNET_001")
+        self.assertEqual(rows[-1]["summary"]["snapshot_id"], DECKLIST_FIXTURE_SNAPSHOT_ID)
+        self.assertEqual(rows[-1]["summary"]["resolved"], 2)
+
+    def test_plain_text_lines_and_matches_bounded_endpoint(self) -> None:
+        if _IMPORT_ERROR is not None:
+            self.skipTest(f"FastAPI integration dependencies unavailable: {_IMPORT_ERROR}")
+
+        names = ["SOL RING", "Arcane Signet", "Missing Card"]
+        rows = self._post("\n".join(names).encode("utf-8"), "text/plain")
+
+        with TestClient(app, raise_server_exceptions=False) as client:
+            bounded = client.post(
+                "/cards/resolve_names",
+                json={"snapshot_id": DECKLIST_FIXTURE_SNAPSHOT_ID, "names": names},
+            ).json()
+
+        streamed = [
+            {key: row.get(key) for key in ("input", "name", "oracle_id", "mana_cost", "type_line", "image_uri")}
+            for row in rows[:-1]
+            if row.get("status") == "RESOLVED"
+        ]
+        self.assertEqual(streamed, bounded["results"])
+        self.assertEqual([row["input"] for row in rows[:-1] if row["status"] == "MISSING"], bounded["missing"])
+
+    def test_chunked_body_is_spooled_without_reading_it_in_full(self) -> None:
+        if _IMPORT_ERROR is not None:
+            self.skipTest(f"FastAPI integration dependencies unavailable: {_IMPORT_ERROR}")
+
+        names = ["Sol Ring", "Arcane Signet", "Missing Card"] * 200
+        body_chunks = [(name + "\n").encode("utf-8") for name in names]
+        received_chunks: list[int] = []
+        real_spool = resolve_stream.spool_body_chunks
+
+        async def _recording_spool(chunks, **kwargs):
+            async def _recorded():
+                async for chunk in chunks:
+                    if chunk:
+                        received_chunks.append(len(chunk))
+                    yield chunk
+
+            return await real_spool(_recorded(), max_memory_bytes=512)
+
+        async def _no_full_body(_request):
+            raise AssertionError("request body must not be read in full")
+
+        async def _post_chunked() -> tuple[int, bytes]:
+            # One http.request message per chunk, as uvicorn (ASGI spec 2.3) delivers a chunked upload.
+            messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in body_chunks]
+            messages.append({"type": "http.request", "body": b"", "more_body": False})
+            response_done = asyncio.Event()
+            sent: list[dict] = []
+
+            async def _receive() -> dict:
+                if messages:
+                    return messages.pop(0)
+                await response_done.wait()
+                return {"type": "http.disconnect"}
+
+            async def _send(message: dict) -> None:
+                sent.append(message)
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    response_done.set()
+
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0", "spec_version": "2.3"},
+                "http_version": "1.1",
+                "method": "POST",
+                "scheme": "http",
+                "path": "/cards/resolve_names_stream",
+                "raw_path": b"/cards/resolve_names_stream",
+                "root_path": "",
+                "query_string": f"snapshot_id={DECKLIST_FIXTURE_SNAPSHOT_ID}".encode("ascii"),
+                "headers": [(b"content-type", b"text/plain"), (b"transfer-encoding", b"chunked")],
+                "client": ("testclient", 50000),
+                "server": ("testserver", 80),
+            }
+            await app(scope, _receive, _send)
+            status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+            content = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+            return status, content
+
+        with patch("api.main.spool_body_chunks", _recording_spool), patch(
+            "starlette.requests.Request.body", _no_full_body
+        ):
+            status, content = asyncio.run(_post_chunked())
+
+        self.assertEqual(status, 200)
+        rows = _ndjson_rows(content)
+        self.assertEqual(len(rows), len(names) + 1)
+        self.assertEqual(rows[-1]["summary"]["resolved"], 400)
+        self.assertEqual(rows[-1]["summary"]["missing"], 200)
+        self.assertEqual(received_chunks, [len(chunk) for chunk in body_chunks])
+
+    def test_oversized_body_is_rejected(self) -> None:
+        if _IMPORT_ERROR is not None:
+            self.skipTest(f"FastAPI integration dependencies unavailable: {_IMPORT_ERROR}")
+
+        with patch("api.main.RESOLVE_STREAM_MAX_BODY_BYTES", 16), patch.object(
+            resolve_stream, "RESOLVE_STREAM_MAX_BODY_BYTES", 16
+        ), TestClient(app, raise_server_exceptions=False) as client:
+            declared = client.post(
+                "/cards/resolve_names_stream",
+                params={"snapshot_id": DECKLIST_FIXTURE_SNAPSHOT_ID},
+                content=b'"Sol Ring"\n' * 4,
+                headers={"content-type": "application/x-ndjson"},
+            )
+            chunked = client.post(
+                "/cards/resolve_names_stream",
+                params={"snapshot_id": DECKLIST_FIXTURE_SNAPSHOT_ID},
+                content=(b'"Sol Ring"\n' for _ in range(4)),
+                headers={"content-type": "application/x-ndjson"},
+            )
+
+        self.assertEqual(declared.status_code, 413)
+        self.assertEqual(chunked.status_code, 413)
+
+
+if __name__ == "__main__":
+    unittest.main()
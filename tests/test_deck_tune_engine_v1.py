@@ -678,6 +678,75 @@ class DeckTuneEngineV1Tests(unittest.TestCase):
         self.assertEqual(len(swaps_override), 1)
         self.assertIn(swaps_override[0].get("cut_name"), {"Mid Value Card", "Low Value Card"})
 
+    def test_swap_search_k_patch_enables_pair_swaps(self) -> None:
+        def _fake_evaluate_swap_pairs(*, legal_pairs_out=None, **kwargs):
+            if isinstance(legal_pairs_out, list):
+                legal_pairs_out.extend(
+                    [
+                        {
+                            "cut_name": "Arcane Signet",
+                            "add_name": "Opt",
+                            "cut_oracle_id": "ORA_CAN_020",
+                            "add_oracle_id": "ORA_CAN_030",
+                            "cut_primitives": ["RAMP_MANA"],
+                            "add_primitives": ["CARD_DRAW"],
+                            "coherence_delta": -0.9,
+                            "reasons_v1": ["GC_COMPLIANCE_PRESERVED"],
+                        },
+                        {
+                            "cut_name": "Mystery Card",
+                            "add_name": "Lightning Greaves",
+                            "cut_oracle_id": "ORA_CAN_060",
+                            "add_oracle_id": "ORA_CAN_090",
+                            "cut_primitives": ["RAMP_MANA"],
+                            "add_primitives": ["PROTECTION"],
+                            "coherence_delta": -0.5,
+                            "reasons_v1": ["ADD_PROTECTION_SUPPORT", "GC_COMPLIANCE_PRESERVED"],
+                        },
+                    ]
+                )
+            return ([], 2, 0.0)
+
+        cards = ["Arcane Signet", "Mystery Card", "Plain Utility"]
+        with patch(
+            "api.engine.deck_tune_engine_v1._evaluate_swap_pairs",
+            side_effect=_fake_evaluate_swap_pairs,
+        ):
+            payload_default = run_deck_tune_engine_v1(
+                canonical_deck_input=self._canonical_input(cards=cards),
+                baseline_build_result=self._baseline_build_result(),
+                db_snapshot_id=GUARDRAILS_FIXTURE_SNAPSHOT_ID,
+                bracket_id="B3",
+                profile_id="focused",
+                mulligan_model_id="NORMAL",
+                max_swaps=5,
+            )
+            payload_k2 = run_deck_tune_engine_v1(
+                canonical_deck_input=self._canonical_input(
+                    cards=cards,
+                    engine_patches_v0=[{"patch_type": "tune_config_v1", "swap_search_k": 2}],
+                ),
+                baseline_build_result=self._baseline_build_result(),
+                db_snapshot_id=GUARDRAILS_FIXTURE_SNAPSHOT_ID,
+                bracket_id="B3",
+                profile_id="focused",
+                mulligan_model_id="NORMAL",
+                max_swaps=5,
+            )
+
+        self.assertEqual(payload_default.get("recommended_swaps_v1"), [])
+        self.assertNotIn("swap_search_v1", payload_default.get("evaluation_summary_v1") or {})
+
+        swaps = payload_k2.get("recommended_swaps_v1") if isinstance(payload_k2.get("recommended_swaps_v1"), list) else []
+        self.assertEqual(
+            [(row.get("cut_name"), row.get("add_name")) for row in swaps],
+            [("Arcane Signet", "Opt"), ("Mystery Card", "Lightning Greaves")],
+        )
+        self.assertTrue(all("MULTI_SWAP_GROUP" in row.get("reasons_v1", []) for row in swaps))
+        search_summary = (payload_k2.get("evaluation_summary_v1") or {}).get("swap_search_v1") or {}
+        self.assertEqual(search_summary.get("swap_search_k"), 2)
+        self.assertEqual(search_summary.get("groups_applied"), 1)
+
     def test_min_bar_removes_bad_swap(self) -> None:
         with patch(
             "api.engine.deck_tune_engine_v1.get_candidate_pool_v1",
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import unittest
+
+from api.engine.deck_tune_local_search_v1 import REASON_MULTI_SWAP_GROUP, run_swap_local_search_v1
+
+
+def _cut_key(row: dict) -> str:
+    return f"CUT::{row.get('cut_name')}"
+
+
+def _add_key(row: dict) -> str:
+    return f"ADD::{row.get('add_name')}"
+
+
+def _pair(cut_name: str, add_name: str, cut_primitives: list, add_primitives: list, coherence: float) -> dict:
+    return {
+        "cut_name": cut_name,
+        "add_name": add_name,
+        "cut_oracle_id": f"ORA_{cut_name}",
+        "add_oracle_id": f"ORA_{add_name}",
+        "cut_primitives": cut_primitives,
+        "add_primitives": add_primitives,
+        "coherence_delta": coherence,
+        "reasons_v1": ["GC_COMPLIANCE_PRESERVED"],
+    }
+
+
+# Cutting "Lone Draw" loses the only CARD_DRAW, so neither swap helps alone:
+# only together do they cover RAMP_MANA while keeping CARD_DRAW.
+_LEGAL_PAIRS = [
+    _pair("Lone Draw", "Cultivate", ["CARD_DRAW"], ["RAMP_MANA"], 0.2),
+    _pair("Filler", "Divination", [], ["CARD_DRAW"], -0.1),
+    _pair("Filler", "Cultivate", [], ["RAMP_MANA"], -0.3),
+    _pair("Lone Draw", "Divination", ["CARD_DRAW"], ["CARD_DRAW"], 0.0),
+]
+
+
+def _search(**overrides) -> tuple:
+    kwargs = {
+        "selected_swaps": [],
+        "legal_pairs": _LEGAL_PAIRS,
+        "primitive_counts_by_id": {"CARD_DRAW": 1},
+        "target_primitives": {"CARD_DRAW", "RAMP_MANA"},
+        "required_missing_primitives": {"RAMP_MANA"},
+        "require_coverage_gain": True,
+        "max_swaps": 5,
+        "swap_search_k": 2,
+        "min_gain": 0.01,
+        "cut_key_fn": _cut_key,
+        "add_key_fn": _add_key,
+        "is_group_allowed": lambda rows: True,
+    }
+    kwargs.update(overrides)
+    return run_swap_local_search_v1(**kwargs)
+
+
+class SwapLocalSearchV1Tests(unittest.TestCase):
+    def test_pair_swap_fixes_requirement_single_swaps_miss(self) -> None:
+        rows, summary = _search()
+
+        self.assertEqual(
+            [(row["cut_name"], row["add_name"]) for row in rows],
+            [("Filler", "Divination"), ("Lone Draw", "Cultivate")],
+        )
+        self.assertTrue(all(REASON_MULTI_SWAP_GROUP in row["reasons_v1"] for row in rows))
+        total_coverage = sum(row["delta_summary_v1"]["primitive_coverage_delta_v1"] for row in rows)
+        self.assertEqual(total_coverage, 1)
+        self.assertEqual(sum(row["delta_summary_v1"]["missing_required_count_delta_v1"] for row in rows), 1)
+        self.assertEqual(summary["groups_applied"], 1)
+        self.assertGreater(summary["evaluations"], 0)
+
+    def test_existing_selection_is_kept_and_its_keys_are_reserved(self) -> None:
+        selected = [{"cut_name": "Filler", "add_name": "Divination", "reasons_v1": ["ADD_PRIMITIVE_COVERAGE"]}]
+        rows, summary = _search(selected_swaps=selected)
+
+        self.assertEqual(rows, selected)
+        self.assertEqual(summary["groups_applied"], 0)
+
+    def test_k1_budget_and_slot_limits_disable_groups(self) -> None:
+        for overrides in ({"swap_search_k": 1}, {"max_evaluations": 0}, {"max_swaps": 1}):
+            with self.subTest(overrides=overrides):
+                rows, _summary = _search(**overrides)
+                self.assertEqual(rows, [])
+
+        _rows, summary = _search(max_evaluations=0)
+        self.assertTrue(summary["evaluation_cap_hit"])
+
+    def test_rejected_groups_are_not_retried(self) -> None:
+        seen: list[tuple] = []
+
+        def _reject(rows: list) -> bool:
+            seen.append(tuple(sorted((row["cut_name"], row["add_name"]) for row in rows)))
+            return False
+
+        rows, summary = _search(is_group_allowed=_reject)
+
+        self.assertEqual(rows, [])
+        self.assertEqual(summary["groups_rejected"], len(seen))
+        self.assertEqual(len(seen), 2)
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_deterministic(self) -> None:
+        self.assertEqual(_search(swap_search_k=3), _search(swap_search_k=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from api.engine import decklist_resolve_v1
+from api.engine.decklist_parse_v1 import parse_decklist_text
+from api.engine.decklist_resolve_v1 import (
+    clear_decklist_name_index_cache_v1,
+    compile_decklist_name_index_v1,
+    decklist_name_index_from_payload_v1,
+    decklist_name_index_to_payload_v1,
+    get_decklist_name_index_v1,
+    resolve_parsed_decklist,
+)
+from snapshot_build.decklist_name_index_build import build_decklist_name_index_artifacts, main
+from tests.decklist_fixture_harness import (
+    DECKLIST_FIXTURE_SNAPSHOT_ID,
+    create_decklist_fixture_db,
+    set_decklist_fixture_env,
+)
+
+_DECKLIST = """
+Commander
+1 Krenko, Mob Boss
+Deck
+1 Arcane Signet
+1 Twin Name
+1 Bala Ged Recovery
+1 bala ged recovery//bala ged sanctuary
+1 Missing Card
+"""
+
+
+class DecklistNameIndexBuildTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = create_decklist_fixture_db(Path(self._tmp_dir.name))
+        self._env = set_decklist_fixture_env(self.db_path)
+        self._env.__enter__()
+        clear_decklist_name_index_cache_v1()
+
+    def tearDown(self) -> None:
+        clear_decklist_name_index_cache_v1()
+        self._env.__exit__(None, None, None)
+        self._tmp_dir.cleanup()
+
+    def _compiled(self):
+        con = sqlite3.connect(str(self.db_path))
+        con.row_factory = sqlite3.Row
+        try:
+            return compile_decklist_name_index_v1(con, DECKLIST_FIXTURE_SNAPSHOT_ID)
+        finally:
+            con.close()
+
+    def test_payload_round_trip_preserves_lookups(self) -> None:
+        compiled = self._compiled()
+        restored = decklist_name_index_from_payload_v1(decklist_name_index_to_payload_v1(compiled))
+
+        self.assertIsNotNone(restored)
+        for field in decklist_resolve_v1.DecklistNameIndexV1.__slots__:
+            self.assertEqual(getattr(restored, field), getattr(compiled, field), field)
+        self.assertIsNone(decklist_name_index_from_payload_v1({"version": "other"}))
+
+    def test_artifact_is_used_and_resolution_is_unchanged(self) -> None:
+        parsed = parse_decklist_text(_DECKLIST)
+        expected = resolve_parsed_decklist(parsed, DECKLIST_FIXTURE_SNAPSHOT_ID)
+
+        summary = build_decklist_name_index_artifacts(db_path=self.db_path)
+        self.assertEqual([row["snapshot_id"] for row in summary["artifacts"]], [DECKLIST_FIXTURE_SNAPSHOT_ID])
+
+        clear_decklist_name_index_cache_v1()
+        with patch.object(decklist_resolve_v1, "compile_decklist_name_index_v1", side_effect=AssertionError("recompiled")):
+            self.assertEqual(resolve_parsed_decklist(parsed, DECKLIST_FIXTURE_SNAPSHOT_ID), expected)
+            self.assertIs(get_decklist_name_index_v1(DECKLIST_FIXTURE_SNAPSHOT_ID), get_decklist_name_index_v1(DECKLIST_FIXTURE_SNAPSHOT_ID))
+
+    def test_stale_artifact_is_ignored(self) -> None:
+        self.assertEqual(main(["--db", str(self.db_path), "--snapshot_id", DECKLIST_FIXTURE_SNAPSHOT_ID]), 0)
+
+        con = sqlite3.connect(str(self.db_path))
+        try:
+            con.execute(
+                "INSERT INTO cards (snapshot_id, oracle_id, name) VALUES (?, ?, ?)",
+                (DECKLIST_FIXTURE_SNAPSHOT_ID, "ORA_NEW_001", "Brand New Card"),
+            )
+            con.commit()
+        finally:
+            con.close()
+
+        payload = resolve_parsed_decklist(parse_decklist_text("1 Brand New Card\n"), DECKLIST_FIXTURE_SNAPSHOT_ID)
+        self.assertEqual(payload.get("status"), "OK")
+        self.assertEqual(payload["resolved_cards"][0]["oracle_id"], "ORA_NEW_001")
+
+    def test_artifact_is_stale_after_alias_edit_with_same_row_count(self) -> None:
+        self.assertEqual(main(["--db", str(self.db_path), "--snapshot_id", DECKLIST_FIXTURE_SNAPSHOT_ID]), 0)
+
+        con = sqlite3.connect(str(self.db_path))
+        try:
+            con.execute(
+                "UPDATE card_aliases SET alias_name = ? WHERE snapshot_id = ? AND alias_name = ?",
+                ("Arcana Signet", DECKLIST_FIXTURE_SNAPSHOT_ID, "Signet of Arcana"),
+            )
+            con.commit()
+        finally:
+            con.close()
+
+        clear_decklist_name_index_cache_v1()
+        payload = resolve_parsed_decklist(parse_decklist_text("1 Arcana Signet\n"), DECKLIST_FIXTURE_SNAPSHOT_ID)
+        self.assertEqual(payload.get("status"), "OK")
+        self.assertEqual(payload["resolved_cards"][0]["oracle_id"], "ORA_SIGNET_001")
+
+    def test_missing_db_returns_error_code(self) -> None:
+        self.assertEqual(main(["--db", str(Path(self._tmp_dir.name) / "missing.sqlite")]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
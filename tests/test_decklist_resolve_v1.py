@@ -119,6 +119,14 @@ class DecklistResolveV1Tests(unittest.TestCase):
             },
         )
 
+    def test_missing_card_candidates_tolerate_typos(self) -> None:
+        payload = resolve_parsed_decklist(parse_decklist_text("1 Arcane Sigent\n"), DECKLIST_FIXTURE_SNAPSHOT_ID)
+
+        unknowns = payload.get("unknowns") if isinstance(payload.get("unknowns"), list) else []
+        self.assertEqual(len(unknowns), 1)
+        self.assertEqual(unknowns[0].get("reason_code"), "CARD_NOT_FOUND")
+        self.assertEqual(unknowns[0].get("candidates"), [{"oracle_id": "ORA_SIGNET_001", "name": "Arcane Signet"}])
+
     def test_resolve_dfc_face_and_combined_variants(self) -> None:
         parsed = parse_decklist_text(
             """
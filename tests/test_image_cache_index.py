@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from engine.image_cache_contract import resolve_local_image_path
+from engine import image_cache_index
+from engine.image_cache_index import ImageBytesLRU, ImageCacheIndex
+
+ORACLE_ID = "123e4567-e89b-12d3-a456-426614174000"
+OTHER_ORACLE_ID = "223e4567-e89b-12d3-a456-426614174000"
+
+
+class ImageCacheIndexTests(unittest.TestCase):
+    def test_lookup_matches_contract_resolution_and_extension_preference(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            (root / "normal").mkdir()
+            (root / "normal" / f"{ORACLE_ID}.webp").write_bytes(b"webp")
+            (root / "normal" / f"{ORACLE_ID}.png").write_bytes(b"png")
+            (root / "normal" / f"{OTHER_ORACLE_ID.upper()}.jpg").write_bytes(b"upper")
+            (root / "normal" / "not-a-uuid.jpg").write_bytes(b"junk")
+
+            index = ImageCacheIndex(root)
+            entry = index.lookup(ORACLE_ID, "normal")
+
+            self.assertIsNotNone(entry)
+            self.assertEqual(entry.path, resolve_local_image_path(str(root), ORACLE_ID, "normal"))
+            self.assertEqual(entry.extension, "png")
+            self.assertEqual(entry.length, 3)
+            self.assertIsNone(index.lookup(OTHER_ORACLE_ID, "normal"))
+            self.assertIsNone(index.lookup(ORACLE_ID, "small"))
+
+    def test_directory_change_triggers_rescan_and_new_etag(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            size_dir = root / "small"
+            size_dir.mkdir()
+            index = ImageCacheIndex(root)
+            self.assertIsNone(index.lookup(ORACLE_ID, "small"))
+
+            image_path = size_dir / f"{ORACLE_ID}.jpg"
+            image_path.write_bytes(b"first")
+            first = index.lookup(ORACLE_ID, "small")
+            self.assertIsNotNone(first)
+
+            replacement = size_dir / f"{ORACLE_ID}.jpg.tmp"
+            replacement.write_bytes(b"second!")
+            os.replace(replacement, image_path)
+            second = index.lookup(ORACLE_ID, "small")
+
+            self.assertIsNotNone(second)
+            self.assertNotEqual(first.etag, second.etag)
+
+    def test_concurrent_lookups_in_racy_window_share_one_scan(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            size_dir = root / "small"
+            size_dir.mkdir()
+            (size_dir / f"{ORACLE_ID}.jpg").write_bytes(b"first")
+            index = ImageCacheIndex(root)
+            scans = []
+            real_scan = image_cache_index._scan_size_dir
+
+            def counting_scan(*args):
+                scans.append(args[-1])
+                return real_scan(*args)
+
+            results = []
+            results_lock = threading.Lock()
+
+            def worker() -> None:
+                for _ in range(20):
+                    found = (index.lookup(ORACLE_ID, "small"), index.lookup(OTHER_ORACLE_ID, "small"))
+                    with results_lock:
+                        results.append(found)
+
+            with patch.object(image_cache_index, "_scan_size_dir", side_effect=counting_scan):
+                # The directory was just modified, so every lookup falls in the racy window.
+                threads = [threading.Thread(target=worker) for _ in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                # A file added right after the scan is still found through its own stat.
+                (size_dir / f"{OTHER_ORACLE_ID}.png").write_bytes(b"late")
+                late = index.lookup(OTHER_ORACLE_ID, "small")
+
+            self.assertEqual(scans, ["small"])
+            self.assertEqual(len(results), 160)
+            self.assertTrue(all(found[0] is not None and found[0].length == 5 for found in results))
+            self.assertIsNotNone(late)
+            self.assertEqual(late.extension, "png")
+
+    def test_invalid_inputs_raise_value_error(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            index = ImageCacheIndex(Path(tmp_dir))
+            with self.assertRaises(ValueError):
+                index.lookup("not-a-uuid", "normal")
+            with self.assertRaises(ValueError):
+                index.lookup(ORACLE_ID, "huge")
+
+
+class ImageBytesLRUTests(unittest.TestCase):
+    def test_evicts_least_recently_used_within_byte_budget(self) -> None:
+        cache = ImageBytesLRU(max_bytes=10, max_item_bytes=6)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        self.assertEqual(cache.get("a"), b"aaaa")
+        cache.put("c", b"cccc")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"aaaa")
+        self.assertEqual(cache.get("c"), b"cccc")
+        self.assertEqual(cache.total_bytes, 8)
+
+        cache.put("big", b"x" * 7)
+        self.assertIsNone(cache.get("big"))
+        self.assertFalse(ImageBytesLRU(max_bytes=0).accepts(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from snapshot_build.image_download_async import (
+    ASYNC_DOWNLOAD_AVAILABLE,
+    AdaptiveConcurrency,
+    download_items_async,
+)
+from snapshot_build.prefetch_card_images import prefetch_card_images
+
+SNAPSHOT_ID = "snap_async_prefetch_test"
+JPEG_PREFIX = b"\xff\xd8\xff"
+PNG_PREFIX = b"\x89PNG\r\n\x1a\n"
+
+
+class _StandInImageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInImageHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.throttled_paths: set[str] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _StandInImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: _StandInImageServer
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.requests += 1
+            first_throttle = self.path.startswith("/throttle/") and self.path not in self.server.throttled_paths
+            self.server.throttled_paths.add(self.path)
+        if first_throttle:
+            self._send(429, b"slow down", {"Retry-After": "0"})
+        elif self.path.startswith("/throttle/"):
+            self._send(200, PNG_PREFIX + self.path.encode("utf-8"))
+        elif self.path.startswith("/img/"):
+            self._send(200, JPEG_PREFIX + self.path.encode("utf-8") * 50)
+        else:
+            self._send(404, b"missing")
+
+
+@unittest.skipUnless(ASYNC_DOWNLOAD_AVAILABLE, "httpx unavailable")
+class AsyncImageDownloadTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = _StandInImageServer()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        self._tmp_dir = TemporaryDirectory()
+        self.root = Path(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp_dir.cleanup()
+
+    def test_adaptive_concurrency_grows_on_fast_responses_and_halves_on_throttle(self) -> None:
+        gate = AdaptiveConcurrency(initial=4, maximum=6, target_latency_seconds=1.0)
+        for _ in range(20):
+            gate.on_response(0.01)
+        self.assertEqual(gate.limit, 6.0)
+        gate.on_throttle(0.0)
+        self.assertEqual(gate.limit, 3.0)
+        gate.on_response(5.0)
+        self.assertAlmostEqual(gate.limit, 2.7)
+
+    def test_connections_are_reused_across_requests(self) -> None:
+        items = [(f"{index:08d}-0000-0000-0000-000000000000", "small", f"{self.server.base_url}/img/{index}.jpg") for index in range(24)]
+        results: list[tuple[str, str, str, str]] = []
+
+        def _finalize(oracle_id: str, size: str, image_url: str, temp_path: Path) -> str:
+            return temp_path.read_bytes()[:3].hex()
+
+        stats = download_items_async(
+            items,
+            temp_path_for=lambda oracle_id, size: self.root / size / f"{oracle_id}.part",
+            finalize=_finalize,
+            on_result=lambda *result: results.append(result),
+            timeout_seconds=5.0,
+            rate_limit_per_sec=10000.0,
+            initial_concurrency=2,
+            max_concurrency=4,
+        )
+
+        self.assertEqual(sorted(result[1] for result in results), sorted(item[0] for item in items))
+        self.assertEqual({result[0] for result in results}, {"OK"})
+        self.assertEqual({result[3] for result in results}, {JPEG_PREFIX.hex()})
+        self.assertEqual(stats["requests"], 24)
+        self.assertLessEqual(self.server.connections, 4)
+
+    def test_prefetch_async_engine_retries_throttling_and_resumes(self) -> None:
+        oracle_ids = [
+            "11111111-1111-1111-1111-111111111111",
+            "22222222-2222-2222-2222-222222222222",
+            "33333333-3333-3333-3333-333333333333",
+        ]
+        urls = [
+            f"{self.server.base_url}/img/one.jpg",
+            f"{self.server.base_url}/throttle/two.png",
+            f"{self.server.base_url}/gone.jpg",
+        ]
+        db_path = self.root / "cards.sqlite"
+        con = sqlite3.connect(str(db_path))
+        try:
+            con.execute("CREATE TABLE cards (snapshot_id TEXT NOT NULL, oracle_id TEXT NOT NULL, image_uris_json TEXT)")
+            con.executemany(
+                "INSERT INTO cards (snapshot_id, oracle_id, image_uris_json) VALUES (?, ?, ?)",
+                [(SNAPSHOT_ID, oracle_id, json.dumps({"small": url})) for oracle_id, url in zip(oracle_ids, urls)],
+            )
+            con.commit()
+        finally:
+            con.close()
+
+        out_dir = self.root / "card_images"
+        kwargs = dict(
+            db_path=db_path,
+            snapshot_id=SNAPSHOT_ID,
+            out_dir=out_dir,
+            sizes=["small"],
+            limit=0,
+            workers=2,
+            resume=True,
+            progress_every=0,
+            rate_limit_per_sec=1000.0,
+            timeout_seconds=5.0,
+            engine="async",
+        )
+        first = prefetch_card_images(**kwargs)
+        second = prefetch_card_images(**kwargs)
+
+        self.assertEqual((first["engine"], first["downloaded"], first["failed"]), ("async", 2, 1))
+        self.assertEqual((second["skipped"], second["failed"]), (2, 1))
+        self.assertTrue((out_dir / "small" / f"{oracle_ids[0]}.jpg").read_bytes().startswith(JPEG_PREFIX))
+        self.assertTrue((out_dir / "small" / f"{oracle_ids[1]}.png").read_bytes().startswith(PNG_PREFIX))
+        self.assertEqual(list((out_dir / ".partial").rglob("*.part")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
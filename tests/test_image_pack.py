@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from engine import image_pack
+from engine.image_pack import ImagePackReader, ImagePackWriter, image_pack_paths
+
+ORACLE_ID = "123e4567-e89b-12d3-a456-426614174000"
+OTHER_ORACLE_ID = "223e4567-e89b-12d3-a456-426614174000"
+
+
+class ImagePackTests(unittest.TestCase):
+    def test_reader_sees_appends_and_later_records_supersede_earlier(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            writer = ImagePackWriter(root, "normal")
+            reader = ImagePackReader(root, "normal")
+            try:
+                self.assertIsNone(reader.lookup(ORACLE_ID))
+
+                first = writer.append(ORACLE_ID, "jpg", b"first")
+                self.assertIsNone(reader.lookup(ORACLE_ID))
+                self.assertTrue(writer.contains(ORACLE_ID))
+                writer.flush()
+                self.assertEqual(reader.read(reader.lookup(ORACLE_ID)), b"first")
+
+                writer.append(OTHER_ORACLE_ID, "png", b"other")
+                replaced = writer.append(ORACLE_ID.upper(), "webp", b"second")
+                writer.flush()
+                record = reader.lookup(ORACLE_ID)
+
+                self.assertEqual(record.extension, "webp")
+                self.assertEqual(reader.read(record), b"second")
+                self.assertNotEqual(record.etag, first.etag)
+                self.assertEqual(record.offset, replaced.offset)
+                self.assertEqual(reader.read(reader.lookup(OTHER_ORACLE_ID)), b"other")
+                self.assertIsNone(ImagePackReader(root, "small").lookup(ORACLE_ID))
+                self.assertTrue(ImagePackWriter(root, "normal").contains(OTHER_ORACLE_ID))
+            finally:
+                writer.close()
+                reader.close()
+
+    def test_interrupted_appends_are_ignored_and_do_not_break_later_records(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            data_path, index_path = image_pack_paths(root, "small")
+            with ImagePackWriter(root, "small") as writer:
+                writer.append(ORACLE_ID, "jpg", b"kept")
+            with index_path.open("ab") as index_file:
+                index_file.write(b'{"ext":"jpg","length":99,"offset":4,"oracle_id":"' + OTHER_ORACLE_ID.encode() + b'"}\n')
+                index_file.write(b'{"ext":"jpg","len')
+
+            with ImagePackWriter(root, "small") as writer:
+                self.assertFalse(writer.contains(OTHER_ORACLE_ID))
+                writer.append(OTHER_ORACLE_ID, "jpg", b"late")
+
+            reader = ImagePackReader(root, "small")
+            try:
+                self.assertEqual(reader.read(reader.lookup(ORACLE_ID)), b"kept")
+                self.assertEqual(reader.read(reader.lookup(OTHER_ORACLE_ID)), b"late")
+                self.assertEqual(data_path.read_bytes(), b"keptlate")
+            finally:
+                reader.close()
+
+    def test_one_fsync_per_batch_and_reader_parses_only_the_appended_tail(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            oracle_ids = [f"{idx:08x}-e89b-12d3-a456-426614174000" for idx in range(5)]
+            reader = ImagePackReader(root, "small")
+            parsed_bytes: list[int] = []
+            real_parse = image_pack._parse_index_lines
+
+            def _counting_parse(raw: bytes, *args: object) -> int:
+                parsed_bytes.append(len(raw))
+                return real_parse(raw, *args)
+
+            try:
+                with patch.object(image_pack, "IMAGE_PACK_SYNC_EVERY", 2), patch.object(
+                    image_pack, "IMAGE_PACK_SYNC_INTERVAL_SECONDS", 3600.0
+                ), patch.object(image_pack.os, "fsync", wraps=os.fsync) as fsync, patch.object(
+                    image_pack, "_parse_index_lines", side_effect=_counting_parse
+                ):
+                    with ImagePackWriter(root, "small") as writer:
+                        for oracle_id in oracle_ids[:4]:
+                            writer.append(oracle_id, "jpg", oracle_id.encode())
+                        self.assertEqual(fsync.call_count, 2)
+                        self.assertEqual(reader.read(reader.lookup(oracle_ids[3])), oracle_ids[3].encode())
+                        writer.append(oracle_ids[4], "jpg", b"last")
+                        self.assertIsNone(reader.lookup(oracle_ids[4]))
+                    self.assertEqual(fsync.call_count, 3)
+                    self.assertEqual(reader.read(reader.lookup(oracle_ids[4])), b"last")
+                    self.assertEqual(reader.read(reader.lookup(oracle_ids[0])), oracle_ids[0].encode())
+
+                _, index_path = image_pack_paths(root, "small")
+                self.assertEqual(sum(parsed_bytes), index_path.stat().st_size)
+            finally:
+                reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
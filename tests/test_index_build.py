@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import sqlite3
+import unittest
+from unittest.mock import patch
+
+from engine.db_tags import ensure_tag_tables
+from snapshot_build.index_build import ensure_runtime_tag_indices, rebuild_inverted_indices
+
+SNAPSHOT_ID = "snap_index_build"
+TAXONOMY_VERSION = "taxonomy_index_build_v1"
+
+_CARD_TAGS = [
+    ("oid-a", '["RAMP","DRAW","RAMP"]', '["EQ_RAMP"]'),
+    ("oid-b", '["DRAW", "", 7, null]', '{"not": "a list"}'),
+    ("oid-c", "not-json", '["EQ_DRAW","EQ_RAMP"]'),
+    ("oid-d", "7", "[]"),
+    ("", '["RAMP"]', '["EQ_RAMP"]'),
+]
+
+
+class RebuildInvertedIndicesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.con = sqlite3.connect(":memory:")
+        self.con.row_factory = sqlite3.Row
+        ensure_tag_tables(self.con)
+        ensure_runtime_tag_indices(self.con)
+        for taxonomy_version in (TAXONOMY_VERSION, "taxonomy_other"):
+            self._write_card_tags(_CARD_TAGS, taxonomy_version)
+        rebuild_inverted_indices(self.con, SNAPSHOT_ID, "taxonomy_other")
+
+    def tearDown(self) -> None:
+        self.con.close()
+
+    def _write_card_tags(self, card_tags: list, taxonomy_version: str = TAXONOMY_VERSION) -> None:
+        for oracle_id, primitive_ids_json, equiv_class_ids_json in card_tags:
+            self.con.execute(
+                """
+                INSERT OR REPLACE INTO card_tags (
+                  oracle_id, snapshot_id, taxonomy_version, ruleset_version,
+                  primitive_ids_json, equiv_class_ids_json, facets_json, evidence_json, created_at
+                ) VALUES (?, ?, ?, 'rules_v1', ?, ?, '{}', '[]', '2026-01-01T00:00:00+00:00')
+                """,
+                (oracle_id, SNAPSHOT_ID, taxonomy_version, primitive_ids_json, equiv_class_ids_json),
+            )
+
+    def _index_rows(self, taxonomy_version: str = TAXONOMY_VERSION) -> dict:
+        out = {}
+        for table_name, id_column in (("primitive_to_cards", "primitive_id"), ("equiv_to_cards", "equiv_id")):
+            rows = self.con.execute(
+                f"SELECT {id_column}, oracle_id FROM {table_name} "
+                "WHERE snapshot_id = ? AND taxonomy_version = ? ORDER BY rowid",
+                (SNAPSHOT_ID, taxonomy_version),
+            ).fetchall()
+            out[table_name] = [tuple(row) for row in rows]
+        return out
+
+    def _index_ddl(self) -> list:
+        rows = self.con.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name IN ('primitive_to_cards', 'equiv_to_cards') ORDER BY name"
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def test_json1_and_python_paths_build_identical_sorted_indexes(self) -> None:
+        expected = {
+            "primitive_to_cards": [("DRAW", "oid-a"), ("DRAW", "oid-b"), ("RAMP", "oid-a")],
+            "equiv_to_cards": [("EQ_DRAW", "oid-c"), ("EQ_RAMP", "oid-a"), ("EQ_RAMP", "oid-c")],
+        }
+        index_ddl = self._index_ddl()
+
+        summary = rebuild_inverted_indices(self.con, SNAPSHOT_ID, TAXONOMY_VERSION)
+        self.assertEqual(
+            summary,
+            {"card_tags_scanned": 5, "primitive_to_cards_rows": 3, "equiv_to_cards_rows": 3},
+        )
+        self.assertEqual(self._index_rows(), expected)
+        self.assertEqual(self._index_ddl(), index_ddl)
+
+        with patch("snapshot_build.index_build.json1_available", return_value=False):
+            python_summary = rebuild_inverted_indices(self.con, SNAPSHOT_ID, TAXONOMY_VERSION)
+        self.assertEqual(python_summary, summary)
+        self.assertEqual(self._index_rows(), expected)
+        self.assertEqual(len(self._index_rows("taxonomy_other")["primitive_to_cards"]), 3)
+
+    def test_rebuild_limited_to_changed_oracle_ids(self) -> None:
+        rebuild_inverted_indices(self.con, SNAPSHOT_ID, TAXONOMY_VERSION)
+        self._write_card_tags([("oid-b", '["TUTOR"]', "[]"), ("oid-d", '["RAMP"]', '["EQ_RAMP"]')])
+
+        for json1 in (True, False):
+            with self.subTest(json1=json1), patch("snapshot_build.index_build.json1_available", return_value=json1):
+                summary = rebuild_inverted_indices(self.con, SNAPSHOT_ID, TAXONOMY_VERSION, oracle_ids=["oid-b", "oid-d"])
+                self.assertEqual(summary["card_tags_scanned"], 2)
+                self.assertEqual(
+                    sorted(self._index_rows()["primitive_to_cards"]),
+                    [("DRAW", "oid-a"), ("RAMP", "oid-a"), ("RAMP", "oid-d"), ("TUTOR", "oid-b")],
+                )
+                self.assertEqual(
+                    sorted(self._index_rows()["equiv_to_cards"]),
+                    [("EQ_DRAW", "oid-c"), ("EQ_RAMP", "oid-a"), ("EQ_RAMP", "oid-c"), ("EQ_RAMP", "oid-d")],
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from api.engine.candidate_pool_v1 import get_candidate_pool_v1
+from api.engine.color_identity_constraints_v1 import UNKNOWN_COLOR_IDENTITY, is_card_color_legal_v1
+from engine.color_identity_mask import (
+    COLOR_IDENTITY_MASK_INDEX,
+    color_identity_mask,
+    color_identity_mask_from_field,
+    colors_from_mask,
+    is_mask_subset,
+    snapshot_has_color_identity_mask,
+)
+from snapshot_build.migrate_cards_color_identity_mask import ensure_cards_color_identity_mask
+from tests.guardrails_fixture_harness import (
+    GUARDRAILS_FIXTURE_SNAPSHOT_ID,
+    create_guardrails_fixture_db,
+    set_guardrails_fixture_env,
+)
+
+
+class ColorIdentityMaskContractTests(unittest.TestCase):
+    def test_mask_encoding_is_wubrg_bit_order(self) -> None:
+        self.assertEqual(color_identity_mask([]), 0)
+        self.assertEqual(color_identity_mask(["W"]), 1)
+        self.assertEqual(color_identity_mask(["G", "u"]), 18)
+        self.assertEqual(colors_from_mask(31), ["W", "U", "B", "R", "G"])
+        self.assertEqual(colors_from_mask(color_identity_mask(["R", "U"])), ["U", "R"])
+
+    def test_mask_from_field_distinguishes_unavailable_from_colorless(self) -> None:
+        self.assertEqual(color_identity_mask_from_field("[]"), 0)
+        self.assertEqual(color_identity_mask_from_field('["U","R"]'), 10)
+        self.assertIsNone(color_identity_mask_from_field(None))
+        self.assertIsNone(color_identity_mask_from_field(""))
+        self.assertIsNone(color_identity_mask_from_field("not-json"))
+        self.assertIsNone(color_identity_mask_from_field('{"U": true}'))
+
+    def test_mask_subset(self) -> None:
+        self.assertTrue(is_mask_subset(0, 0))
+        self.assertTrue(is_mask_subset(2, 10))
+        self.assertFalse(is_mask_subset(16, 10))
+
+
+class MigrateCardsColorIdentityMaskTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir_ctx = tempfile.TemporaryDirectory()
+        self.db_path = create_guardrails_fixture_db(Path(self._tmp_dir_ctx.name))
+
+    def tearDown(self) -> None:
+        self._tmp_dir_ctx.cleanup()
+
+    def test_migration_is_idempotent_and_indexed(self) -> None:
+        first = ensure_cards_color_identity_mask(db_path=self.db_path)
+        second = ensure_cards_color_identity_mask(db_path=self.db_path)
+
+        self.assertTrue(first["column_added"])
+        self.assertGreater(first["rows_updated"], 0)
+        self.assertFalse(second["column_added"])
+        self.assertEqual(second["rows_updated"], 0)
+        self.assertEqual(second["rows_unavailable"], first["rows_unavailable"])
+
+        con = sqlite3.connect(str(self.db_path))
+        try:
+            index_row = con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                (COLOR_IDENTITY_MASK_INDEX,),
+            ).fetchone()
+            rows = con.execute(
+                "SELECT name, color_identity, color_identity_mask FROM cards ORDER BY oracle_id ASC"
+            ).fetchall()
+        finally:
+            con.close()
+
+        self.assertIsNotNone(index_row)
+        for name, color_identity, mask in rows:
+            with self.subTest(name=name):
+                self.assertEqual(mask, color_identity_mask_from_field(color_identity))
+
+    def test_runtime_filters_match_before_and_after_migration(self) -> None:
+        kwargs = {
+            "db_snapshot_id": GUARDRAILS_FIXTURE_SNAPSHOT_ID,
+            "include_primitives": ["RAMP_MANA", "CARD_DRAW"],
+            "exclude_card_names": ["Niv-Mizzet, Parun"],
+            "commander_color_set": {"U", "R"},
+            "bracket_id": "B3",
+            "limit": 2000,
+        }
+
+        with set_guardrails_fixture_env(self.db_path):
+            pool_before = get_candidate_pool_v1(**kwargs)
+            legal_before = [
+                is_card_color_legal_v1(name, {"U", "R"}, GUARDRAILS_FIXTURE_SNAPSHOT_ID)
+                for name in ("Arcane Signet", "Cultivate", "Mystery Card")
+            ]
+
+            ensure_cards_color_identity_mask(db_path=self.db_path)
+
+            pool_after = get_candidate_pool_v1(**kwargs)
+            legal_after = [
+                is_card_color_legal_v1(name, {"U", "R"}, GUARDRAILS_FIXTURE_SNAPSHOT_ID)
+                for name in ("Arcane Signet", "Cultivate", "Mystery Card")
+            ]
+
+        self.assertEqual(pool_after, pool_before)
+        self.assertEqual(legal_after, legal_before)
+        self.assertEqual(legal_after, [True, False, UNKNOWN_COLOR_IDENTITY])
+
+    def test_unpopulated_mask_column_keeps_json_color_filtering(self) -> None:
+        kwargs = {
+            "db_snapshot_id": GUARDRAILS_FIXTURE_SNAPSHOT_ID,
+            "include_primitives": ["RAMP_MANA", "CARD_DRAW"],
+            "exclude_card_names": [],
+            "commander_color_set": {"U", "R"},
+            "bracket_id": "B3",
+            "limit": 2000,
+        }
+        with set_guardrails_fixture_env(self.db_path):
+            pool_before = get_candidate_pool_v1(**kwargs)
+
+        con = sqlite3.connect(str(self.db_path))
+        try:
+            con.execute("ALTER TABLE cards ADD COLUMN color_identity_mask INTEGER")
+            con.commit()
+            self.assertFalse(snapshot_has_color_identity_mask(con, GUARDRAILS_FIXTURE_SNAPSHOT_ID))
+        finally:
+            con.close()
+
+        with set_guardrails_fixture_env(self.db_path):
+            pool_after = get_candidate_pool_v1(**kwargs)
+
+        self.assertEqual(pool_after, pool_before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,9 @@ import json
 import sqlite3
 from pathlib import Path
 
+from engine.image_pack import ImagePackReader
 from snapshot_build.prefetch_card_images import _parse_sizes_csv, prefetch_card_images
+from snapshot_build.snapshot_diff_ingest import CHANGE_ADDED, CHANGE_REMOVED, ensure_snapshot_diff_tables
 
 
 SNAPSHOT_ID = "snap_prefetch_test"
@@ -261,3 +263,98 @@ def test_prefetch_uses_payload_extension_when_it_differs_from_url(tmp_path: Path
     assert summary["downloaded"] == 1
     assert (out_dir / "normal" / f"{ORACLE_ID_1}.png").is_file()
     assert not (out_dir / "normal" / f"{ORACLE_ID_1}.jpg").exists()
+
+
+def test_prefetch_pack_layout_appends_and_resumes_from_pack(tmp_path: Path) -> None:
+    db_path = tmp_path / "cards.sqlite"
+    _create_fixture_db(db_path)
+    out_dir = tmp_path / "card_images"
+    downloaded_urls: list[str] = []
+
+    def fake_download(url: str, timeout_seconds: float) -> bytes:
+        _ = timeout_seconds
+        downloaded_urls.append(url)
+        return b"\xff\xd8\xff" + url.encode("utf-8")
+
+    kwargs = dict(
+        db_path=db_path,
+        snapshot_id=SNAPSHOT_ID,
+        out_dir=out_dir,
+        sizes=["normal", "small"],
+        limit=0,
+        workers=4,
+        resume=True,
+        progress_every=0,
+        rate_limit_per_sec=1000.0,
+        timeout_seconds=1.0,
+        download_fn=fake_download,
+        layout="pack",
+    )
+    first = prefetch_card_images(**kwargs)
+    second = prefetch_card_images(**kwargs)
+
+    assert first["downloaded"] == 4
+    assert second["skipped"] == 4
+    assert len(downloaded_urls) == 4
+    assert not (out_dir / "normal").exists()
+
+    reader = ImagePackReader(out_dir, "small")
+    try:
+        record = reader.lookup(ORACLE_ID_2)
+        assert record is not None
+        assert record.extension == "jpg"
+        assert reader.read(record) == b"\xff\xd8\xffhttps://img.example/oracle2-small.jpg"
+    finally:
+        reader.close()
+
+
+def test_prefetch_changes_only_limits_plan_to_change_manifest(tmp_path: Path) -> None:
+    db_path = tmp_path / "cards.sqlite"
+    _create_fixture_db(db_path)
+    downloaded_urls: list[str] = []
+
+    def fake_download(url: str, timeout_seconds: float) -> bytes:
+        _ = timeout_seconds
+        downloaded_urls.append(url)
+        return b"\xff\xd8\xff"
+
+    kwargs = dict(
+        db_path=db_path,
+        snapshot_id=SNAPSHOT_ID,
+        out_dir=tmp_path / "card_images",
+        sizes=["small"],
+        limit=0,
+        workers=1,
+        resume=True,
+        progress_every=0,
+        rate_limit_per_sec=1000.0,
+        timeout_seconds=1.0,
+        download_fn=fake_download,
+        changes_only=True,
+    )
+    try:
+        prefetch_card_images(**kwargs)
+    except RuntimeError as exc:
+        assert "no change manifest" in str(exc)
+    else:
+        raise AssertionError("expected RuntimeError without a change manifest")
+
+    con = sqlite3.connect(str(db_path))
+    try:
+        ensure_snapshot_diff_tables(con)
+        con.executemany(
+            "INSERT INTO card_fingerprints_v1 (snapshot_id, oracle_id, fingerprint) VALUES (?, ?, 'fp')",
+            [(SNAPSHOT_ID, ORACLE_ID_1), (SNAPSHOT_ID, ORACLE_ID_2)],
+        )
+        con.executemany(
+            "INSERT INTO snapshot_changes_v1 (snapshot_id, base_snapshot_id, oracle_id, change) VALUES (?, 'base', ?, ?)",
+            [(SNAPSHOT_ID, ORACLE_ID_2, CHANGE_ADDED), (SNAPSHOT_ID, "gone-oracle", CHANGE_REMOVED)],
+        )
+        con.commit()
+    finally:
+        con.close()
+
+    summary = prefetch_card_images(**kwargs)
+
+    assert summary["downloaded"] == 1
+    assert downloaded_urls == ["https://img.example/oracle2-small.jpg"]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from api.engine.candidate_selection_v0 import query_candidate_rows
+from api.engine.constants import TagsNotCompiledError
+from api.engine.primitive_bitset_index_v1 import (
+    clear_primitive_bitset_index_cache_v1,
+    get_cards_primitives_bitset_index_v1,
+    get_primitive_bitset_index_v1,
+    iter_bitset_ordinals,
+)
+from engine.db_tags import ensure_tag_tables
+from snapshot_build.index_build import ensure_runtime_tag_indices, rebuild_inverted_indices
+from tests.conftest import TEST_SNAPSHOT_ID
+
+TAXONOMY_VERSION = "taxonomy_test_v1"
+
+_CARDS = [
+    ("oid-a", "Arcane Signet", '["RAMP_MANA"]', '["RAMP_MANA","MANA_FIXING"]'),
+    ("oid-b", "Brainstorm", '["CARD_DRAW"]', '["CARD_DRAW","CARD_SELECTION"]'),
+    ("oid-c", "Cultivate", '["RAMP_LAND"]', '["RAMP_LAND","RAMP_MANA"]'),
+    ("oid-d", "Divination", "not-json", '["CARD_DRAW"]'),
+]
+
+
+def _seed(db_path: Path) -> None:
+    con = sqlite3.connect(str(db_path))
+    con.row_factory = sqlite3.Row
+    try:
+        ensure_tag_tables(con)
+        for oracle_id, name, primitives_json, tag_primitives_json in _CARDS:
+            con.execute(
+                """
+                INSERT INTO cards (snapshot_id, oracle_id, name, color_identity, legalities_json, primitives_json)
+                VALUES (?, ?, ?, '[]', '{"commander":"legal"}', ?)
+                """,
+                (TEST_SNAPSHOT_ID, oracle_id, name, primitives_json),
+            )
+            con.execute(
+                """
+                INSERT INTO card_tags (
+                  oracle_id, snapshot_id, taxonomy_version, ruleset_version,
+                  primitive_ids_json, equiv_class_ids_json, facets_json, evidence_json, created_at
+                ) VALUES (?, ?, ?, 'rules_v1', ?, '[]', '{}', '[]', '2026-01-01T00:00:00+00:00')
+                """,
+                (oracle_id, TEST_SNAPSHOT_ID, TAXONOMY_VERSION, tag_primitives_json),
+            )
+        ensure_runtime_tag_indices(con)
+        rebuild_inverted_indices(con, TEST_SNAPSHOT_ID, TAXONOMY_VERSION)
+        con.commit()
+    finally:
+        con.close()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_primitive_bitset_index_cache_v1()
+    yield
+    clear_primitive_bitset_index_cache_v1()
+
+
+def test_iter_bitset_ordinals_is_ascending() -> None:
+    assert list(iter_bitset_ordinals(0)) == []
+    assert list(iter_bitset_ordinals(0b1011)) == [0, 1, 3]
+    assert list(iter_bitset_ordinals((1 << 70) | (1 << 9))) == [9, 70]
+
+
+def test_set_queries_over_compiled_primitives(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    index = get_primitive_bitset_index_v1(TEST_SNAPSHOT_ID, TAXONOMY_VERSION)
+
+    assert index.oracle_ids == ["oid-a", "oid-b", "oid-c", "oid-d"]
+    assert index.oracle_ids_for(index.bitset_for("RAMP_MANA")) == ["oid-a", "oid-c"]
+    assert index.oracle_ids_for(index.union(["CARD_DRAW", "RAMP_LAND"])) == ["oid-b", "oid-c", "oid-d"]
+    assert index.oracle_ids_for(index.intersection(["CARD_DRAW", "CARD_SELECTION"])) == ["oid-b"]
+    assert index.intersection(["CARD_DRAW", "UNKNOWN"]) == 0
+    assert index.count(index.union(["RAMP_MANA", "CARD_DRAW"])) == 4
+    assert index.match_counts(["RAMP_MANA", "RAMP_LAND", "MANA_FIXING"]) == {0: 2, 2: 2}
+    assert index.primitives_for(2) == ["RAMP_LAND", "RAMP_MANA"]
+
+
+def test_cards_primitives_json_source_skips_invalid_json(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    index = get_cards_primitives_bitset_index_v1(TEST_SNAPSHOT_ID)
+
+    assert index.card_count == 4
+    assert index.oracle_ids_for(index.bitset_for("CARD_DRAW")) == ["oid-b"]
+    assert index.primitives_for(3) == []
+
+
+def test_index_is_cached_and_rebuilt_after_db_change(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    first = get_primitive_bitset_index_v1(TEST_SNAPSHOT_ID, TAXONOMY_VERSION)
+    assert get_primitive_bitset_index_v1(TEST_SNAPSHOT_ID, TAXONOMY_VERSION) is first
+
+    con = sqlite3.connect(str(mtg_test_db_path))
+    try:
+        con.execute("DELETE FROM primitive_to_cards WHERE oracle_id = 'oid-a'")
+        con.commit()
+    finally:
+        con.close()
+
+    rebuilt = get_primitive_bitset_index_v1(TEST_SNAPSHOT_ID, TAXONOMY_VERSION)
+    assert rebuilt is not first
+    assert "oid-a" not in rebuilt.oracle_ids
+
+
+def test_unrelated_table_write_keeps_cached_index(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    first = get_primitive_bitset_index_v1(TEST_SNAPSHOT_ID, TAXONOMY_VERSION)
+    json_first = get_cards_primitives_bitset_index_v1(TEST_SNAPSHOT_ID)
+
+    con = sqlite3.connect(str(mtg_test_db_path))
+    try:
+        con.execute(
+            """
+            INSERT INTO run_history_v0 (
+              run_id, created_at, endpoint, input_hash_v1, output_build_hash_v1,
+              layer_hashes_json, request_json, response_json
+            ) VALUES ('run-1', '2026-01-02T00:00:00+00:00', '/build', 'in', 'out', '{}', '{}', '{}')
+            """
+        )
+        con.commit()
+    finally:
+        con.close()
+
+    assert get_primitive_bitset_index_v1(TEST_SNAPSHOT_ID, TAXONOMY_VERSION) is first
+    assert get_cards_primitives_bitset_index_v1(TEST_SNAPSHOT_ID) is json_first
+
+
+def test_query_candidate_rows_uses_index_order_and_primitives(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    rows = query_candidate_rows(TEST_SNAPSHOT_ID, ["RAMP_MANA", "CARD_DRAW"], limit=4000)
+
+    assert [row["name"] for row in rows] == ["Arcane Signet", "Brainstorm", "Cultivate", "Divination"]
+    assert rows[0]["primitives"] == ["MANA_FIXING", "RAMP_MANA"]
+    assert [row["name"] for row in query_candidate_rows(TEST_SNAPSHOT_ID, [], limit=2)] == [
+        "Arcane Signet",
+        "Brainstorm",
+    ]
+
+
+def test_query_candidate_rows_requires_compiled_index(mtg_test_db_path: Path) -> None:
+    with pytest.raises(TagsNotCompiledError):
+        query_candidate_rows(TEST_SNAPSHOT_ID, ["RAMP_MANA"], limit=10)
+
+
+def test_ordinals_follow_name_order_not_oracle_id_order(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    con = sqlite3.connect(str(mtg_test_db_path))
+    try:
+        # oid-a now sorts last by name, oid-e shares a name with oid-c and sorts after it by oracle_id.
+        con.execute("UPDATE cards SET name = 'Zendikar Signet' WHERE oracle_id = 'oid-a'")
+        con.execute(
+            """
+            INSERT INTO cards (snapshot_id, oracle_id, name, color_identity, legalities_json, primitives_json)
+            VALUES (?, 'oid-e', 'Cultivate', '[]', '{"commander":"legal"}', '["RAMP_LAND"]')
+            """,
+            (TEST_SNAPSHOT_ID,),
+        )
+        con.commit()
+    finally:
+        con.close()
+
+    index = get_primitive_bitset_index_v1(TEST_SNAPSHOT_ID, TAXONOMY_VERSION)
+    assert index.names == ["Brainstorm", "Cultivate", "Divination", "Zendikar Signet"]
+    assert index.oracle_ids_for(index.union(["RAMP_MANA", "CARD_DRAW"])) == ["oid-b", "oid-c", "oid-d", "oid-a"]
+    assert [row["name"] for row in query_candidate_rows(TEST_SNAPSHOT_ID, ["RAMP_MANA"], limit=10)] == [
+        "Cultivate",
+        "Zendikar Signet",
+    ]
+
+    json_index = get_cards_primitives_bitset_index_v1(TEST_SNAPSHOT_ID)
+    assert json_index.oracle_ids == ["oid-b", "oid-c", "oid-e", "oid-d", "oid-a"]
+    assert json_index.oracle_ids_for(json_index.bitset_for("RAMP_LAND")) == ["oid-c", "oid-e"]
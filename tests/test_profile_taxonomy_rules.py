@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import unittest
+
+from snapshot_build.profile_taxonomy_rules import profile_rules, rule_budget_violations, sample_cards
+from snapshot_build.tag_snapshot import CompiledRule
+
+
+def _rule(rule_id: str, pattern: str, match_mode: str = "regex", field: str = "oracle_text") -> CompiledRule:
+    return CompiledRule(
+        rule_id=rule_id,
+        primitive_id=f"P_{rule_id}",
+        pattern=pattern,
+        field=field,
+        match_mode=match_mode,
+        facet_key=None,
+        facet_value=None,
+        exclusive_group=None,
+        unknown_on_match=False,
+        priority=100,
+    )
+
+
+class ProfileTaxonomyRulesTests(unittest.TestCase):
+    def test_profile_ranks_pathological_rule_and_reports_worst_input(self) -> None:
+        rules = [
+            _rule("R_DRAW", r"\bdraw (a|two) cards?\b"),
+            _rule("R_SLOW", r"(\w+\s?)+!"),
+            _rule("R_ARTIFACT", "artifact", match_mode="substring", field="type_line"),
+        ]
+        cards = [
+            {"oracle_id": "oid-a", "type_line": "Artifact", "oracle_text": "Draw a card."},
+            {"oracle_id": "oid-b", "type_line": "Instant", "oracle_text": "untap target creature"},
+            {"oracle_id": "oid-c", "type_line": "", "oracle_text": "Draw two cards!"},
+        ]
+
+        profiles = profile_rules(rules, cards)
+        by_rule = {profile["rule_id"]: profile for profile in profiles}
+
+        self.assertEqual(profiles[0]["rule_id"], "R_SLOW")
+        self.assertEqual(by_rule["R_SLOW"]["backtracking_risks"], ["nested_quantifier"])
+        self.assertEqual(by_rule["R_SLOW"]["worst_inputs"][0]["oracle_id"], "oid-b")
+        self.assertEqual((by_rule["R_SLOW"]["evaluations"], by_rule["R_SLOW"]["hits"]), (3, 1))
+        self.assertEqual(by_rule["R_DRAW"]["hits"], 2)
+        self.assertEqual(by_rule["R_DRAW"]["candidate_evaluations"], 2)
+        self.assertEqual(by_rule["R_DRAW"]["backtracking_risks"], [])
+        self.assertEqual((by_rule["R_ARTIFACT"]["evaluations"], by_rule["R_ARTIFACT"]["hits"]), (2, 1))
+
+        self.assertEqual(rule_budget_violations(profiles), [])
+        violations = rule_budget_violations(profiles, budget_ms=by_rule["R_DRAW"]["total_ms"] + 1.0)
+        self.assertEqual([violation.split(":")[0] for violation in violations], ["R_SLOW"])
+        self.assertEqual(len(rule_budget_violations(profiles, single_input_budget_ms=0.0)), 3)
+
+        in_process = {profile["rule_id"]: profile for profile in profile_rules(rules, cards, rule_timeout_seconds=None)}
+        for rule_id, profile in by_rule.items():
+            self.assertEqual(
+                (in_process[rule_id]["evaluations"], in_process[rule_id]["hits"], in_process[rule_id]["candidate_evaluations"]),
+                (profile["evaluations"], profile["hits"], profile["candidate_evaluations"]),
+            )
+
+    def test_runaway_rule_is_killed_and_the_remaining_rules_still_run(self) -> None:
+        rules = [
+            _rule("R_BEFORE", "draw"),
+            _rule("R_RUNAWAY", r"(a+)+$"),
+            _rule("R_AFTER", "card"),
+        ]
+        cards = [
+            {"oracle_id": "oid-a", "type_line": "", "oracle_text": "Draw a card."},
+            {"oracle_id": "oid-b", "type_line": "", "oracle_text": "a" * 40 + "!"},
+        ]
+
+        profiles = profile_rules(rules, cards, rule_timeout_seconds=0.5)
+        by_rule = {profile["rule_id"]: profile for profile in profiles}
+
+        self.assertEqual(profiles[0]["rule_id"], "R_RUNAWAY")
+        self.assertTrue(by_rule["R_RUNAWAY"]["timed_out"])
+        self.assertEqual(by_rule["R_RUNAWAY"]["total_ms"], 500.0)
+        self.assertEqual((by_rule["R_BEFORE"]["timed_out"], by_rule["R_BEFORE"]["hits"]), (False, 1))
+        self.assertEqual((by_rule["R_AFTER"]["timed_out"], by_rule["R_AFTER"]["hits"]), (False, 1))
+        self.assertEqual(
+            [violation.split(":")[0] for violation in rule_budget_violations(profiles)],
+            ["R_RUNAWAY"],
+        )
+
+    def test_sample_cards_is_strided_and_deterministic(self) -> None:
+        cards = [{"oracle_id": f"oid-{idx}"} for idx in range(10)]
+        self.assertEqual([card["oracle_id"] for card in sample_cards(cards, 4)], ["oid-0", "oid-2", "oid-5", "oid-7"])
+        self.assertEqual(sample_cards(cards, 0), cards)
+
+
+if __name__ == "__main__":
+    unittest.main()
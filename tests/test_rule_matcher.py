@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import random
+import re
+import unittest
+from typing import Dict, List, Tuple
+from unittest.mock import patch
+
+from snapshot_build.rule_matcher import (
+    RuleMatcher,
+    RuleSpan,
+    _LiteralAutomaton,
+    regex_backtracking_risks,
+    regex_required_literals,
+)
+from snapshot_build.tag_snapshot import CompiledRule
+
+
+def _rule(index: int, pattern: str, match_mode: str, field: str = "oracle_text") -> CompiledRule:
+    return CompiledRule(
+        rule_id=f"R{index:04d}",
+        primitive_id=None,
+        pattern=pattern,
+        field=field,
+        match_mode=match_mode,
+        facet_key=None,
+        facet_value=None,
+        exclusive_group=None,
+        unknown_on_match=False,
+        priority=100,
+    )
+
+
+def _reference_match(rule: CompiledRule, text: str) -> RuleSpan | None:
+    # Per-call matcher tag_snapshot used before RuleMatcher; the engine must agree with it exactly.
+    if text == "":
+        return None
+    if rule.match_mode == "regex":
+        try:
+            pattern = re.compile(rule.pattern, re.IGNORECASE)
+        except re.error:
+            return None
+        match = pattern.search(text)
+        if match is None:
+            return None
+        start, end = match.span()
+        return (start, end, text[start:end][:120])
+    haystack = text.lower()
+    needle = rule.pattern.lower()
+    idx = haystack.find(needle)
+    if idx < 0:
+        return None
+    end = idx + len(needle)
+    return (idx, end, text[idx:end][:120])
+
+
+def _reference_hits(rules: List[CompiledRule], field_name: str, text: str) -> Dict[int, RuleSpan]:
+    hits: Dict[int, RuleSpan] = {}
+    for rule_index, rule in enumerate(rules):
+        if rule.field != "both" and rule.field != field_name:
+            continue
+        span = _reference_match(rule, text)
+        if span is not None:
+            hits[rule_index] = span
+    return hits
+
+
+_WORDS = ["draw", "a", "card", "Dra", "target", "creature", "KING", "ſtorm", "İsland", "straße", "ı", "K", "{T}", "+1/+1"]
+
+
+def _random_regex(rng: random.Random, depth: int = 0) -> str:
+    parts: List[str] = []
+    for _ in range(rng.randint(1, 3)):
+        choice = rng.random()
+        if choice < 0.45 or depth > 1:
+            parts.append(re.escape(rng.choice(_WORDS)))
+        elif choice < 0.6:
+            parts.append(rng.choice([r"\b", ".*", r"\s+", "[a-z]+", r"\d", "(?-i:K)", " ", "x?"]))
+        elif choice < 0.8:
+            alternatives = "|".join(_random_regex(rng, depth + 1) for _ in range(rng.randint(2, 3)))
+            parts.append(rng.choice(["(", "(?:"]) + alternatives + ")")
+        else:
+            parts.append("(?:" + _random_regex(rng, depth + 1) + ")" + rng.choice(["+", "*", "{2}", "{0,1}", "?"]))
+    return " ".join(parts) if rng.random() < 0.3 else "".join(parts)
+
+
+class RuleMatcherTests(unittest.TestCase):
+    def test_required_literals(self) -> None:
+        self.assertEqual(regex_required_literals(r"\bdraw (a|two) cards?\b"), ("draw ",))
+        self.assertEqual(
+            regex_required_literals(r"\b(put|exile)\b.*\b(battlefield|graveyard)\b"),
+            ("battlefield", "graveyard"),
+        )
+        self.assertEqual(regex_required_literals(r"(?:Counter)+ target"), ("counter",))
+        self.assertEqual(regex_required_literals(r"(?-i:Kicker)"), ("kicker",))
+        self.assertIsNone(regex_required_literals(r"[a-z]+\d*"))
+        self.assertIsNone(regex_required_literals(r"(draw)?\s"))
+        self.assertIsNone(regex_required_literals(r"(unclosed"))
+
+    def test_backtracking_risks(self) -> None:
+        self.assertEqual(regex_backtracking_risks(r"(\w+\s?)+$"), ["nested_quantifier"])
+        self.assertEqual(regex_backtracking_risks(r"(a|ab)*c"), ["overlapping_alternation_in_repeat"])
+        self.assertEqual(regex_backtracking_risks(r"a.*b.*c.*d"), ["stacked_repeats"])
+        self.assertEqual(regex_backtracking_risks(r"(.*a){10}"), ["nested_quantifier"])
+        self.assertEqual(regex_backtracking_risks(r"\w+\s*\w+\s*\w+\s*!"), ["stacked_repeats"])
+        self.assertEqual(regex_backtracking_risks(r"(.*a){3}"), [])
+        self.assertEqual(regex_backtracking_risks(r"\w+ \w+ \w+"), [])
+        self.assertEqual(regex_backtracking_risks(r"[a-z]+[0-9]+[a-z]+"), [])
+        self.assertEqual(regex_backtracking_risks(r"\bdraw (a|two) cards?\b"), [])
+        self.assertEqual(regex_backtracking_risks(r"graveyard .* battlefield"), [])
+        self.assertEqual(regex_backtracking_risks(r"(?:foo|bar)+"), [])
+        self.assertEqual(regex_backtracking_risks(r"(unclosed"), [])
+
+    def test_first_match_spans_match_per_rule_search(self) -> None:
+        rules = [
+            _rule(0, "draw a card", "substring"),
+            _rule(1, "Draw", "substring", field="both"),
+            _rule(2, "creature", "substring", field="type_line"),
+            _rule(3, r"\bdraw (a|two) cards?\b", "regex"),
+            _rule(4, r"(unclosed", "regex"),
+            _rule(5, r"stor(m|e)", "regex", field="both"),
+            _rule(6, r"king", "regex", field="type_line"),
+            _rule(7, r"\d+", "regex"),
+            _rule(8, "İs", "substring"),
+            _rule(9, "straße", "regex"),
+        ]
+        texts = [
+            "",
+            "Draw a card, then draw two cards.",
+            "Legendary Creature — Human KING",
+            "Whenever ſTORM resolves, draw a card.",
+            "İsland walk. Put 3 +1/+1 counters",
+            "STRASSE straße",
+        ]
+        matcher = RuleMatcher(rules)
+        for text in texts:
+            for field_name in ("oracle_text", "type_line"):
+                self.assertEqual(matcher.match(field_name, text), _reference_hits(rules, field_name, text), (field_name, text))
+        self.assertEqual(matcher.match("name", "Draw"), {})
+
+    def test_automaton_and_find_report_the_same_first_ends(self) -> None:
+        keys = ["he", "she", "his", "hers", "s", "e", "ſ", "hershe"]
+        automaton = _LiteralAutomaton(keys)
+        text = "ushershe ſhis"
+        expected = {key_id: text.find(key) + len(key) for key_id, key in enumerate(keys) if key in text}
+        self.assertEqual(automaton.first_ends(text), expected)
+        with patch.object(_LiteralAutomaton, "FIND_MAX_KEYS", 0):
+            self.assertEqual(automaton.first_ends(text), expected)
+
+    def test_randomized_rules_agree_with_reference(self) -> None:
+        for find_max_keys in (_LiteralAutomaton.FIND_MAX_KEYS, 0):
+            with self.subTest(find_max_keys=find_max_keys), patch.object(_LiteralAutomaton, "FIND_MAX_KEYS", find_max_keys):
+                self._assert_randomized_rules_agree_with_reference()
+
+    def _assert_randomized_rules_agree_with_reference(self) -> None:
+        rng = random.Random(20260118)
+        rules: List[CompiledRule] = []
+        for index in range(160):
+            if rng.random() < 0.6:
+                rules.append(_rule(index, _random_regex(rng), "regex", field=rng.choice(["oracle_text", "both"])))
+            else:
+                words = rng.sample(_WORDS, rng.randint(1, 2))
+                rules.append(_rule(index, " ".join(words), "substring", field=rng.choice(["oracle_text", "type_line"])))
+        matcher = RuleMatcher(rules)
+
+        texts: List[Tuple[str, str]] = []
+        for _ in range(300):
+            words = [rng.choice(_WORDS + ["the", "of", "you", "KİNG", "Straße", "DRAW"]) for _ in range(rng.randint(0, 12))]
+            texts.append(("oracle_text", " ".join(words)))
+            texts.append(("type_line", " ".join(reversed(words))))
+        for field_name, text in texts:
+            reference = _reference_hits(rules, field_name, text)
+            self.assertEqual(matcher.match(field_name, text), reference, (field_name, text))
+            candidates = matcher.regex_candidates(field_name, text)
+            regex_hits = {rule_index for rule_index in reference if rules[rule_index].match_mode == "regex"}
+            self.assertLessEqual(regex_hits, set(candidates), (field_name, text))
+            self.assertTrue(all(matcher.compiled_pattern(rule_index) is not None for rule_index in candidates))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import io
+import json
+import sqlite3
+import sys
+import threading
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import tools.run_update_pipeline as pipeline
+
+try:
+    import tools.update_scryfall_bulk as update_scryfall_bulk
+except ImportError:  # pragma: no cover - requests/tqdm are optional in test environments
+    update_scryfall_bulk = None
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls: list = []
+
+    def action(self, name: str, body=None):
+        def _run() -> None:
+            with self.lock:
+                self.calls.append(name)
+            if body is not None:
+                body()
+
+        return _run
+
+
+class RunStageGraphTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.state_path = self.root / "state.json"
+        self.lines: list = []
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _run(self, stages, **kwargs):
+        return pipeline.run_stage_graph(
+            stages,
+            state_path=self.state_path,
+            cwd=self.root,
+            printer=self.lines.append,
+            **kwargs,
+        )
+
+    def test_independent_stages_overlap(self) -> None:
+        prefetch_started = threading.Event()
+        tag_started = threading.Event()
+
+        def prefetch() -> None:
+            prefetch_started.set()
+            if not tag_started.wait(timeout=5):
+                raise RuntimeError("tag never overlapped prefetch")
+
+        def tag() -> None:
+            tag_started.set()
+            if not prefetch_started.wait(timeout=5):
+                raise RuntimeError("prefetch never overlapped tag")
+
+        results = self._run(
+            [
+                pipeline.Stage(name="ingest", action=lambda: None),
+                pipeline.Stage(name="prefetch", action=prefetch, depends_on=("ingest",)),
+                pipeline.Stage(name="tag", action=tag, depends_on=("ingest",), resource=pipeline.DB_WRITE_RESOURCE),
+            ]
+        )
+        self.assertEqual([result.status for result in results], [pipeline.STAGE_RAN] * 3)
+
+    def test_shared_resource_never_overlaps(self) -> None:
+        active = []
+        overlaps = []
+        lock = threading.Lock()
+
+        def writer() -> None:
+            with lock:
+                active.append(1)
+                if len(active) > 1:
+                    overlaps.append(True)
+            threading.Event().wait(0.05)
+            with lock:
+                active.pop()
+
+        stages = [
+            pipeline.Stage(name=f"writer_{idx}", action=writer, resource=pipeline.DB_WRITE_RESOURCE) for idx in range(3)
+        ]
+        results = self._run(stages, max_parallel=3)
+        self.assertEqual([result.status for result in results], [pipeline.STAGE_RAN] * 3)
+        self.assertEqual(overlaps, [])
+
+    def test_resume_after_failure_skips_completed_stages(self) -> None:
+        recorder = _Recorder()
+        fail = {"tag": True}
+
+        def tag_body() -> None:
+            if fail["tag"]:
+                raise RuntimeError("boom")
+
+        def stages():
+            return [
+                pipeline.Stage(name="ingest", action=recorder.action("ingest")),
+                pipeline.Stage(name="tag", action=recorder.action("tag", tag_body), depends_on=("ingest",)),
+                pipeline.Stage(name="primitive_index", action=recorder.action("primitive_index"), depends_on=("tag",)),
+            ]
+
+        first = self._run(stages())
+        self.assertEqual(
+            [result.status for result in first],
+            [pipeline.STAGE_RAN, pipeline.STAGE_FAILED, pipeline.STAGE_BLOCKED],
+        )
+        self.assertEqual(recorder.calls, ["ingest", "tag"])
+
+        fail["tag"] = False
+        recorder.calls.clear()
+        second = self._run(stages())
+        self.assertEqual(
+            [result.status for result in second],
+            [pipeline.STAGE_CHECKPOINT, pipeline.STAGE_RAN, pipeline.STAGE_RAN],
+        )
+        self.assertEqual(recorder.calls, ["tag", "primitive_index"])
+
+        recorder.calls.clear()
+        third = self._run(stages())
+        self.assertEqual([result.status for result in third], [pipeline.STAGE_CHECKPOINT] * 3)
+        self.assertEqual(recorder.calls, [])
+
+        state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        self.assertEqual(state["version"], pipeline.PIPELINE_STATE_VERSION)
+        self.assertEqual(sorted(state["stages"]), ["ingest", "primitive_index", "tag"])
+
+    def test_changed_input_reruns_stage_and_downstream_only(self) -> None:
+        recorder = _Recorder()
+        pack_manifest = self.root / "pack_manifest.json"
+        pack_manifest.write_text('{"v": 1}', encoding="utf-8")
+        output = self.root / "tags.out"
+
+        def write_tags() -> None:
+            output.write_text(pack_manifest.read_text(encoding="utf-8"), encoding="utf-8")
+
+        def stages():
+            return [
+                pipeline.Stage(name="decklist_name_index", action=recorder.action("decklist_name_index")),
+                pipeline.Stage(
+                    name="tag",
+                    action=recorder.action("tag", write_tags),
+                    input_files=(pack_manifest,),
+                    output_files=(output,),
+                ),
+                pipeline.Stage(name="primitive_index", action=recorder.action("primitive_index"), depends_on=("tag",)),
+            ]
+
+        self._run(stages())
+        recorder.calls.clear()
+
+        pack_manifest.write_text('{"v": 2}', encoding="utf-8")
+        results = self._run(stages())
+        self.assertEqual(sorted(recorder.calls), ["primitive_index", "tag"])
+        self.assertEqual(results[0].status, pipeline.STAGE_CHECKPOINT)
+
+        recorder.calls.clear()
+        output.unlink()
+        self._run(stages())
+        # Same output content again, so primitive_index's upstream digest holds.
+        self.assertEqual(recorder.calls, ["tag"])
+
+        recorder.calls.clear()
+        self._run(stages(), force_stages=["decklist_name_index"])
+        self.assertEqual(recorder.calls, ["decklist_name_index"])
+
+        recorder.calls.clear()
+        self._run(stages(), fresh=True)
+        self.assertEqual(sorted(recorder.calls), ["decklist_name_index", "primitive_index", "tag"])
+
+    def test_command_stage_reports_exit_code_and_throughput(self) -> None:
+        ok = pipeline.Stage(
+            name="ok",
+            command=(sys.executable, "-c", "print('hello')"),
+            units=lambda: 10,
+            units_label="cards",
+        )
+        bad = pipeline.Stage(name="bad", command=(sys.executable, "-c", "raise SystemExit(4)"), depends_on=("ok",))
+        results = self._run([ok, bad])
+
+        self.assertEqual(results[0].status, pipeline.STAGE_RAN)
+        self.assertEqual(results[0].units, 10)
+        self.assertIsNotNone(results[0].throughput())
+        self.assertIn("[ok] hello", self.lines)
+        self.assertEqual(results[1].status, pipeline.STAGE_FAILED)
+        self.assertEqual(results[1].returncode, 4)
+
+        report = pipeline.format_stage_report(results, 1.0)
+        self.assertIn("cards", report[1])
+        self.assertTrue(report[-1].startswith("total"))
+
+    def test_cycle_and_unknown_dependency_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self._run([pipeline.Stage(name="a", action=lambda: None, depends_on=("missing",))])
+        with self.assertRaises(ValueError):
+            self._run(
+                [
+                    pipeline.Stage(name="a", action=lambda: None, depends_on=("b",)),
+                    pipeline.Stage(name="b", action=lambda: None, depends_on=("a",)),
+                ]
+            )
+
+
+@unittest.skipUnless(update_scryfall_bulk is not None, "requests/tqdm unavailable")
+class ResumeAfterIngestFailureTests(unittest.TestCase):
+    SNAPSHOT_ID = "snap_resume"
+
+    def test_resumed_ingest_replaces_half_written_snapshot(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            db_path = root / "mtg.sqlite"
+            bulk_json = root / "oracle_cards.json"
+            state_path = root / "state.json"
+            cards = [
+                {"id": f"s{idx}", "oracle_id": f"o{idx}", "name": f"Card {idx}", "lang": "en", "oracle_text": ""}
+                for idx in range(5)
+            ]
+            # Truncated mid-array: the first batches commit, then parsing fails.
+            bulk_json.write_text(json.dumps(cards)[:-40], encoding="utf-8")
+
+            con = update_scryfall_bulk.connect(db_path)
+            update_scryfall_bulk.apply_schema(con, update_scryfall_bulk.load_schema(REPO_ROOT / "schemas" / "schema.sql"))
+            con.close()
+
+            def ingest() -> None:
+                con = update_scryfall_bulk.connect(db_path)
+                try:
+                    update_scryfall_bulk.ingest_snapshot(con, self.SNAPSHOT_ID, bulk_json, {"download_uri": "file"}, {})
+                finally:
+                    con.close()
+
+            def run():
+                return pipeline.run_stage_graph(
+                    [pipeline.Stage(name="ingest", action=ingest, input_files=(bulk_json,))],
+                    state_path=state_path,
+                    cwd=root,
+                    printer=lambda line: None,
+                )
+
+            def counts():
+                with sqlite3.connect(str(db_path)) as check:
+                    return (
+                        check.execute("SELECT COUNT(1) FROM snapshots WHERE snapshot_id = ?", (self.SNAPSHOT_ID,)).fetchone()[0],
+                        check.execute("SELECT COUNT(1) FROM cards WHERE snapshot_id = ?", (self.SNAPSHOT_ID,)).fetchone()[0],
+                    )
+
+            small_batches = update_scryfall_bulk.ingest_cards
+
+            def ingest_cards(con, snapshot_id, json_path):
+                return small_batches(con, snapshot_id, json_path, batch_size=2)
+
+            with patch.object(update_scryfall_bulk, "ingest_cards", side_effect=ingest_cards):
+                failed = run()
+                self.assertEqual(failed[0].status, pipeline.STAGE_FAILED)
+                snapshot_rows, card_rows = counts()
+                self.assertEqual(snapshot_rows, 0)
+                self.assertGreater(card_rows, 0)
+
+                bulk_json.write_text(json.dumps(cards), encoding="utf-8")
+                resumed = run()
+                self.assertEqual(resumed[0].status, pipeline.STAGE_RAN)
+                self.assertEqual(counts(), (1, 5))
+
+                # Ingest finished but its checkpoint was lost: rerunning the same snapshot_id still works.
+                state_path.unlink()
+                rerun = run()
+                self.assertEqual(rerun[0].status, pipeline.STAGE_RAN)
+                self.assertEqual(counts(), (1, 5))
+
+
+class RunUpdatePipelineMainTests(unittest.TestCase):
+    def test_main_wires_ingest_tag_and_index_stages(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            db_path = root / "mtg.sqlite"
+            sqlite3.connect(str(db_path)).close()
+            bulk_json = root / "default-cards.json"
+            bulk_json.write_text("[]", encoding="utf-8")
+            pack = root / "pack"
+            pack.mkdir()
+            (pack / "pack_manifest.json").write_text("{}", encoding="utf-8")
+            captured = {}
+
+            def fake_run_stage_graph(stages, **kwargs):
+                captured["stages"] = {stage.name: stage for stage in stages}
+                captured["kwargs"] = kwargs
+                return [pipeline.StageResult(name=stage.name, status=pipeline.STAGE_RAN) for stage in stages]
+
+            with patch.object(pipeline, "run_stage_graph", side_effect=fake_run_stage_graph), redirect_stdout(io.StringIO()):
+                exit_code = pipeline.main(
+                    [
+                        "--db",
+                        str(db_path),
+                        "--snapshot-id",
+                        "snap_1",
+                        "--bulk-json",
+                        str(bulk_json),
+                        "--cache-dir",
+                        str(root / "images"),
+                        "--bulk-dir",
+                        str(root / "bulk"),
+                        "--ingest",
+                        "--incremental",
+                        "--taxonomy-pack",
+                        str(pack),
+                        "--state-file",
+                        str(root / "state.json"),
+                    ]
+                )
+
+        self.assertEqual(exit_code, 0)
+        stages = captured["stages"]
+        self.assertEqual(
+            list(stages),
+            ["ingest", "enrich", "decklist_name_index", "tag", "primitive_index", "prefetch"],
+        )
+        self.assertIn("--incremental", stages["ingest"].command)
+        self.assertIn("--incremental", stages["tag"].command)
+        self.assertIn("--incremental", stages["primitive_index"].command)
+        self.assertIn("snapshot_build.decklist_name_index_build", stages["decklist_name_index"].command)
+        self.assertEqual(stages["tag"].env["MTG_ENGINE_DB_PATH"], str(db_path.resolve()))
+        self.assertEqual(stages["prefetch"].depends_on, ("enrich",))
+        self.assertIsNone(stages["prefetch"].resource)
+        for name in ("ingest", "enrich", "decklist_name_index", "tag", "primitive_index"):
+            self.assertEqual(stages[name].resource, pipeline.DB_WRITE_RESOURCE)
+            if name != "ingest":
+                self.assertIn("ingest", stages[name].depends_on)
+        self.assertEqual(captured["kwargs"]["state_path"], (root / "state.json").resolve())
+
+    def test_main_returns_3_when_a_stage_command_fails(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            db_path = root / "mtg.sqlite"
+            sqlite3.connect(str(db_path)).close()
+
+            def fake_run_stage_graph(stages, **kwargs):
+                return [pipeline.StageResult(name="decklist_name_index", status=pipeline.STAGE_FAILED, returncode=1)]
+
+            with patch.object(pipeline, "run_stage_graph", side_effect=fake_run_stage_graph), redirect_stdout(io.StringIO()):
+                exit_code = pipeline.main(
+                    [
+                        "--db",
+                        str(db_path),
+                        "--snapshot-id",
+                        "snap_1",
+                        "--skip-enrich",
+                        "--skip-prefetch",
+                        "--skip-primitive-index",
+                        "--cache-dir",
+                        str(root / "images"),
+                        "--bulk-dir",
+                        str(root / "bulk"),
+                        "--state-file",
+                        str(root / "state.json"),
+                    ]
+                )
+        self.assertEqual(exit_code, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from engine.snapshot_cache import SnapshotScopedCache, snapshot_cards_signature
+
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "schemas" / "schema.sql"
+
+
+class SnapshotScopedCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self._tmp_dir.name) / "cards.sqlite"
+        con = sqlite3.connect(str(self.db_path))
+        try:
+            con.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+            for snapshot_id in ("snap_a", "snap_b"):
+                con.execute(
+                    "INSERT INTO snapshots (snapshot_id, created_at, source, scryfall_bulk_uri, manifest_json) "
+                    "VALUES (?, '2026-01-01', 'test', 'local://bulk', '{}')",
+                    (snapshot_id,),
+                )
+                con.execute("INSERT INTO cards (snapshot_id, oracle_id, name) VALUES (?, 'o-1', 'One')", (snapshot_id,))
+            con.commit()
+        finally:
+            con.close()
+        self.cache = SnapshotScopedCache()
+
+    def tearDown(self) -> None:
+        self._tmp_dir.cleanup()
+
+    def _execute(self, sql: str, params: tuple = ()) -> None:
+        con = sqlite3.connect(str(self.db_path))
+        try:
+            con.execute(sql, params)
+            con.commit()
+        finally:
+            con.close()
+
+    def _get(self, snapshot_id: str, builder) -> object:
+        return self.cache.get_or_build(
+            self.db_path,
+            ("test", snapshot_id),
+            builder,
+            lambda con: snapshot_cards_signature(con, snapshot_id),
+        )
+
+    def test_only_writes_to_the_snapshot_rebuild_its_entry(self) -> None:
+        builds: list[str] = []
+
+        def _builder(snapshot_id: str):
+            def _build() -> object:
+                builds.append(snapshot_id)
+                return object()
+
+            return _build
+
+        first_a = self._get("snap_a", _builder("snap_a"))
+        first_b = self._get("snap_b", _builder("snap_b"))
+
+        self._execute("INSERT INTO cards (snapshot_id, oracle_id, name) VALUES ('snap_b', 'o-2', 'Two')")
+        self.assertIs(self._get("snap_a", _builder("snap_a")), first_a)
+        self.assertIsNot(self._get("snap_b", _builder("snap_b")), first_b)
+
+        self._execute(
+            "UPDATE snapshots SET manifest_json = ? WHERE snapshot_id = 'snap_a'",
+            ('{"image_enrichment_v1": {"rows_upserted": 1}}',),
+        )
+        self.assertIsNot(self._get("snap_a", _builder("snap_a")), first_a)
+        self.assertEqual(builds, ["snap_a", "snap_b", "snap_b", "snap_a"])
+
+    def test_concurrent_misses_share_one_build_without_blocking_other_keys(self) -> None:
+        warm_b = self._get("snap_b", object)
+        build_started = threading.Event()
+        release_build = threading.Event()
+        builds: list[int] = []
+
+        def _slow_build() -> object:
+            builds.append(1)
+            build_started.set()
+            release_build.wait(5)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(self._get, "snap_a", _slow_build) for _ in range(4)]
+            self.assertTrue(build_started.wait(5))
+
+            started = time.perf_counter()
+            self.assertIs(self._get("snap_b", object), warm_b)
+            self.assertLess(time.perf_counter() - started, 1.0)
+
+            release_build.set()
+            values = [future.result(5) for future in futures]
+
+        self.assertEqual(len(builds), 1)
+        self.assertTrue(all(value is values[0] for value in values))
+
+    def test_failed_build_is_raised_to_waiters_and_not_cached(self) -> None:
+        def _failing_build() -> object:
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self._get("snap_a", _failing_build)
+        built = self._get("snap_a", object)
+        self.assertIs(self._get("snap_a", object), built)
+
+
+if __name__ == "__main__":
+    unittest.main()
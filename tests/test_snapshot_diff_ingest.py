@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, Tuple
+
+from snapshot_build.snapshot_diff_ingest import (
+    CARD_RAW_ROW_COLUMNS,
+    CARD_ROW_COLUMNS,
+    card_fingerprint,
+    ingest_card_rows_incremental,
+    load_snapshot_change_base,
+    load_snapshot_changes,
+    resolve_base_snapshot_id,
+)
+
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "schemas" / "schema.sql"
+BASE_SNAPSHOT_ID = "snap_base"
+NEXT_SNAPSHOT_ID = "snap_next"
+
+
+def _rows(oracle_id: str, name: str, oracle_text: str, cmc: Any = 2) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+    card = {"id": f"scry-{oracle_id}", "oracle_id": oracle_id, "name": name, "oracle_text": oracle_text, "cmc": cmc}
+    raw_row = (card["id"], oracle_id, "en", name, json.dumps(card))
+    card_row = (oracle_id, name, "{2}", cmc, "Artifact", oracle_text, "[]", "[]", 0, "[]", "[]", "{}", "[]")
+    return raw_row, card_row
+
+
+class SnapshotDiffIngestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        self.con = sqlite3.connect(str(Path(self._tmp_dir.name) / "cards.sqlite"))
+        self.con.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+        for snapshot_id, created_at in ((BASE_SNAPSHOT_ID, "2026-01-01"), (NEXT_SNAPSHOT_ID, "2026-01-02")):
+            self.con.execute(
+                "INSERT INTO snapshots (snapshot_id, created_at, source, scryfall_bulk_uri, manifest_json) "
+                "VALUES (?, ?, 'test', 'local://bulk', '{}')",
+                (snapshot_id, created_at),
+            )
+
+        # Base snapshot as written by a full ingest: no fingerprints, image enrichment applied afterwards.
+        for raw_row, card_row in (
+            _rows("o-keep", "Keep", "Tap: add mana."),
+            _rows("o-edit", "Edit", "Old text."),
+            _rows("o-gone", "Gone", "Leaves."),
+        ):
+            self.con.execute(
+                f"INSERT INTO cards_raw (snapshot_id, {', '.join(CARD_RAW_ROW_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                (BASE_SNAPSHOT_ID, *raw_row),
+            )
+            self.con.execute(
+                f"INSERT INTO cards (snapshot_id, {', '.join(CARD_ROW_COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (BASE_SNAPSHOT_ID, *card_row),
+            )
+        self.con.execute(
+            "UPDATE cards SET image_uris_json = ?, image_status = 'OK' WHERE snapshot_id = ?",
+            ('{"small": "https://img/small.jpg"}', BASE_SNAPSHOT_ID),
+        )
+        self.con.commit()
+
+    def tearDown(self) -> None:
+        self.con.close()
+        self._tmp_dir.cleanup()
+
+    def _cards(self, snapshot_id: str) -> Dict[str, Tuple[Any, ...]]:
+        rows = self.con.execute(
+            "SELECT oracle_id, oracle_text, image_status FROM cards WHERE snapshot_id = ?",
+            (snapshot_id,),
+        ).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def test_only_delta_is_written_and_unchanged_rows_are_carried_forward(self) -> None:
+        self.assertEqual(resolve_base_snapshot_id(self.con, NEXT_SNAPSHOT_ID), BASE_SNAPSHOT_ID)
+        self.assertIsNone(load_snapshot_changes(self.con, BASE_SNAPSHOT_ID))
+
+        summary = ingest_card_rows_incremental(
+            self.con,
+            snapshot_id=NEXT_SNAPSHOT_ID,
+            base_snapshot_id=BASE_SNAPSHOT_ID,
+            card_rows=[
+                _rows("o-keep", "Keep", "Tap: add mana.", cmc=2.0),
+                _rows("o-edit", "Edit", "New text."),
+                _rows("o-new", "New", "Fresh."),
+            ],
+            batch_size=2,
+        )
+
+        self.assertEqual(
+            {key: summary[key] for key in ("added", "changed", "removed", "unchanged")},
+            {"added": 1, "changed": 1, "removed": 1, "unchanged": 1},
+        )
+        self.assertEqual(
+            self._cards(NEXT_SNAPSHOT_ID),
+            {
+                "o-keep": ("Tap: add mana.", "OK"),
+                "o-edit": ("New text.", None),
+                "o-new": ("Fresh.", None),
+            },
+        )
+        raw_oracle_ids = self.con.execute(
+            "SELECT oracle_id FROM cards_raw WHERE snapshot_id = ? ORDER BY oracle_id",
+            (NEXT_SNAPSHOT_ID,),
+        ).fetchall()
+        self.assertEqual([row[0] for row in raw_oracle_ids], ["o-edit", "o-keep", "o-new"])
+        self.assertEqual(load_snapshot_changes(self.con, NEXT_SNAPSHOT_ID), ["o-edit", "o-new"])
+        self.assertEqual(load_snapshot_changes(self.con, NEXT_SNAPSHOT_ID, ("REMOVED",)), ["o-gone"])
+
+    def test_stored_fingerprints_make_an_identical_refresh_a_no_op(self) -> None:
+        rows = [_rows("o-keep", "Keep", "Tap: add mana."), _rows("o-edit", "Edit", "Old text.")]
+        ingest_card_rows_incremental(
+            self.con, snapshot_id=NEXT_SNAPSHOT_ID, base_snapshot_id=BASE_SNAPSHOT_ID, card_rows=rows
+        )
+        self.con.execute(
+            "INSERT INTO snapshots (snapshot_id, created_at, source, scryfall_bulk_uri, manifest_json) "
+            "VALUES ('snap_third', '2026-01-03', 'test', 'local://bulk', '{}')"
+        )
+
+        summary = ingest_card_rows_incremental(
+            self.con, snapshot_id="snap_third", base_snapshot_id=NEXT_SNAPSHOT_ID, card_rows=rows
+        )
+
+        self.assertEqual((summary["added"], summary["changed"], summary["removed"], summary["unchanged"]), (0, 0, 0, 2))
+        self.assertEqual(load_snapshot_changes(self.con, "snap_third"), [])
+        self.assertEqual(self._cards("snap_third"), self._cards(NEXT_SNAPSHOT_ID))
+
+    def test_raw_rows_come_from_the_new_download_even_for_unchanged_cards(self) -> None:
+        raw_row, card_row = _rows("o-keep", "Keep", "Tap: add mana.")
+        fresh_raw_row = (*raw_row[:4], json.dumps({"id": "scry-o-keep", "prices": {"usd": "1.00"}}))
+
+        summary = ingest_card_rows_incremental(
+            self.con,
+            snapshot_id=NEXT_SNAPSHOT_ID,
+            base_snapshot_id=BASE_SNAPSHOT_ID,
+            card_rows=[(fresh_raw_row, card_row)],
+        )
+
+        self.assertEqual(summary["unchanged"], 1)
+        raw_json = self.con.execute(
+            "SELECT json FROM cards_raw WHERE snapshot_id = ? AND oracle_id = 'o-keep'",
+            (NEXT_SNAPSHOT_ID,),
+        ).fetchone()[0]
+        self.assertEqual(raw_json, fresh_raw_row[4])
+        self.assertEqual(self._cards(NEXT_SNAPSHOT_ID), {"o-keep": ("Tap: add mana.", "OK")})
+
+    def test_last_copy_of_a_repeated_oracle_id_wins(self) -> None:
+        ingest_card_rows_incremental(
+            self.con,
+            snapshot_id=NEXT_SNAPSHOT_ID,
+            base_snapshot_id=BASE_SNAPSHOT_ID,
+            card_rows=[
+                _rows("o-keep", "Keep", "Tap: add mana."),
+                _rows("o-edit", "Edit", "First new text."),
+                _rows("o-keep", "Keep", "Changed later."),
+                _rows("o-edit", "Edit", "Old text."),
+            ],
+            batch_size=1,
+        )
+        summary = ingest_card_rows_incremental(
+            self.con,
+            snapshot_id="snap_same_batch",
+            base_snapshot_id=BASE_SNAPSHOT_ID,
+            card_rows=[_rows("o-keep", "Keep", "Changed later."), _rows("o-keep", "Keep", "Tap: add mana.")],
+        )
+
+        self.assertEqual(
+            self._cards(NEXT_SNAPSHOT_ID),
+            {"o-keep": ("Changed later.", None), "o-edit": ("Old text.", "OK")},
+        )
+        self.assertEqual(load_snapshot_changes(self.con, NEXT_SNAPSHOT_ID), ["o-keep"])
+        fingerprints = dict(
+            self.con.execute(
+                "SELECT oracle_id, fingerprint FROM card_fingerprints_v1 WHERE snapshot_id = ?",
+                (NEXT_SNAPSHOT_ID,),
+            ).fetchall()
+        )
+        self.assertEqual(fingerprints["o-edit"], card_fingerprint(_rows("o-edit", "Edit", "Old text.")[1]))
+        self.assertEqual(fingerprints["o-keep"], card_fingerprint(_rows("o-keep", "Keep", "Changed later.")[1]))
+
+        self.assertEqual((summary["changed"], summary["unchanged"]), (0, 1))
+        self.assertEqual(self._cards("snap_same_batch"), {"o-keep": ("Tap: add mana.", "OK")})
+        self.assertEqual(load_snapshot_changes(self.con, "snap_same_batch"), [])
+
+    def test_change_base_is_read_from_the_snapshot_manifest(self) -> None:
+        self.assertIsNone(load_snapshot_change_base(self.con, NEXT_SNAPSHOT_ID))
+        self.con.execute(
+            "UPDATE snapshots SET manifest_json = ? WHERE snapshot_id = ?",
+            (json.dumps({"change_manifest_v1": {"base_snapshot_id": BASE_SNAPSHOT_ID}}), NEXT_SNAPSHOT_ID),
+        )
+        self.assertEqual(load_snapshot_change_base(self.con, NEXT_SNAPSHOT_ID), BASE_SNAPSHOT_ID)
+        self.assertIsNone(load_snapshot_change_base(self.con, "snap_missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
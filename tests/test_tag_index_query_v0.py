@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+
+from api.engine import tag_index_query_v0
+from api.engine.tag_index_query_v0 import get_candidates_for_primitives_v0
+from snapshot_build.migrate_cards_color_identity_mask import ensure_cards_color_identity_mask
+from tests.conftest import TEST_SNAPSHOT_ID
+
+RULESET_VERSION = "primitive_rules_test_v0"
+
+_CARDS = [
+    ("oid-1", "Arcane Signet", "[]"),
+    ("oid-2", "Birds of Paradise", '["G"]'),
+    ("oid-3", "Counterspell", '["U"]'),
+    ("oid-4", "Lightning Bolt", '["R"]'),
+    ("oid-5", "Mystery Card", "not-json"),
+]
+
+_TAGS = [
+    ("oid-1", "Arcane Signet", "RAMP_MANA", 0.9),
+    ("oid-2", "Birds of Paradise", "RAMP_MANA", 0.95),
+    ("oid-5", "Mystery Card", "RAMP_MANA", 0.9),
+    ("oid-3", "Counterspell", "COUNTERSPELL", 1.0),
+    ("oid-4", "Lightning Bolt", "REMOVAL_SINGLE", 0.8),
+    ("oid-3", "Counterspell", "REMOVAL_SINGLE", 0.8),
+]
+
+
+def _seed(db_path: Path) -> None:
+    con = sqlite3.connect(str(db_path))
+    try:
+        for oracle_id, name, color_identity in _CARDS:
+            con.execute(
+                "INSERT INTO cards (snapshot_id, oracle_id, name, color_identity) VALUES (?, ?, ?, ?)",
+                (TEST_SNAPSHOT_ID, oracle_id, name, color_identity),
+            )
+        for oracle_id, name, primitive_id, confidence in _TAGS:
+            con.execute(
+                """
+                INSERT INTO card_primitive_tags_v0 (
+                  oracle_id, card_name, primitive_id, ruleset_version, confidence, evidence_json
+                ) VALUES (?, ?, ?, ?, ?, '[]')
+                """,
+                (oracle_id, name, primitive_id, RULESET_VERSION, confidence),
+            )
+        con.execute(
+            """
+            INSERT INTO primitive_tag_runs_v0 (
+              run_id, db_snapshot_id, ruleset_version, cards_processed, tags_emitted,
+              unknowns_emitted, run_hash_v1, created_at
+            ) VALUES ('run-1', ?, ?, 5, 6, 0, 'hash', '2026-01-01T00:00:00+00:00')
+            """,
+            (TEST_SNAPSHOT_ID, RULESET_VERSION),
+        )
+        con.commit()
+    finally:
+        con.close()
+
+
+def _names(result: dict) -> dict:
+    return {primitive_id: [row["name"] for row in rows] for primitive_id, rows in result.items()}
+
+
+def _query(db_path: Path, **overrides) -> dict:
+    kwargs = {
+        "db_path": str(db_path),
+        "ruleset_version": RULESET_VERSION,
+        "primitive_ids": ["REMOVAL_SINGLE", "RAMP_MANA", "COUNTERSPELL", "MISSING"],
+        "color_identity": ["U", "R"],
+        "exclude_oracle_ids": set(),
+        "limit_per_primitive": 200,
+    }
+    kwargs.update(overrides)
+    return get_candidates_for_primitives_v0(**kwargs)
+
+
+def test_batched_query_ranks_per_primitive_and_filters_colors(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+
+    result = _query(mtg_test_db_path)
+
+    assert list(result.keys()) == ["COUNTERSPELL", "MISSING", "RAMP_MANA", "REMOVAL_SINGLE"]
+    assert _names(result) == {
+        "COUNTERSPELL": ["Counterspell"],
+        "MISSING": [],
+        "RAMP_MANA": ["Arcane Signet", "Mystery Card"],
+        "REMOVAL_SINGLE": ["Counterspell", "Lightning Bolt"],
+    }
+
+
+def test_limit_and_exclusions_apply_per_primitive(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+
+    result = _query(
+        mtg_test_db_path,
+        color_identity=None,
+        exclude_oracle_ids={"oid-2"},
+        limit_per_primitive=1,
+    )
+
+    assert _names(result)["RAMP_MANA"] == ["Arcane Signet"]
+    assert _names(result)["REMOVAL_SINGLE"] == ["Counterspell"]
+
+
+def test_mask_and_per_primitive_fallback_paths_agree(mtg_test_db_path: Path) -> None:
+    _seed(mtg_test_db_path)
+    json_result = _query(mtg_test_db_path)
+
+    ensure_cards_color_identity_mask(db_path=mtg_test_db_path)
+    mask_result = _query(mtg_test_db_path)
+
+    with patch.object(
+        tag_index_query_v0,
+        "_query_ranked_rows_batched",
+        side_effect=sqlite3.OperationalError("no such function: ROW_NUMBER"),
+    ):
+        fallback_result = _query(mtg_test_db_path)
+
+    assert mask_result == json_result
+    assert fallback_result == json_result
@@ -1,19 +1,25 @@
 from __future__ import annotations
 
 import hashlib
+import io
 import json
 import sqlite3
 import tempfile
 import unittest
 import zipfile
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 from unittest.mock import patch
 from xml.sax.saxutils import escape
 
-from snapshot_build.tag_snapshot import compile_snapshot_tags
+from snapshot_build import export_taxonomy_pack
+from snapshot_build.index_build import drop_secondary_indexes_for_bulk_load
+from snapshot_build.snapshot_diff_ingest import ensure_snapshot_diff_tables
+from snapshot_build.tag_snapshot import COMPILED_PACK_FILE_NAME, compile_snapshot_tags, load_compiled_pack
+from taxonomy import exporter
 from taxonomy.exporter import export_workbook_to_pack
 from taxonomy.loader import load
-from taxonomy.pack_manifest import build_manifest, stable_json_dumps, write_manifest
+from taxonomy.pack_manifest import build_manifest, sha256_file, stable_json_dumps, write_manifest
 from taxonomy.taxonomy_pack_v1 import TAXONOMY_PACK_V1_VERSION, build_taxonomy_pack_v1
 
 MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
@@ -30,7 +36,7 @@ def _excel_col_name(index_1_based: int) -> str:
     return "".join(reversed(out))
 
 
-def _worksheet_xml(rows: list[list[object]]) -> str:
+def _worksheet_xml(rows: list[list[object]], shared_strings: dict[str, int] | None = None) -> str:
     row_nodes: list[str] = []
     for row_idx, row in enumerate(rows, start=1):
         cell_nodes: list[str] = []
@@ -38,6 +44,10 @@ def _worksheet_xml(rows: list[list[object]]) -> str:
             if value is None:
                 continue
             cell_ref = f"{_excel_col_name(col_idx)}{row_idx}"
+            if shared_strings is not None:
+                string_idx = shared_strings.setdefault(str(value), len(shared_strings))
+                cell_nodes.append(f'<c r="{cell_ref}" t="s"><v>{string_idx}</v></c>')
+                continue
             cell_text = escape(str(value))
             cell_nodes.append(
                 f'<c r="{cell_ref}" t="inlineStr"><is><t>{cell_text}</t></is></c>'
@@ -52,8 +62,13 @@ def _worksheet_xml(rows: list[list[object]]) -> str:
     )
 
 
-def _write_minimal_xlsx(workbook_path: Path, sheets: dict[str, list[list[object]]]) -> None:
+def _write_minimal_xlsx(
+    workbook_path: Path,
+    sheets: dict[str, list[list[object]]],
+    use_shared_strings: bool = False,
+) -> None:
     workbook_path.parent.mkdir(parents=True, exist_ok=True)
+    shared_strings: dict[str, int] | None = {} if use_shared_strings else None
     with zipfile.ZipFile(workbook_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
         workbook_sheet_nodes: list[str] = []
         rel_nodes: list[str] = []
@@ -69,7 +84,14 @@ def _write_minimal_xlsx(workbook_path: Path, sheets: dict[str, list[list[object]
                 'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
                 f'Target="{target}"/>'
             )
-            zf.writestr(f"xl/{target}", _worksheet_xml(rows))
+            zf.writestr(f"xl/{target}", _worksheet_xml(rows, shared_strings))
+
+        if shared_strings is not None:
+            string_nodes = "".join(f"<si><t>{escape(value)}</t></si>" for value in shared_strings)
+            zf.writestr(
+                "xl/sharedStrings.xml",
+                f'<?xml version="1.0" encoding="UTF-8"?><sst xmlns="{MAIN_NS}">{string_nodes}</sst>',
+            )
 
         workbook_xml = (
             '<?xml version="1.0" encoding="UTF-8"?>'
@@ -185,6 +207,73 @@ class TaxonomyExporterLoaderTests(unittest.TestCase):
             self.assertIn("qa_rules.json", manifest_files)
             self.assertIn("taxonomy_pack_v1.json", manifest_files)
 
+    def test_streaming_worksheet_reader_decodes_cells_and_resolves_shared_strings_lazily(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            workbook_path = Path(tmp) / "book.xlsx"
+            with zipfile.ZipFile(workbook_path, "w") as zf:
+                zf.writestr(
+                    "xl/sharedStrings.xml",
+                    f'<sst xmlns="{MAIN_NS}"><si><t>rule_id</t></si><si><r><t>rich </t></r><r><t>text</t></r></si>'
+                    "<si><t>never read</t></si></sst>",
+                )
+                zf.writestr(
+                    "xl/worksheets/sheet1.xml",
+                    f'<worksheet xmlns="{MAIN_NS}"><sheetData>'
+                    '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="C1"><v>3</v></c></row>'
+                    '<row r="2"/>'
+                    '<row r="3"><c r="B3" t="s"><v>1</v></c><c r="C3" t="b"><v>1</v></c>'
+                    '<c r="D3" t="inlineStr"><is><t>in</t></is></c><c r="E3" t="s"><v>99</v></c></row>'
+                    "</sheetData></worksheet>",
+                )
+
+            with zipfile.ZipFile(workbook_path, "r") as zf:
+                shared_strings = exporter._read_shared_strings(zf)
+                rows = exporter._read_worksheet_rows(zf, "xl/worksheets/sheet1.xml", shared_strings)
+                self.assertEqual(next(rows), ["rule_id", None, "3"])
+                self.assertEqual(shared_strings._values, ["rule_id"])
+                self.assertEqual(list(rows), [[], [None, "rich text", "true", "in"]])
+                self.assertEqual(len(shared_strings._values), 3)
+                shared_strings.close()
+
+                empty = exporter._read_shared_strings(zf)
+                empty.close()
+                self.assertIsNone(empty.get(0))
+
+    def test_exporter_shared_string_workbook_matches_inline_string_workbook(self) -> None:
+        sheets = {
+            "Rulespec Rules": [
+                ["rule_id", "primitive_id", "pattern", "field"],
+                ["R2", "DRAW", "draw a card", "oracle_text"],
+                [None, None, None, None],
+                ["R1", "TOKEN_PRODUCTION", "create", None],
+                ["R3", "DRAW", "draw a card", "both"],
+            ],
+            "Rulespec Facets": [["facet_key", "facet_value"], ["strategy", "tokens"]],
+            "QA Rules": [["rule_id", "note"]],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            pack_files = []
+            for use_shared_strings in (False, True):
+                workbook_path = tmp_path / f"shared_{use_shared_strings}" / "MTG_Tag_Taxonomy_v1_23_full.xlsx"
+                _write_minimal_xlsx(workbook_path, sheets, use_shared_strings=use_shared_strings)
+                pack_dir = export_workbook_to_pack(
+                    workbook_path=workbook_path,
+                    out_dir=tmp_path / f"packs_{use_shared_strings}",
+                    taxonomy_version="taxonomy_test_stream",
+                )
+                pack_files.append(
+                    {
+                        path.name: path.read_text(encoding="utf-8")
+                        for path in sorted(pack_dir.glob("*.json"))
+                        if path.name not in {"meta.json", "pack_manifest.json"}
+                    }
+                )
+
+            self.assertEqual(pack_files[0], pack_files[1])
+            rules = json.loads(pack_files[1]["rulespec_rules.json"])
+            self.assertEqual([rule["rule_id"] for rule in rules], ["R1", "R2", "R3"])
+
     def test_loader_rejects_manifest_hash_mismatch(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             tmp_path = Path(tmp)
@@ -218,6 +307,137 @@ class TaxonomyExporterLoaderTests(unittest.TestCase):
             self.assertIn("Manifest", str(err.exception))
 
 
+    def test_export_taxonomy_pack_keeps_pack_out_of_place_on_rule_budget_failure(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            workbook_path = tmp_path / "MTG_Tag_Taxonomy_v1_23_full.xlsx"
+            out_dir = tmp_path / "packs"
+            _write_minimal_xlsx(
+                workbook_path,
+                {
+                    "Rulespec Rules": [
+                        ["rule_id", "primitive_id", "pattern"],
+                        ["R1", "TOKEN_PRODUCTION", "create"],
+                    ],
+                    "Rulespec Facets": [["facet_key", "facet_value"]],
+                    "QA Rules": [["rule_id", "note"]],
+                },
+            )
+            argv = [
+                "export_taxonomy_pack",
+                "--workbook",
+                str(workbook_path),
+                "--out",
+                str(out_dir),
+                "--taxonomy_version",
+                "taxonomy_test_budget",
+                "--profile_snapshot_id",
+                "snap_budget",
+                "--rule_budget_ms",
+                "1",
+            ]
+
+            def _run(violations: list) -> int:
+                report = {"flagged_rules": [], "budget_violations": violations}
+                with patch("sys.argv", argv), patch.object(
+                    export_taxonomy_pack, "build_rule_profile_report", return_value=report
+                ) as profile_mock, redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                    result = export_taxonomy_pack.main()
+                profiled_folder = Path(profile_mock.call_args.kwargs["taxonomy_pack_folder"])
+                self.assertNotEqual(profiled_folder.parent, out_dir.resolve())
+                return result
+
+            self.assertEqual(_run(["R1: 5 ms over the sample exceeds budget 1 ms"]), 1)
+            self.assertEqual(sorted(path.name for path in out_dir.iterdir()), [])
+
+            self.assertEqual(_run([]), 0)
+            self.assertEqual(sorted(path.name for path in out_dir.iterdir()), ["taxonomy_test_budget"])
+            load(out_dir / "taxonomy_test_budget")
+            self.assertTrue((out_dir / "taxonomy_test_budget" / COMPILED_PACK_FILE_NAME).exists())
+
+            # A failing re-export leaves the previously published pack untouched.
+            self.assertEqual(_run(["R1: over budget"]), 1)
+            self.assertEqual(sorted(path.name for path in out_dir.iterdir()), ["taxonomy_test_budget"])
+            load(out_dir / "taxonomy_test_budget")
+
+
+    def test_compiled_pack_cache_is_keyed_by_manifest_and_revalidated_on_change(self) -> None:
+        rulespec_rules = [
+            {"rule_id": "R2", "primitive_id": "DRAW", "pattern": "draw", "priority": 5, "exclusive_group": "CARDS"},
+            {"rule_id": "R1", "primitive_id": "RAMP", "pattern": "add {g}", "exclusive_group": "CARDS"},
+            {"rule_id": "R3", "primitive_id": "OFF", "pattern": "x", "enabled": False},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            pack_dir = _write_taxonomy_pack(
+                tmp_path / "taxonomy_cache_v1",
+                "taxonomy_cache_v1",
+                rulespec_rules,
+                primitives=[{"primitive_id": "TUTOR"}],
+            )
+
+            compiled = load_compiled_pack(pack_dir)
+            self.assertTrue((pack_dir / COMPILED_PACK_FILE_NAME).exists())
+            self.assertEqual(compiled.pack_sha256, sha256_file(pack_dir / "pack_manifest.json"))
+            self.assertEqual([rule.rule_id for rule in compiled.rules], ["R2", "R1"])
+            self.assertEqual(compiled.exclusive_groups, {"CARDS": ("DRAW", "RAMP")})
+            self.assertEqual(compiled.allowed_primitive_ids, frozenset({"DRAW", "RAMP", "OFF", "TUTOR"}))
+            self.assertEqual(set(compiled.matcher.match("oracle_text", "Draw a card")), {0})
+
+            with patch("snapshot_build.tag_snapshot.load", side_effect=AssertionError("cache miss")):
+                cached = load_compiled_pack(pack_dir)
+                moved_dir = pack_dir.rename(tmp_path / "moved_taxonomy_cache_v1")
+                moved = load_compiled_pack(moved_dir)
+            self.assertEqual(cached.rules, compiled.rules)
+            self.assertEqual(cached.pack.rulespec_rules, compiled.pack.rulespec_rules)
+            self.assertEqual(moved.pack.pack_folder, moved_dir.resolve())
+
+            # A re-exported pack gets a new manifest and so a fresh compile.
+            _write_taxonomy_pack(moved_dir, "taxonomy_cache_v1", rulespec_rules[:1])
+            self.assertEqual([rule.rule_id for rule in load_compiled_pack(moved_dir).rules], ["R2"])
+
+            # A file edited behind the manifest's back is caught by the full load, not served from cache.
+            rules_path = moved_dir / "rulespec_rules.json"
+            rules_path.write_text(rules_path.read_text(encoding="utf-8") + " ", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                load_compiled_pack(moved_dir)
+
+    def test_compiled_pack_cache_is_plain_json_and_keyed_by_code_version(self) -> None:
+        rulespec_rules = [
+            {"rule_id": "R1", "primitive_id": "DRAW", "pattern": r"draw (a|two) cards?", "rule_type": "regex"},
+            {"rule_id": "R2", "primitive_id": "RAMP", "pattern": "add {g}"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            pack_dir = _write_taxonomy_pack(Path(tmp) / "taxonomy_cache_v2", "taxonomy_cache_v2", rulespec_rules)
+            compiled = load_compiled_pack(pack_dir)
+            cache_path = pack_dir / COMPILED_PACK_FILE_NAME
+            cached_json = json.loads(cache_path.read_text(encoding="utf-8"))
+            self.assertEqual(cached_json["regex_anchors"], [[r"draw (a|two) cards?", ["draw "]]])
+
+            # A hit rebuilds the matcher from the cached anchors instead of re-deriving them.
+            with patch("snapshot_build.tag_snapshot.load", side_effect=AssertionError("cache miss")), patch(
+                "snapshot_build.rule_matcher.regex_required_literals", side_effect=AssertionError("anchors re-derived")
+            ):
+                cached = load_compiled_pack(pack_dir)
+            self.assertEqual(cached.rules, compiled.rules)
+            self.assertEqual(cached.pack, compiled.pack)
+            self.assertEqual(set(cached.matcher.match("oracle_text", "Draw two cards and add {G}.")), {0, 1})
+
+            # Changed tagger or matcher code retires the cache without touching the pack.
+            with patch("snapshot_build.tag_snapshot.compiled_pack_code_version", return_value="other-code"), patch(
+                "snapshot_build.tag_snapshot.load", wraps=load
+            ) as loader:
+                load_compiled_pack(pack_dir)
+            self.assertEqual(loader.call_count, 1)
+
+            # Garbage in the cache file is never executed, just rebuilt over.
+            cache_path.write_bytes(b"\x80\x04garbage")
+            with patch("snapshot_build.tag_snapshot.load", wraps=load) as loader:
+                self.assertEqual(load_compiled_pack(pack_dir).rules, compiled.rules)
+            self.assertEqual(loader.call_count, 1)
+            self.assertEqual(json.loads(cache_path.read_text(encoding="utf-8"))["format"], cached_json["format"])
+
+
 class SnapshotCompilerTests(unittest.TestCase):
     def setUp(self) -> None:
         self.con = sqlite3.connect(":memory:")
@@ -452,6 +672,260 @@ class SnapshotCompilerTests(unittest.TestCase):
         self.assertEqual(unknown_row["reason"], "MATCH_WITHOUT_PRIMITIVE")
         self.assertEqual(unknown_row["rule_id"], "R_UNKNOWN")
 
+    def test_compile_snapshot_parallel_workers_match_single_process(self) -> None:
+        snapshot_id = "snap_parallel"
+        texts = [
+            ("Creature — Goblin", "Haste. Create two 1/1 Goblin creature tokens."),
+            ("Instant", "Draw a card. Counter target spell."),
+            ("Legendary Creature — Elf", "Whenever you draw a card, create a token."),
+            ("Sorcery", "Return target creature card from your graveyard to the battlefield."),
+            ("Artifact", "{T}: Add one mana of any color."),
+        ]
+        for index in range(37):
+            type_line, oracle_text = texts[index % len(texts)]
+            self._insert_card(
+                snapshot_id=snapshot_id,
+                oracle_id=f"oid-{(index * 7) % 37:03d}",
+                name=f"Card {index}",
+                type_line=type_line,
+                oracle_text=oracle_text,
+            )
+
+        rules = [
+            {"rule_id": "R_TOKEN", "primitive_id": "TOKEN_PRODUCTION", "pattern": "create", "exclusive_group": "G", "priority": 1},
+            {"rule_id": "R_DRAW", "primitive_id": "CARD_DRAW", "pattern": r"draw (a|two) cards?", "rule_type": "regex", "exclusive_group": "G"},
+            {"rule_id": "R_COUNTER", "pattern": "counter target", "rule_type": "substring"},
+            {"rule_id": "R_REANIMATE", "primitive_id": "REANIMATION", "pattern": r"graveyard .* battlefield", "rule_type": "regex", "unknown_on_match": True},
+            {"rule_id": "R_ELF", "facet_key": "typal", "facet_value": "elf", "pattern": "elf", "field": "type_line"},
+        ]
+
+        def _compile(workers: int) -> tuple[dict, list, list]:
+            with tempfile.TemporaryDirectory() as tmp:
+                pack_dir = _write_taxonomy_pack(
+                    pack_dir=Path(tmp) / "taxonomy_unit_parallel",
+                    taxonomy_version="taxonomy_unit_parallel",
+                    rulespec_rules=rules,
+                )
+                with patch("snapshot_build.tag_snapshot.connect", return_value=self.con), patch(
+                    "snapshot_build.tag_snapshot.snapshot_exists", return_value=True
+                ), patch("snapshot_build.tag_snapshot.TAG_MIN_CARDS_PER_WORKER", 1):
+                    summary = compile_snapshot_tags(
+                        snapshot_id=snapshot_id,
+                        taxonomy_pack_folder=str(pack_dir),
+                        workers=workers,
+                    )
+            tag_rows = self.con.execute(
+                """
+                SELECT oracle_id, primitive_ids_json, equiv_class_ids_json, facets_json, evidence_json
+                FROM card_tags WHERE snapshot_id = ? ORDER BY oracle_id
+                """,
+                (snapshot_id,),
+            ).fetchall()
+            unknown_rows = self.con.execute(
+                "SELECT oracle_id, rule_id, reason, snippet FROM unknowns_queue WHERE snapshot_id = ? ORDER BY id",
+                (snapshot_id,),
+            ).fetchall()
+            return summary, [tuple(row) for row in tag_rows], [tuple(row) for row in unknown_rows]
+
+        single_summary, single_tags, single_unknowns = _compile(1)
+        parallel_summary, parallel_tags, parallel_unknowns = _compile(3)
+
+        self.assertEqual(single_summary["tag_workers"], 1)
+        self.assertEqual(parallel_summary["tag_workers"], 3)
+        self.assertEqual(parallel_summary["run_hash"], single_summary["run_hash"])
+        self.assertEqual(parallel_tags, single_tags)
+        self.assertEqual(parallel_unknowns, single_unknowns)
+        self.assertEqual(len(single_tags), 37)
+        self.assertTrue(any(row[2] == "AMBIGUOUS_GROUP_MATCH" for row in single_unknowns))
+
+    def test_compile_snapshot_incremental_reuses_unchanged_cards(self) -> None:
+        base_cards = {
+            "oid-a": ("Creature — Goblin", "Create two 1/1 Goblin creature tokens."),
+            "oid-b": ("Instant", "Draw a card. Counter target spell."),
+            "oid-c": ("Legendary Creature — Elf", "Whenever you draw a card, counter target spell."),
+            "oid-d": ("Sorcery", "Return target creature card from your graveyard to the battlefield."),
+            "oid-e": ("Artifact", "{T}: Add one mana of any color."),
+        }
+        next_cards = dict(base_cards)
+        next_cards["oid-b"] = ("Instant", "Draw two cards.")
+        next_cards["oid-f"] = ("Enchantment", "Creatures you control get +1/+1.")
+        del next_cards["oid-e"]
+        for snapshot_id, cards in (("snap_inc_base", base_cards), ("snap_inc_next", next_cards)):
+            for oracle_id, (type_line, oracle_text) in cards.items():
+                self._insert_card(snapshot_id, oracle_id, oracle_id.upper(), type_line, oracle_text)
+
+        rules = [
+            {"rule_id": "R_TOKEN", "primitive_id": "TOKEN_PRODUCTION", "pattern": "create", "priority": 1},
+            {"rule_id": "R_DRAW", "primitive_id": "CARD_DRAW", "pattern": r"draw (a|two) cards?", "rule_type": "regex"},
+            {"rule_id": "R_COUNTER", "pattern": "counter target", "rule_type": "substring"},
+            {"rule_id": "R_REANIMATE", "primitive_id": "REANIMATION", "pattern": r"graveyard .* battlefield", "rule_type": "regex"},
+        ]
+
+        def _compile(tmp: str, snapshot_id: str, rulespec_rules: list, incremental: bool) -> tuple[dict, list, list]:
+            pack_dir = _write_taxonomy_pack(
+                pack_dir=Path(tmp) / f"taxonomy_unit_incremental_{len(list(Path(tmp).iterdir()))}",
+                taxonomy_version="taxonomy_unit_incremental",
+                rulespec_rules=rulespec_rules,
+            )
+            with patch("snapshot_build.tag_snapshot.connect", return_value=self.con), patch(
+                "snapshot_build.tag_snapshot.snapshot_exists", return_value=True
+            ):
+                summary = compile_snapshot_tags(
+                    snapshot_id=snapshot_id,
+                    taxonomy_pack_folder=str(pack_dir),
+                    incremental=incremental,
+                )
+            tag_rows = self.con.execute(
+                """
+                SELECT oracle_id, ruleset_version, primitive_ids_json, equiv_class_ids_json, facets_json, evidence_json
+                FROM card_tags WHERE snapshot_id = ? ORDER BY oracle_id
+                """,
+                (snapshot_id,),
+            ).fetchall()
+            unknown_rows = self.con.execute(
+                "SELECT oracle_id, taxonomy_version, rule_id, reason, snippet FROM unknowns_queue WHERE snapshot_id = ? ORDER BY id",
+                (snapshot_id,),
+            ).fetchall()
+            return summary, [tuple(row) for row in tag_rows], [tuple(row) for row in unknown_rows]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            first, _, _ = _compile(tmp, "snap_inc_base", rules, incremental=True)
+            self.assertEqual((first["cards_reused"], first["cards_retagged"]), (0, 5))
+
+            incremental, incremental_tags, incremental_unknowns = _compile(tmp, "snap_inc_next", rules, incremental=True)
+            self.assertEqual(incremental["retag_base_snapshot_id"], "snap_inc_base")
+            self.assertEqual((incremental["cards_reused"], incremental["cards_retagged"]), (3, 2))
+            self.assertEqual(incremental["card_tags_written"], 5)
+            full, full_tags, full_unknowns = _compile(tmp, "snap_inc_next", rules, incremental=False)
+            self.assertEqual(incremental_tags, full_tags)
+            self.assertEqual(incremental_unknowns, full_unknowns)
+            self.assertEqual([row[0] for row in incremental_unknowns], ["oid-c"])
+            self.assertEqual(incremental["run_hash"], full["run_hash"])
+
+            edited_rules = [dict(rule) for rule in rules]
+            edited_rules[0]["pattern"] = "create two"
+            edited, edited_tags, edited_unknowns = _compile(tmp, "snap_inc_next", edited_rules, incremental=True)
+            self.assertEqual(edited["retag_base_snapshot_id"], "snap_inc_next")
+            self.assertEqual(edited["rules_changed"], 2)
+            self.assertEqual((edited["cards_reused"], edited["cards_retagged"]), (4, 1))
+            full_edited, full_edited_tags, full_edited_unknowns = _compile(tmp, "snap_inc_next", edited_rules, incremental=False)
+            self.assertEqual(edited_tags, full_edited_tags)
+            self.assertEqual(edited_unknowns, full_edited_unknowns)
+            self.assertEqual(edited["run_hash"], full_edited["run_hash"])
+
+    def test_compile_snapshot_incremental_uses_change_manifest_and_index_delta(self) -> None:
+        base_cards = {
+            "oid-a": ("Creature — Goblin", "Create two 1/1 Goblin creature tokens."),
+            "oid-b": ("Instant", "Draw a card."),
+            "oid-c": ("Sorcery", "Return target creature card from your graveyard to the battlefield."),
+            "oid-e": ("Artifact", "Create a Treasure token."),
+        }
+        next_cards = dict(base_cards)
+        next_cards["oid-b"] = ("Instant", "Draw two cards.")
+        next_cards["oid-f"] = ("Enchantment", "Create a 2/2 Zombie token.")
+        del next_cards["oid-e"]
+        for snapshot_id, cards in (("snap_delta_base", base_cards), ("snap_delta_next", next_cards)):
+            for oracle_id, (type_line, oracle_text) in cards.items():
+                self._insert_card(snapshot_id, oracle_id, oracle_id.upper(), type_line, oracle_text)
+
+        # Change manifest as written by an incremental ingest of snap_delta_next against snap_delta_base.
+        ensure_snapshot_diff_tables(self.con)
+        self.con.executemany(
+            "INSERT INTO card_fingerprints_v1 (snapshot_id, oracle_id, fingerprint) VALUES ('snap_delta_next', ?, 'fp')",
+            [(oracle_id,) for oracle_id in next_cards],
+        )
+        self.con.executemany(
+            "INSERT INTO snapshot_changes_v1 (snapshot_id, base_snapshot_id, oracle_id, change) "
+            "VALUES ('snap_delta_next', 'snap_delta_base', ?, ?)",
+            [("oid-b", "CHANGED"), ("oid-f", "ADDED"), ("oid-e", "REMOVED")],
+        )
+        self.con.execute(
+            "UPDATE snapshots SET manifest_json = ? WHERE snapshot_id = 'snap_delta_next'",
+            (stable_json_dumps({"change_manifest_v1": {"base_snapshot_id": "snap_delta_base"}}),),
+        )
+        self.con.commit()
+
+        def _index_rows(snapshot_id: str) -> list:
+            return [
+                tuple(row)
+                for table_name, id_column in (("primitive_to_cards", "primitive_id"), ("equiv_to_cards", "equiv_id"))
+                for row in self.con.execute(
+                    f"SELECT '{table_name}', {id_column}, oracle_id, taxonomy_version FROM {table_name} "
+                    "WHERE snapshot_id = ? ORDER BY 2, 3",
+                    (snapshot_id,),
+                )
+            ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pack_dir = _write_taxonomy_pack(
+                pack_dir=Path(tmp) / "taxonomy_unit_delta",
+                taxonomy_version="taxonomy_unit_delta",
+                rulespec_rules=[
+                    {"rule_id": "R_TOKEN", "primitive_id": "TOKEN_PRODUCTION", "pattern": "create", "priority": 1},
+                    {"rule_id": "R_DRAW", "primitive_id": "CARD_DRAW", "pattern": r"draw (a|two) cards?", "rule_type": "regex"},
+                    {"rule_id": "R_REANIMATE", "primitive_id": "REANIMATION", "pattern": "graveyard", "rule_type": "substring"},
+                ],
+            )
+            with patch("snapshot_build.tag_snapshot.connect", return_value=self.con), patch(
+                "snapshot_build.index_build.connect", return_value=self.con
+            ), patch("snapshot_build.tag_snapshot.snapshot_exists", return_value=True):
+                compile_snapshot_tags("snap_delta_base", str(pack_dir), build_indices=True, incremental=True)
+                # Stale text hashes would force a retag; the manifest lists oid-a and oid-c as unchanged.
+                self.con.execute(
+                    "UPDATE card_tag_fingerprints_v1 SET text_hash = 'stale' WHERE snapshot_id = 'snap_delta_base'"
+                )
+                incremental = compile_snapshot_tags("snap_delta_next", str(pack_dir), build_indices=True, incremental=True)
+                incremental_index = _index_rows("snap_delta_next")
+                full = compile_snapshot_tags("snap_delta_next", str(pack_dir), build_indices=True)
+                full_index = _index_rows("snap_delta_next")
+
+        self.assertTrue(incremental["retag_used_change_manifest"])
+        self.assertEqual((incremental["cards_reused"], incremental["cards_retagged"]), (2, 2))
+        self.assertEqual(incremental["card_tags_scanned"], 2)
+        self.assertEqual(full["card_tags_scanned"], 4)
+        self.assertEqual(incremental["run_hash"], full["run_hash"])
+        self.assertEqual(incremental_index, full_index)
+        self.assertIn(("primitive_to_cards", "TOKEN_PRODUCTION", "oid-a", "taxonomy_unit_delta"), incremental_index)
+        self.assertIn(("primitive_to_cards", "TOKEN_PRODUCTION", "oid-f", "taxonomy_unit_delta"), incremental_index)
+
+
+    def test_compile_snapshot_bulk_load_keeps_indexes_and_one_created_at(self) -> None:
+        for idx in range(6):
+            self._insert_card("snap_bulk_big", f"oid-{idx}", f"Card {idx}", "Sorcery", "Create a 1/1 token.")
+        self._insert_card("snap_bulk_small", "oid-0", "Card 0", "Sorcery", "Create a 1/1 token.")
+
+        def _card_tags_indexes() -> list:
+            rows = self.con.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'card_tags' ORDER BY name"
+            ).fetchall()
+            return [tuple(row) for row in rows]
+
+        synchronous_before = self.con.execute("PRAGMA synchronous").fetchone()[0]
+        with tempfile.TemporaryDirectory() as tmp:
+            pack_dir = _write_taxonomy_pack(
+                pack_dir=Path(tmp) / "taxonomy_unit_bulk",
+                taxonomy_version="taxonomy_unit_bulk",
+                rulespec_rules=[{"rule_id": "R_TOKEN", "primitive_id": "TOKEN_PRODUCTION", "pattern": "create", "priority": 1}],
+            )
+            with patch("snapshot_build.tag_snapshot.connect", return_value=self.con), patch(
+                "snapshot_build.tag_snapshot.snapshot_exists", return_value=True
+            ):
+                compile_snapshot_tags(snapshot_id="snap_bulk_big", taxonomy_pack_folder=str(pack_dir))
+                indexes = _card_tags_indexes()
+                self.assertIn("idx_card_tags_snapshot_taxonomy", [name for name, _ in indexes])
+                compile_snapshot_tags(snapshot_id="snap_bulk_small", taxonomy_pack_folder=str(pack_dir))
+                compile_snapshot_tags(snapshot_id="snap_bulk_big", taxonomy_pack_folder=str(pack_dir))
+
+        self.assertEqual(_card_tags_indexes(), indexes)
+        self.assertEqual(self.con.execute("PRAGMA synchronous").fetchone()[0], synchronous_before)
+        created_at_rows = self.con.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT created_at) FROM card_tags WHERE snapshot_id = 'snap_bulk_big'"
+        ).fetchone()
+        self.assertEqual(tuple(created_at_rows), (6, 1))
+
+        # Indexes are only deferred when this load outweighs the rows already in card_tags.
+        self.assertEqual(drop_secondary_indexes_for_bulk_load(self.con, "card_tags", rows_to_load=1), [])
+        self.assertEqual(_card_tags_indexes(), indexes)
 
 if __name__ == "__main__":
     unittest.main()
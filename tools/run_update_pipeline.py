@@ -3,15 +3,34 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import os
+import sqlite3
 import subprocess
 import sys
+import threading
+import time
 import urllib.request
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Sequence
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Set, Tuple
 
 BULK_INDEX_URL = "https://api.scryfall.com/bulk-data"
 DEFAULT_BULK_FILENAME = "default-cards.json"
 
+PIPELINE_STATE_VERSION = "update_pipeline_state_v1"
+DEFAULT_MAX_PARALLEL = 3
+
+# Stages holding this resource never overlap: SQLite has one writer, and a
+# long bulk-load transaction would otherwise time other writers out.
+DB_WRITE_RESOURCE = "db_write"
+
+STAGE_RAN = "RAN"
+STAGE_CHECKPOINT = "CHECKPOINT"
+STAGE_FAILED = "FAILED"
+STAGE_BLOCKED = "BLOCKED"
+
 
 def _nonempty_str(value: Any) -> str:
     if isinstance(value, str):
@@ -40,6 +59,18 @@ def _sha256_file(path: Path) -> str:
     return hasher.hexdigest()
 
 
+def _stable_json_dumps(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _sha256_json(payload: Any) -> str:
+    return hashlib.sha256(_stable_json_dumps(payload).encode("utf-8")).hexdigest()
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
 def _download_default_cards_index_uri() -> str:
     with urllib.request.urlopen(BULK_INDEX_URL, timeout=60) as response:
         payload = json.loads(response.read().decode("utf-8"))
@@ -74,14 +105,586 @@ def _download_file(url: str, destination: Path) -> None:
     temp_path.replace(destination)
 
 
-def _run_checked(command: Sequence[str], cwd: Path) -> None:
-    subprocess.run(list(command), cwd=str(cwd), check=True)
+class StageCommandError(RuntimeError):
+    def __init__(self, stage_name: str, returncode: int, command: Sequence[str]):
+        super().__init__(f"exit code {returncode}: {list(command)}")
+        self.stage_name = stage_name
+        self.returncode = returncode
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of the update DAG: a subprocess command or an in-process action.
+
+    input_files, the command and the upstream output digests make up the
+    checkpoint key; output_files and the units probe make up the output digest
+    that a resumed run re-checks and that downstream keys are built from.
+    """
+
+    name: str
+    command: Tuple[str, ...] = ()
+    action: Callable[[], None] | None = None
+    depends_on: Tuple[str, ...] = ()
+    input_files: Tuple[Path, ...] = ()
+    output_files: Tuple[Path, ...] = ()
+    key_extra: Callable[[], Any] | None = None
+    units: Callable[[], int | None] | None = None
+    units_label: str = ""
+    resource: str | None = None
+    checkpoint: bool = True
+    env: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    wall_seconds: float = 0.0
+    units: int | None = None
+    units_label: str = ""
+    error: str = ""
+    returncode: int | None = None
+
+    def throughput(self) -> float | None:
+        if self.units is None or self.status != STAGE_RAN or self.wall_seconds <= 0:
+            return None
+        return float(self.units) / self.wall_seconds
+
+
+class _FileHasher:
+    """sha256 per (path, size, mtime) so one run hashes a large bulk file once."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, int, int], str] = {}
+
+    def digest(self, path: Path) -> str | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        if not path.is_file():
+            return None
+        cache_key = (str(path), int(stat.st_size), int(stat.st_mtime_ns))
+        with self._lock:
+            cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        value = _sha256_file(path)
+        with self._lock:
+            self._cache[cache_key] = value
+        return value
+
+
+def _topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    by_name: Dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dependency in stage.depends_on:
+            if dependency not in by_name:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+
+    ordered: List[Stage] = []
+    placed: Set[str] = set()
+    while len(ordered) < len(stages):
+        progressed = False
+        for stage in stages:
+            if stage.name not in placed and all(dependency in placed for dependency in stage.depends_on):
+                ordered.append(stage)
+                placed.add(stage.name)
+                progressed = True
+        if not progressed:
+            cycle = sorted(stage.name for stage in stages if stage.name not in placed)
+            raise ValueError(f"Stage dependency cycle among: {cycle}")
+    return ordered
+
+
+def _load_state(state_path: Path) -> Dict[str, Any]:
+    try:
+        obj = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(obj, dict) or obj.get("version") != PIPELINE_STATE_VERSION:
+        return {}
+    stages = obj.get("stages")
+    return dict(stages) if isinstance(stages, dict) else {}
+
+
+def _write_state(state_path: Path, stage_state: Dict[str, Any], last_run: Dict[str, Any] | None = None) -> None:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    payload: Dict[str, Any] = {"version": PIPELINE_STATE_VERSION, "stages": stage_state}
+    if last_run is not None:
+        payload["last_run"] = last_run
+    temp_path = state_path.with_suffix(state_path.suffix + ".tmp")
+    temp_path.write_text(json.dumps(payload, indent=2, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(state_path)
+
+
+class _StageRunner:
+    def __init__(self, cwd: Path, hasher: _FileHasher, printer: Callable[[str], None]):
+        self.cwd = cwd
+        self.hasher = hasher
+        self._printer = printer
+        self._print_lock = threading.Lock()
+
+    def log(self, stage_name: str, message: str) -> None:
+        with self._print_lock:
+            self._printer(f"[{stage_name}] {message}")
+
+    def stage_key(self, stage: Stage, upstream_digests: Mapping[str, str]) -> str:
+        return _sha256_json(
+            {
+                "stage": stage.name,
+                "command": list(stage.command),
+                "inputs": {str(path): self.hasher.digest(path) for path in stage.input_files},
+                "upstream": {name: upstream_digests[name] for name in stage.depends_on},
+                "extra": stage.key_extra() if stage.key_extra is not None else None,
+            }
+        )
+
+    def probe_units(self, stage: Stage) -> int | None:
+        if stage.units is None:
+            return None
+        try:
+            return stage.units()
+        except Exception:
+            return None
+
+    def output_digest(self, stage: Stage, key: str, units: int | None) -> str:
+        if not stage.output_files and stage.units is None:
+            # Nothing to observe: the stage is identified by what went into it.
+            return key
+        return _sha256_json(
+            {
+                "outputs": {str(path): self.hasher.digest(path) for path in stage.output_files},
+                "units": units,
+            }
+        )
+
+    def run_command(self, stage: Stage) -> None:
+        env = dict(os.environ)
+        env.update(stage.env)
+        process = subprocess.Popen(
+            list(stage.command),
+            cwd=str(self.cwd),
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+        )
+        assert process.stdout is not None
+        for line in process.stdout:
+            self.log(stage.name, line.rstrip("\n"))
+        returncode = process.wait()
+        if returncode != 0:
+            raise StageCommandError(stage.name, returncode, stage.command)
+
+    def execute(
+        self,
+        stage: Stage,
+        upstream_digests: Mapping[str, str],
+        recorded: Mapping[str, Any] | None,
+        force: bool,
+    ) -> Tuple[StageResult, str, str]:
+        """Run (or resume past) one stage; returns (result, checkpoint key, output digest)."""
+        started = time.perf_counter()
+        key = self.stage_key(stage, upstream_digests)
+
+        if stage.checkpoint and not force and isinstance(recorded, Mapping) and recorded.get("key") == key:
+            units = self.probe_units(stage)
+            digest = self.output_digest(stage, key, units)
+            if recorded.get("output_digest") == digest:
+                self.log(stage.name, "checkpoint matches; skipping")
+                return (
+                    StageResult(name=stage.name, status=STAGE_CHECKPOINT, units=units, units_label=stage.units_label),
+                    key,
+                    digest,
+                )
+
+        self.log(stage.name, "starting")
+        if stage.action is not None:
+            stage.action()
+        else:
+            self.run_command(stage)
+        wall_seconds = time.perf_counter() - started
+        units = self.probe_units(stage)
+        digest = self.output_digest(stage, key, units)
+        self.log(stage.name, f"done in {wall_seconds:.1f}s")
+        return (
+            StageResult(
+                name=stage.name,
+                status=STAGE_RAN,
+                wall_seconds=wall_seconds,
+                units=units,
+                units_label=stage.units_label,
+            ),
+            key,
+            digest,
+        )
+
+
+def run_stage_graph(
+    stages: Sequence[Stage],
+    *,
+    state_path: Path,
+    cwd: Path,
+    max_parallel: int = DEFAULT_MAX_PARALLEL,
+    fresh: bool = False,
+    force_stages: Sequence[str] = (),
+    printer: Callable[[str], None] = print,
+) -> List[StageResult]:
+    """Run stages as soon as their dependencies are done, up to max_parallel at once.
+
+    A stage whose checkpoint key and output digest match the state file is
+    skipped. Completed stages are checkpointed as they finish, so after a
+    failure the next run resumes from the last good stage. On failure no new
+    stages start; running ones finish and the rest are reported BLOCKED.
+    """
+    ordered = _topological_order(stages)
+    unknown_forced = sorted(set(force_stages) - {stage.name for stage in ordered})
+    if unknown_forced:
+        raise ValueError(f"Unknown stage(s) to force: {unknown_forced}")
+
+    stage_state = {} if fresh else _load_state(state_path)
+    runner = _StageRunner(cwd=cwd, hasher=_FileHasher(), printer=printer)
+    results: Dict[str, StageResult] = {}
+    digests: Dict[str, str] = {}
+    pending: List[Stage] = list(ordered)
+    running: Dict[Future, Stage] = {}
+    busy_resources: Set[str] = set()
+    failed = False
+
+    with ThreadPoolExecutor(max_workers=max(int(max_parallel), 1)) as executor:
+        while pending or running:
+            if not failed:
+                for stage in list(pending):
+                    if len(running) >= max(int(max_parallel), 1):
+                        break
+                    if any(dependency not in digests for dependency in stage.depends_on):
+                        continue
+                    if stage.resource is not None and stage.resource in busy_resources:
+                        continue
+                    pending.remove(stage)
+                    if stage.resource is not None:
+                        busy_resources.add(stage.resource)
+                    recorded = stage_state.pop(stage.name, None)
+                    future = executor.submit(
+                        runner.execute,
+                        stage,
+                        dict(digests),
+                        recorded,
+                        stage.name in force_stages,
+                    )
+                    running[future] = stage
+
+            if not running:
+                break
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                if stage.resource is not None:
+                    busy_resources.discard(stage.resource)
+                try:
+                    result, key, digest = future.result()
+                except StageCommandError as exc:
+                    failed = True
+                    results[stage.name] = StageResult(
+                        name=stage.name,
+                        status=STAGE_FAILED,
+                        units_label=stage.units_label,
+                        error=str(exc),
+                        returncode=exc.returncode,
+                    )
+                    runner.log(stage.name, f"FAILED: {exc}")
+                    continue
+                except Exception as exc:
+                    failed = True
+                    results[stage.name] = StageResult(
+                        name=stage.name,
+                        status=STAGE_FAILED,
+                        units_label=stage.units_label,
+                        error=str(exc),
+                    )
+                    runner.log(stage.name, f"FAILED: {exc}")
+                    continue
+
+                results[stage.name] = result
+                digests[stage.name] = digest
+                if stage.checkpoint:
+                    stage_state[stage.name] = {
+                        "key": key,
+                        "output_digest": digest,
+                        "completed_at": _utc_now_iso(),
+                        "wall_seconds": round(result.wall_seconds, 3),
+                        "units": result.units,
+                    }
+                    _write_state(state_path, stage_state)
+
+    for stage in pending:
+        results[stage.name] = StageResult(name=stage.name, status=STAGE_BLOCKED, units_label=stage.units_label)
+
+    ordered_results = [results[stage.name] for stage in ordered]
+    _write_state(
+        state_path,
+        stage_state,
+        last_run={
+            "finished_at": _utc_now_iso(),
+            "stages": [
+                {
+                    "name": result.name,
+                    "status": result.status,
+                    "wall_seconds": round(result.wall_seconds, 3),
+                    "units": result.units,
+                    "units_label": result.units_label,
+                    "error": result.error,
+                }
+                for result in ordered_results
+            ],
+        },
+    )
+    return ordered_results
+
+
+def format_stage_report(results: Sequence[StageResult], total_wall_seconds: float) -> List[str]:
+    lines = [f"{'stage':<22} {'status':<11} {'wall_s':>8}  throughput"]
+    for result in results:
+        throughput = result.throughput()
+        if throughput is not None:
+            rate = f"{result.units} {result.units_label} ({throughput:,.1f}/s)"
+        elif result.units is not None:
+            rate = f"{result.units} {result.units_label}"
+        else:
+            rate = "-"
+        lines.append(f"{result.name:<22} {result.status:<11} {result.wall_seconds:>8.1f}  {rate}")
+    lines.append(f"{'total':<22} {'':<11} {total_wall_seconds:>8.1f}")
+    return lines
+
+
+def _sqlite_count(db_path: Path, sql: str, params: Sequence[Any] = ()) -> int | None:
+    if not db_path.is_file():
+        return None
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        row = con.execute(sql, tuple(params)).fetchone()
+    except sqlite3.Error:
+        return None
+    finally:
+        con.close()
+    return int(row[0]) if row is not None and row[0] is not None else None
+
+
+def build_update_stages(args: argparse.Namespace, *, repo_root: Path) -> List[Stage]:
+    """The update DAG for parsed CLI args.
+
+    ingest -> {enrich -> prefetch, decklist_name_index, tag, primitive_index};
+    download_bulk feeds enrich. DB writers share DB_WRITE_RESOURCE, so image
+    prefetch (network + files only) overlaps tagging and index builds.
+    """
+    db_path: Path = args.db_path
+    snapshot_id: str = args.snapshot_id
+    db_env = {"MTG_ENGINE_DB_PATH": str(db_path)}
+    python = sys.executable
+    stages: List[Stage] = []
+
+    def snapshot_cards() -> int | None:
+        return _sqlite_count(db_path, "SELECT COUNT(1) FROM cards WHERE snapshot_id = ?", (snapshot_id,))
+
+    if args.download_bulk:
+        stages.append(
+            Stage(
+                name="download_bulk",
+                action=lambda: _download_file(_download_default_cards_index_uri(), args.bulk_json_path),
+                output_files=(args.bulk_json_path,),
+                # The bulk download URI carries Scryfall's build timestamp.
+                key_extra=_download_default_cards_index_uri,
+            )
+        )
+
+    if args.ingest:
+        ingest_command = [
+            python,
+            str((repo_root / "tools" / "update_scryfall_bulk.py").resolve()),
+            "--db",
+            str(db_path),
+            "--schema",
+            str(args.schema_path),
+            "--out",
+            str(args.ingest_out_dir),
+            "--snapshot-id",
+            snapshot_id,
+        ]
+        if args.incremental:
+            ingest_command.append("--incremental")
+        stages.append(
+            Stage(
+                name="ingest",
+                command=tuple(ingest_command),
+                input_files=(args.schema_path,),
+                units=snapshot_cards,
+                units_label="cards",
+                resource=DB_WRITE_RESOURCE,
+                env={"PYTHONPATH": str(repo_root)},
+            )
+        )
+    ingest_deps: Tuple[str, ...] = ("ingest",) if args.ingest else ()
+
+    if not args.skip_enrich:
+        enrich_command = [
+            python,
+            "-m",
+            "snapshot_build.enrich_images_from_scryfall_bulk",
+            "--db",
+            str(db_path),
+            "--bulk-json",
+            str(args.bulk_json_path),
+        ]
+        if int(args.limit) > 0:
+            enrich_command.extend(["--limit", str(int(args.limit))])
+        stages.append(
+            Stage(
+                name="enrich",
+                command=tuple(enrich_command),
+                depends_on=(("download_bulk",) if args.download_bulk else ()) + ingest_deps,
+                input_files=(args.bulk_json_path,),
+                resource=DB_WRITE_RESOURCE,
+            )
+        )
+
+    if not args.skip_decklist_index:
+        stages.append(
+            Stage(
+                name="decklist_name_index",
+                command=(
+                    python,
+                    "-m",
+                    "snapshot_build.decklist_name_index_build",
+                    "--db",
+                    str(db_path),
+                    "--snapshot_id",
+                    snapshot_id,
+                ),
+                depends_on=ingest_deps,
+                units=snapshot_cards,
+                units_label="cards",
+                resource=DB_WRITE_RESOURCE,
+            )
+        )
+
+    if args.taxonomy_pack_path is not None:
+        tag_command = [
+            python,
+            "-m",
+            "snapshot_build.tag_snapshot",
+            "--snapshot_id",
+            snapshot_id,
+            "--taxonomy_pack",
+            str(args.taxonomy_pack_path),
+            "--workers",
+            str(max(int(args.tag_workers), 1)),
+            "--build_indices",
+        ]
+        if args.incremental:
+            tag_command.append("--incremental")
+        stages.append(
+            Stage(
+                name="tag",
+                command=tuple(tag_command),
+                depends_on=ingest_deps,
+                input_files=(args.taxonomy_pack_path / "pack_manifest.json",),
+                units=lambda: _sqlite_count(
+                    db_path, "SELECT COUNT(1) FROM card_tags WHERE snapshot_id = ?", (snapshot_id,)
+                ),
+                units_label="cards",
+                resource=DB_WRITE_RESOURCE,
+                env=db_env,
+            )
+        )
+
+    if not args.skip_primitive_index:
+        primitive_command = [
+            python,
+            str((repo_root / "scripts" / "build_primitive_tag_index_v0.py").resolve()),
+            "--db",
+            str(db_path),
+            "--snapshot-id",
+            snapshot_id,
+            "--workers",
+            str(max(int(args.tag_workers), 1)),
+        ]
+        if args.incremental:
+            primitive_command.append("--incremental")
+        stages.append(
+            Stage(
+                name="primitive_index",
+                command=tuple(primitive_command),
+                depends_on=ingest_deps,
+                input_files=(
+                    (repo_root / "data" / "primitives" / "primitive_defs_v0.json").resolve(),
+                    (repo_root / "data" / "primitives" / "primitive_rules_v0.json").resolve(),
+                ),
+                units=snapshot_cards,
+                units_label="cards",
+                resource=DB_WRITE_RESOURCE,
+                env=db_env,
+            )
+        )
+
+    if not args.skip_prefetch:
+        prefetch_command = [
+            python,
+            "-m",
+            "snapshot_build.prefetch_card_images",
+            "--db",
+            str(db_path),
+            "--snapshot_id",
+            snapshot_id,
+            "--source",
+            "card_images",
+            "--out",
+            str(args.cache_dir_path),
+            "--sizes",
+            "normal,small",
+            "--workers",
+            str(int(args.workers)),
+            "--progress",
+            str(int(args.progress)),
+        ]
+        if bool(args.resume):
+            prefetch_command.append("--resume")
+        else:
+            prefetch_command.append("--no-resume")
+        stages.append(
+            Stage(
+                name="prefetch",
+                command=tuple(prefetch_command),
+                depends_on=("enrich",) if not args.skip_enrich else ingest_deps,
+                units=snapshot_cards,
+                units_label="cards",
+            )
+        )
+
+    if args.launch:
+        stages.append(
+            Stage(
+                name="launch",
+                command=(python, str((repo_root / "launch_dev.py").resolve())),
+                depends_on=tuple(stage.name for stage in stages),
+                checkpoint=False,
+            )
+        )
+
+    return stages
 
 
 def _build_arg_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Run Update Mode bulk/enrich/prefetch pipeline")
+    parser = argparse.ArgumentParser(description="Run the Update Mode stage graph (ingest/tag/index/enrich/prefetch)")
     parser.add_argument("--db", required=True, help="Path to SQLite DB")
-    parser.add_argument("--snapshot-id", required=True, dest="snapshot_id", help="Snapshot ID used by prefetch")
+    parser.add_argument("--snapshot-id", required=True, dest="snapshot_id", help="Snapshot ID to ingest into / build for")
     parser.add_argument("--cache-dir", default="./data/card_images", dest="cache_dir", help="Local card image cache directory")
     parser.add_argument("--bulk-dir", default="./data/scryfall/bulk", dest="bulk_dir", help="Directory for bulk downloads")
     parser.add_argument("--bulk-json", default="", dest="bulk_json", help="Path to default-cards bulk JSON")
@@ -92,13 +695,46 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     resume_group.add_argument("--no-resume", dest="resume", action="store_false", help="Redownload images even when cached")
     parser.set_defaults(resume=True)
     parser.add_argument("--download-bulk", action="store_true", dest="download_bulk", help="Download fresh default_cards bulk JSON from Scryfall")
+    parser.add_argument("--ingest", action="store_true", help="Ingest Scryfall oracle_cards into --snapshot-id (tools/update_scryfall_bulk.py)")
+    parser.add_argument("--schema", default="./schemas/schema.sql", help="schema.sql for --ingest")
+    parser.add_argument("--ingest-out", default="", dest="ingest_out", help="Download folder for --ingest (default: --bulk-dir)")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Diff-ingest against the previous snapshot and re-tag / re-index only changed cards",
+    )
+    parser.add_argument("--taxonomy-pack", default="", dest="taxonomy_pack", help="Taxonomy pack folder; enables the tag stage")
+    parser.add_argument("--tag-workers", type=int, default=1, dest="tag_workers", help="Worker processes for tagging stages")
     parser.add_argument("--skip-enrich", action="store_true", dest="skip_enrich", help="Skip enrichment step")
     parser.add_argument("--skip-prefetch", action="store_true", dest="skip_prefetch", help="Skip prefetch step")
+    parser.add_argument("--skip-decklist-index", action="store_true", dest="skip_decklist_index", help="Skip the decklist name index build")
+    parser.add_argument("--skip-primitive-index", action="store_true", dest="skip_primitive_index", help="Skip the primitive tag index build")
     launch_group = parser.add_mutually_exclusive_group()
     launch_group.add_argument("--launch", action="store_true", dest="launch", help="Launch dev environment after pipeline")
     launch_group.add_argument("--no-launch", action="store_false", dest="launch", help="Do not launch dev environment")
     parser.set_defaults(launch=False)
     parser.add_argument("--limit", type=int, default=0, help="Optional enrichment scan limit for smoke tests")
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=DEFAULT_MAX_PARALLEL,
+        dest="max_parallel",
+        help=f"Max stages running at once (default {DEFAULT_MAX_PARALLEL}); DB writers never overlap",
+    )
+    parser.add_argument(
+        "--state-file",
+        default="",
+        dest="state_file",
+        help="Checkpoint file (default: ./logs/update_pipeline_<snapshot-id>.json)",
+    )
+    parser.add_argument("--fresh", action="store_true", help="Ignore checkpoints and run every stage")
+    parser.add_argument(
+        "--force-stage",
+        action="append",
+        default=[],
+        dest="force_stages",
+        help="Re-run this stage even when its checkpoint matches (repeatable)",
+    )
     return parser
 
 
@@ -108,7 +744,7 @@ def main(argv: Sequence[str] | None = None) -> int:
 
     repo_root = Path(__file__).resolve().parents[1]
     db_path = _resolve_path(args.db)
-    if not db_path.is_file():
+    if not db_path.is_file() and not args.ingest:
         print(f"ERROR: DB file not found: {db_path}")
         return 2
 
@@ -121,111 +757,65 @@ def main(argv: Sequence[str] | None = None) -> int:
         print("ERROR: --snapshot-id is required")
         return 2
 
-    steps: Dict[str, str] = {
-        "download_bulk": "SKIPPED",
-        "enrich": "SKIPPED",
-        "prefetch": "SKIPPED",
-        "launch": "SKIPPED",
-    }
-    bulk_sha256 = ""
-    current_step = "initialization"
+    if not args.skip_enrich and not args.download_bulk and not bulk_json_path.is_file():
+        print("ERROR: Bulk JSON missing. Re-run with --download-bulk or provide --bulk-json.")
+        return 2
+
+    taxonomy_pack_path = _resolve_path(args.taxonomy_pack) if _nonempty_str(args.taxonomy_pack) != "" else None
+    if taxonomy_pack_path is not None and not (taxonomy_pack_path / "pack_manifest.json").is_file():
+        print(f"ERROR: Taxonomy pack not found: {taxonomy_pack_path}")
+        return 2
+
+    args.db_path = db_path
+    args.snapshot_id = snapshot_id
+    args.cache_dir_path = cache_dir
+    args.bulk_json_path = bulk_json_path
+    args.schema_path = _resolve_path(args.schema)
+    args.ingest_out_dir = _resolve_path(args.ingest_out) if _nonempty_str(args.ingest_out) != "" else bulk_dir
+    args.taxonomy_pack_path = taxonomy_pack_path
+    state_path = (
+        _resolve_path(args.state_file)
+        if _nonempty_str(args.state_file) != ""
+        else (repo_root / "logs" / f"update_pipeline_{snapshot_id}.json").resolve()
+    )
 
     bulk_dir.mkdir(parents=True, exist_ok=True)
     cache_dir.mkdir(parents=True, exist_ok=True)
 
     try:
-        if args.download_bulk:
-            print("STEP 1/3 Download bulk")
-            current_step = "download_bulk"
-            download_uri = _download_default_cards_index_uri()
-            print(f"Downloading default_cards bulk to: {bulk_json_path}")
-            _download_file(download_uri, bulk_json_path)
-            steps["download_bulk"] = "RAN"
-
-        if not bulk_json_path.is_file():
-            raise RuntimeError("Bulk JSON missing. Re-run with --download-bulk or provide --bulk-json.")
-
-        bulk_sha256 = _sha256_file(bulk_json_path)
-        print(f"Bulk SHA256: {bulk_sha256}")
-
-        if not args.skip_enrich:
-            print("STEP 2/3 Enrich DB")
-            current_step = "enrich"
-            enrich_command = [
-                sys.executable,
-                "-m",
-                "snapshot_build.enrich_images_from_scryfall_bulk",
-                "--db",
-                str(db_path),
-                "--bulk-json",
-                str(bulk_json_path),
-                "--bulk-version",
-                bulk_sha256,
-            ]
-            if int(args.limit) > 0:
-                enrich_command.extend(["--limit", str(int(args.limit))])
-            _run_checked(enrich_command, cwd=repo_root)
-            steps["enrich"] = "RAN"
-        else:
-            print("Skipping enrichment step")
-
-        if not args.skip_prefetch:
-            print("STEP 3/3 Prefetch images")
-            current_step = "prefetch"
-            prefetch_command = [
-                sys.executable,
-                "-m",
-                "snapshot_build.prefetch_card_images",
-                "--db",
-                str(db_path),
-                "--snapshot_id",
-                snapshot_id,
-                "--source",
-                "card_images",
-                "--out",
-                str(cache_dir),
-                "--sizes",
-                "normal,small",
-                "--workers",
-                str(int(args.workers)),
-                "--progress",
-                str(int(args.progress)),
-            ]
-            if bool(args.resume):
-                prefetch_command.append("--resume")
-            else:
-                prefetch_command.append("--no-resume")
-            _run_checked(prefetch_command, cwd=repo_root)
-            steps["prefetch"] = "RAN"
-        else:
-            print("Skipping prefetch step")
-
-        if args.launch:
-            current_step = "launch"
-            launch_command = [sys.executable, str((repo_root / "launch_dev.py").resolve())]
-            _run_checked(launch_command, cwd=repo_root)
-            steps["launch"] = "RAN"
-
-    except subprocess.CalledProcessError as exc:
-        print(f"ERROR: Step '{current_step}' failed with exit code {exc.returncode}: {exc.cmd}")
-        return 3
+        stages = build_update_stages(args, repo_root=repo_root)
+        print(f"Stages: {' '.join(stage.name for stage in stages) or '(none)'}")
+        started = time.perf_counter()
+        results = run_stage_graph(
+            stages,
+            state_path=state_path,
+            cwd=repo_root,
+            max_parallel=args.max_parallel,
+            fresh=bool(args.fresh),
+            force_stages=list(args.force_stages),
+        )
+        total_wall_seconds = time.perf_counter() - started
     except Exception as exc:
-        print(f"ERROR: Step '{current_step}' failed: {exc}")
+        print(f"ERROR: Pipeline setup failed: {exc}")
         return 2
 
     print("\nUpdate pipeline summary")
     print(f"bulk path: {bulk_json_path}")
-    print(f"sha256: {bulk_sha256}")
+    print(f"sha256: {_sha256_file(bulk_json_path) if bulk_json_path.is_file() else ''}")
     print(f"db path: {db_path}")
     print(f"snapshot id: {snapshot_id}")
     print(f"cache dir: {cache_dir}")
-    print(
-        "steps: "
-        f"download_bulk={steps['download_bulk']} "
-        f"enrich={steps['enrich']} "
-        f"prefetch={steps['prefetch']} "
-        f"launch={steps['launch']}"
-    )
+    print(f"state file: {state_path}")
+    for line in format_stage_report(results, total_wall_seconds):
+        print(line)
+
+    failed = [result for result in results if result.status == STAGE_FAILED]
+    for result in failed:
+        print(f"ERROR: Step '{result.name}' failed: {result.error}")
+    if any(result.returncode is not None for result in failed):
+        return 3
+    if failed:
+        return 2
     return 0
 
 
@@ -4,12 +4,22 @@ import sqlite3
 import hashlib
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 import requests
 from tqdm import tqdm
 
+from engine.color_identity_mask import color_identity_mask_from_field
+from snapshot_build.bulk_json_stream import iter_batches, iter_json_array
 from snapshot_build.migrate_card_images_table import ensure_card_images_table
+from snapshot_build.migrate_cards_color_identity_mask import ensure_cards_color_identity_mask
+from snapshot_build.snapshot_diff_ingest import (
+    ensure_snapshot_diff_tables,
+    ingest_card_rows_incremental,
+    resolve_base_snapshot_id,
+)
+
+INGEST_BATCH_SIZE = 2000
 
 
 def extract_primitives(card_dict: dict) -> list[str]:
@@ -228,67 +238,91 @@ def download_file(url: str, out_path: Path):
                 pbar.update(len(chunk))
 
 
-def ingest_cards(con: sqlite3.Connection, snapshot_id: str, json_path: Path):
-    data = json.loads(json_path.read_text(encoding="utf-8"))
-
+def card_rows_for_ingest(card: Dict[str, Any]) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+    """(cards_raw row, cards row) for one bulk card, both without the leading snapshot_id."""
+    name = card.get("name")
+    oracle_id = card.get("oracle_id")
+    raw_row = (
+        card.get("id"),
+        oracle_id,
+        card.get("lang"),
+        name,
+        json.dumps(card, ensure_ascii=False),
+    )
+    card_row = (
+        oracle_id,
+        name,
+        card.get("mana_cost"),
+        card.get("cmc"),
+        card.get("type_line"),
+        card.get("oracle_text"),
+        json.dumps(card.get("colors", [])),
+        json.dumps(card.get("color_identity", [])),
+        color_identity_mask_from_field(card.get("color_identity", [])),
+        json.dumps(card.get("produced_mana", [])),
+        json.dumps(card.get("keywords", [])),
+        json.dumps(card.get("legalities") or {}),
+        json.dumps(extract_primitives(card)),
+    )
+    return raw_row, card_row
+
+
+def ingest_cards(con: sqlite3.Connection, snapshot_id: str, json_path: Path, batch_size: int = INGEST_BATCH_SIZE) -> int:
+    """Stream the bulk array into cards_raw/cards, committing every batch_size cards."""
     cur = con.cursor()
-    raw_rows = []
-    norm_rows = []
-
-    for card in tqdm(data, desc="Preparing rows"):
-        scry_id = card.get("id")
-        oracle_id = card.get("oracle_id")
-        lang = card.get("lang")
-        name = card.get("name")
-
-        legalities_json = json.dumps(card.get("legalities") or {})
-        primitives_json = json.dumps(extract_primitives(card))
-
-        raw_rows.append((
-            snapshot_id,
-            scry_id,
-            oracle_id,
-            lang,
-            name,
-            json.dumps(card, ensure_ascii=False),
-        ))
-
-        norm_rows.append((
-            snapshot_id,
-            oracle_id,
-            name,
-            card.get("mana_cost"),
-            card.get("cmc"),
-            card.get("type_line"),
-            card.get("oracle_text"),
-            json.dumps(card.get("colors", [])),
-            json.dumps(card.get("color_identity", [])),
-            json.dumps(card.get("produced_mana", [])),
-            json.dumps(card.get("keywords", [])),
-            legalities_json,
-            primitives_json,
-        ))
-
-    cur.execute("BEGIN;")
-    cur.executemany("""
-        INSERT OR REPLACE INTO cards_raw
-        (snapshot_id, scryfall_id, oracle_id, lang, name, json)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, raw_rows)
-
-    cur.executemany("""
-        INSERT OR REPLACE INTO cards
-        (snapshot_id, oracle_id, name, mana_cost, cmc, type_line, oracle_text,
-         colors, color_identity, produced_mana, keywords, legalities_json, primitives_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, norm_rows)
-
-    con.commit()
+    ingested = 0
+
+    with tqdm(desc="Ingesting cards", unit="card") as pbar:
+        for batch in iter_batches(iter_json_array(json_path), batch_size):
+            raw_rows = []
+            norm_rows = []
+            for card in batch:
+                raw_row, card_row = card_rows_for_ingest(card)
+                raw_rows.append((snapshot_id, *raw_row))
+                norm_rows.append((snapshot_id, *card_row))
+
+            cur.execute("BEGIN;")
+            cur.executemany("""
+                INSERT OR REPLACE INTO cards_raw
+                (snapshot_id, scryfall_id, oracle_id, lang, name, json)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, raw_rows)
+
+            cur.executemany("""
+                INSERT OR REPLACE INTO cards
+                (snapshot_id, oracle_id, name, mana_cost, cmc, type_line, oracle_text,
+                 colors, color_identity, color_identity_mask, produced_mana, keywords, legalities_json, primitives_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, norm_rows)
+
+            con.commit()
+            ingested += len(batch)
+            pbar.update(len(batch))
+
+    return ingested
+
+
+def ingest_cards_incremental(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    json_path: Path,
+    base_snapshot_id: str,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Write only added/changed cards and carry the rest forward from base_snapshot_id."""
+    cards = tqdm(iter_json_array(json_path), desc="Diffing cards", unit="card")
+    return ingest_card_rows_incremental(
+        con,
+        snapshot_id=snapshot_id,
+        base_snapshot_id=base_snapshot_id,
+        card_rows=(card_rows_for_ingest(card) for card in cards),
+        batch_size=batch_size,
+    )
 
 
 def insert_snapshot(con: sqlite3.Connection, snapshot_id: str, oracle_meta: Dict[str, Any], manifest: Dict[str, Any]):
     con.execute("""
-        INSERT INTO snapshots (snapshot_id, created_at, source, scryfall_bulk_uri, scryfall_bulk_updated_at, manifest_json)
+        INSERT OR REPLACE INTO snapshots (snapshot_id, created_at, source, scryfall_bulk_uri, scryfall_bulk_updated_at, manifest_json)
         VALUES (?, ?, ?, ?, ?, ?)
     """, (
         snapshot_id,
@@ -301,12 +335,60 @@ def insert_snapshot(con: sqlite3.Connection, snapshot_id: str, oracle_meta: Dict
     con.commit()
 
 
+def clear_snapshot_rows(con: sqlite3.Connection, snapshot_id: str):
+    """Remove everything an earlier (possibly interrupted) ingest wrote for snapshot_id."""
+    ensure_snapshot_diff_tables(con)
+    cur = con.cursor()
+    cur.execute("BEGIN;")
+    for table_name in ("snapshots", "cards_raw", "cards", "card_fingerprints_v1", "snapshot_changes_v1"):
+        cur.execute(f"DELETE FROM {table_name} WHERE snapshot_id = ?", (snapshot_id,))
+    con.commit()
+
+
+def ingest_snapshot(
+    con: sqlite3.Connection,
+    snapshot_id: str,
+    json_path: Path,
+    oracle_meta: Dict[str, Any],
+    manifest: Dict[str, Any],
+    base_snapshot_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Ingest json_path as snapshot_id; rerunnable for the same snapshot_id.
+
+    Rows left by an earlier attempt are cleared first, and the snapshots row is
+    written last, so an interrupted ingest never looks like a finished snapshot
+    and a retry (e.g. a resumed update pipeline) starts clean. Returns the
+    change summary for an incremental ingest, else None.
+    """
+    if base_snapshot_id == snapshot_id:
+        raise ValueError(f"base snapshot {base_snapshot_id} is the snapshot being ingested")
+    clear_snapshot_rows(con, snapshot_id)
+    change_summary = None
+    if base_snapshot_id is None:
+        ingest_cards(con, snapshot_id, json_path)
+    else:
+        change_summary = ingest_cards_incremental(con, snapshot_id, json_path, base_snapshot_id)
+        manifest["change_manifest_v1"] = change_summary
+    insert_snapshot(con, snapshot_id, oracle_meta, manifest)
+    return change_summary
+
+
 def main():
     ap = argparse.ArgumentParser(description="Update Mode: ingest Scryfall oracle_cards bulk data into SQLite snapshot.")
     ap.add_argument("--db", required=True, help="Path to SQLite DB (e.g., E:\\mtg-engine\\data\\mtg.sqlite)")
     ap.add_argument("--schema", required=True, help="Path to schema.sql (e.g., schemas\\schema.sql)")
     ap.add_argument("--out", required=True, help="Where to download bulk JSON (e.g., E:\\mtg-engine\\snapshots)")
     ap.add_argument("--snapshot-id", default=None, help="Optional snapshot id; default uses UTC timestamp.")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Diff against the previous snapshot: write only added/changed cards and record a change manifest.",
+    )
+    ap.add_argument(
+        "--base-snapshot-id",
+        default=None,
+        help="Snapshot to diff against with --incremental (default: most recently created snapshot).",
+    )
     args = ap.parse_args()
 
     db_path = Path(args.db)
@@ -346,10 +428,21 @@ def main():
         print("[4/5] Applying schema...")
         apply_schema(con, load_schema(schema_path))
         ensure_card_images_table(db_path=db_path)
+        ensure_cards_color_identity_mask(db_path=db_path)
+
+        base_snapshot_id = None
+        if args.incremental:
+            base_snapshot_id = args.base_snapshot_id or resolve_base_snapshot_id(con, snapshot_id)
+            if base_snapshot_id is None:
+                print("No previous snapshot to diff against; running a full ingest.")
 
         print(f"[5/5] Ingesting cards for snapshot_id={snapshot_id} ...")
-        insert_snapshot(con, snapshot_id, oracle_meta, manifest)
-        ingest_cards(con, snapshot_id, json_path)
+        change_summary = ingest_snapshot(con, snapshot_id, json_path, oracle_meta, manifest, base_snapshot_id)
+        if change_summary is not None:
+            print(
+                f"Delta vs {base_snapshot_id}: added={change_summary['added']} changed={change_summary['changed']} "
+                f"removed={change_summary['removed']} unchanged={change_summary['unchanged']}"
+            )
     finally:
         con.close()
 